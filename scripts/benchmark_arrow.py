@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Measure the export of many items to Parquet files with wbi_arrow.write_parquet().
+
+The items are synthetic items with statements, each with qualifiers and a
+reference block, given as JSON as by a dump reader. The script reports the
+time taken and, in a second run, the peak of the memory allocated during the
+export, as measured by tracemalloc: it depends on the batch size, not on the
+number of items.
+
+Usage:
+    python scripts/benchmark_arrow.py                          # 5000 items of 20 statements
+    python scripts/benchmark_arrow.py --items 100000 --batch-size 1000
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmark_memory import build_item  # noqa: E402  pylint: disable=wrong-import-position
+
+from wikibaseintegrator.wbi_arrow import write_parquet  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=5000, help='number of items exported')
+    parser.add_argument('--statements', type=int, default=20, help='number of statements of each item')
+    parser.add_argument('--batch-size', type=int, default=1000, help='number of items of each record batch')
+    args = parser.parse_args()
+
+    item = build_item(args.statements)
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        rows = write_parquet((item for _ in range(args.items)), directory, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        write_parquet((item for _ in range(args.items)), directory, batch_size=args.batch_size)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    print(f'{args.items} items in {elapsed:.2f} s ({args.items / elapsed:.0f} items/s), peak {peak / 1024 / 1024:.1f} MiB')
+    print(', '.join(f'{table}: {count} rows' for table, count in rows.items()))
+
+
+if __name__ == '__main__':
+    main()
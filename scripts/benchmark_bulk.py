@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Compare the creation of items from the rows of a table, one datatype object at
+a time, and with wbi_bulk.BulkBuilder.
+
+Each row is a scholarly article with a label, a DOI, a publication date, a
+number of pages, a journal with a volume qualifier, and a reference to the
+source of the data. The script reports the time taken to build the items and
+their JSON, as for a write.
+
+Usage:
+    python scripts/benchmark_bulk.py                  # 10000 rows
+    python scripts/benchmark_bulk.py --rows 100000
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from wikibaseintegrator import WikibaseIntegrator  # noqa: E402  pylint: disable=wrong-import-position
+from wikibaseintegrator.datatypes import ExternalID, Item, Quantity, String, Time  # noqa: E402  pylint: disable=wrong-import-position
+from wikibaseintegrator.wbi_bulk import BulkBuilder, Column  # noqa: E402  pylint: disable=wrong-import-position
+from wikibaseintegrator.wbi_enums import ColumnRole  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def build_table(rows: int) -> dict[str, list]:
+    """Return the columns of the table."""
+    return {
+        'label': [f'Article {index}' for index in range(rows)],
+        'doi': [f'10.1000/{index}' for index in range(rows)],
+        'date': [f'+{1950 + index % 70}-{index % 12 + 1:02d}-{index % 28 + 1:02d}T00:00:00Z' for index in range(rows)],
+        'pages': [index % 40 + 1 for index in range(rows)],
+        'journal': [f'Q{100 + index % 50}' for index in range(rows)],
+        'volume': [str(index % 30) for index in range(rows)]
+    }
+
+
+def one_by_one(table: dict[str, list]) -> list[dict]:
+    """Build the items with one datatype object per value."""
+    wbi = WikibaseIntegrator()
+    payloads = []
+    for label, doi, date, pages, journal, volume in zip(table['label'], table['doi'], table['date'], table['pages'], table['journal'], table['volume']):
+        item = wbi.item.new()
+        item.labels.set('en', label)
+        references = [[Item(prop_nr='P248', value='Q5188229')]]
+        item.claims.add([
+            ExternalID(prop_nr='P356', value=doi, references=references),
+            Time(prop_nr='P577', time=date, references=references),
+            Quantity(prop_nr='P1104', amount=pages, references=references),
+            Item(prop_nr='P1433', value=journal, qualifiers=[String(prop_nr='P478', value=volume)], references=references)
+        ])
+        payloads.append(item.get_json())
+    return payloads
+
+
+def bulk(table: dict[str, list]) -> list[dict]:
+    """Build the items with a BulkBuilder."""
+    table = {**table, 'source': ['Q5188229'] * len(table['label'])}
+    builder = BulkBuilder([
+        Column('label', ColumnRole.LABEL, language='en'),
+        Column('doi', prop_nr='P356', datatype=ExternalID),
+        Column('date', prop_nr='P577', datatype=Time),
+        Column('pages', prop_nr='P1104', datatype=Quantity),
+        Column('journal', prop_nr='P1433', datatype=Item),
+        Column('volume', ColumnRole.QUALIFIER, prop_nr='P478', datatype=String, of='journal'),
+        Column('source', ColumnRole.REFERENCE, prop_nr='P248', datatype=Item)
+    ])
+    return [item.get_json() for item in builder.entities(table)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000, help='number of rows of the table')
+    args = parser.parse_args()
+
+    table = build_table(args.rows)
+    for name, build in (('one by one', one_by_one), ('bulk', bulk)):
+        start = time.perf_counter()
+        payloads = build(table)
+        elapsed = time.perf_counter() - start
+        assert len(payloads) == args.rows
+        print(f'{name}: {args.rows} rows in {elapsed:.2f} s ({args.rows / elapsed:.0f} rows/s)')
+
+
+if __name__ == '__main__':
+    main()
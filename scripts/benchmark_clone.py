@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Compare copy.deepcopy() and clone() to create many items from a template.
+
+The template is an item with labels, descriptions and statements with
+qualifiers and references. For each record, a copy of the template gets its own
+label and identifier statement, and its JSON is built, as for a write. The
+script reports the time taken and the memory kept by the copies, as measured by
+tracemalloc in a second run.
+
+The clones are made from a clone of the template: its JSON is built once and
+shared by all the clones.
+
+Usage:
+    python scripts/benchmark_clone.py                  # 10000 records
+    python scripts/benchmark_clone.py --records 100000
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import gc
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from wikibaseintegrator.datatypes import URL, ExternalID, Item, String, Time  # noqa: E402  pylint: disable=wrong-import-position
+from wikibaseintegrator.entities import ItemEntity  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def build_template() -> ItemEntity:
+    """Return an item with the data shared by every record."""
+    template = ItemEntity()
+    for language in ('en', 'fr', 'de', 'es', 'it'):
+        template.labels.set(language, 'Template')
+        template.descriptions.set(language, 'scholarly article')
+    references = [[Item(prop_nr='P248', value='Q5188229'), URL(prop_nr='P854', value='https://example.org/source')]]
+    template.claims.add([
+        Item(prop_nr='P31', value='Q13442814', references=references),
+        Item(prop_nr='P1433', value='Q180445', qualifiers=[String(prop_nr='P478', value='12')], references=references),
+        Time(prop_nr='P577', time='+2020-01-01T00:00:00Z', references=references),
+        Item(prop_nr='P407', value='Q1860', references=references)
+    ])
+    return template
+
+
+def create(template: ItemEntity, records: int, copy_template: Callable[[ItemEntity], ItemEntity]) -> list[ItemEntity]:
+    """Create the records from the template."""
+    entities = []
+    for index in range(records):
+        entity = copy_template(template)
+        entity.labels.set('en', f'Article {index}')
+        entity.claims.add(ExternalID(prop_nr='P356', value=f'10.1000/{index}'))
+        entity.get_json()
+        entities.append(entity)
+    return entities
+
+
+def measure(template: ItemEntity, records: int, copy_template: Callable[[ItemEntity], ItemEntity]) -> tuple[float, int]:
+    """Return the time taken to create the records, and the number of bytes kept by them."""
+    start = time.perf_counter()
+    create(template, records, copy_template)
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = create(template, records, copy_template)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(entities) == records
+    return elapsed, after - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=10000, help='number of items created from the template')
+    args = parser.parse_args()
+
+    for name, template, copy_template in (('deepcopy', build_template(), copy.deepcopy), ('clone', build_template().clone(), ItemEntity.clone)):
+        elapsed, allocated = measure(template, args.records, copy_template)
+        print(f'{name}: {args.records} records in {elapsed:.2f} s, {allocated / args.records:.0f} bytes per record')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Measure the reading of a JSON dump with wbi_dumps.DumpReader.
+
+The dump is a gzip-compressed dump of synthetic items with statements, each
+with qualifiers and a reference block, written to a temporary file. The script
+reports the time taken to read all the items and count their statements, in
+this process and in a pool of worker processes (the speedup depends on the
+number of CPUs), and to read 1% of the items selected by ID, which the
+byte-level prefilter skips without parsing the other lines.
+
+Usage:
+    python scripts/benchmark_dumps.py                          # 5000 items of 20 statements
+    python scripts/benchmark_dumps.py --items 50000 --processes 8
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmark_memory import build_item  # noqa: E402  pylint: disable=wrong-import-position
+
+from wikibaseintegrator.entities import BaseEntity  # noqa: E402  pylint: disable=wrong-import-position
+from wikibaseintegrator.wbi_dumps import DumpReader  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def write_dump(path: str, items: int, statements: int) -> None:
+    """Write a dump of items, in the format of the Wikimedia dumps."""
+    item = build_item(statements)
+    with gzip.open(path, 'wt', encoding='utf-8') as file:
+        file.write('[\n')
+        for index in range(items):
+            item['id'] = f'Q{index + 1}'
+            file.write(json.dumps(item, separators=(',', ':')) + (',\n' if index < items - 1 else '\n'))
+        file.write(']\n')
+
+
+def count_statements(entity: BaseEntity) -> int:
+    """The function called on each entity, in the worker processes if any."""
+    return len(entity.claims)
+
+
+def measure(name: str, reader: DumpReader, **kwargs) -> None:
+    start = time.perf_counter()
+    count = sum(1 for _ in reader.entities(function=count_statements, **kwargs))
+    elapsed = time.perf_counter() - start
+    print(f'{name}: {count} items in {elapsed:.2f} s ({count / elapsed:.0f} items/s)')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=5000, help='number of items of the dump')
+    parser.add_argument('--statements', type=int, default=20, help='number of statements of each item')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help='number of worker processes')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'dump.json.gz')
+        write_dump(path, args.items, args.statements)
+
+        print(f'{os.cpu_count()} CPUs')
+        measure('all, 1 process', DumpReader(path))
+        measure(f'all, {args.processes} processes', DumpReader(path), processes=args.processes)
+        measure('1% by ID, 1 process', DumpReader(path, ids=[f'Q{index}' for index in range(1, args.items + 1, 100)]))
+
+
+if __name__ == '__main__':
+    main()
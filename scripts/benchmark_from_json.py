@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Measure the time taken by ItemEntity().from_json() to load a large item.
+
+The item is either a synthetic item with many statements, each with qualifiers
+and a reference block, or the JSON of a real entity given with --file (e.g. the
+output of Special:EntityData/Q42.json). It is loaded with the validation of
+the values, as for a JSON built by hand, and with trusted=True, as for the
+JSON returned by a Wikibase instance.
+
+Usage:
+    python scripts/benchmark_from_json.py                    # 2000 statements
+    python scripts/benchmark_from_json.py --statements 10000
+    python scripts/benchmark_from_json.py --file Q42.json --repeat 20
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmark_memory import build_item  # noqa: E402  pylint: disable=wrong-import-position
+
+from wikibaseintegrator.entities import ItemEntity  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def load_item(path: str) -> dict:
+    """Return the JSON of the first entity of a file, in the format of wbgetentities or Special:EntityData."""
+    with open(path, encoding='utf-8') as file:
+        json_data = json.load(file)
+    if 'entities' in json_data:
+        json_data = next(iter(json_data['entities'].values()))
+    return json_data
+
+
+def measure(json_data: dict, repeat: int, trusted: bool) -> float:
+    """Return the best time, in seconds, taken to load the item."""
+    return min(timeit.repeat(lambda: ItemEntity().from_json(json_data, trusted=trusted), number=1, repeat=repeat))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--statements', type=int, default=2000, help='number of statements of the synthetic item')
+    parser.add_argument('--file', help='JSON file of the item to load instead of the synthetic item')
+    parser.add_argument('--repeat', type=int, default=10, help='number of runs, the best one is reported')
+    args = parser.parse_args()
+
+    json_data = load_item(args.file) if args.file else build_item(args.statements)
+    statements = sum(len(claims) for claims in json_data.get('claims', {}).values())
+
+    validated = measure(json_data, args.repeat, trusted=False)
+    trusted = measure(json_data, args.repeat, trusted=True)
+    print(f'{statements} statements: {validated * 1000:.1f} ms validated, {trusted * 1000:.1f} ms trusted ({validated / trusted:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
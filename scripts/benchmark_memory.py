@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Measure the memory used by a loaded entity, in bytes per statement.
+
+The script builds the JSON of a synthetic item with many statements, each with
+qualifiers and a reference block, loads it with ItemEntity.from_json() and
+reports the memory allocated by the loaded objects, as measured by
+tracemalloc. The JSON itself is not counted.
+
+Run it on two revisions of the library to compare them. With --lazy, the item is
+loaded lazily and only the statements of the first property are accessed.
+
+With --items, many items are decoded from their JSON text one by one, as the
+responses of a Wikibase instance or the lines of a dump, and loaded as trusted
+JSON. The JSON is dropped once loaded: the memory reported is what the loaded
+entities keep, including the strings of the JSON they share.
+
+Usage:
+    python scripts/benchmark_memory.py                   # 2000 statements
+    python scripts/benchmark_memory.py --statements 10000
+    python scripts/benchmark_memory.py --lazy
+    python scripts/benchmark_memory.py --items 10000 --statements 20
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from wikibaseintegrator.entities import ItemEntity  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def item_snak(property_number: str, numeric_id: int) -> dict:
+    return {
+        'snaktype': 'value',
+        'property': property_number,
+        'datavalue': {'value': {'entity-type': 'item', 'numeric-id': numeric_id, 'id': f'Q{numeric_id}'}, 'type': 'wikibase-entityid'},
+        'datatype': 'wikibase-item'
+    }
+
+
+def string_snak(property_number: str, value: str) -> dict:
+    return {
+        'snaktype': 'value',
+        'property': property_number,
+        'datavalue': {'value': value, 'type': 'string'},
+        'datatype': 'string'
+    }
+
+
+def build_item(statements: int) -> dict:
+    """Return the JSON of an item with the given number of statements, spread over 50 properties."""
+    claims: dict[str, list] = {}
+    for index in range(statements):
+        property_number = f'P{index % 50 + 1}'
+        claims.setdefault(property_number, []).append({
+            'mainsnak': item_snak(property_number, index + 1),
+            'type': 'statement',
+            'qualifiers': {'P580': [string_snak('P580', f'qualifier {index}')]},
+            'qualifiers-order': ['P580'],
+            'id': f'Q1${index:08d}-0000-0000-0000-000000000000',
+            'rank': 'normal',
+            'references': [{
+                'hash': f'{index:040x}',
+                'snaks': {'P248': [item_snak('P248', 5000)], 'P854': [string_snak('P854', f'https://example.org/{index}')]},
+                'snaks-order': ['P248', 'P854']
+            }]
+        })
+
+    return {
+        'type': 'item',
+        'id': 'Q1',
+        'lastrevid': 1,
+        'labels': {'en': {'language': 'en', 'value': 'Benchmark'}},
+        'descriptions': {},
+        'aliases': {},
+        'claims': claims,
+        'sitelinks': {}
+    }
+
+
+def measure(statements: int, lazy: bool = False) -> int:
+    """Return the number of bytes allocated by the entity loaded from a synthetic item."""
+    json_data = build_item(statements)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entity = ItemEntity().from_json(json_data, lazy=lazy)
+    entity.claims.get('P1')
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(entity.claims) > 0
+    return after - before
+
+
+def measure_batch(items: int, statements: int) -> int:
+    """Return the number of bytes kept by the entities loaded from the JSON texts of many synthetic items."""
+    texts = [json.dumps(build_item(statements)) for _ in range(items)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [ItemEntity().from_json(json.loads(text), trusted=True) for text in texts]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(entities) == items
+    return after - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--statements', type=int, default=2000, help='number of statements of the synthetic item')
+    parser.add_argument('--lazy', action='store_true', help='load the item lazily')
+    parser.add_argument('--items', type=int, help='load this number of items from their JSON text, with the given number of statements each')
+    args = parser.parse_args()
+
+    if args.items:
+        allocated = measure_batch(args.items, args.statements)
+        statements = args.items * args.statements
+        print(f'{args.items} items, {statements} statements: {allocated} bytes, {allocated / statements:.0f} bytes per statement')
+        return
+
+    allocated = measure(args.statements, lazy=args.lazy)
+    print(f'{args.statements} statements: {allocated} bytes, {allocated / args.statements:.0f} bytes per statement')
+
+
+if __name__ == '__main__':
+    main()
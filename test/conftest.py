@@ -20,6 +20,7 @@ Guidelines:
 from __future__ import annotations
 
 import json
+import re
 from copy import deepcopy
 from pathlib import Path
 from typing import Any
@@ -65,6 +66,7 @@ class MockWikibase:
         self.mediawiki_api_url = base_url + '/w/api.php'
         self.mediawiki_index_url = base_url + '/w/index.php'
         self.mediawiki_rest_url = base_url + '/w/rest.php'
+        self.entity_data_url = base_url + '/wiki/Special:EntityData'
         self.sparql_endpoint_url = base_url + '/sparql'
 
         self.entities: dict[str, dict] = {}
@@ -74,10 +76,14 @@ class MockWikibase:
         self.requests: list[dict[str, str]] = []  # every parsed API request
         self.edits: list[dict[str, Any]] = []  # every wbeditentity call: {'params': ..., 'data': ...}
         self.sparql_queries: list[str] = []
+        self.entity_data_requests: list[dict[str, Any]] = []  # every Special:EntityData request: {'id': ..., 'revision': ..., 'status': ...}
+        self.rest_requests: list[dict[str, Any]] = []  # every REST API request: {'path': ..., 'params': ..., 'status': ...}
 
         # Configurable behaviour
         self.search_results: list[dict] = []  # wbsearchentities results
         self.fulltext_results: list[dict] = []  # list=search results
+        self.recent_changes: list[dict] = []  # list=recentchanges results, oldest first
+        self.redirects: dict[str, str] = {}  # entity id -> id of the target of the redirect
         self.sparql_bindings: list[dict] = []  # bindings returned by the SPARQL endpoint
         self.constraint_results: dict[str, list[dict]] = {}  # wbcheckconstraints results, keyed by entity id
         self.valid_credentials: dict[str, str] = {}  # user -> password accepted by (client)login
@@ -87,6 +93,8 @@ class MockWikibase:
 
         mocker.register_uri(requests_mock_lib.ANY, self.mediawiki_api_url, json=self._handle_api)
         mocker.post(self.sparql_endpoint_url, json=self._handle_sparql)
+        mocker.get(re.compile(re.escape(self.entity_data_url) + '/'), content=self._handle_entity_data)
+        mocker.get(re.compile(re.escape(self.mediawiki_rest_url) + '/wikibase/v1/'), content=self._handle_rest)
 
     # ------------------------------------------------------------------ #
     # Content setup helpers
@@ -175,6 +183,52 @@ class MockWikibase:
             'results': {'bindings': bindings},
         }
 
+    def _handle_entity_data(self, request: Any, context: Any) -> bytes:
+        """Special:EntityData, with an ETag and a Last-Modified date derived from the last revision of the entity."""
+        url = urlparse(request.url)
+        entity_id = url.path.rsplit('/', 1)[-1].removesuffix('.json')
+        revision = parse_qs(url.query).get('revision', [None])[0]
+        entity = self.entities.get(self.redirects.get(entity_id, entity_id))
+
+        if entity is None or (revision is not None and int(revision) != entity['lastrevid']):
+            context.status_code = 404
+        else:
+            context.headers['ETag'] = f'"{entity["lastrevid"]}"'
+            context.headers['Last-Modified'] = 'Wed, 01 Jan 2025 00:00:00 GMT'
+            if request.headers.get('If-None-Match') == context.headers['ETag']:
+                context.status_code = 304
+        self.entity_data_requests.append({'id': entity_id, 'revision': revision, 'status': context.status_code})
+
+        if context.status_code != 200 or entity is None:
+            return b''
+        return json.dumps({'entities': {entity['id']: entity}}).encode()
+
+    def _handle_rest(self, request: Any, context: Any) -> bytes:
+        """The GET routes of the Wikibase REST API for the items and the properties, with the ETag of the last revision."""
+        url = urlparse(request.url)
+        path = url.path.split('/wikibase/v1', 1)[1]
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        match = re.fullmatch(r'/entities/(items|properties)/([^/]+)(/statements)?', path)
+        entity = self.entities.get(match.group(2)) if match else None
+
+        body: dict[str, Any] | None = None
+        if entity is None:
+            context.status_code = 404
+            body = {'code': 'resource-not-found', 'message': 'The requested resource does not exist'}
+        else:
+            context.headers['ETag'] = f'"{entity["lastrevid"]}"'
+            if request.headers.get('If-None-Match') == context.headers['ETag']:
+                context.status_code = 304
+            elif match and match.group(3):
+                body = {prop_nr: [_rest_statement(claim) for claim in claims] for prop_nr, claims in entity.get('claims', {}).items() if params.get('property', prop_nr) == prop_nr}
+            else:
+                body = _rest_entity(entity)
+                if '_fields' in params:
+                    body = {key: value for key, value in body.items() if key == 'id' or key in params['_fields'].split(',')}
+        self.rest_requests.append({'path': path, 'params': params, 'status': context.status_code})
+
+        return json.dumps(body).encode() if body is not None else b''
+
     # ------------------------------------------------------------------ #
     # action= handlers
     # ------------------------------------------------------------------ #
@@ -213,8 +267,16 @@ class MockWikibase:
 
         return {key: deepcopy(value) for key, value in entity.items() if key not in ENTITY_SECTIONS or key in keep}
 
+    def _conflict(self, params: dict[str, str], entity_id: str) -> dict | None:
+        """An edit conflict if the entity changed since the base revision. A real instance merges the edits that don't conflict."""
+        if 'baserevid' in params and entity_id in self.entities and int(params['baserevid']) != self.entities[entity_id]['lastrevid']:
+            return {'error': {'code': 'editconflict', 'info': 'Edit conflict: the entity was modified since the base revision.'}}
+        return None
+
     def _action_wbeditentity(self, params: dict[str, str]) -> dict:
         data = json.loads(params['data'])
+        if conflict := self._conflict(params, params.get('id', '')):
+            return conflict
         self.edits.append({'params': params, 'data': data})
 
         if params.get('id'):
@@ -330,6 +392,10 @@ class MockWikibase:
         if params.get('list') == 'search':
             return {'batchcomplete': '', 'query': {'searchinfo': {'totalhits': len(self.fulltext_results)}, 'search': deepcopy(self.fulltext_results)}}
 
+        if params.get('list') == 'recentchanges':
+            changes = [change for change in self.recent_changes if change['timestamp'] >= params.get('rcstart', '')]
+            return {'batchcomplete': '', 'query': {'recentchanges': deepcopy(changes)}}
+
         return {'batchcomplete': ''}
 
     def _action_login(self, params: dict[str, str]) -> dict:
@@ -363,8 +429,55 @@ class MockWikibase:
     def _action_wbmergeitems(self, params: dict[str, str]) -> dict:
         return {'success': 1, 'redirected': 1, 'from': {'id': params['fromid']}, 'to': {'id': params['toid']}}
 
+    def _action_wbsetclaim(self, params: dict[str, str]) -> dict:
+        claim = json.loads(params['claim'])
+        entity_id = claim['id'].split('$', 1)[0]
+        if entity_id not in self.entities:
+            return {'error': {'code': 'no-such-entity', 'info': f'Could not find an entity with the ID "{entity_id}".'}}
+        if conflict := self._conflict(params, entity_id):
+            return conflict
+
+        entity = self._apply_edit(deepcopy(self.entities[entity_id]), {'claims': [claim]}, entity_id, self.entities[entity_id]['type'])
+        self.entities[entity_id] = deepcopy(entity)
+        stored = next(statement for statement in entity.get('claims', entity.get('statements', {})).get(claim['mainsnak']['property'], []) if statement['id'] == claim['id'])
+
+        return {'pageinfo': {'lastrevid': entity['lastrevid']}, 'success': 1, 'claim': stored}
+
     def _action_wbremoveclaims(self, params: dict[str, str]) -> dict:
-        return {'pageinfo': {'lastrevid': 1}, 'success': 1, 'claims': params['claim'].split('|')}
+        claim_ids = params['claim'].split('|')
+        entity_id = claim_ids[0].split('$', 1)[0]
+        if entity_id not in self.entities:
+            return {'pageinfo': {'lastrevid': 1}, 'success': 1, 'claims': claim_ids}
+        if conflict := self._conflict(params, entity_id):
+            return conflict
+
+        entity = self._apply_edit(deepcopy(self.entities[entity_id]), {'claims': [{'id': claim_id, 'remove': ''} for claim_id in claim_ids]}, entity_id,
+                                  self.entities[entity_id]['type'])
+        self.entities[entity_id] = deepcopy(entity)
+
+        return {'pageinfo': {'lastrevid': entity['lastrevid']}, 'success': 1, 'claims': claim_ids}
+
+    def _set_term(self, params: dict[str, str], section: str) -> dict:
+        entity_id = params['id']
+        if entity_id not in self.entities:
+            return {'error': {'code': 'no-such-entity', 'info': f'Could not find an entity with the ID "{entity_id}".'}}
+        if conflict := self._conflict(params, entity_id):
+            return conflict
+
+        language = params['language']
+        value: dict[str, str] = {'language': language, 'value': params.get('value', '')}
+        if not value['value']:
+            value['remove'] = ''
+        entity = self._apply_edit(deepcopy(self.entities[entity_id]), {section: {language: value}}, entity_id, self.entities[entity_id]['type'])
+        self.entities[entity_id] = deepcopy(entity)
+
+        return {'entity': {'id': entity_id, 'type': entity['type'], 'lastrevid': entity['lastrevid'], section: {language: value}}, 'success': 1}
+
+    def _action_wbsetlabel(self, params: dict[str, str]) -> dict:
+        return self._set_term(params, 'labels')
+
+    def _action_wbsetdescription(self, params: dict[str, str]) -> dict:
+        return self._set_term(params, 'descriptions')
 
     def _action_delete(self, params: dict[str, str]) -> dict:
         return {'delete': {'title': params.get('title', ''), 'reason': params.get('reason', 'mock deletion'), 'logid': 1}}
@@ -392,6 +505,52 @@ def literal(value: str, datatype: str | None = None, lang: str | None = None) ->
     return binding
 
 
+def _rest_entity(entity: dict) -> dict:
+    """The JSON of an entity in the format of the REST API."""
+    rest = {
+        'id': entity['id'],
+        'type': entity['type'],
+        'labels': {language: label['value'] for language, label in entity.get('labels', {}).items()},
+        'descriptions': {language: description['value'] for language, description in entity.get('descriptions', {}).items()},
+        'aliases': {language: [alias['value'] for alias in aliases] for language, aliases in entity.get('aliases', {}).items()},
+        'statements': {prop_nr: [_rest_statement(claim) for claim in claims] for prop_nr, claims in entity.get('claims', {}).items()}
+    }
+    if entity['type'] == 'property':
+        rest['data_type'] = entity['datatype']
+    else:
+        rest['sitelinks'] = {site: {'title': sitelink['title'], 'badges': sitelink['badges'], 'url': f'https://{site}.example.org'}
+                             for site, sitelink in entity.get('sitelinks', {}).items()}
+    return rest
+
+
+def _rest_statement(claim: dict) -> dict:
+    """The JSON of a statement in the format of the REST API."""
+    return {
+        'id': claim['id'],
+        'rank': claim['rank'],
+        **_rest_part(claim['mainsnak']),
+        'qualifiers': [_rest_part(snak) for prop_nr in claim.get('qualifiers-order') or claim.get('qualifiers', {}) for snak in claim['qualifiers'][prop_nr]],
+        'references': [{'hash': reference.get('hash', '0' * 40),
+                        'parts': [_rest_part(snak) for prop_nr in reference.get('snaks-order') or reference['snaks'] for snak in reference['snaks'][prop_nr]]}
+                       for reference in claim.get('references', [])]
+    }
+
+
+def _rest_part(snak: dict) -> dict:
+    """The JSON of a snak in the format of the REST API: the default fields of the times and the coordinates are omitted."""
+    value: dict[str, Any] = {'type': snak['snaktype']}
+    if snak['snaktype'] == 'value':
+        content = snak['datavalue']['value']
+        if snak['datavalue']['type'] == 'wikibase-entityid':
+            content = content['id']
+        elif snak['datavalue']['type'] == 'time':
+            content = {key: content[key] for key in ('time', 'precision', 'calendarmodel')}
+        elif snak['datavalue']['type'] == 'globecoordinate':
+            content = {key: value for key, value in content.items() if key != 'altitude'}
+        value['content'] = content
+    return {'property': {'id': snak['property'], 'data_type': snak.get('datatype')}, 'value': value}
+
+
 # ---------------------------------------------------------------------- #
 # Fixtures
 # ---------------------------------------------------------------------- #
@@ -411,9 +570,11 @@ def reset_library_state():
     """Reset the module-level caches of the library between tests."""
     wbi_helpers.properties_dt.clear()
     wbi_fastrun.fastrun_store.clear()
+    wbi_fastrun.class_closures.clear()
     yield
     wbi_helpers.properties_dt.clear()
     wbi_fastrun.fastrun_store.clear()
+    wbi_fastrun.class_closures.clear()
 
 
 @pytest.fixture(autouse=True)
@@ -436,6 +597,7 @@ def wikibase(requests_mock, preserve_config):
     wbi_config['MEDIAWIKI_INDEX_URL'] = instance.mediawiki_index_url
     wbi_config['MEDIAWIKI_REST_URL'] = instance.mediawiki_rest_url
     wbi_config['SPARQL_ENDPOINT_URL'] = instance.sparql_endpoint_url
+    wbi_config['ENTITY_DATA_URL'] = instance.entity_data_url
     wbi_config['WIKIBASE_URL'] = instance.base_url
     return instance
 
@@ -9,6 +9,8 @@ from wikibaseintegrator import WikibaseIntegrator, datatypes
 from wikibaseintegrator.datatypes import (URL, BaseDataType, CommonsMedia, ExternalID, Form, GeoShape, GlobeCoordinate, Item, Lexeme, Math, MonolingualText, MusicalNotation,
                                           Property, Quantity, Sense, String, TabularData, Time)
 from wikibaseintegrator.datatypes.extra import EDTF, LocalMedia
+from wikibaseintegrator.entities.baseentity import BaseEntity
+from wikibaseintegrator.models import Claims
 from wikibaseintegrator.wbi_enums import WikibaseDatatype, WikibaseRank, WikibaseSnakType, WikibaseTimePrecision
 
 
@@ -213,6 +215,44 @@ class TestDatatypeRegistry:
 
         for dtype in expected_datatypes:
             assert len([x for x in BaseDataType.subclasses if x.DTYPE == dtype]) == 1, f'datatype {dtype} is not registered exactly once'
+            assert BaseDataType.dtypes[dtype].DTYPE == dtype
+
+    def test_ptypes(self):
+        assert BaseDataType.ptypes['http://wikiba.se/ontology#String'] is String
+        assert BaseDataType.ptypes['http://wikiba.se/ontology#Time'] is Time
+        # LocalMedia inherits the PTYPE of String without declaring it
+        assert LocalMedia not in BaseDataType.ptypes.values()
+
+    def test_entity_types(self):
+        assert {etype: entity.__name__ for etype, entity in BaseEntity.etypes.items()} == {
+            'item': 'ItemEntity', 'property': 'PropertyEntity', 'lexeme': 'LexemeEntity', 'mediainfo': 'MediaInfoEntity'
+        }
+
+    def test_override_rules(self, monkeypatch):
+        monkeypatch.setattr(BaseDataType, 'subclasses', list(BaseDataType.subclasses))
+        monkeypatch.setattr(BaseDataType, 'dtypes', dict(BaseDataType.dtypes))
+        monkeypatch.setattr(BaseDataType, 'ptypes', dict(BaseDataType.ptypes))
+
+        # A subclass inheriting the DTYPE does not replace its parent
+        class InheritedString(String):
+            pass
+
+        assert BaseDataType.dtypes['string'] is String
+
+        # A subclass redeclaring the DTYPE replaces its parent
+        class CustomString(String):
+            DTYPE = 'string'
+
+        assert BaseDataType.dtypes['string'] is CustomString
+        assert BaseDataType.ptypes['http://wikiba.se/ontology#String'] is String
+        assert Claims().from_json({'P1': [{**String(prop_nr='P1', value='a').get_json(), 'id': 'Q1$1'}]}).get('P1')[0].__class__ is CustomString
+
+        # An unrelated class declaring the same DTYPE does not replace the registered one
+        class OtherString(BaseDataType):
+            DTYPE = 'string'
+
+        assert BaseDataType.dtypes['string'] is CustomString
+        assert InheritedString in BaseDataType.subclasses and OtherString in BaseDataType.subclasses
 
 
 class TestLexemeSubIdentifiers:
@@ -3,13 +3,22 @@ Interaction tests for ItemEntity against the simulated Wikibase instance:
 retrieval, error handling and, most importantly, the exact payloads sent to
 the wbeditentity API endpoint when writing.
 """
+import copy
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
 from wikibaseintegrator import WikibaseIntegrator
-from wikibaseintegrator.datatypes import Item, String
-from wikibaseintegrator.wbi_exceptions import ModificationFailed, MWApiError, NonExistentEntityError
+from wikibaseintegrator.datatypes import ExternalID, GlobeCoordinate, Item, MonolingualText, Quantity, String, Time
+from wikibaseintegrator.entities import ItemEntity
+from wikibaseintegrator.models import Claims, LazyDict
+from wikibaseintegrator.wbi_cache import ResponseCache
+from wikibaseintegrator.wbi_config import config as wbi_config
+from wikibaseintegrator.wbi_enums import ActionIfExists, ConflictPolicy, ReadBackend, WikibaseSnakType
+from wikibaseintegrator.wbi_exceptions import EditConflict, ModificationFailed, MWApiError, NonExistentEntityError, PartialWriteError
+
+from .conftest import load_fixture
 
 wbi = WikibaseIntegrator()
 
@@ -63,6 +72,516 @@ class TestGet:
         assert len(item.labels) == 0
 
 
+class TestEntityData:
+    """The entities read from Special:EntityData, revalidated against the cache of the WikibaseIntegrator instance."""
+
+    @pytest.fixture
+    def wbi_entity_data(self):
+        return WikibaseIntegrator(read_backend=ReadBackend.ENTITY_DATA)
+
+    def test_get(self, wikibase, item_q582, wbi_entity_data):
+        item = wbi_entity_data.item.get('Q582')
+
+        assert item.get_json()['labels'] == item_q582['labels']
+        assert item.claims.get('P31')[0].mainsnak.datavalue == item_q582['claims']['P31'][0]['mainsnak']['datavalue']
+        assert item.lastrevid == item_q582['lastrevid']
+        assert wikibase.requests == []  # No call to the MediaWiki API
+        assert wikibase.entity_data_requests == [{'id': 'Q582', 'revision': None, 'status': 200}]
+
+    def test_conditional_requests(self, wikibase, item_q582, wbi_entity_data):
+        wbi_entity_data.item.get('Q582').labels.set('en', 'Modified')
+        item = wbi_entity_data.item.get('Q582')
+        assert item.labels.get('fr').value == 'Villeurbanne'
+        assert item.labels.get('en').value != 'Modified'  # The cached response is not shared with the first entity
+        assert wikibase.entity_data_requests[-1]['status'] == 304
+        assert wbi_entity_data.read_cache.hits == 1
+
+        # A new revision is returned in full and replaces the cached response
+        wikibase.entities['Q582']['lastrevid'] += 1
+        assert wbi_entity_data.item.get('Q582').lastrevid == item_q582['lastrevid'] + 1
+        assert wikibase.entity_data_requests[-1]['status'] == 200
+
+        # The cache is per WikibaseIntegrator instance
+        WikibaseIntegrator(read_backend=ReadBackend.ENTITY_DATA).item.get('Q582')
+        assert wikibase.entity_data_requests[-1]['status'] == 200
+
+    def test_revision(self, wikibase, item_q582, wbi_entity_data):
+        revision = item_q582['lastrevid']
+        assert wbi.item.get('Q582', revision=revision).lastrevid == revision  # Whatever the read backend
+        wbi_entity_data.item.get('Q582', revision=revision)
+        wbi_entity_data.item.get('Q582', revision=revision)
+
+        # A revision never changes, it is not revalidated
+        assert [request['revision'] for request in wikibase.entity_data_requests] == [str(revision), str(revision)]
+
+        with pytest.raises(ValueError):
+            wbi.item.get('Q582', revision=revision, props=['labels'])
+
+    def test_props_and_errors(self, wikibase, item_q582, wbi_entity_data):
+        wbi_entity_data.item.get('Q582', props=['labels'])
+        assert wikibase.last_request['action'] == 'wbgetentities'
+
+        with pytest.raises(NonExistentEntityError):
+            wbi_entity_data.item.get('Q99999999999999')
+
+    def test_redirect(self, wikibase, item_q582, wbi_entity_data):
+        wikibase.redirects['Q1'] = 'Q582'
+        assert wbi_entity_data.item.get('Q1').id == 'Q582'
+
+    def test_cache_size(self, wikibase):
+        wikibase.add_fixture('item_Q582')
+        wikibase.add_entity({**load_fixture('item_Q582'), 'id': 'Q583'})
+        api = WikibaseIntegrator(read_backend=ReadBackend.ENTITY_DATA, read_cache=ResponseCache(max_size=1))
+
+        api.item.get('Q582')
+        api.item.get('Q583')
+        api.item.get('Q582')
+
+        assert len(api.read_cache) == 1
+        assert [request['status'] for request in wikibase.entity_data_requests] == [200, 200, 200]
+        assert (api.read_cache.hits, api.read_cache.misses) == (0, 3)
+
+    def test_cache_counters(self, wbi_entity_data):
+        cache = wbi_entity_data.read_cache
+
+        def count():
+            for _ in range(1000):
+                cache.record_hit()
+                cache.record_miss()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for future in [executor.submit(count) for _ in range(8)]:
+                future.result()
+
+        assert (cache.hits, cache.misses) == (8000, 8000)
+
+
+class TestRest:
+    """The items and the properties read from the Wikibase REST API, revalidated with their ETag."""
+
+    @pytest.fixture
+    def wbi_rest(self):
+        return WikibaseIntegrator(read_backend=ReadBackend.REST)
+
+    def test_get(self, wikibase, item_q582, wbi_rest):
+        item = wbi_rest.item.get('Q582')
+
+        assert item.lastrevid == item_q582['lastrevid']
+        assert item.get_json()['labels'] == item_q582['labels']
+        assert item.get_json()['aliases'] == item_q582['aliases']
+        assert item.sitelinks.get('frwiki').title == item_q582['sitelinks']['frwiki']['title']
+        for prop_nr, claims in item_q582['claims'].items():
+            assert [claim.get_json()['mainsnak'].get('datavalue') for claim in item.claims.get(prop_nr)] == [claim['mainsnak'].get('datavalue') for claim in claims]
+            assert [claim.id for claim in item.claims.get(prop_nr)] == [claim['id'] for claim in claims]
+        assert wikibase.requests == []
+
+        # The entity is only transferred again when it changed
+        wbi_rest.item.get('Q582')
+        assert wikibase.rest_requests[-1]['status'] == 304
+        assert wbi_rest.item.get('Q582').lastrevid == item_q582['lastrevid']
+
+    def test_values(self, wikibase, wbi_rest):
+        claims = [
+            Time(prop_nr='P585', time='+2001-01-15T00:00:00Z', qualifiers=[MonolingualText(prop_nr='P1476', text='titre', language='fr')]),
+            Quantity(prop_nr='P2067', amount=70, unit='Q11570', references=[[Item(prop_nr='P248', value='Q5')]]),
+            GlobeCoordinate(prop_nr='P625', latitude=45.77, longitude=4.88, precision=0.01),
+            Item(prop_nr='P31', snaktype=WikibaseSnakType.NO_VALUE)
+        ]
+        entity = {'type': 'item', 'id': 'Q1', 'lastrevid': 1, 'claims': {}}
+        for index, claim in enumerate(claims):
+            entity['claims'][claim.mainsnak.property_number] = [{**claim.get_json(), 'id': f'Q1${index}'}]
+        wikibase.add_entity(entity)
+
+        item = wbi_rest.item.get('Q1')
+
+        for claim in claims:
+            assert item.claims.get(claim.mainsnak.property_number)[0].get_json()['mainsnak'] == claim.get_json()['mainsnak']
+        assert item.claims.get('P585')[0].qualifiers.get('P1476')[0].datavalue == claims[0].qualifiers.get('P1476')[0].datavalue
+        assert item.claims.get('P2067')[0].references.get_json()[0]['snaks'] == claims[1].references.get_json()[0]['snaks']
+
+    def test_fields(self, wikibase, item_q582, wbi_rest):
+        item = wbi_rest.item.get('Q582', props=['labels', 'claims'])
+
+        assert wikibase.rest_requests[-1]['params'] == {'_fields': 'type,labels,statements'}
+        assert item.labels.get('fr').value == 'Villeurbanne'
+        assert len(item.claims) > 0
+        assert len(item.sitelinks) == 0
+        assert item.lastrevid == item_q582['lastrevid']
+
+    def test_get_claims(self, wikibase, item_q582, wbi_rest):
+        item = wbi_rest.item.new(id='Q582')
+        item.get_claims('P31')
+
+        assert wikibase.rest_requests[-1]['path'] == '/entities/items/Q582/statements'
+        assert wikibase.rest_requests[-1]['params'] == {'property': 'P31'}
+        assert list(item.claims.claims) == ['P31']
+
+    def test_property_and_other_types(self, wikibase, wbi_rest):
+        wikibase.add_fixture('property_P50')
+        wikibase.add_fixture('lexeme_L5')
+
+        assert wbi_rest.property.get('P50').datatype.value == load_fixture('property_P50')['datatype']
+        wbi_rest.lexeme.get('L5')  # Not served by the REST API
+        assert wikibase.last_request['action'] == 'wbgetentities'
+
+        with pytest.raises(NonExistentEntityError):
+            wbi_rest.item.get('Q99999999999999')
+
+
+class TestLazy:
+    def test_objects_built_on_access(self, item_q582):
+        item = wbi.item.get('Q582', lazy=True)
+        claims = item.claims.claims
+        assert isinstance(claims, LazyDict)
+        assert all(claims.is_raw(property) for property in claims)
+
+        # Counting does not build anything
+        assert len(item.claims) == 3
+        assert item.claims.count() == sum(len(claims) for claims in item_q582['claims'].values())
+        assert all(claims.is_raw(property) for property in claims)
+
+        assert item.claims.get('P31')[0].mainsnak.property_number == 'P31'
+        assert not claims.is_raw('P31')
+        assert claims.is_raw('P443')
+
+        assert item.labels.get('fr').value == 'Villeurbanne'
+        assert item.labels.values.is_raw('en')
+        assert item.sitelinks.get('frwiki').title == item_q582['sitelinks']['frwiki']['title']
+        assert item.sitelinks.sitelinks.is_raw('enwiki')
+
+    def test_get_json_reuses_untouched_json(self, item_q582):
+        json_data = load_fixture('item_Q582')
+        item = ItemEntity().from_json(json_data, lazy=True)
+        item.claims.get('P31')
+        item.aliases.set('fr', 'Villeurbanne (Rhône)')
+
+        result = item.get_json()
+        assert result['claims']['P443'] is json_data['claims']['P443']
+        assert result['labels']['fr'] is json_data['labels']['fr']
+        assert result['aliases']['en'] is json_data['aliases']['en']
+        assert result['claims']['P31'] is not json_data['claims']['P31']
+
+        eager = ItemEntity().from_json(load_fixture('item_Q582'))
+        eager.aliases.set('fr', 'Villeurbanne (Rhône)')
+        assert Claims().from_json(result['claims']).get_json() == eager.claims.get_json()
+        assert result['labels'] == eager.labels.get_json()
+        assert result['aliases'] == eager.aliases.get_json()
+        assert result['sitelinks'] == eager.sitelinks.get_json()
+
+    def test_write_lazy_item(self, wikibase, item_q582):
+        item = wbi.item.get('Q582', lazy=True)
+        item.claims.add(Item(prop_nr='P1791', value='Q42'))
+        item.write(allow_anonymous=True, statement_level=False)
+
+        payload = wikibase.last_edit['data']
+        assert payload['claims']['P1791'][0]['mainsnak']['datavalue']['value']['id'] == 'Q42'
+        assert payload['claims']['P443'] == item_q582['claims']['P443']
+        assert payload['labels']['fr'] == {'language': 'fr', 'value': 'Villeurbanne'}
+
+    def test_copy(self, item_q582):
+        item = wbi.item.get('Q582', lazy=True)
+        copied = copy.deepcopy(item.claims)
+        assert copied.get_json() == item.claims.get_json()
+        assert copied.get('P443')[0].get_json() == item.claims.get('P443')[0].get_json()
+
+
+class TestStatementLevel:
+    """A small change of an entity loaded lazily is written with the statement-level modules, not with wbeditentity, once enabled."""
+
+    @pytest.fixture(autouse=True)
+    def max_edits(self, monkeypatch):
+        monkeypatch.setitem(wbi_config, 'STATEMENT_LEVEL_MAX_EDITS', 2)
+
+    @staticmethod
+    def actions(wikibase):
+        return [request['action'] for request in wikibase.requests if request.get('action') not in ('wbgetentities', 'query')]
+
+    def test_disabled_by_default(self, wikibase, item_q582, monkeypatch):
+        monkeypatch.undo()
+        item = wbi.item.get('Q582', lazy=True)
+        item.claims.add(Item(prop_nr='P1791', value='Q42'))
+        item.write(allow_anonymous=True)
+
+        assert self.actions(wikibase) == ['wbeditentity']
+
+    def test_add_claim(self, wikibase, item_q582):
+        item = wbi.item.get('Q582', lazy=True)
+        item.claims.add(Item(prop_nr='P1791', value='Q42'))
+        result = item.write(allow_anonymous=True)
+
+        assert self.actions(wikibase) == ['wbsetclaim']
+        assert wikibase.edits == []
+        claim_id = json.loads(wikibase.last_request['claim'])['id']
+        assert claim_id.startswith('Q582$')
+        assert result.claims.get('P1791')[0].id == claim_id
+        assert result.lastrevid == item_q582['lastrevid'] + 1
+        assert wikibase.entities['Q582']['claims']['P443'] == item_q582['claims']['P443']
+        assert {prop_nr: [claim.id for claim in claims] for prop_nr, claims in result.claims.claims.items()} == \
+               {prop_nr: [claim['id'] for claim in claims] for prop_nr, claims in wikibase.entities['Q582']['claims'].items()}
+
+    def test_change_claim(self, wikibase, item_q582):
+        item = wbi.item.get('Q582', lazy=True)
+        claim = item.claims.get('P443')[0]
+        claim.qualifiers.add(String(prop_nr='P407', value='French'))
+        item.write(allow_anonymous=True, baserevid=item.lastrevid)
+
+        assert self.actions(wikibase) == ['wbsetclaim']
+        assert wikibase.last_request['baserevid'] == str(item_q582['lastrevid'])
+        assert json.loads(wikibase.last_request['claim'])['id'] == item_q582['claims']['P443'][0]['id']
+        assert len(wikibase.entities['Q582']['claims']['P443']) == 1
+        assert 'P407' in wikibase.entities['Q582']['claims']['P443'][0]['qualifiers']
+
+    def test_remove_claims_and_set_terms(self, wikibase, item_q582):
+        item = wbi.item.get('Q582', lazy=True)
+        item.claims.remove('P31')
+        item.labels.set('en', 'Villeurbanne (France)')
+        result = item.write(allow_anonymous=True)
+
+        assert self.actions(wikibase) == ['wbremoveclaims', 'wbsetlabel']
+        assert wikibase.requests[-2]['claim'].split('|') == [claim['id'] for claim in item_q582['claims']['P31']]
+        assert 'P31' not in wikibase.entities['Q582']['claims']
+        assert wikibase.entities['Q582']['labels']['en']['value'] == 'Villeurbanne (France)'
+        assert result.lastrevid == item_q582['lastrevid'] + 2
+        assert not result.claims.get('P31')
+
+    def test_remove_description(self, wikibase, item_q582):
+        item = wbi.item.get('Q582', lazy=True)
+        item.descriptions.get('en').remove()
+        result = item.write(allow_anonymous=True)
+
+        assert self.actions(wikibase) == ['wbsetdescription']
+        assert wikibase.last_request['value'] == ''
+        assert 'en' not in wikibase.entities['Q582']['descriptions']
+        assert result.descriptions.get('en') is None
+
+    def test_write_lightweight(self, wikibase, item_q582):
+        item = wbi.item.get('Q582', lazy=True)
+        item.claims.add(Item(prop_nr='P1791', value='Q42'))
+        result = item.write_lightweight(allow_anonymous=True)
+
+        assert self.actions(wikibase) == ['wbsetclaim']
+        assert result.claims == {'P1791': [json.loads(wikibase.last_request['claim'])['id']]}
+        assert item.lastrevid == item_q582['lastrevid'] + 1
+
+    def test_too_many_edits(self, wikibase, item_q582):
+        item = wbi.item.get('Q582', lazy=True)
+        item.claims.add([Item(prop_nr='P1791', value='Q42'), String(prop_nr='P1', value='a'), String(prop_nr='P2', value='b')])
+        item.write(allow_anonymous=True)
+        assert self.actions(wikibase) == ['wbeditentity']
+
+        item = wbi.item.get('Q582', lazy=True)
+        item.claims.add([String(prop_nr='P3', value='c'), String(prop_nr='P4', value='d'), String(prop_nr='P5', value='e')])
+        item.write(allow_anonymous=True, statement_level=True)
+        assert self.actions(wikibase)[1:] == ['wbsetclaim'] * 3
+
+    def test_not_eligible(self, wikibase, item_q582):
+        item = wbi.item.get('Q582', lazy=True)
+        item.aliases.set('fr', 'Vilurba')
+        with pytest.raises(ValueError):
+            item.write(allow_anonymous=True, statement_level=True)
+        item.write(allow_anonymous=True)
+        assert self.actions(wikibase) == ['wbeditentity']
+
+        item = wbi.item.get('Q582')
+        item.claims.add(Item(prop_nr='P1791', value='Q42'))
+        with pytest.raises(ValueError):
+            item.write(allow_anonymous=True, statement_level=True)
+
+    def test_error_in_the_middle(self, wikibase, item_q582, monkeypatch):
+        """The write isn't atomic, the edits saved before an error are reported."""
+        monkeypatch.setattr(wikibase, '_action_wbsetlabel', lambda params: {'error': {'code': 'modification-failed', 'info': 'Simulated error.'}})
+        item = wbi.item.get('Q582', lazy=True)
+        item.claims.remove('P31')
+        item.labels.set('en', 'Villeurbanne (France)')
+        with pytest.raises(PartialWriteError) as error:
+            item.write(allow_anonymous=True)
+
+        assert self.actions(wikibase) == ['wbremoveclaims', 'wbsetlabel']
+        assert (error.value.entity_id, error.value.lastrevid, error.value.edits) == ('Q582', item_q582['lastrevid'] + 1, 1)
+        assert isinstance(error.value.__cause__, ModificationFailed)
+        assert 'P31' not in wikibase.entities['Q582']['claims']
+
+    def test_error_in_the_first_edit(self, wikibase, item_q582):
+        """Nothing is saved, the error is raised as is."""
+        item = wbi.item.get('Q582', lazy=True)
+        item.claims.remove('P31')
+        item.labels.set('en', 'Villeurbanne (France)')
+        wikibase.fail_next(code='modification-failed')
+        with pytest.raises(ModificationFailed):
+            item.write(allow_anonymous=True)
+
+        assert self.actions(wikibase) == ['wbremoveclaims']
+
+
+class TestEditConflict:
+    """The revision an entity was read from is sent as base revision unless the policy is OVERWRITE, the changes are written again after a conflict with REBASE."""
+
+    @staticmethod
+    def edit_elsewhere():
+        other = wbi.item.get('Q582')
+        other.claims.add(String(prop_nr='P1', value='elsewhere'))
+        other.claims.remove('P2581')
+        other.write(allow_anonymous=True)
+
+    def test_baserevid(self, wikibase, item_q582):
+        item = wbi.item.get('Q582')
+        item.write(allow_anonymous=True)
+        assert 'baserevid' not in wikibase.last_edit['params']
+
+        item.write(allow_anonymous=True, conflict_policy=ConflictPolicy.FAIL)
+        assert wikibase.last_edit['params']['baserevid'] == str(item_q582['lastrevid'] + 1)
+
+    def test_rebase_not_lazy(self, wikibase, item_q582):
+        item = wbi.item.get('Q582')
+        self.edit_elsewhere()
+        item.labels.set('en', 'Villeurbanne (France)')
+        with pytest.raises(EditConflict):
+            item.write(allow_anonymous=True, conflict_policy=ConflictPolicy.REBASE)
+
+        # The whole entity is not written again over the edit made elsewhere
+        assert len(wikibase.edits) == 1
+        assert [request['action'] for request in wikibase.requests].count('wbeditentity') == 2
+
+    def test_rebase_changes(self, wikibase, item_q582):
+        item = wbi.item.get('Q582', lazy=True)
+        self.edit_elsewhere()
+        item.aliases.set('fr', 'Vilurba')
+        item.claims.remove('P2581')
+        written = item.write(allow_anonymous=True, conflict_policy=ConflictPolicy.REBASE)
+
+        # Only the changes are written again, without the removal of the claim removed elsewhere
+        assert wikibase.last_edit['data'] == {'aliases': {'fr': [{'language': 'fr', 'value': 'Vilurba', 'add': ''}]}}
+        assert 'P2581' not in written.claims.claims
+        assert written.claims.get('P1')[0].mainsnak.datavalue['value'] == 'elsewhere'
+        assert 'Vilurba' in [alias.value for alias in written.aliases.get('fr')]
+
+    def test_rebase_statement_level(self, wikibase, item_q582):
+        item = wbi.item.get('Q582', lazy=True)
+        self.edit_elsewhere()
+        claim = Item(prop_nr='P1791', value='Q42')
+        item.claims.add(claim)
+        written = item.write(allow_anonymous=True, statement_level=True, conflict_policy=ConflictPolicy.REBASE)
+
+        assert [request['action'] for request in wikibase.requests[-3:]] == ['wbsetclaim', 'wbgetentities', 'wbeditentity']
+        assert written.claims.get('P1791')[0].id == claim.id
+        assert written.claims.get('P1')
+
+    def test_fail(self, wikibase, item_q582, monkeypatch):
+        item = wbi.item.get('Q582')
+        self.edit_elsewhere()
+        with pytest.raises(EditConflict):
+            item.write(allow_anonymous=True, conflict_policy=ConflictPolicy.FAIL)
+
+        monkeypatch.setitem(wbi_config, 'EDIT_CONFLICT_RETRIES', 0)
+        item = wbi.item.get('Q582', lazy=True)
+        self.edit_elsewhere()
+        item.labels.set('en', 'Villeurbanne (France)')
+        with pytest.raises(EditConflict):
+            item.write(allow_anonymous=True, conflict_policy=ConflictPolicy.REBASE)
+
+
+class TestClone:
+    @pytest.fixture
+    def template(self):
+        template = wbi.item.new()
+        template.labels.set('en', 'Template')
+        template.descriptions.set('en', 'A template')
+        template.claims.add(Item(prop_nr='P31', value='Q5', qualifiers=[String(prop_nr='P2', value='a')], references=[[String(prop_nr='P3', value='b')]]))
+        template.claims.add(String(prop_nr='P1', value='template'))
+        template.sitelinks.set('enwiki', 'Template', badges=['Q17437796'])
+        return template
+
+    def test_same_json(self, template):
+        clone = template.clone()
+        assert isinstance(clone, ItemEntity)
+        assert clone is not template
+        assert clone.get_json() == template.get_json()
+
+    def test_modifications_are_not_shared(self, template):
+        expected = template.get_json()
+        clone1 = template.clone()
+        clone2 = template.clone()
+
+        clone1.labels.set('en', 'Clone')
+        clone1.claims.add(String(prop_nr='P1', value='clone'))
+        clone1.claims.get('P31')[0].qualifiers.add(String(prop_nr='P4', value='c'))
+        clone1.claims.get('P31')[0].references.add(String(prop_nr='P5', value='d'))
+        clone1.sitelinks.get('enwiki').badges.append('Q17437798')
+
+        assert template.get_json() == expected
+        assert clone2.get_json() == expected
+        assert clone1.get_json()['labels']['en']['value'] == 'Clone'
+        assert len(clone1.claims.get('P31')[0].qualifiers) == 2
+
+        template.labels.set('en', 'Modified')
+        assert clone2.labels.get('en').value == 'Template'
+
+    def test_datavalues_are_not_shared(self, template):
+        """The datavalues modified in place in a copy, or in the entity, don't change the other copies."""
+        expected = template.get_json()
+        clone1 = template.clone()
+        clone2 = clone1.clone()
+        clone3 = clone1.clone()
+
+        clone2.claims.get('P31')[0].mainsnak.datavalue['value']['id'] = 'Q6'
+        clone2.claims.get('P31')[0].qualifiers.get('P2')[0].datavalue['value'] = 'changed'
+        template.claims.get('P1')[0].mainsnak.datavalue['value'] = 'changed'
+
+        assert clone1.get_json() == expected
+        assert clone3.get_json() == expected
+        assert clone3.claims.get('P31')[0].mainsnak.datavalue['value']['id'] == 'Q5'
+        assert clone3.claims.get('P1')[0].mainsnak.datavalue['value'] == 'template'
+        assert clone2.get_json()['claims']['P31'][0]['mainsnak']['datavalue']['value']['id'] == 'Q6'
+
+    def test_clones_share_the_json(self, template):
+        clone1 = template.clone()
+        clone2 = clone1.clone()
+        assert clone2.get_json()['claims']['P31'] is clone1.get_json()['claims']['P31']
+        assert clone2.get_json()['labels']['en'] is clone1.get_json()['labels']['en']
+
+    def test_clone_existing_item(self, item_q582):
+        item = wbi.item.get('Q582')
+        item.claims.get('P31')[0].remove()
+
+        clone = item.clone()
+        assert clone.id == 'Q582'
+        assert clone.lastrevid == item.lastrevid
+        assert clone.get_json() == item.get_json()
+        assert clone.claims.get('P31')[0].removed
+
+    def test_new_claims(self, wikibase, item_q582):
+        """The claims given a GUID locally are still new in the copies, and copies of copies."""
+        item = wbi.item.get('Q582', lazy=True)
+        claim = String(prop_nr='P1', value='a')
+        item.claims.add(claim)
+        assert claim.new
+
+        clone = item.clone().clone()
+        assert clone.claims.new_ids() == {claim.id}
+        assert clone.claims.get('P1')[0].new
+        assert not clone.claims.get('P31')[0].new
+
+        clone = item.clone()
+        result = clone.write_lightweight(allow_anonymous=True)
+        assert result.claims == {'P1': [claim.id]}
+        assert clone.claims.new_ids() == set()
+
+        # A removed new claim is not sent for removal
+        clone = item.clone()
+        clone.claims.get('P1')[0].remove()
+        assert 'P1' not in clone.get_json()['claims']
+
+    def test_write_clone(self, wikibase, template):
+        clone = template.clone()
+        clone.claims.add(ExternalID(prop_nr='P2581', value='123'))
+        clone.write(allow_anonymous=True)
+
+        payload = wikibase.last_edit['data']
+        assert payload['labels'] == template.labels.get_json()
+        assert set(payload['claims']) == {'P31', 'P1', 'P2581'}
+        assert 'id' not in payload
+
+
 class TestEntityUrl:
     def test_entity_url(self):
         assert wbi.item.new(id='Q582').get_entity_url() == 'http://www.wikidata.org/entity/Q582'
@@ -121,6 +640,61 @@ class TestWrite:
         # A new entity must not carry an id in its data payload (regression: 'id': null was sent)
         assert 'id' not in wikibase.last_edit['data']
         assert written.id != 'Q582'
+        assert all('id' not in claim for claims in wikibase.last_edit['data']['claims'].values() for claim in claims)
+
+    def test_write_keeps_claim_ids(self, wikibase, item_q582):
+        item = wbi.item.get('Q582')
+        claim = Item(prop_nr='P1791', value='Q42')
+        item.claims.add(claim)
+        claim_id = claim.id
+        written = item.write(allow_anonymous=True)
+
+        assert wikibase.last_edit['data']['claims']['P1791'][0]['id'] == claim_id
+        assert written.claims.get('P1791')[0].id == claim_id
+        assert not written.claims.get('P1791')[0].new
+
+    def test_write_lightweight_new_item(self, wikibase):
+        item = wbi.item.new()
+        item.labels.set('en', 'New item')
+        item.claims.add([String(prop_nr='P1', value='a'), String(prop_nr='P1', value='b')], action_if_exists=ActionIfExists.FORCE_APPEND)
+        result = item.write_lightweight(allow_anonymous=True)
+
+        saved = wikibase.entities[result.id]
+        assert item.id == result.id
+        assert item.lastrevid == result.lastrevid == saved['lastrevid']
+        assert result.claims == {'P1': [claim['id'] for claim in saved['claims']['P1']]}
+        assert [claim.id for claim in item.claims.get('P1')] == result.claims['P1']
+        assert item.labels.get('en').value == 'New item'
+
+    def test_write_lightweight_new_item_reordered(self, wikibase, monkeypatch):
+        apply_edit = wikibase._apply_edit
+
+        def reversed_claims(*args):
+            entity = apply_edit(*args)
+            entity['claims']['P1'].reverse()
+            return entity
+
+        monkeypatch.setattr(wikibase, '_apply_edit', reversed_claims)
+        item = wbi.item.new()
+        item.claims.add([String(prop_nr='P1', value='a'), String(prop_nr='P1', value='b')], action_if_exists=ActionIfExists.FORCE_APPEND)
+        item.write_lightweight(allow_anonymous=True)
+
+        saved = {claim['id']: claim['mainsnak']['datavalue']['value'] for claim in wikibase.entities[item.id]['claims']['P1']}
+        assert [saved[claim.id] for claim in item.claims.get('P1')] == ['a', 'b']
+
+    def test_write_lightweight(self, wikibase, item_q582):
+        item = wbi.item.get('Q582', lazy=True)
+        item.claims.remove('P31')
+        claim = Item(prop_nr='P1791', value='Q42')
+        item.claims.add(claim)
+        result = item.write_lightweight(allow_anonymous=True, statement_level=False)
+
+        assert result.claims == {'P1791': [claim.id]}
+        assert result.lastrevid == item.lastrevid == item_q582['lastrevid'] + 1
+        assert 'P31' not in item.claims.claims
+        assert not claim.new
+        assert item.claims.claims.is_raw('P443')
+        assert 'P31' not in item.get_json()['claims']
 
     def test_write_limited_claims(self, wikibase, item_q582):
         item = wbi.item.get('Q582')
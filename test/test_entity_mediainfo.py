@@ -4,6 +4,10 @@ Interaction tests for MediaInfoEntity against the simulated Wikibase instance.
 import pytest
 
 from wikibaseintegrator import WikibaseIntegrator
+from wikibaseintegrator.datatypes import Item
+from wikibaseintegrator.entities import MediaInfoEntity
+
+from .conftest import load_fixture
 
 wbi = WikibaseIntegrator()
 
@@ -47,6 +51,18 @@ class TestGet:
         assert media_json['statements']
         assert 'claims' not in media_json
 
+    def test_get_json_keeps_lazy_json(self):
+        json_data = load_fixture('mediainfo_M75908279')
+        for statement in json_data['statements']['P180']:
+            statement['mainsnak']['datatype'] = 'wikibase-item'
+
+        media = MediaInfoEntity().from_json(json_data, lazy=True)
+        media_json = media.get_json()
+        assert all('datatype' not in statement['mainsnak'] for statements in media_json['statements'].values() for statement in statements)
+
+        # The JSON loaded lazily still holds the data types
+        assert isinstance(media.claims.get('P180')[0], Item)
+
     def test_entity_claims(self, mediainfo_budapest):
         import re
 
@@ -5,14 +5,18 @@ JSON fixtures — exactly the payloads a Wikibase instance would return — so n
 network interaction is required.
 """
 import copy
+import json
+import pickle
 
 import pytest
 
 from wikibaseintegrator import WikibaseIntegrator, datatypes
-from wikibaseintegrator.datatypes import Item, MonolingualText, String
-from wikibaseintegrator.entities import ItemEntity
-from wikibaseintegrator.models import Claims, Descriptions, Form, Qualifiers
-from wikibaseintegrator.wbi_enums import ActionIfExists, WikibaseSnakType
+from wikibaseintegrator.datatypes import BaseDataType, Item, MonolingualText, String
+from wikibaseintegrator.entities import BaseEntity, ItemEntity
+from wikibaseintegrator.models import Claims, Descriptions, Form, Qualifiers, Reference, References
+from wikibaseintegrator.models.basemodel import changes
+from wikibaseintegrator.models.snaks import Snak, intern_datavalue
+from wikibaseintegrator.wbi_enums import ActionIfExists, WikibaseRank, WikibaseSnakType
 
 from .conftest import load_fixture
 
@@ -225,6 +229,31 @@ class TestClaims:
         claims.remove('P1')
         assert claims.get('P1') == []
 
+    def test_claim_ids_generated(self, item):
+        claim = String(prop_nr='P1', value='a')
+        item.claims.add(claim)
+        assert claim.id.startswith('Q582$') and claim.new
+        assert item.get_json()['claims']['P1'][0]['id'] == claim.id
+        assert all(not claim.new for claim in item.claims.get('P31'))
+
+        # A removed new claim is dropped, the instance doesn't know it
+        item.claims.remove('P1')
+        assert 'P1' not in item.get_json()['claims']
+
+        # The same claim added to another entity gets a GUID of this entity
+        other = ItemEntity(id='Q42')
+        other.claims.add(claim, action_if_exists=ActionIfExists.FORCE_APPEND)
+        assert other.claims.get('P1')[0].id.startswith('Q42$')
+        assert claim.id.startswith('Q582$')
+        # The copy doesn't share the qualifiers and references of the claim
+        other.claims.get('P1')[0].qualifiers.add(String(prop_nr='P2', value='b'))
+        other.claims.get('P1')[0].references.add(String(prop_nr='P3', value='c'))
+        assert len(claim.qualifiers) == 0 and len(claim.references) == 0
+
+        # Without the ID of the entity, nor for a claim with an ID given by the caller
+        assert ItemEntity().add_claims(String(prop_nr='P1', value='a')).claims.get('P1')[0].id is None
+        assert other.add_claims(String(prop_nr='P2', value='b', id='Q42$1')).claims.get('P2')[0].id == 'Q42$1'
+
     def test_merge_refs_or_append_with_valueless_snak(self):
         # A no-value snak has no datavalue: MERGE_REFS_OR_APPEND must not raise a KeyError on it.
         claims = Claims()
@@ -335,6 +364,240 @@ class TestReferences:
         assert len(claim.references) == 0
 
 
+class TestFingerprints:
+    def test_snak_fingerprint_invalidated_by_setters(self):
+        claim = Item(prop_nr='P1', value='Q1')
+        fingerprint = claim.mainsnak.fingerprint
+        assert claim.mainsnak.fingerprint is fingerprint
+
+        claim.mainsnak.datavalue = Item(prop_nr='P1', value='Q2').mainsnak.datavalue
+        assert claim.mainsnak.fingerprint != fingerprint
+        assert claim == Item(prop_nr='P1', value='Q2')
+
+        claim.mainsnak.snaktype = WikibaseSnakType.UNKNOWN_VALUE
+        assert claim.mainsnak.fingerprint[0] == 'somevalue'
+
+    def test_qualifier_order_is_ignored(self):
+        claim1 = Item(prop_nr='P1', value='Q1', qualifiers=[Item(prop_nr='P2', value='Q1'), String(prop_nr='P3', value='a')])
+        claim2 = Item(prop_nr='P1', value='Q1', qualifiers=[String(prop_nr='P3', value='a'), Item(prop_nr='P2', value='Q1')])
+
+        assert claim1.fingerprint == claim2.fingerprint
+        assert hash(claim1.fingerprint) == hash(claim2.fingerprint)
+        assert claim1.get_fingerprint(include_rank=True) == claim2.get_fingerprint(include_rank=True)
+
+    def test_membership(self):
+        claim = Item(prop_nr='P1', value='Q1', qualifiers=[Item(prop_nr='P2', value='Q1')], references=[[String(prop_nr='P3', value='a')]])
+
+        assert Item(prop_nr='P2', value='Q1') in claim.qualifiers
+        assert Item(prop_nr='P2', value='Q2') not in claim.qualifiers
+        assert claim.references.references[0] in claim.references
+        assert 'P2' not in claim.qualifiers
+
+    def test_append_or_replace_deduplicates(self):
+        claims = Claims()
+        claims.add([Item(prop_nr='P1', value='Q1'), Item(prop_nr='P1', value='Q1'), Item(prop_nr='P1', value='Q2')], action_if_exists=ActionIfExists.APPEND_OR_REPLACE)
+        assert len(claims.get('P1')) == 2
+
+        claims.add(Item(prop_nr='P1', value='Q2', references=[[String(prop_nr='P3', value='a')]]), action_if_exists=ActionIfExists.APPEND_OR_REPLACE)
+        assert len(claims.get('P1')) == 2
+        assert len(claims.get('P1')[1].references) == 1
+
+    def test_reference_fingerprint(self):
+        claim1 = Item(prop_nr='P1', value='Q1', references=[[String(prop_nr='P3', value='a'), Item(prop_nr='P4', value='Q4')]])
+        claim2 = Item(prop_nr='P1', value='Q1', references=[[Item(prop_nr='P4', value='Q4'), String(prop_nr='P3', value='a')]])
+
+        assert claim1.references.references[0] == claim2.references.references[0]
+        assert claim1.get_fingerprint(include_references=True) == claim2.get_fingerprint(include_references=True)
+
+        claim2.references.add(String(prop_nr='P3', value='b'))
+        assert claim1.get_fingerprint(include_references=True) != claim2.get_fingerprint(include_references=True)
+        assert claim1.fingerprint == claim2.fingerprint
+
+    def test_order_within_property_is_ignored(self):
+        reference1 = Reference().add(String(prop_nr='P3', value='a')).add(String(prop_nr='P3', value='b'))
+        reference2 = Reference().add(String(prop_nr='P3', value='b')).add(String(prop_nr='P3', value='a'))
+
+        assert reference1.fingerprint == reference2.fingerprint
+        assert reference1.computed_hash == reference2.computed_hash
+
+    def test_cached(self):
+        claim = Item(prop_nr='P1', value='Q1', qualifiers=[Item(prop_nr='P2', value='Q1')], references=[[String(prop_nr='P3', value='a')]])
+        reference = claim.references.references[0]
+
+        fingerprint, qualifiers_fingerprint = claim.fingerprint, claim.qualifiers.fingerprint
+        reference_fingerprint, reference_hash = reference.fingerprint, reference.computed_hash
+
+        # Read again, the cached values are returned
+        assert claim.fingerprint is fingerprint
+        assert claim.qualifiers.fingerprint is qualifiers_fingerprint
+        assert reference.fingerprint is reference_fingerprint
+        assert reference.computed_hash is reference_hash
+
+        # Changed, they are computed again
+        claim.qualifiers.add(Item(prop_nr='P2', value='Q2'))
+        reference.add(String(prop_nr='P4', value='b'))
+        assert claim.fingerprint != fingerprint
+        assert claim.qualifiers.fingerprint != qualifiers_fingerprint
+        assert reference.fingerprint != reference_fingerprint
+        assert reference.computed_hash != reference_hash
+
+    def test_cache_follows_changes(self):
+        claim = Item(prop_nr='P1', value='Q1', qualifiers=[Item(prop_nr='P2', value='Q1')], references=[[String(prop_nr='P3', value='a')]])
+        reference = claim.references.references[0]
+        fingerprint, reference_hash = claim.fingerprint, reference.computed_hash
+
+        claim.qualifiers.add(Item(prop_nr='P2', value='Q2'))
+        assert claim.fingerprint != fingerprint
+        claim.qualifiers.get('P2')[1].datavalue = Item(prop_nr='P2', value='Q3').mainsnak.datavalue
+        assert Item(prop_nr='P2', value='Q3') in claim.qualifiers
+        assert Item(prop_nr='P2', value='Q2') not in claim.qualifiers
+
+        reference.add(String(prop_nr='P4', value='b'))
+        assert reference.computed_hash != reference_hash
+        assert Reference().add(String(prop_nr='P3', value='a')) not in claim.references
+
+    def test_indexes_follow_changes(self):
+        claims = Claims()
+        claim = Item(prop_nr='P1', value='Q1')
+        claims.add([claim, Item(prop_nr='P1', value='Q2')], action_if_exists=ActionIfExists.APPEND_OR_REPLACE)
+
+        # A claim changed in place is found with its new value
+        claim.mainsnak.datavalue = Item(prop_nr='P1', value='Q3').mainsnak.datavalue
+        claims.add(Item(prop_nr='P1', value='Q3'), action_if_exists=ActionIfExists.APPEND_OR_REPLACE)
+        claims.add(Item(prop_nr='P1', value='Q1'), action_if_exists=ActionIfExists.APPEND_OR_REPLACE)
+        assert [claim.mainsnak.datavalue['value']['id'] for claim in claims.get('P1')] == ['Q3', 'Q2', 'Q1']
+
+        references = References()
+        references.add(Reference().add(String(prop_nr='P3', value='a')))
+        references.references[0].add(String(prop_nr='P4', value='b'))
+        references.add(Reference().add(String(prop_nr='P3', value='a')))
+        assert len(references) == 2
+        assert references.remove(Reference().add(String(prop_nr='P3', value='a')))
+        assert Reference().add(String(prop_nr='P3', value='a')) not in references
+
+    def test_append_or_replace_keeps_the_index(self):
+        claims = Claims()
+        claims.add([Item(prop_nr='P1', value=f'Q{number}', qualifiers=[String(prop_nr='P2', value='a')]) for number in range(1, 100)], action_if_exists=ActionIfExists.FORCE_APPEND)
+        claims.add(Item(prop_nr='P1', value='Q100'), action_if_exists=ActionIfExists.APPEND_OR_REPLACE)
+
+        # Adding the same claims again updates them without invalidating the index, which would be rebuilt on each add
+        state = changes()
+        for number in range(1, 101):
+            qualifiers = [String(prop_nr='P2', value='a')] if number < 100 else []
+            claims.add(Item(prop_nr='P1', value=f'Q{number}', qualifiers=qualifiers, references=[[String(prop_nr='P3', value='b')]]), action_if_exists=ActionIfExists.APPEND_OR_REPLACE)
+        assert changes() == state
+        assert len(claims.get('P1')) == 100
+        assert all(len(claim.references) == 1 for claim in claims.get('P1'))
+
+        claims.get('P1')[0].qualifiers.get('P2')[0].datavalue = String(prop_nr='P2', value='b').mainsnak.datavalue
+        claims.add(Item(prop_nr='P1', value='Q1', qualifiers=[String(prop_nr='P2', value='b')]), action_if_exists=ActionIfExists.APPEND_OR_REPLACE)
+        assert len(claims.get('P1')) == 100
+
+    def test_trusted_qualifiers_reset_the_cache(self):
+        qualifiers = Qualifiers().add(String(prop_nr='P2', value='a'))
+        fingerprint = qualifiers.fingerprint
+
+        qualifiers.from_json({'P3': [String(prop_nr='P3', value='b').mainsnak.get_json()]}, trusted=True)
+        assert qualifiers.fingerprint != fingerprint
+        assert len(qualifiers.fingerprint) == 2
+
+    def test_globe_coordinate_rounding(self):
+        claim1 = datatypes.GlobeCoordinate(prop_nr='P625', latitude=1.12345678, longitude=2.0, precision=0.0001)
+        claim2 = datatypes.GlobeCoordinate(prop_nr='P625', latitude=1.12345679, longitude=2.0, precision=0.0001)
+
+        assert claim1 == claim2
+        assert claim1.mainsnak.datavalue['value']['latitude'] == 1.12345678
+
+
+class TestSlots:
+    def test_loaded_objects_have_no_dict(self, item):
+        claim = item.claims.get('P443')[0]
+        for obj in [item.claims, claim, claim.mainsnak, claim.qualifiers, claim.references, claim.references.references[0], claim.references.references[0].snaks,
+                    item.labels, item.labels.get('fr'), item.aliases, item.sitelinks]:
+            assert not hasattr(obj, '__dict__'), type(obj).__name__
+
+    def test_subclass_without_slots(self, monkeypatch):
+        # Keep the subclass out of the datatype registry of the other tests
+        monkeypatch.setattr(BaseDataType, 'subclasses', list(BaseDataType.subclasses))
+
+        class TaggedString(String):
+
+            def __init__(self, tag=None, **kwargs):
+                super().__init__(**kwargs)
+                self.tag = tag
+
+        claim = TaggedString(tag='a tag', prop_nr='P1', value='a')
+        assert claim.tag == 'a tag'
+        assert claim == String(prop_nr='P1', value='a')
+        assert 'tag=' in repr(claim) and '_Claim__mainsnak=' in repr(claim)
+
+    def test_copy_and_pickle(self, item):
+        claim = item.claims.get('P443')[0]
+        assert copy.deepcopy(claim).get_json() == claim.get_json()
+        assert pickle.loads(pickle.dumps(claim)).get_json() == claim.get_json()
+
+
+class TestTrusted:
+    @pytest.mark.parametrize('entity_type, fixture', [('item', 'item_Q582'), ('lexeme', 'lexeme_L5'), ('mediainfo', 'mediainfo_M75908279'), ('property', 'property_P50')])
+    def test_same_result_as_validated(self, entity_type, fixture):
+        entity_class = BaseEntity.etypes[entity_type]
+        trusted = entity_class().from_json(load_fixture(fixture), trusted=True)
+        validated = entity_class().from_json(load_fixture(fixture))
+
+        assert trusted.get_json() == validated.get_json()
+        assert trusted.id == validated.id
+        assert [claim.fingerprint for claim in trusted.claims] == [claim.fingerprint for claim in validated.claims]
+        assert all(claim.rank in WikibaseRank for claim in trusted.claims)
+
+    def test_claim_classes(self):
+        claims = Claims().from_json(load_fixture('item_Q582')['claims'], trusted=True)
+        assert isinstance(claims.get('P31')[0], Item)
+        assert claims.get('P443')[0].qualifiers.get('P407')[0].property_number == 'P407'
+
+    def test_values_not_validated(self):
+        snak_json = {'snaktype': 'value', 'property': '31', 'datavalue': {'value': 'a', 'type': 'string'}, 'datatype': 'string'}
+        assert Snak().from_json(snak_json).property_number == 'P31'
+        assert Snak().from_json(snak_json, trusted=True).property_number == '31'
+
+    def test_references_not_deduplicated(self):
+        claim_json = load_fixture('item_Q582')['claims']['P443'][0]
+        claim_json['references'] = claim_json['references'] * 2
+
+        assert len(Item().from_json(claim_json).references) == 1
+        assert len(Item().from_json(claim_json, trusted=True).references) == 2
+
+    def test_setters_still_validate(self):
+        claim = Item().from_json(load_fixture('item_Q582')['claims']['P31'][0], trusted=True)
+        with pytest.raises(ValueError):
+            claim.rank = 'invalid'
+        with pytest.raises(ValueError):
+            claim.mainsnak.property_number = 'invalid'
+
+
+class TestInterning:
+    @pytest.mark.parametrize('trusted', [False, True])
+    def test_strings_shared_between_entities(self, trusted):
+        # Two decodings of the same JSON give distinct strings, the loaded entities share them
+        item1 = ItemEntity().from_json(json.loads(json.dumps(load_fixture('item_Q582'))), trusted=trusted)
+        item2 = ItemEntity().from_json(json.loads(json.dumps(load_fixture('item_Q582'))), trusted=trusted)
+
+        claim1, claim2 = item1.claims.get('P31')[0], item2.claims.get('P31')[0]
+        assert claim1.mainsnak.property_number is claim2.mainsnak.property_number
+        assert claim1.mainsnak.datatype is claim2.mainsnak.datatype
+        assert claim1.mainsnak.datavalue['type'] is claim2.mainsnak.datavalue['type']
+        assert claim1.mainsnak.datavalue['value']['id'] is claim2.mainsnak.datavalue['value']['id']
+        assert claim1.type is claim2.type
+        assert item1.labels.get('fr').language is item2.labels.get('fr').language
+        assert item1.sitelinks.get('enwiki').site is item2.sitelinks.get('enwiki').site
+
+        reference1, reference2 = item1.claims.get('P443')[0].references.references[0], item2.claims.get('P443')[0].references.references[0]
+        assert reference1.snaks_order[0] is reference2.snaks_order[0]
+
+    def test_values_unchanged(self):
+        datavalue = {'value': {'amount': '+1', 'unit': 'http://www.wikidata.org/entity/Q11573'}, 'type': 'quantity'}
+        assert intern_datavalue(copy.deepcopy(datavalue)) == datavalue
+
+
 class TestForms:
     def test_get_forms(self):
         wbi = WikibaseIntegrator()
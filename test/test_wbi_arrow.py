@@ -0,0 +1,103 @@
+"""
+Tests for the export of entities to Arrow record batches and Parquet files.
+"""
+import pytest
+
+from wikibaseintegrator.datatypes import GlobeCoordinate, Item, MonolingualText, Quantity, String, Time
+from wikibaseintegrator.entities import ItemEntity, LexemeEntity
+from wikibaseintegrator.wbi_arrow import ArrowExporter, iter_record_batches, time_seconds, write_parquet
+from wikibaseintegrator.wbi_enums import WikibaseSnakType
+
+from .conftest import load_fixture
+
+pyarrow = pytest.importorskip('pyarrow')
+
+
+def test_fixtures():
+    exporter = ArrowExporter()
+    exporter.add(load_fixture('item_Q582'))
+    exporter.add(LexemeEntity().from_json(load_fixture('lexeme_L5')))
+    exporter.add(load_fixture('mediainfo_M75908279'))
+    assert len(exporter) == 3
+
+    batches = exporter.flush()
+
+    assert len(exporter) == 0
+    assert batches['entities'].column('id').to_pylist() == ['Q582', 'L5', 'L5-F1', 'L5-F2', 'L5-S1', 'M75908279']
+    assert batches['entities'].column('lexical_category').to_pylist()[1] == 'Q1084'
+    assert {'entity_id': 'L5-F1', 'term_type': 'representation', 'language': 'es', 'value': 'pinos'} in batches['terms'].to_pylist()
+
+    item = load_fixture('item_Q582')
+    statements = batches['statements'].to_pylist()
+    assert sum(statement['entity_id'] == 'Q582' for statement in statements) == sum(len(claims) for claims in item['claims'].values())
+    assert statements[0]['statement_id'] == item['claims']['P31'][0]['id']
+    assert statements[0]['value'] == 'Q484170'
+
+    references = batches['references'].to_pylist()
+    assert references
+    assert all(reference['reference_hash'] for reference in references)
+
+    assert all(batch.num_rows == 0 for batch in exporter.flush().values())
+
+
+def test_typed_columns():
+    item = ItemEntity()
+    item.claims.add([
+        Time(prop_nr='P1', time='+2001-12-31T00:00:00Z', qualifiers=[MonolingualText(prop_nr='P2', text='un', language='fr')],
+             references=[[String(prop_nr='P3', value='a'), Item(prop_nr='P4', value='Q4')]]),
+        Quantity(prop_nr='P5', amount=1.5, upper_bound=2, lower_bound=1, unit='Q11573'),
+        GlobeCoordinate(prop_nr='P6', latitude=45.77, longitude=4.88, precision=0.01),
+        String(prop_nr='P7', snaktype=WikibaseSnakType.UNKNOWN_VALUE)
+    ])
+
+    batches = ArrowExporter().add(item).flush()
+    statements = {statement['property']: statement for statement in batches['statements'].to_pylist()}
+
+    assert batches['statements'].schema.field('time').type == pyarrow.timestamp('s')
+    assert statements['P1']['value'] == '+2001-12-31T00:00:00Z'
+    assert statements['P1']['time'].year == 2001
+    assert statements['P1']['time_precision'] == 11
+    assert statements['P5']['quantity_amount'] == 1.5
+    assert statements['P5']['quantity_upper'] == 2
+    assert statements['P5']['quantity_unit'] == 'http://www.wikidata.org/entity/Q11573'
+    assert statements['P6']['latitude'] == 45.77
+    assert statements['P6']['coordinate_precision'] == 0.01
+    assert statements['P7']['snaktype'] == 'somevalue'
+    assert statements['P7']['value'] is None
+
+    qualifier = batches['qualifiers'].to_pylist()[0]
+    assert (qualifier['value'], qualifier['value_language']) == ('un', 'fr')
+    assert qualifier['hash'] == item.claims.get('P1')[0].qualifiers.get('P2')[0].computed_hash
+
+    references = batches['references'].to_pylist()
+    assert [reference['property'] for reference in references] == ['P3', 'P4']
+    assert {reference['reference_hash'] for reference in references} == {item.claims.get('P1')[0].references.references[0].computed_hash}
+
+
+@pytest.mark.parametrize('time,seconds', [
+    ('+1970-01-01T00:00:01Z', 1),
+    ('+2001-12-31T00:00:00Z', 1009756800),
+    ('+1600-02-29T12:00:00Z', -11670955200),
+    ('+1999-00-00T00:00:00Z', 915148800),
+    ('+0001-01-01T00:00:00Z', -62135596800),
+    ('-0001-01-01T00:00:00Z', -62135596800 - 366 * 86400),
+    ('2001', None)
+])
+def test_time_seconds(time, seconds):
+    assert time_seconds(time) == seconds
+
+
+def test_iter_record_batches():
+    batches = list(iter_record_batches((load_fixture('item_Q582') for _ in range(5)), batch_size=2))
+
+    assert [batch['entities'].num_rows for batch in batches] == [2, 2, 1]
+
+
+def test_write_parquet(tmp_path):
+    parquet = pytest.importorskip('pyarrow.parquet')
+
+    rows = write_parquet((load_fixture('item_Q582') for _ in range(3)), str(tmp_path), batch_size=2)
+
+    table = parquet.read_table(tmp_path / 'statements.parquet')
+    assert table.num_rows == rows['statements']
+    assert parquet.read_table(tmp_path / 'entities.parquet').column('id').to_pylist() == ['Q582'] * 3
@@ -0,0 +1,123 @@
+"""
+Tests for the bulk creation of items from tabular data.
+"""
+import pytest
+
+from wikibaseintegrator.datatypes import URL, ExternalID, Item, Quantity, String, Time
+from wikibaseintegrator.wbi_bulk import BulkBuilder, Column
+from wikibaseintegrator.wbi_enums import ColumnRole
+
+COLUMNS = [
+    Column('id', ColumnRole.ID),
+    Column('label', ColumnRole.LABEL, language='en'),
+    Column('alias', ColumnRole.ALIAS, language='en'),
+    Column('doi', prop_nr='P356', datatype=ExternalID),
+    Column('date', prop_nr='P577', datatype='time'),
+    Column('pages', prop_nr='P1104', datatype=Quantity, unit='Q1069725'),
+    Column('journal', prop_nr='P1433', datatype=Item),
+    Column('volume', ColumnRole.QUALIFIER, prop_nr='P478', datatype=String, of='journal'),
+    Column('url', ColumnRole.REFERENCE, prop_nr='P854', datatype=URL, of='doi'),
+    Column('source', ColumnRole.REFERENCE, prop_nr='P248', datatype=Item)
+]
+
+TABLE = {
+    'id': [None, 'Q2'],
+    'label': ['First', 'Second'],
+    'alias': [['1st', 'One'], ''],
+    'doi': ['10.1000/1', '10.1000/2'],
+    'date': ['+2020-01-00T00:00:00Z', None],
+    'pages': [12, float('nan')],
+    'journal': ['Q1', 'Q1'],
+    'volume': ['3', None],
+    'url': ['https://example.org/1', None],
+    'source': ['Q5', 'Q5']
+}
+
+
+def test_payloads_match_the_datatypes():
+    first, second = BulkBuilder(COLUMNS).payloads(TABLE)
+
+    assert 'id' not in first
+    assert second['id'] == 'Q2'
+    assert first['labels'] == {'en': {'language': 'en', 'value': 'First'}}
+    assert first['aliases'] == {'en': [{'language': 'en', 'value': '1st'}, {'language': 'en', 'value': 'One'}]}
+    assert 'aliases' not in second
+
+    assert first['claims']['P577'][0]['mainsnak'] == Time(prop_nr='P577', time='+2020-01-00T00:00:00Z').mainsnak.get_json()
+    assert first['claims']['P1104'][0]['mainsnak'] == Quantity(prop_nr='P1104', amount=12, unit='Q1069725').mainsnak.get_json()
+    assert list(second['claims']) == ['P356', 'P1433']
+
+    journal = first['claims']['P1433'][0]
+    assert journal['qualifiers'] == {'P478': [String(prop_nr='P478', value='3').mainsnak.get_json()]}
+    assert journal['qualifiers-order'] == ['P478']
+    assert journal['references'] == [{'snaks': {'P248': [Item(prop_nr='P248', value='Q5').mainsnak.get_json()]}, 'snaks-order': ['P248']}]
+    assert first['claims']['P356'][0]['references'][0]['snaks-order'] == ['P854', 'P248']
+    assert 'qualifiers' not in second['claims']['P1433'][0]
+
+
+def test_entities():
+    first, second = BulkBuilder(COLUMNS).entities(TABLE)
+
+    assert first.labels.get('en').value == 'First'
+    assert first.claims.get('P1433')[0].qualifiers.get('P478')[0].datavalue['value'] == '3'
+    assert second.id == 'Q2'
+
+
+def test_same_values_are_formatted_once(monkeypatch):
+    calls = []
+    set_value = Item.set_value
+
+    def counting_set_value(self, value=None, **kwargs):
+        calls.append(value)
+        return set_value(self, value, **kwargs)
+
+    monkeypatch.setattr(Item, 'set_value', counting_set_value)
+    payloads = list(BulkBuilder([Column('journal', prop_nr='P1433', datatype=Item)]).payloads({'journal': ['Q1', 'Q2', 'Q1', 'Q1']}))
+
+    assert [value for value in calls if value is not None] == ['Q1', 'Q2']
+    assert payloads[0]['claims']['P1433'][0]['mainsnak'] is payloads[2]['claims']['P1433'][0]['mainsnak']
+
+
+def test_rows_and_chunks():
+    rows = [{'doi': f'10.1000/{index}', 'other': 'ignored'} for index in range(5)]
+    builder = BulkBuilder([Column('doi', prop_nr='P356', datatype=ExternalID)], chunk_size=2)
+
+    payloads = list(builder.payloads(iter(rows)))
+
+    assert [payload['claims']['P356'][0]['mainsnak']['datavalue']['value'] for payload in payloads] == [row['doi'] for row in rows]
+
+
+def test_arrow_table():
+    pyarrow = pytest.importorskip('pyarrow')
+    table = pyarrow.table({'date': ['+2020-01-01T00:00:00Z', None], 'pages': [1.0, None]})
+    builder = BulkBuilder([Column('date', prop_nr='P577', datatype=Time, precision=11), Column('pages', prop_nr='P1104', datatype=Quantity)])
+
+    first, second = builder.payloads(table)
+
+    assert first['claims']['P1104'][0]['mainsnak']['datavalue']['value']['amount'] == '+1'
+    assert 'claims' not in second
+
+
+def test_invalid_value():
+    builder = BulkBuilder([Column('date', prop_nr='P577', datatype=Time)])
+
+    with pytest.raises(ValueError, match="column 'date', row 1"):
+        list(builder.payloads({'date': ['+2020-01-01T00:00:00Z', '2020']}))
+
+
+@pytest.mark.parametrize('columns', [
+    [Column('doi', prop_nr='P356', datatype=ExternalID), Column('doi', ColumnRole.LABEL)],
+    [Column('volume', ColumnRole.REFERENCE, prop_nr='P478', datatype=String, of='journal')]
+])
+def test_invalid_columns(columns):
+    with pytest.raises(ValueError):
+        BulkBuilder(columns)
+
+
+def test_invalid_column():
+    with pytest.raises(ValueError):
+        Column('doi', prop_nr='P356')
+    with pytest.raises(ValueError):
+        Column('doi', prop_nr='P356', datatype='unknown')
+    with pytest.raises(ValueError):
+        Column('volume', ColumnRole.QUALIFIER, prop_nr='P478', datatype=String)
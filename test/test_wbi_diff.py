@@ -0,0 +1,146 @@
+"""
+Tests for the structural comparison of two versions of an entity.
+"""
+import pytest
+
+from wikibaseintegrator.datatypes import Item, String
+from wikibaseintegrator.entities import ItemEntity, LexemeEntity
+from wikibaseintegrator.models import Form, Sense
+from wikibaseintegrator.wbi_diff import diff
+from wikibaseintegrator.wbi_enums import ActionIfExists, WikibaseRank
+
+from .conftest import load_fixture
+
+
+@pytest.fixture
+def old_item():
+    return ItemEntity().from_json(load_fixture('item_Q582'))
+
+
+@pytest.fixture
+def new_item():
+    return ItemEntity().from_json(load_fixture('item_Q582'))
+
+
+def test_no_change(old_item, new_item):
+    entity_diff = diff(old_item, new_item)
+
+    assert not entity_diff
+    assert not entity_diff.get_json()
+    assert str(entity_diff) == 'no change'
+
+
+def test_lazy_entity_has_no_change(old_item):
+    assert not diff(old_item, ItemEntity().from_json(load_fixture('item_Q582'), lazy=True, trusted=True))
+
+
+def test_claims(old_item, new_item):
+    removed = new_item.claims.get('P31')[1]
+    removed.remove()
+    changed = new_item.claims.get('P31')[0]
+    changed.qualifiers.add(String(prop_nr='P1545', value='1'))
+    changed.rank = WikibaseRank.PREFERRED
+    new_item.claims.add(Item(prop_nr='P31', value='Q5'), action_if_exists=ActionIfExists.APPEND_OR_REPLACE)
+
+    entity_diff = diff(old_item, new_item)
+
+    assert entity_diff.properties == ['P31']
+    assert [claim.id for claim in entity_diff.claims_removed['P31']] == [removed.id]
+    assert [claim.mainsnak.datavalue['value']['id'] for claim in entity_diff.claims_added['P31']] == ['Q5']
+    change = entity_diff.claims_changed['P31'][0]
+    assert change.old.id == changed.id
+    assert not change.value_changed
+    assert change.rank_changed
+    assert [qualifier.property_number for qualifier in change.qualifiers_added] == ['P1545']
+    assert not change.qualifiers_removed
+
+    claims_json = entity_diff.get_json()['claims']['P31']
+    assert claims_json[0]['id'] == changed.id
+    assert claims_json[0]['rank'] == 'preferred'
+    assert claims_json[1]['id'].startswith(f'{new_item.id}$')  # A GUID generated when the claim was added
+    assert claims_json[2] == {'id': removed.id, 'remove': ''}
+
+    lines = str(entity_diff).splitlines()
+    assert lines == ['+ P31: Q5', '- P31: Q1549591', f'~ P31 {changed.id}: Q484170, rank normal -> preferred, +qualifier P1545: 1']
+
+
+def test_claims_matched_by_value(old_item):
+    new_item = ItemEntity()
+    new_item.claims.add(Item(prop_nr='P31', value='Q484170', references=[[String(prop_nr='P143', value='a')]]))
+    new_item.claims.add(Item(prop_nr='P31', value='Q1549591'), action_if_exists=ActionIfExists.APPEND_OR_REPLACE)
+
+    entity_diff = diff(old_item.clone(), new_item)
+
+    change = entity_diff.claims_changed['P31'][0]
+    assert change.old.mainsnak.datavalue['value']['id'] == 'Q484170'
+    assert len(change.references_added) == 1
+    assert 'P31' not in entity_diff.claims_added
+    assert len(entity_diff.claims_removed['P443']) == len(old_item.claims.get('P443'))
+    assert entity_diff.get_json()['claims']['P31'] == [change.get_json()]
+
+
+def test_claim_value_changed(old_item, new_item):
+    claim = new_item.claims.get('P31')[0]
+    claim.mainsnak.datavalue = Item(prop_nr='P31', value='Q5').mainsnak.datavalue
+
+    change = diff(old_item, new_item).claims_changed['P31'][0]
+
+    assert change.value_changed
+    assert str(change) == 'Q484170 -> Q5'
+
+
+def test_terms_and_sitelinks(old_item, new_item):
+    new_item.labels.set('en', 'Villeurbanne (city)')
+    new_item.labels.set('de', 'Villeurbanne')
+    new_item.descriptions.get('fr').remove()
+    new_item.aliases.set('fr', 'Villeurbanne', action_if_exists=ActionIfExists.REPLACE_ALL)
+    new_item.sitelinks.set('dewiki', 'Villeurbanne')
+    del new_item.sitelinks.sitelinks['frwiki']
+
+    entity_diff = diff(old_item, new_item)
+
+    assert entity_diff.terms['labels'] == {'en': (old_item.labels.get('en').value, 'Villeurbanne (city)'), 'de': (None, 'Villeurbanne')}
+    assert entity_diff.terms['descriptions'] == {'fr': (old_item.descriptions.get('fr').value, None)}
+    assert entity_diff.aliases == {'fr': (['Villeurbanne (Rhône)'], ['Villeurbanne'])}
+    assert list(entity_diff.sitelinks) == ['frwiki', 'dewiki']
+
+    json_data = entity_diff.get_json()
+    assert 'claims' not in json_data
+    assert json_data['labels']['de'] == {'language': 'de', 'value': 'Villeurbanne'}
+    assert json_data['descriptions'] == {'fr': {'language': 'fr', 'remove': ''}}
+    assert json_data['aliases'] == {'fr': [{'language': 'fr', 'value': 'Villeurbanne (Rhône)', 'remove': ''}, {'language': 'fr', 'value': 'Villeurbanne', 'add': ''}]}
+    assert json_data['sitelinks'] == {'frwiki': {'site': 'frwiki', 'remove': ''}, 'dewiki': {'site': 'dewiki', 'title': 'Villeurbanne', 'badges': []}}
+
+
+def test_lexeme():
+    old = LexemeEntity().from_json(load_fixture('lexeme_L5'))
+    new = LexemeEntity().from_json(load_fixture('lexeme_L5'))
+    new.lemmas.set('es', 'pino!')
+    new.lexical_category = 'Q1'
+    new.forms.get('L5-F1').representations.set('es', 'pinos!')
+    new.forms.forms.remove(new.forms.get('L5-F2'))
+    new.forms.add(Form(grammatical_features='Q110786'))
+    new.senses.get('L5-S1').remove()
+    new.senses.add(Sense())
+
+    entity_diff = diff(old, new)
+
+    assert entity_diff.terms == {'lemmas': {'es': ('pino', 'pino!')}}
+    assert entity_diff.values == {'lexical_category': ('Q1084', 'Q1')}
+    assert entity_diff.forms_changed['L5-F1'].terms == {'representations': {'es': ('pinos', 'pinos!')}}
+    assert [form.id for form in entity_diff.forms_removed] == ['L5-F2']
+    assert [form.id for form in entity_diff.forms_added] == [None]
+    assert [sense.id for sense in entity_diff.senses_removed] == ['L5-S1']
+
+    json_data = entity_diff.get_json()
+    assert json_data['lexicalCategory'] == 'Q1'
+    assert json_data['forms'][0] == {'id': 'L5-F1', 'representations': {'es': {'language': 'es', 'value': 'pinos!'}}}
+    assert json_data['forms'][1]['add'] == ''
+    assert json_data['forms'][2] == {'id': 'L5-F2', 'remove': ''}
+    assert json_data['senses'][1] == {'id': 'L5-S1', 'remove': ''}
+    assert "L5-F1 ~ representations[es]: 'pinos' -> 'pinos!'" in str(entity_diff).splitlines()
+
+
+def test_different_types():
+    with pytest.raises(TypeError):
+        diff(ItemEntity(), LexemeEntity())
@@ -0,0 +1,85 @@
+"""
+Tests for the streaming reader of the JSON dumps.
+"""
+import bz2
+import gzip
+import io
+import json
+
+import pytest
+
+from wikibaseintegrator.entities import ItemEntity, LexemeEntity, MediaInfoEntity, PropertyEntity
+from wikibaseintegrator.wbi_dumps import DumpFilter, DumpReader
+
+from .conftest import load_fixture
+
+FIXTURES = ['item_Q582', 'lexeme_L5', 'property_P50', 'mediainfo_M75908279']
+
+
+def dump_bytes(count: int = 1) -> bytes:
+    """A dump of the fixtures, in the format of the Wikimedia dumps, repeated with new IDs."""
+    lines = []
+    for index in range(count):
+        for name in FIXTURES:
+            json_data = load_fixture(name)
+            if index:
+                json_data['id'] = json_data['id'] + str(index)
+            lines.append(json.dumps(json_data, separators=(',', ':')))
+    return ('[\n' + ',\n'.join(lines) + '\n]\n').encode()
+
+
+def entity_id(entity):
+    return entity.id
+
+
+@pytest.mark.parametrize('extension,compress', [('.json', bytes), ('.json.gz', gzip.compress), ('.json.bz2', bz2.compress)])
+def test_read(tmp_path, extension, compress):
+    path = tmp_path / f'dump{extension}'
+    path.write_bytes(compress(dump_bytes()))
+
+    entities = list(DumpReader(path))
+
+    assert [type(entity) for entity in entities] == [ItemEntity, LexemeEntity, PropertyEntity, MediaInfoEntity]
+    assert entities[0].labels.get('en').value == load_fixture('item_Q582')['labels']['en']['value']
+    assert entities[0].get_json()['claims'] == load_fixture('item_Q582')['claims']
+
+
+def test_filters():
+    reader = DumpReader(io.BytesIO(dump_bytes(3)), entity_types=['item', 'mediainfo'], properties=['P31', 'P180'])
+    assert [json_data['id'] for json_data in reader.json()] == ['Q582', 'M75908279', 'Q5821', 'M759082791', 'Q5822', 'M759082792']
+
+    reader = DumpReader(io.BytesIO(dump_bytes(3)), ids=['q5821', 'L52'])
+    assert [entity.id for entity in reader] == ['Q5821', 'L52']
+
+
+def test_prefilter():
+    line = json.dumps(load_fixture('item_Q582'), separators=(',', ':')).encode()
+
+    assert DumpFilter(entity_types=['item'], ids=['Q582']).prefilter(line)
+    assert not DumpFilter(entity_types=['lexeme']).prefilter(line)
+    assert not DumpFilter(ids=['Q1']).prefilter(line)
+    assert not DumpFilter(properties=['P180']).prefilter(line)
+    # The prefilter may keep a line which does not match, the exact filter removes it
+    assert DumpFilter(properties=['P407']).prefilter(line)
+    assert not DumpFilter(properties=['P407']).match(json.loads(line))
+    # Without a type and an ID at the head of the line, the line is kept
+    assert DumpFilter(ids=['Q1']).prefilter(b'{"labels":{},"id":"Q582","type":"item"}')
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_processes(ordered):
+    dump = dump_bytes(10)
+    expected = [json.loads(line.rstrip(b',')).get('id') for line in dump.splitlines()[1:-1]]
+
+    entities = list(DumpReader(io.BytesIO(dump)).entities(processes=2, ordered=ordered, chunk_size=3))
+    ids = [entity.id for entity in entities]
+
+    assert ids == expected if ordered else sorted(ids) == sorted(expected)
+    item = entities[ids.index('Q582')]
+    assert item.claims.get('P31')[0].mainsnak.datavalue['value']['id'] == 'Q484170'
+
+
+def test_function():
+    reader = DumpReader(io.BytesIO(dump_bytes(5)), entity_types=['lexeme'])
+
+    assert list(reader.entities(processes=2, chunk_size=2, function=entity_id)) == ['L5', 'L51', 'L52', 'L53', 'L54']
@@ -4,6 +4,8 @@ Wikibase instance, so the whole pipeline (statement loading, lazy qualifier /
 reference / rank loading, comparison) runs offline and deterministically.
 """
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
@@ -40,7 +42,8 @@ class SparqlData:
         self.qualifiers: dict[str, list[dict]] = {}  # statement URI -> bindings
         self.references: dict[str, list[dict]] = {}  # statement URI -> bindings
         self.ranks: dict[str, list[dict]] = {}  # statement URI -> bindings
-        self.labels: list[dict] = []  # language data bindings
+        self.language_data: dict[str, list[dict]] = {}  # RDF predicate -> language data bindings
+        self.subclasses: dict[str, list[str]] = {}  # class ID -> IDs of its (transitive) subclasses
         wikibase.sparql_bindings = self.dispatch
 
     def dispatch(self, query: str) -> list[dict]:
@@ -50,14 +53,39 @@ class SparqlData:
             return self.references.get(self._sid(query), [])
         if 'wbi_fastrun._load_rank' in query:
             return self.ranks.get(self._sid(query), [])
+        if 'wbi_fastrun._class_closure' in query:
+            roots = re.findall(r'/entity/(Q\d+)>', re.search(r'VALUES \?root \{([^}]*)\}', query).group(1))  # type: ignore
+            return [{'class': uri(f'{self.wikibase.base_url}/entity/{x}')} for root in roots for x in [root, *self.subclasses.get(root, [])]]
         if 'wbi_fastrun._query_lang' in query:
-            return self.labels
+            return self._language_data_page(query)
         if 'wbi_fastrun.load_statements' in query:
             match = re.search(r'/prop/(P\d+)> \?sid', query)
             assert match is not None
             return self.statements.get(match.group(1), [])
         return []
 
+    def _language_data_page(self, query: str) -> list[dict]:
+        """Apply the predicate, the language filter, the keyset and the limit of a language data query."""
+        predicate = next((predicate for predicate in self.language_data if f'?entity {predicate} ?label' in query), None)
+        if predicate is None:
+            return []
+        languages_match = re.search(r'LANG\(\?label\) IN \(([^)]*)\)', query)
+        assert languages_match is not None
+        languages = re.findall(r'"([^"]*)"', languages_match.group(1))
+
+        def key(binding: dict) -> tuple[str, str, str]:
+            return binding['entity']['value'], binding['label']['xml:lang'], binding['label']['value']
+
+        rows = sorted((binding for binding in self.language_data[predicate] if binding['label']['xml:lang'] in languages), key=key)
+
+        keyset = re.search(r'STR\(\?entity\) > "([^"]*)".*LANG\(\?label\) > "([^"]*)".*STR\(\?label\) > "([^"]*)"', query, re.DOTALL)
+        if keyset:
+            rows = [row for row in rows if key(row) > keyset.groups()]
+
+        limit = re.search(r'LIMIT (\d+)', query)
+        assert limit is not None
+        return rows[:int(limit.group(1))]
+
     @staticmethod
     def _sid(query: str) -> str:
         match = re.search(r'VALUES \?sid \{ <([^>]+)> \}', query)
@@ -96,12 +124,18 @@ class SparqlData:
     def rank(self, sid: str, rank: str) -> None:
         self.ranks[sid] = [{'rank': uri(f'http://wikiba.se/ontology#{rank}')}]
 
-    def label(self, entity_id: str, value: str, lang: str) -> None:
-        self.labels.append({
+    def label(self, entity_id: str, value: str, lang: str, predicate: str = 'rdfs:label') -> None:
+        self.language_data.setdefault(predicate, []).append({
             'entity': uri(f'{self.wikibase.base_url}/entity/{entity_id}'),
             'label': literal(value, lang=lang),
         })
 
+    def description(self, entity_id: str, value: str, lang: str) -> None:
+        self.label(entity_id, value, lang, predicate='schema:description')
+
+    def alias(self, entity_id: str, value: str, lang: str) -> None:
+        self.label(entity_id, value, lang, predicate='skos:altLabel')
+
 
 @pytest.fixture
 def sparql_data(wikibase):
@@ -165,6 +199,17 @@ class TestLoadStatements:
         with pytest.raises(ValueError):
             frc.load_statements(claims='not a claim')
 
+    def test_entity_uris_interned(self, wikibase, sparql_data, frc):
+        """The URI of an entity is shared by its statements."""
+        sparql_data.statement('Q99', 'P352', literal('P40095'), PTYPE_EXTERNAL_ID)
+        sparql_data.statement('Q99', 'P352', literal('P40096'), PTYPE_EXTERNAL_ID, index=1)
+
+        frc.load_statements(claims=ExternalID(value='P40095', prop_nr='P352'))
+
+        entities = [statement['entity'] for statements in frc.data['P352'].values() for statement in statements]
+        assert len(entities) == 2
+        assert entities[0] is entities[1]
+
 
 class TestGetEntities:
     def test_get_entities(self, wikibase, sparql_data, frc):
@@ -421,6 +466,274 @@ class TestEntityWriteRequired:
         assert item.write_required(base_filter=[BaseDataType(prop_nr='P352')], action_if_exists=ActionIfExists.FORCE_APPEND) is True
 
 
+class TestUpdateEntity:
+    """The containers are patched with the entity returned by the instance after a write."""
+
+    @staticmethod
+    def _claim_json(claim, claim_id: str) -> dict:
+        claim.id = claim_id
+        return claim.get_json()
+
+    def _sparql_query_count(self, wikibase) -> int:
+        return len(wikibase.sparql_queries)
+
+    def test_statements_are_replaced(self, wikibase, sparql_data, frc):
+        sparql_data.statement('Q99', 'P352', literal('P40095'), PTYPE_EXTERNAL_ID)
+        assert frc.write_required(claims=[ExternalID(value='P40096', prop_nr='P352')], entity_filter='Q99') is True
+        queries = self._sparql_query_count(wikibase)
+
+        frc.update_entity({'id': 'Q99', 'claims': {'P352': [self._claim_json(ExternalID(value='P40096', prop_nr='P352'), 'Q99$5B9D6F5A-2C43')]}})
+
+        assert '"P40095"' not in frc.data['P352']
+        assert frc.data['P352']['"P40096"'] == [{'entity': f'{wikibase.base_url}/entity/Q99', 'sid': f'{wikibase.base_url}/entity/statement/Q99-5B9D6F5A-2C43'}]
+        assert frc.write_required(claims=[ExternalID(value='P40096', prop_nr='P352')], entity_filter='Q99', use_references=True, use_rank=True) is False
+        assert frc.write_required(claims=[ExternalID(value='P40095', prop_nr='P352')], entity_filter='Q99') is True
+        # The qualifiers, references and rank of the new statement are known, nothing is loaded
+        assert self._sparql_query_count(wikibase) == queries
+
+    def test_qualifiers_are_updated(self, wikibase, sparql_data, frc):
+        sid = sparql_data.statement('Q99', 'P352', literal('P40095'), PTYPE_EXTERNAL_ID)
+        assert frc.write_required(claims=[ExternalID(value='P40095', prop_nr='P352', qualifiers=[String(value='a', prop_nr='P5')])]) is True
+
+        claim = ExternalID(value='P40095', prop_nr='P352', qualifiers=[String(value='a', prop_nr='P5')])
+        frc.update_entity({'id': 'Q99', 'claims': {'P352': [self._claim_json(claim, 'Q99$5B9D6F5A-2C43')]}})
+
+        assert sid not in frc._qualifiers_cache
+        assert frc.write_required(claims=[ExternalID(value='P40095', prop_nr='P352', qualifiers=[String(value='a', prop_nr='P5')])]) is False
+
+    def test_entity_leaving_the_corpus(self, wikibase, sparql_data):
+        sparql_data.statement('Q99', 'P352', literal('P40095'), PTYPE_EXTERNAL_ID)
+        frc = wbi_fastrun.FastRunContainer(base_data_type=BaseDataType, base_filter=[BaseDataType(prop_nr='P352'), Item(value='Q7187', prop_nr='P31')])
+        frc.load_statements(claims=ExternalID(value='P40095', prop_nr='P352'))
+
+        # Q99 is no longer an instance of gene (Q7187)
+        frc.update_entity({'id': 'Q99', 'claims': {
+            'P352': [self._claim_json(ExternalID(value='P40095', prop_nr='P352'), 'Q99$1')],
+            'P31': [self._claim_json(Item(value='Q8054', prop_nr='P31'), 'Q99$2')],
+        }})
+        assert frc.data['P352'] == {}
+
+    def test_new_entity_joining_the_corpus(self, wikibase, sparql_data):
+        frc = wbi_fastrun.FastRunContainer(base_data_type=BaseDataType, base_filter=[BaseDataType(prop_nr='P352'), Item(value='Q7187', prop_nr='P31')])
+        frc.load_statements(claims=ExternalID(value='P40095', prop_nr='P352'))
+
+        frc.update_entity({'id': 'Q100', 'claims': {
+            'P352': [self._claim_json(ExternalID(value='P40095', prop_nr='P352'), 'Q100$1')],
+            'P31': [self._claim_json(Item(value='Q7187', prop_nr='P31'), 'Q100$2')],
+        }})
+        assert frc.get_entities(claims=ExternalID(value='P40095', prop_nr='P352')) == ['Q100']
+
+    def test_unknown_corpus(self, wikibase, sparql_data):
+        """With a custom base query, only an entity already in the data is patched."""
+        sparql_data.statement('Q99', 'P352', literal('P40095'), PTYPE_EXTERNAL_ID)
+        frc = wbi_fastrun.FastRunContainer(base_data_type=BaseDataType, base_filter=[], base_query='?entity wdt:P31 wd:Q7187 .')
+        frc.load_statements(claims=ExternalID(value='P40095', prop_nr='P352'))
+
+        frc.update_entity({'id': 'Q100', 'claims': {'P352': [self._claim_json(ExternalID(value='P40096', prop_nr='P352'), 'Q100$1')]}})
+        assert '"P40096"' not in frc.data['P352']
+
+        frc.update_entity({'id': 'Q99', 'claims': {'P352': [self._claim_json(ExternalID(value='P40097', prop_nr='P352'), 'Q99$1')]}})
+        assert list(frc.data['P352']) == ['"P40097"']
+
+    def test_language_data(self, wikibase, sparql_data, frc):
+        sparql_data.label('Q99', 'old label', 'en')
+        sparql_data.alias('Q99', 'old alias', 'en')
+        frc.init_language_data('en', 'label')
+        frc.init_language_data('en', 'aliases')
+
+        frc.update_entity({'id': 'Q99', 'claims': {'P352': [self._claim_json(ExternalID(value='P40095', prop_nr='P352'), 'Q99$1')]},
+                           'labels': {'en': {'language': 'en', 'value': 'new label'}}})
+        assert frc.get_language_data('Q99', 'en', 'label') == ['new label']
+        assert frc.get_language_data('Q99', 'en', 'aliases') == []
+
+    def test_write(self, wikibase, sparql_data):
+        """A write through an entity updates the containers: the same check no longer requires a write."""
+        base_filter = [BaseDataType(prop_nr='P352')]
+        item = wbi.item.new()
+        item.claims.add(ExternalID(value='P40095', prop_nr='P352'))
+        assert item.write_required(base_filter=base_filter) is True
+
+        item = item.write(allow_anonymous=True)
+        queries = self._sparql_query_count(wikibase)
+        assert item.write_required(base_filter=base_filter) is False
+        assert self._sparql_query_count(wikibase) == queries
+
+    def test_write_without_update(self, wikibase, sparql_data):
+        base_filter = [BaseDataType(prop_nr='P352')]
+        item = wbi.item.new()
+        item.claims.add(ExternalID(value='P40095', prop_nr='P352'))
+        assert item.write_required(base_filter=base_filter) is True
+
+        item = item.write(allow_anonymous=True, update_fastrun=False)
+        assert item.write_required(base_filter=base_filter) is True
+
+
+class TestThreadSafety:
+    def test_single_flight_property_load(self, wikibase, sparql_data, frc):
+        """The threads checking the same property share one load."""
+        sparql_data.statement('Q99', 'P352', literal('P40095'), PTYPE_EXTERNAL_ID)
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(lambda _: frc.write_required(claims=[ExternalID(value='P40095', prop_nr='P352')]), range(64)))
+
+        assert results == [False] * 64
+        assert len([query for query in wikibase.sparql_queries if 'wbi_fastrun.load_statements' in query]) == 1
+
+    def test_no_partially_loaded_property(self, wikibase, sparql_data, frc):
+        """During a reload, the readers still see the previous data of the property."""
+        sparql_data.statement('Q99', 'P352', literal('P40095'), PTYPE_EXTERNAL_ID)
+        frc.load_statements(claims=ExternalID(value='P40095', prop_nr='P352'))
+
+        loading = threading.Event()
+        release = threading.Event()
+        dispatch = wikibase.sparql_bindings
+
+        def slow_dispatch(query):
+            if 'wbi_fastrun.load_statements' in query:
+                loading.set()
+                release.wait(timeout=5)
+            return dispatch(query)
+
+        wikibase.sparql_bindings = slow_dispatch
+        reload = threading.Thread(target=frc.load_statements, kwargs={'claims': ExternalID(prop_nr='P352'), 'cache': False})
+        reload.start()
+        assert loading.wait(timeout=5)
+        # No request is sent during the check: the mocked HTTP layer is serialized
+        assert frc.write_required(claims=[ExternalID(value='P40095', prop_nr='P352')], use_qualifiers=False) is False
+        release.set()
+        reload.join()
+
+        assert frc.write_required(claims=[ExternalID(value='P40095', prop_nr='P352')]) is False
+
+    def test_update_during_reload(self, wikibase, sparql_data, frc):
+        """An update of an entity waits for the reload of its properties, the data stored by the reload doesn't drop it."""
+        sparql_data.statement('Q99', 'P352', literal('P40095'), PTYPE_EXTERNAL_ID)
+        frc.load_statements(claims=ExternalID(value='P40095', prop_nr='P352'))
+
+        loading = threading.Event()
+        release = threading.Event()
+        dispatch = wikibase.sparql_bindings
+
+        def slow_dispatch(query):
+            if 'wbi_fastrun.load_statements' in query:
+                loading.set()
+                release.wait(timeout=5)
+            return dispatch(query)
+
+        wikibase.sparql_bindings = slow_dispatch
+        reload = threading.Thread(target=frc.load_statements, kwargs={'claims': ExternalID(prop_nr='P352'), 'cache': False})
+        reload.start()
+        assert loading.wait(timeout=5)
+        claim = ExternalID(value='P40096', prop_nr='P352')
+        claim.id = 'Q99$1'
+        update = threading.Thread(target=frc.update_entity, args=({'id': 'Q99', 'claims': {'P352': [claim.get_json()]}},))
+        update.start()
+        update.join(timeout=0.2)
+        assert update.is_alive()
+        release.set()
+        reload.join()
+        update.join()
+
+        # The reload returns the statements from before the write
+        assert list(frc.data['P352']) == ['"P40096"']
+
+    def test_single_flight_language_load(self, wikibase, sparql_data, frc):
+        sparql_data.label('Q99', 'gene', 'en')
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: frc.get_language_data('Q99', 'en', 'label'), range(32)))
+
+        assert results == [['gene']] * 32
+        assert len([query for query in wikibase.sparql_queries if 'wbi_fastrun._query_lang' in query]) == 1
+
+    def test_single_flight_statement_load(self, wikibase, sparql_data, frc):
+        """The threads comparing the qualifiers of the same statement share one load."""
+        sid = sparql_data.statement('Q99', 'P352', literal('P40095'), PTYPE_EXTERNAL_ID)
+        sparql_data.qualifier(sid, 'P5', literal('a'), PTYPE_STRING)
+        frc.load_statements(claims=ExternalID(value='P40095', prop_nr='P352'))
+
+        dispatch = wikibase.sparql_bindings
+        # The first load waits for the other threads to ask for the same statement
+        slow = threading.Event()
+
+        def slow_dispatch(query):
+            if 'wbi_fastrun._load_qualifiers' in query:
+                slow.wait(timeout=0.2)
+            return dispatch(query)
+
+        wikibase.sparql_bindings = slow_dispatch
+        claims = [ExternalID(value='P40095', prop_nr='P352', qualifiers=[String(value='a', prop_nr='P5')])]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: frc.write_required(claims=claims), range(16)))
+
+        assert results == [False] * 16
+        assert len([query for query in wikibase.sparql_queries if 'wbi_fastrun._load_qualifiers' in query]) == 1
+
+    def test_update_during_language_load(self, wikibase, sparql_data, frc):
+        """An update of an entity waits for the load of the language data, the data stored by the load doesn't drop it."""
+        sparql_data.label('Q99', 'gene', 'en')
+        frc.get_language_data('Q99', 'en', 'label')
+
+        loading = threading.Event()
+        release = threading.Event()
+        dispatch = wikibase.sparql_bindings
+
+        def slow_dispatch(query):
+            if 'wbi_fastrun._query_lang' in query:
+                loading.set()
+                release.wait(timeout=5)
+            return dispatch(query)
+
+        wikibase.sparql_bindings = slow_dispatch
+        load = threading.Thread(target=frc.init_language_data, args=('en', 'aliases'))
+        load.start()
+        assert loading.wait(timeout=5)
+        claim = ExternalID(value='P40095', prop_nr='P352')
+        claim.id = 'Q99$1'
+        entity_json = {'id': 'Q99', 'labels': {'en': {'language': 'en', 'value': 'protein'}}, 'claims': {'P352': [claim.get_json()]}}
+        update = threading.Thread(target=frc.update_entity, args=(entity_json,))
+        update.start()
+        update.join(timeout=0.2)
+        assert update.is_alive()
+        release.set()
+        load.join()
+        update.join()
+
+        assert frc.get_language_data('Q99', 'en', 'label') == ['protein']
+
+
+class TestSnapshot:
+    def test_export_and_attach(self, wikibase, sparql_data):
+        sid = sparql_data.statement('Q99', 'P352', literal('P40095'), PTYPE_EXTERNAL_ID)
+        sparql_data.qualifier(sid, 'P5', literal('a'), PTYPE_STRING)
+        sparql_data.label('Q99', 'gene', 'en')
+
+        claims = [ExternalID(value='P40095', prop_nr='P352', qualifiers=[String(value='a', prop_nr='P5')])]
+        item = wbi.item.new()
+        item.id = 'Q99'
+        item.claims.add(claims)
+        item.labels.set('en', 'gene')
+        assert item.write_required(base_filter=[BaseDataType(prop_nr='P352')]) is False
+        queries = len(wikibase.sparql_queries)
+
+        block = wbi_fastrun.fastrun_store[0].export_snapshot()
+        try:
+            # A worker process starts with an empty store
+            wbi_fastrun.fastrun_store.clear()
+            frc = wbi_fastrun.FastRunContainer.from_snapshot(block.name)
+        finally:
+            block.close()
+            block.unlink()
+
+        assert wbi_fastrun.fastrun_store == [frc]
+        assert item.write_required(base_filter=[BaseDataType(prop_nr='P352')]) is False
+        assert len(wikibase.sparql_queries) == queries
+
+        # The container is still usable as usual
+        frc.load_statements(claims=ExternalID(prop_nr='P704'))
+        assert len(wikibase.sparql_queries) == queries + 1
+
+
 class TestLanguageData:
     def test_language_data_and_check(self, wikibase, sparql_data, frc):
         sparql_data.label('Q582', 'Villeurbanne', 'fr')
@@ -449,6 +762,130 @@ class TestLanguageData:
         assert frc.check_language_data('Q582', ['Villeurbanne', 'Lyon'], 'fr', 'label', action_if_exists=ActionIfExists.REPLACE_ALL) is True
 
 
+    def test_several_languages_in_one_query(self, wikibase, sparql_data, frc):
+        sparql_data.label('Q582', 'Villeurbanne', 'fr')
+        sparql_data.label('Q582', 'Villeurbanne (en)', 'en')
+
+        frc.init_language_data(['fr', 'en'], 'label')
+        assert len(wikibase.sparql_queries) == 1
+        assert frc.get_language_data('Q582', 'fr', 'label') == ['Villeurbanne']
+        assert frc.get_language_data('Q582', 'en', 'label') == ['Villeurbanne (en)']
+        # Both languages were loaded by the first query
+        assert len(wikibase.sparql_queries) == 1
+
+    def test_keyset_pagination(self, wikibase, sparql_data, frc):
+        for alias in ('Villeurbanne', 'Villeurbane', 'VBN'):
+            sparql_data.alias('Q582', alias, 'fr')
+        sparql_data.alias('Q456', 'Lyon', 'fr')
+
+        frc.init_language_data('fr', 'aliases', limit=2)
+
+        # Two full pages and a last empty one, each page starting after the last row of the previous one
+        assert len(wikibase.sparql_queries) == 3
+        assert 'STR(?entity) >' in wikibase.sparql_queries[-1]
+        assert 'OFFSET' not in wikibase.sparql_queries[-1]
+        assert sorted(frc.get_language_data('Q582', 'fr', 'aliases')) == ['VBN', 'Villeurbane', 'Villeurbanne']
+        assert frc.get_language_data('Q456', 'fr', 'aliases') == ['Lyon']
+
+    def test_compact_storage(self, wikibase, sparql_data, frc):
+        sparql_data.label('Q582', 'Villeurbanne', 'fr')
+        sparql_data.alias('Q582', 'Villeurbane', 'fr')
+
+        frc.init_language_data('fr', 'label')
+        frc.init_language_data('fr', 'aliases')
+        assert frc.loaded_langs['fr']['label'] == {'Q582': 'Villeurbanne'}
+        assert frc.loaded_langs['fr']['aliases'] == {'Q582': ('Villeurbane',)}
+
+    def test_duplicate_aliases(self):
+        """The aliases are deduplicated in their order of arrival, whatever the number of bindings of the entity."""
+        results = [{'entity': {'value': 'https://wikibase.example.org/entity/Q582'}, 'label': {'value': f'alias {i % 1000}', 'xml:lang': 'fr'}} for i in range(3000)]
+        results.append({'entity': {'value': 'https://wikibase.example.org/entity/Q456'}, 'label': {'value': 'Lyon'}})
+
+        data = wbi_fastrun.FastRunContainer._process_lang(results, ['fr', 'en'], 'aliases')
+        assert data['fr']['Q582'] == tuple(f'alias {i}' for i in range(1000))
+        assert data['fr']['Q456'] == ('Lyon',)
+        assert data['en'] == {}
+
+    def test_invalid_language_data_type(self, frc):
+        with pytest.raises(ValueError):
+            frc.init_language_data('fr', 'labels')
+
+
+class TestEntityWriteRequiredLanguageData:
+    """write_required() through an entity also compares the labels, descriptions and aliases."""
+
+    @pytest.fixture
+    def corpus(self, wikibase, sparql_data):
+        sparql_data.statement('Q99', 'P352', literal('P40095'), PTYPE_EXTERNAL_ID)
+        sparql_data.label('Q99', 'Villeurbanne', 'fr')
+        sparql_data.description('Q99', 'commune française', 'fr')
+        sparql_data.alias('Q99', 'Villeurbane', 'fr')
+        return sparql_data
+
+    @staticmethod
+    def _item(item_id: str | None = 'Q99') -> ItemEntity:
+        item = wbi.item.new()
+        item.id = item_id
+        item.claims.add(ExternalID(value='P40095', prop_nr='P352'))
+        return item
+
+    def test_same_terms(self, corpus):
+        item = self._item()
+        item.labels.set('fr', 'Villeurbanne')
+        item.descriptions.set('fr', 'commune française')
+        item.aliases.set('fr', 'Villeurbane')
+        assert item.write_required(base_filter=[BaseDataType(prop_nr='P352')]) is False
+
+    def test_label_change_requires_write(self, corpus):
+        item = self._item()
+        item.labels.set('fr', 'Villeurbanne (Rhône)')
+        assert item.write_required(base_filter=[BaseDataType(prop_nr='P352')]) is True
+        # The comparison of the terms can be disabled
+        assert item.write_required(base_filter=[BaseDataType(prop_nr='P352')], use_language_data=False) is False
+
+    def test_new_language_requires_write(self, corpus):
+        item = self._item()
+        item.descriptions.set('en', 'commune in Rhône, France')
+        assert item.write_required(base_filter=[BaseDataType(prop_nr='P352')]) is True
+
+    def test_removed_label_requires_write(self, corpus):
+        item = self._item()
+        item.labels.set('fr', 'Villeurbanne')
+        item.labels.set('fr', None)
+        assert item.write_required(base_filter=[BaseDataType(prop_nr='P352')]) is True
+
+    def test_aliases(self, corpus):
+        item = self._item()
+        item.aliases.set('fr', 'Villeurbane')
+        assert item.write_required(base_filter=[BaseDataType(prop_nr='P352')]) is False
+
+        item.aliases.set('fr', 'VBN')
+        assert item.write_required(base_filter=[BaseDataType(prop_nr='P352')]) is True
+
+    def test_terms_ignored_without_id(self, corpus):
+        """The entity holding the claims is found, different terms don't require writing a duplicate."""
+        item = self._item(None)
+        item.labels.set('fr', 'Villeurbanne (Rhône)')
+        assert item.write_required(base_filter=[BaseDataType(prop_nr='P352')]) is False
+
+    def test_terms_only_with_known_entity(self, corpus):
+        """No claim is covered by the base filter, the terms of the known entity are still compared."""
+        item = wbi.item.new()
+        item.id = 'Q99'
+        item.labels.set('fr', 'Villeurbanne')
+        assert item.write_required(base_filter=[BaseDataType(prop_nr='P352')]) is False
+
+        item.labels.set('fr', 'Lyon')
+        assert item.write_required(base_filter=[BaseDataType(prop_nr='P352')]) is True
+
+    def test_languages_loaded_in_one_query(self, wikibase, corpus):
+        item = self._item()
+        item.labels.set('fr', 'Villeurbanne')
+        item.labels.set('en', 'Villeurbanne')
+        item.write_required(base_filter=[BaseDataType(prop_nr='P352')])
+        assert len([query for query in wikibase.sparql_queries if 'wbi_fastrun._query_lang' in query]) == 1
+
+
 class TestClear:
     def test_clear(self, wikibase, sparql_data, frc):
         sparql_data.statement('Q99', 'P352', literal('P40095'), PTYPE_EXTERNAL_ID)
@@ -496,3 +933,167 @@ class TestBaseFilter:
         assert f'?entity <{wikibase.base_url}/prop/direct/P352> ?zzP352 .' in base_filter_string
         assert f'?entity <{wikibase.base_url}/prop/direct/P703> <{wikibase.base_url}/entity/Q55983715> .' in base_filter_string
         assert f'?entity <{wikibase.base_url}/prop/direct/P31>/<{wikibase.base_url}/prop/direct/P279>* <{wikibase.base_url}/entity/Q3624078> .' in base_filter_string
+
+    def test_alternative_values(self, wikibase):
+        """A tuple of values of the same property is translated to a VALUES block (OR-operation)."""
+        frc = wbi_fastrun.FastRunContainer(base_data_type=BaseDataType, base_filter=[
+            (Item(value='Q5', prop_nr='P31'), Item(value='Q15632617', prop_nr='P31'), Item(value='Q95074', prop_nr='P31')),
+        ])
+
+        base_filter_string = frc._base_filter_string()
+        assert (f'VALUES ?zzvalues0 {{ <{wikibase.base_url}/entity/Q5> <{wikibase.base_url}/entity/Q15632617> <{wikibase.base_url}/entity/Q95074> }}'
+                in base_filter_string)
+        assert f'?entity <{wikibase.base_url}/prop/direct/P31> ?zzvalues0 .' in base_filter_string
+        assert frc.base_filter_properties == {'P31'}
+
+    def test_alternative_values_in_property_path(self, wikibase):
+        frc = wbi_fastrun.FastRunContainer(base_data_type=BaseDataType, base_filter=[
+            BaseDataType(prop_nr='P352'),
+            [(Item(value='Q5', prop_nr='P31'), Item(value='Q95074', prop_nr='P31')), Item(prop_nr='P279')],
+        ])
+
+        base_filter_string = frc._base_filter_string()
+        assert f'VALUES ?zzvalues1 {{ <{wikibase.base_url}/entity/Q5> <{wikibase.base_url}/entity/Q95074> }}' in base_filter_string
+        assert f'?entity <{wikibase.base_url}/prop/direct/P31>/<{wikibase.base_url}/prop/direct/P279>* ?zzvalues1 .' in base_filter_string
+        assert frc.base_filter_properties == {'P352', 'P31'}
+
+    @pytest.mark.parametrize('alternatives', [
+        (Item(value='Q5', prop_nr='P31'), Item(value='Q95074', prop_nr='P279')),  # Different properties
+        (Item(value='Q5', prop_nr='P31'), Item(prop_nr='P31')),  # Without value
+        (),
+    ])
+    def test_invalid_alternative_values(self, alternatives):
+        with pytest.raises(ValueError):
+            wbi_fastrun.FastRunContainer(base_filter=[alternatives], base_data_type=BaseDataType)
+
+    def test_one_scan_per_property(self, wikibase, sparql_data):
+        """The whole population is loaded with one query per property."""
+        sparql_data.statement('Q99', 'P352', literal('P40095'), PTYPE_EXTERNAL_ID)
+
+        frc = wbi_fastrun.FastRunContainer(base_data_type=BaseDataType, base_filter=[(Item(value='Q5', prop_nr='P31'), Item(value='Q95074', prop_nr='P31'))])
+        assert frc.write_required(claims=[ExternalID(value='P40095', prop_nr='P352')]) is False
+        statements_queries = [query for query in wikibase.sparql_queries if 'wbi_fastrun.load_statements' in query]
+        assert len(statements_queries) == 1
+        assert 'VALUES ?zzvalues0' in statements_queries[0]
+
+    def test_base_query(self, wikibase, sparql_data):
+        """A custom graph pattern is added to the base filter of every query."""
+        sparql_data.statement('Q99', 'P352', literal('P40095'), PTYPE_EXTERNAL_ID)
+        base_query = '{ ?entity wdt:P31 wd:Q5 } UNION { ?entity wdt:P279 wd:Q5 }'
+
+        frc = wbi_fastrun.FastRunContainer(base_data_type=BaseDataType, base_filter=[], base_query=base_query)
+        assert base_query in frc._base_filter_string()
+        assert frc.write_required(claims=[ExternalID(value='P40095', prop_nr='P352')]) is False
+        assert base_query in wikibase.sparql_queries[0]
+
+    def test_base_query_through_entity(self, wikibase, sparql_data):
+        """With a custom base query, every claim of the entity is compared."""
+        sparql_data.statement('Q99', 'P352', literal('P40095'), PTYPE_EXTERNAL_ID)
+
+        item = wbi.item.new()
+        item.id = 'Q99'
+        item.claims.add(ExternalID(value='P40095', prop_nr='P352'))
+        assert item.write_required(base_filter=[], base_query='?entity wdt:P31 wd:Q5 .') is False
+        assert len(wbi_fastrun.fastrun_store) == 1
+
+        # A different base query creates a new container
+        item.write_required(base_filter=[], base_query='?entity wdt:P31 wd:Q95074 .')
+        assert len(wbi_fastrun.fastrun_store) == 2
+
+
+class TestClassClosure:
+    @pytest.fixture
+    def base_filter(self):
+        return [BaseDataType(prop_nr='P352'), [Item(value='Q1', prop_nr='P31'), Item(prop_nr='P279')]]
+
+    def test_closure_base_filter(self, wikibase, sparql_data, base_filter):
+        """The property path is replaced by the classes of the closure, computed once."""
+        sparql_data.subclasses['Q1'] = ['Q2', 'Q3']
+        sparql_data.statement('Q99', 'P352', literal('P40095'), PTYPE_EXTERNAL_ID)
+        sparql_data.statement('Q99', 'P704', literal('ENST00000376197'), PTYPE_EXTERNAL_ID)
+
+        frc = wbi_fastrun.FastRunContainer(base_data_type=BaseDataType, base_filter=base_filter, precompute_closure=True)
+        assert frc.write_required(claims=[ExternalID(value='P40095', prop_nr='P352'), ExternalID(value='ENST00000376197', prop_nr='P704')]) is False
+
+        closure_queries = [query for query in wikibase.sparql_queries if 'wbi_fastrun._class_closure' in query]
+        assert len(closure_queries) == 1
+        assert f'?class <{wikibase.base_url}/prop/direct/P279>* ?root .' in closure_queries[0]
+
+        statements_queries = [query for query in wikibase.sparql_queries if 'wbi_fastrun.load_statements' in query]
+        assert len(statements_queries) == 2
+        for query in statements_queries:
+            assert f'VALUES ?zzclasses1 {{ <{wikibase.base_url}/entity/Q1> <{wikibase.base_url}/entity/Q2> <{wikibase.base_url}/entity/Q3> }}' in query
+            assert f'?entity <{wikibase.base_url}/prop/direct/P31> ?zzclasses1 .' in query
+            assert '/prop/direct/P279>*' not in query
+
+    def test_closure_chunks(self, wikibase, sparql_data, base_filter, monkeypatch):
+        """A large closure is split into several queries, the statements matching several chunks are stored once."""
+        monkeypatch.setattr(wbi_fastrun, 'CLASS_CLOSURE_CHUNK_SIZE', 2)
+        sparql_data.subclasses['Q1'] = ['Q2', 'Q3']
+        sparql_data.statement('Q99', 'P352', literal('P40095'), PTYPE_EXTERNAL_ID)
+        sparql_data.label('Q99', 'gene', 'en')
+
+        frc = wbi_fastrun.FastRunContainer(base_data_type=BaseDataType, base_filter=base_filter, precompute_closure=True)
+        frc.load_statements(claims=ExternalID(value='P40095', prop_nr='P352'))
+        statements_queries = [query for query in wikibase.sparql_queries if 'wbi_fastrun.load_statements' in query]
+        assert len(statements_queries) == 2
+        assert frc.data['P352']['"P40095"'] == [{'entity': f'{wikibase.base_url}/entity/Q99', 'sid': f'{wikibase.base_url}/entity/statement/Q99-P352-0'}]
+
+        assert frc.get_language_data('Q99', 'en', 'label') == ['gene']
+        assert len([query for query in wikibase.sparql_queries if 'wbi_fastrun._query_lang' in query]) == 2
+
+    def test_several_closure_chunks(self, wikibase, sparql_data, monkeypatch):
+        """With several large closures, only the smallest one is split, the others keep their property path."""
+        monkeypatch.setattr(wbi_fastrun, 'CLASS_CLOSURE_CHUNK_SIZE', 2)
+        sparql_data.subclasses['Q1'] = ['Q2', 'Q3', 'Q4', 'Q5']
+        sparql_data.subclasses['Q10'] = ['Q11', 'Q12']
+        sparql_data.subclasses['Q20'] = ['Q21']
+
+        frc = wbi_fastrun.FastRunContainer(base_data_type=BaseDataType, base_filter=[
+            [Item(value='Q1', prop_nr='P31'), Item(prop_nr='P279')],
+            [Item(value='Q10', prop_nr='P31'), Item(prop_nr='P279')],
+            [Item(value='Q20', prop_nr='P31'), Item(prop_nr='P279')],
+        ], precompute_closure=True)
+
+        base_filter_strings = frc._base_filter_strings()
+        assert len(base_filter_strings) == 2
+        for base_filter_string in base_filter_strings:
+            assert f'<{wikibase.base_url}/prop/direct/P31>/<{wikibase.base_url}/prop/direct/P279>* <{wikibase.base_url}/entity/Q1> .' in base_filter_string
+            assert f'VALUES ?zzclasses2 {{ <{wikibase.base_url}/entity/Q20> <{wikibase.base_url}/entity/Q21> }}' in base_filter_string
+        assert f'VALUES ?zzclasses1 {{ <{wikibase.base_url}/entity/Q10> <{wikibase.base_url}/entity/Q11> }}' in base_filter_strings[0]
+        assert f'VALUES ?zzclasses1 {{ <{wikibase.base_url}/entity/Q12> }}' in base_filter_strings[1]
+
+    def test_alternative_values_closure(self, wikibase, sparql_data):
+        sparql_data.subclasses['Q1'] = ['Q2']
+        sparql_data.subclasses['Q5'] = ['Q6']
+
+        frc = wbi_fastrun.FastRunContainer(base_data_type=BaseDataType, base_filter=[
+            [(Item(value='Q1', prop_nr='P31'), Item(value='Q5', prop_nr='P31')), Item(prop_nr='P279')],
+        ], precompute_closure=True)
+
+        base_filter_strings = frc._base_filter_strings()
+        assert len(base_filter_strings) == 1
+        assert 'VALUES ?zzclasses0 { ' + ' '.join(f'<{wikibase.base_url}/entity/{x}>' for x in ['Q1', 'Q5', 'Q2', 'Q6']) + ' }' in base_filter_strings[0]
+
+    def test_closure_file(self, wikibase, sparql_data, base_filter, tmp_path):
+        """The closures are persisted and read back from the closure file."""
+        sparql_data.subclasses['Q1'] = ['Q2']
+        closure_file = str(tmp_path / 'closures.json')
+
+        wbi_fastrun.FastRunContainer(base_data_type=BaseDataType, base_filter=base_filter, precompute_closure=True, closure_file=closure_file)._base_filter_strings()
+        assert len(wikibase.sparql_queries) == 1
+
+        # A new run, without the closures in memory
+        wbi_fastrun.class_closures.clear()
+        frc = wbi_fastrun.FastRunContainer(base_data_type=BaseDataType, base_filter=base_filter, precompute_closure=True, closure_file=closure_file)
+        assert f'<{wikibase.base_url}/entity/Q2>' in frc._base_filter_strings()[0]
+        assert len(wikibase.sparql_queries) == 1
+
+    def test_closure_through_entity(self, wikibase, sparql_data, base_filter):
+        sparql_data.statement('Q99', 'P352', literal('P40095'), PTYPE_EXTERNAL_ID)
+
+        item = wbi.item.new()
+        item.claims.add(ExternalID(value='P40095', prop_nr='P352'))
+        assert item.write_required(base_filter=base_filter, precompute_closure=True) is False
+        assert wbi_fastrun.fastrun_store[0].precompute_closure is True
+        assert any('wbi_fastrun._class_closure' in query for query in wikibase.sparql_queries)
@@ -0,0 +1,130 @@
+"""
+Tests for the client-side snak and reference hashes: they must match the hashes of the server.
+"""
+import hashlib
+import json
+
+import pytest
+
+from wikibaseintegrator.datatypes import URL, ExternalID, Item, String, Time
+from wikibaseintegrator.entities import ItemEntity
+from wikibaseintegrator.models import Claims, Reference, References
+from wikibaseintegrator.models.snaks import Snak
+from wikibaseintegrator.wbi_enums import ActionIfExists, WikibaseSnakType
+from wikibaseintegrator.wbi_hashing import snak_hash, snak_list_hash
+
+from .conftest import load_fixture
+
+
+def walk(json_data):
+    """Yield every dict of a JSON document."""
+    if isinstance(json_data, dict):
+        yield json_data
+        for value in json_data.values():
+            yield from walk(value)
+    elif isinstance(json_data, list):
+        for value in json_data:
+            yield from walk(value)
+
+
+@pytest.mark.parametrize('fixture', ['item_Q582', 'lexeme_L5', 'mediainfo_M75908279'])
+def test_snak_hashes_match_the_server(fixture):
+    snaks = [snak for snak in walk(load_fixture(fixture)) if 'snaktype' in snak and 'hash' in snak]
+    assert snaks
+
+    for snak in snaks:
+        assert Snak().from_json(snak).computed_hash == snak['hash']
+
+
+def test_reference_hashes_match_the_server():
+    references = [reference for reference in walk(load_fixture('item_Q582')) if 'snaks-order' in reference and 'hash' in reference]
+    assert references
+
+    for reference in references:
+        assert Reference().from_json(reference).computed_hash == reference['hash']
+
+
+def test_local_claim_matches_fetched_claim():
+    item = ItemEntity().from_json(load_fixture('item_Q582'))
+    fetched = item.claims.get('P31')[0]
+
+    local = Item(prop_nr='P31', value=fetched.mainsnak.datavalue['value']['id'])
+    assert local.mainsnak.hash is None
+    assert local.mainsnak.computed_hash == fetched.mainsnak.hash
+
+    local = String(prop_nr='P1', value='a', references=[[URL(prop_nr='P854', value='https://lingualibre.fr/wiki/Q59755')]])
+    assert local.references.references[0].computed_hash == 'eb00b1101dce304ebdcef5bc63ed747b85507f67'
+
+
+def test_computed_hash_follows_changes():
+    snak = String(prop_nr='P1', value='a').mainsnak
+    first = snak.computed_hash
+
+    snak.datavalue = String(prop_nr='P1', value='b').mainsnak.datavalue
+    assert snak.computed_hash != first
+
+    snak.snaktype = WikibaseSnakType.NO_VALUE
+    assert snak.computed_hash == snak_hash(WikibaseSnakType.NO_VALUE, 'P1')
+
+
+def test_snak_list_hash_ignores_order():
+    qualifiers1 = Item(prop_nr='P1', value='Q1', qualifiers=[String(prop_nr='P2', value='a'), Item(prop_nr='P3', value='Q3')]).qualifiers
+    qualifiers2 = Item(prop_nr='P1', value='Q1', qualifiers=[Item(prop_nr='P3', value='Q3'), String(prop_nr='P2', value='a')]).qualifiers
+
+    assert qualifiers1.computed_hash == qualifiers2.computed_hash
+    assert qualifiers1.computed_hash == snak_list_hash(qualifier.computed_hash for qualifier in qualifiers1)
+
+
+@pytest.mark.parametrize('datavalue', [
+    {'value': {'text': 'été', 'language': 'fr'}, 'type': 'monolingualtext'},
+    {'value': {'time': '+2001-12-31T00:00:00Z', 'timezone': 0, 'before': 0, 'after': 0, 'precision': 11, 'calendarmodel': 'http://www.wikidata.org/entity/Q1985727'},
+     'type': 'time'},
+    {'value': {'amount': '+1', 'unit': '1'}, 'type': 'quantity'},
+    {'value': {'amount': '+1', 'unit': '1', 'upperBound': '+2', 'lowerBound': '+0'}, 'type': 'quantity'},
+    {'value': {'latitude': 52, 'longitude': 0.00001, 'altitude': None, 'precision': 0.0001, 'globe': 'http://www.wikidata.org/entity/Q2'}, 'type': 'globecoordinate'},
+    {'value': {'entity-type': 'form', 'id': 'L5-F1'}, 'type': 'wikibase-entityid'},
+    {'value': {'unknown': True}, 'type': 'unknown'}
+])
+def test_every_value_type_has_a_hash(datavalue):
+    computed = snak_hash(WikibaseSnakType.KNOWN_VALUE, 'P1', datavalue)
+    assert len(computed) == 40
+    assert computed == snak_hash(WikibaseSnakType.KNOWN_VALUE, 'P1', dict(datavalue))
+    assert computed != snak_hash(WikibaseSnakType.KNOWN_VALUE, 'P2', datavalue)
+
+
+@pytest.mark.parametrize('value_type', ['monolingualtext', 'time', 'quantity', 'globecoordinate'])
+def test_unchecked_value_types_use_the_json(value_type):
+    # No hash of the server is available to check the PHP serialization of these types, see wbi_hashing
+    datavalue = {'value': {'value': 1}, 'type': value_type}
+    assert snak_hash(WikibaseSnakType.KNOWN_VALUE, 'P1', datavalue) == hashlib.sha1(json.dumps(['P1', datavalue], sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def test_references_with_a_time_deduplicate():
+    local = Time(prop_nr='P813', time='+2022-01-01T00:00:00Z')
+    fetched = Reference().from_json({'snaks': {'P813': [local.mainsnak.get_json()]}, 'snaks-order': ['P813'], 'hash': '0' * 40})
+
+    references = References()
+    references.add(fetched)
+    references.add(Time(prop_nr='P813', time='+2022-01-01T00:00:00Z'))
+    assert len(references) == 1
+
+
+def test_references_add_deduplicates():
+    references = References()
+    references.add(ExternalID(prop_nr='P352', value='P58742'))
+    references.add(ExternalID(prop_nr='P352', value='P58742'))
+    references.add(ExternalID(prop_nr='P352', value='P58743'))
+
+    assert len(references) == 2
+    assert Reference(snaks=references.references[0].snaks) in references
+
+
+def test_merge_refs_or_append_deduplicates():
+    claims = Claims()
+    claims.add(Item(prop_nr='P1', value='Q1', references=[[String(prop_nr='P2', value='a')]]))
+    with pytest.warns(UserWarning):
+        claims.add(Item(prop_nr='P1', value='Q1', references=[[String(prop_nr='P2', value='a')], [String(prop_nr='P2', value='b')]]),
+                   action_if_exists=ActionIfExists.MERGE_REFS_OR_APPEND)
+
+    assert len(claims.get('P1')) == 1
+    assert len(claims.get('P1')[0].references) == 2
@@ -9,9 +9,9 @@ import requests
 
 from wikibaseintegrator.wbi_config import config as wbi_config
 from wikibaseintegrator.wbi_exceptions import AnonymousEditNotAllowedError, MaxRetriesReachedException, ModificationFailed, MWApiError, NonExistentEntityError, SaveFailed
-from wikibaseintegrator.wbi_helpers import (check_constraints, download_entity_ttl, execute_sparql_query, format2wbi, format_amount, fulltext_search, generate_entity_instances,
-                                            get_user_agent, lexeme_edit_sense, lexeme_remove_form, lexeme_remove_sense, mediawiki_api_call, mediawiki_api_call_helper, merge_items,
-                                            remove_claims, search_entities)
+from wikibaseintegrator.wbi_helpers import (check_constraints, download_entity_ttl, execute_sparql_query, format2wbi, format_amount, fulltext_search, generate_claim_id,
+                                            generate_entity_instances, get_user_agent, lexeme_edit_sense, lexeme_remove_form, lexeme_remove_sense, mediawiki_api_call,
+                                            mediawiki_api_call_helper, merge_items, remove_claims, search_entities, set_claim, set_term)
 
 
 class FakeLogin:
@@ -347,6 +347,34 @@ class TestEditHelpers:
         assert request['action'] == 'wbremoveclaims'
         assert request['claim'] == 'Q582$1d2e3f4a-5b6c-7d8e-9f0a-1b2c3d4e5f6a'
 
+        remove_claims(claim_id=['Q582$1', 'Q582$2'], login=login, tags=['bot'])
+        assert wikibase.last_request['claim'] == 'Q582$1|Q582$2'
+        assert wikibase.last_request['tags'] == 'bot'
+
+    def test_set_claim_and_term(self, wikibase, item_q582):
+        login = FakeLogin(mediawiki_api_url=wikibase.mediawiki_api_url)
+        claim = {'mainsnak': {'snaktype': 'value', 'property': 'P1', 'datavalue': {'value': 'a', 'type': 'string'}}, 'type': 'statement', 'rank': 'normal'}
+        with pytest.raises(ValueError):
+            set_claim(claim, login=login)
+
+        claim['id'] = generate_claim_id('Q582')
+        result = set_claim(claim, login=login, baserevid=item_q582['lastrevid'])
+        assert wikibase.last_request['action'] == 'wbsetclaim'
+        assert wikibase.last_request['baserevid'] == str(item_q582['lastrevid'])
+        assert result['claim']['id'] == claim['id']
+        assert result['pageinfo']['lastrevid'] == item_q582['lastrevid'] + 1
+
+        set_term('Q582', 'label', 'en', 'Villeurbanne (France)', login=login)
+        assert wikibase.last_request['action'] == 'wbsetlabel'
+        assert wikibase.entities['Q582']['labels']['en']['value'] == 'Villeurbanne (France)'
+        with pytest.raises(ValueError):
+            set_term('Q582', 'alias', 'en', 'Villeurbanne', login=login)
+
+    def test_generate_claim_id(self):
+        entity_id, uuid = generate_claim_id('Q582').split('$')
+        assert entity_id == 'Q582'
+        assert len(uuid) == 36 and uuid == uuid.upper()
+
     def test_lexeme_form_and_sense_id_validation(self):
         with pytest.raises(ValueError):
             lexeme_remove_form('invalid-form-id')
@@ -0,0 +1,207 @@
+"""
+Tests for the local SQLite mirror of entities, and its use as the data source of a fastrun container.
+"""
+import gzip
+import json
+
+import pytest
+
+from wikibaseintegrator import wbi_fastrun
+from wikibaseintegrator.datatypes import BaseDataType, ExternalID, Item, Quantity, String
+from wikibaseintegrator.entities import ItemEntity
+from wikibaseintegrator.wbi_enums import WikibaseRank
+from wikibaseintegrator.wbi_mirror import EntityMirror, MirrorSource
+
+from .conftest import load_fixture
+
+
+def item(entity_id: str, *claims, labels: dict | None = None, aliases: dict | None = None) -> dict:
+    """The JSON of an item with the given claims, as returned by a Wikibase instance."""
+    json_claims: dict = {}
+    for index, claim in enumerate(claims):
+        claim_json = claim.get_json()
+        claim_json['id'] = f'{entity_id}${index:08d}-0000-0000-0000-000000000000'
+        json_claims.setdefault(claim.mainsnak.property_number, []).append(claim_json)
+    return {
+        'type': 'item',
+        'id': entity_id,
+        'lastrevid': 1,
+        'labels': {language: {'language': language, 'value': value} for language, value in (labels or {}).items()},
+        'descriptions': {},
+        'aliases': {language: [{'language': language, 'value': value} for value in values] for language, values in (aliases or {}).items()},
+        'claims': json_claims,
+        'sitelinks': {}
+    }
+
+
+@pytest.fixture
+def mirror(wikibase):
+    mirror = EntityMirror()
+    mirror.add([
+        item('Q1', Item(prop_nr='P31', value='Q5'), Item(prop_nr='P27', value='Q142'), ExternalID(prop_nr='P214', value='113230702',
+                                                                                                   qualifiers=[String(prop_nr='P1932', value='Douglas Adams')]),
+             labels={'en': 'Douglas Adams'}, aliases={'en': ['DNA']}),
+        item('Q2', Item(prop_nr='P31', value='Q5'), Item(prop_nr='P27', value='Q145'), ExternalID(prop_nr='P214', value='12345')),
+        item('Q3', Item(prop_nr='P31', value='Q10')),
+        item('Q10', Item(prop_nr='P279', value='Q11')),
+        item('Q11', Item(prop_nr='P279', value='Q5')),
+        item('Q4', Item(prop_nr='P31', value='Q5', rank=WikibaseRank.DEPRECATED), Quantity(prop_nr='P2067', amount=70, unit='Q11570'))
+    ])
+    return mirror
+
+
+def test_add_and_get(wikibase, mirror):
+    entity = ItemEntity().from_json(load_fixture('item_Q582'))
+    mirror.add(entity)
+
+    assert len(mirror) == 7
+    assert 'Q582' in mirror
+    assert mirror.get('Q582')['labels'] == load_fixture('item_Q582')['labels']
+    assert mirror.get_entity('Q582').claims.get('P31')[0].mainsnak.datavalue['value']['id'] == 'Q484170'
+    assert mirror.get('Q999') is None
+
+    claim = load_fixture('item_Q582')['claims']['P443'][0]
+    claim_id = claim['id']
+    assert mirror.get_statement(claim_id)['mainsnak']['datavalue'] == claim['mainsnak']['datavalue']
+
+    mirror.add(item('Q582', Item(prop_nr='P31', value='Q5')))
+    assert mirror.get_statement(claim_id) is None
+    assert mirror.find(Item(prop_nr='P31', value='Q484170')) == set()
+
+    mirror.remove('Q582')
+    assert 'Q582' not in mirror
+
+    with pytest.raises(ValueError):
+        mirror.add({'type': 'item', 'labels': {}})
+
+
+def test_find(wikibase, mirror):
+    assert mirror.find(ExternalID(prop_nr='P214', value='113230702')) == {'Q1'}
+    assert mirror.find(Item(prop_nr='P31', value='Q5'), Item(prop_nr='P27', value='Q142')) == {'Q1'}
+    assert mirror.find(Item(prop_nr='P31', value='Q5')) == {'Q1', 'Q2'}  # The deprecated statement of Q4 is not a best statement
+    assert mirror.find((Item(prop_nr='P27', value='Q142'), Item(prop_nr='P27', value='Q145'))) == {'Q1', 'Q2'}
+    assert mirror.find(BaseDataType(prop_nr='P279')) == {'Q10', 'Q11'}
+    assert mirror.find([Item(prop_nr='P31', value='Q5'), Item(prop_nr='P279')]) == {'Q1', 'Q2', 'Q3'}
+    assert mirror.find(Quantity(prop_nr='P2067', amount=70, unit='Q11570')) == {'Q4'}
+    assert mirror.find(Quantity(prop_nr='P2067', amount=70)) == set()
+    assert len(mirror.find()) == 6
+
+
+def test_terms(wikibase, mirror):
+    assert mirror.terms('label', ['en']) == [('Q1', 'en', 'Douglas Adams')]
+    assert mirror.terms('alias', ['en', 'fr']) == [('Q1', 'en', 'DNA')]
+
+
+def test_mirror_source(wikibase, mirror):
+    source = MirrorSource(mirror, [Item(prop_nr='P31', value='Q5')], 'http://www.wikidata.org', case_insensitive=True)
+
+    assert source.corpus() == {'Q1', 'Q2'}
+    assert source.statements('P214') == {
+        '"113230702"': [{'entity': 'http://www.wikidata.org/entity/Q1', 'sid': 'http://www.wikidata.org/entity/statement/Q1-00000002-0000-0000-0000-000000000000'}],
+        '"12345"': [{'entity': 'http://www.wikidata.org/entity/Q2', 'sid': 'http://www.wikidata.org/entity/statement/Q2-00000002-0000-0000-0000-000000000000'}]
+    }
+    assert source.claim('http://www.wikidata.org/entity/statement/Q1-00000002-0000-0000-0000-000000000000').qualifiers.get('P1932')[0].datavalue['value'] == 'Douglas Adams'
+    assert source.claim('http://www.wikidata.org/entity/statement/Q9-00000000-0000-0000-0000-000000000000') is None
+    assert list(source.terms(['en'], 'aliases')) == [{'entity': {'value': 'http://www.wikidata.org/entity/Q1'}, 'label': {'value': 'DNA', 'xml:lang': 'en'}}]
+
+    source.update('Q2', in_corpus=False)
+    assert set(source.statements('P214')) == {'"113230702"'}
+    source.clear()
+    assert source.corpus() == {'Q1', 'Q2'}
+
+
+def test_load(wikibase):
+    wikibase.add_fixture('item_Q582')
+    wikibase.add_fixture('property_P50')
+    mirror = EntityMirror()
+
+    assert mirror.load(['Q582', 'P50']) == 2
+    assert mirror.get('P50')['datatype'] == load_fixture('property_P50')['datatype']
+
+
+def test_load_dump(wikibase, tmp_path):
+    path = tmp_path / 'dump.json.gz'
+    lines = [json.dumps(load_fixture(name)) for name in ('item_Q582', 'lexeme_L5', 'property_P50')]
+    path.write_bytes(gzip.compress(('[\n' + ',\n'.join(lines) + '\n]\n').encode()))
+    mirror = EntityMirror(tmp_path / 'mirror.sqlite')
+
+    assert mirror.load_dump(path, batch_size=2, entity_types=['item', 'lexeme']) == 2
+    assert mirror.find() == {'Q582', 'L5'}
+
+
+def test_update_recent_changes(wikibase, mirror):
+    wikibase.add_entity(item('Q1', Item(prop_nr='P31', value='Q5')))
+    wikibase.recent_changes = [
+        {'ns': 0, 'title': 'Q1', 'pageid': 1, 'timestamp': '2025-01-01T00:00:00Z'},
+        {'ns': 0, 'title': 'Q999', 'pageid': 999, 'timestamp': '2025-01-02T00:00:00Z'}
+    ]
+
+    with pytest.raises(ValueError):
+        mirror.update_recent_changes()
+    assert mirror.update_recent_changes(start='2024-12-31T00:00:00Z') == 1
+    assert mirror.find(ExternalID(prop_nr='P214', value='113230702')) == set()
+    assert 'Q999' not in mirror
+
+    # The next call starts from the last change
+    assert mirror.update_recent_changes() == 0
+    assert wikibase.last_request['rcstart'] == '2025-01-02T00:00:00Z'
+
+
+class TestFastRun:
+    """A fastrun container using the mirror as its data source never queries the SPARQL endpoint."""
+
+    def test_write_required(self, wikibase, mirror):
+        frc = wbi_fastrun.FastRunContainer(base_filter=[Item(prop_nr='P31', value='Q5')], mirror=mirror)
+
+        assert frc.write_required(claims=[ExternalID(prop_nr='P214', value='12345')]) is False
+        assert frc.write_required(claims=[ExternalID(prop_nr='P214', value='12345')], entity_filter='Q1') is True
+        assert frc.write_required(claims=[ExternalID(prop_nr='P214', value='113230702')]) is True  # The qualifier is missing
+        assert frc.write_required(claims=[ExternalID(prop_nr='P214', value='113230702', qualifiers=[String(prop_nr='P1932', value='Douglas Adams')])]) is False
+        assert frc.get_entities(claims=[Item(prop_nr='P27', value='Q142')]) == ['Q1']
+        assert wikibase.sparql_queries == []
+
+    def test_base_filter_path(self, wikibase, mirror):
+        frc = wbi_fastrun.FastRunContainer(base_filter=[[Item(prop_nr='P31', value='Q5'), Item(prop_nr='P279')]], mirror=mirror)
+
+        assert frc.get_entities(claims=[Item(prop_nr='P31', value='Q10')]) == ['Q3']
+        assert frc.get_entities(claims=[Item(prop_nr='P279', value='Q5')]) == []
+
+    def test_rank_and_language_data(self, wikibase, mirror):
+        frc = wbi_fastrun.FastRunContainer(base_filter=[BaseDataType(prop_nr='P214')], use_rank=True, mirror=mirror)
+
+        assert frc.write_required(claims=[ExternalID(prop_nr='P214', value='12345', rank=WikibaseRank.PREFERRED)]) is True
+        assert frc.get_language_data('Q1', 'en', 'label') == ['Douglas Adams']
+        assert frc.get_language_data('Q1', 'en', 'aliases') == ['DNA']
+        assert wikibase.sparql_queries == []
+
+    def test_update_entity(self, wikibase, mirror):
+        frc = wbi_fastrun.get_fastrun_container(base_filter=[Item(prop_nr='P31', value='Q5')], mirror=mirror)
+        assert frc.write_required(claims=[ExternalID(prop_nr='P214', value='999')]) is True
+
+        wbi_fastrun.update_fastrun_store(item('Q3', Item(prop_nr='P31', value='Q5'), ExternalID(prop_nr='P214', value='999')))
+
+        assert frc.write_required(claims=[ExternalID(prop_nr='P214', value='999')]) is False
+        assert mirror.find(ExternalID(prop_nr='P214', value='999')) == {'Q3'}
+
+    def test_export_snapshot(self, wikibase, mirror, tmp_path):
+        frc = wbi_fastrun.FastRunContainer(base_filter=[Item(prop_nr='P31', value='Q5')], mirror=mirror)
+        with pytest.raises(ValueError):
+            frc.export_snapshot()
+
+        file_mirror = EntityMirror(tmp_path / 'mirror.sqlite')
+        file_mirror.add(mirror.get('Q1'))
+        frc = wbi_fastrun.FastRunContainer(base_filter=[Item(prop_nr='P31', value='Q5')], mirror=file_mirror)
+        block = frc.export_snapshot()
+        try:
+            copy = wbi_fastrun.FastRunContainer.from_snapshot(block.name)
+        finally:
+            block.close()
+            block.unlink()
+            wbi_fastrun.fastrun_store.clear()
+
+        assert copy.get_entities(claims=[Item(prop_nr='P27', value='Q142')]) == ['Q1']
+        copy.mirror.close()
+
+    def test_base_query(self, mirror):
+        with pytest.raises(ValueError):
+            wbi_fastrun.FastRunContainer(base_filter=[], base_query='?entity ?p ?o .', mirror=mirror)
@@ -0,0 +1,119 @@
+"""
+Tests for the edit session, writing the modifications of each entity in a single edit.
+"""
+import pytest
+
+from wikibaseintegrator import WikibaseIntegrator
+from wikibaseintegrator.datatypes import ExternalID, Item, String
+from wikibaseintegrator.wbi_enums import ActionIfExists
+from wikibaseintegrator.wbi_session import EditSession
+
+wbi = WikibaseIntegrator()
+
+
+def actions(wikibase) -> list[str]:
+    return [request['action'] for request in wikibase.requests if request.get('action') not in ('wbgetentities', 'query')]
+
+
+def test_get_shared(wikibase, item_q582):
+    session = EditSession(api=wbi, allow_anonymous=True)
+    session.get('Q582').claims.add(ExternalID(prop_nr='P214', value='123'))
+    session.get('Q582').claims.add(Item(prop_nr='P31', value='Q5'), action_if_exists=ActionIfExists.APPEND_OR_REPLACE)
+    session.get('Q582').labels.set('en', 'Villeurbanne (France)')
+
+    assert len(session) == 1
+    assert 'Q582' in session
+    assert len([request for request in wikibase.requests if request.get('action') == 'wbgetentities']) == 1
+
+    written = session.commit()
+
+    assert actions(wikibase) == ['wbeditentity']
+    data = wikibase.last_edit['data']
+    assert data['claims']['P214'][0]['mainsnak']['datavalue']['value'] == '123'
+    assert [claim['mainsnak']['datavalue']['value']['id'] for claim in data['claims']['P31']][-1] == 'Q5'
+    assert data['labels']['en']['value'] == 'Villeurbanne (France)'
+    assert written[0].lastrevid == item_q582['lastrevid'] + 1
+    assert len(session) == 0
+
+
+def test_merge(wikibase, item_q582):
+    session = EditSession(api=wbi, allow_anonymous=True)
+    first = session.get('Q582')
+    first.claims.add(ExternalID(prop_nr='P214', value='123'))
+
+    second = session.add(wbi.item.get('Q582', lazy=True))
+    second.claims.get('P31')[0].remove()
+    second.claims.add(String(prop_nr='P1', value='a'))
+    second.labels.set('en', None)
+    second.aliases.set('fr', 'Vilurba')
+    second.sitelinks.set('dewiki', 'Villeurbanne')
+    session.add(second)
+
+    session.commit()
+
+    assert actions(wikibase) == ['wbeditentity']
+    data = wikibase.last_edit['data']
+    assert set(data['claims']) >= {'P214', 'P1'}
+    assert data['claims']['P31'][0]['remove'] == ''
+    assert data['labels']['en']['remove'] == ''
+    assert 'Vilurba' in [alias['value'] for alias in data['aliases']['fr']]
+    assert data['sitelinks']['dewiki']['title'] == 'Villeurbanne'
+
+
+def test_merge_same_claim(wikibase, item_q582):
+    session = EditSession(api=wbi, allow_anonymous=True)
+    first = session.get('Q582')
+    claim_id = first.claims.get('P31')[0].id
+    first.claims.get('P31')[0].references.add(String(prop_nr='P854', value='https://example.org'))
+
+    second = session.add(wbi.item.get('Q582', lazy=True))
+    second.claims.get('P31')[0].qualifiers.add(String(prop_nr='P1', value='a'))
+
+    session.commit()
+
+    claim = next(claim for claim in wikibase.last_edit['data']['claims']['P31'] if claim['id'] == claim_id)
+    assert [qualifier['datavalue']['value'] for qualifier in claim['qualifiers']['P1']] == ['a']
+    assert any(snak['datavalue']['value'] == 'https://example.org' for reference in claim['references'] for snak in reference['snaks'].get('P854', []))
+
+
+def test_merge_not_lazy(wikibase, item_q582):
+    session = EditSession(api=wbi)
+    session.get('Q582')
+    with pytest.raises(ValueError):
+        session.add(wbi.item.get('Q582'))
+    with pytest.raises(ValueError):
+        session.get('X1')
+
+
+def test_unchanged_not_written(wikibase, item_q582):
+    session = EditSession(api=wbi, allow_anonymous=True)
+    session.get('Q582')
+
+    assert session.commit() == []
+    assert actions(wikibase) == []
+
+
+def test_max_entities(wikibase, item_q582):
+    wikibase.add_fixture('property_P50')
+    session = EditSession(api=wbi, max_entities=1, allow_anonymous=True)
+    session.get('Q582').claims.add(ExternalID(prop_nr='P214', value='123'))
+    session.get('P50').labels.set('en', 'author')
+
+    assert actions(wikibase) == ['wbeditentity']
+    assert wikibase.last_edit['params']['id'] == 'Q582'
+    assert 'P50' in session and 'Q582' not in session
+
+
+def test_context_manager(wikibase, item_q582):
+    with pytest.raises(RuntimeError):
+        with EditSession(api=wbi, allow_anonymous=True) as session:
+            session.get('Q582').claims.add(ExternalID(prop_nr='P214', value='123'))
+            raise RuntimeError
+    assert actions(wikibase) == []
+    assert len(session) == 0
+
+    with EditSession(api=wbi, allow_anonymous=True) as session:
+        item = session.add(wbi.item.new())
+        item.labels.set('en', 'A new item')
+    assert actions(wikibase) == ['wbeditentity']
+    assert wikibase.last_edit['params']['new'] == 'item'
@@ -5,15 +5,24 @@ from typing import Any
 
 from wikibaseintegrator.models import Claim
 from wikibaseintegrator.wbi_enums import WikibaseSnakType
+from wikibaseintegrator.wbi_helpers import register_subclass
+
+URI_PATTERN = re.compile(r'^([a-z][a-z\d+.-]*):([^][<>\"\x00-\x20\x7F])+$')
+SPARQL_URI_PATTERN = re.compile(r'^<?(.*?)>?$')
+SPARQL_LITERAL_PATTERN = re.compile(r'^"?(.*?)"?$')
 
 
 class BaseDataType(Claim):
     """
     The base class for all Wikibase data types, they inherit from it
     """
+    __slots__ = ()
     DTYPE = 'base-data-type'
     PTYPE = 'property-data-type'
     subclasses: list[type[BaseDataType]] = []
+    # The data types by DTYPE and by PTYPE, see register_subclass() for the rules applied to the subclasses
+    dtypes: dict[str, type[BaseDataType]] = {}
+    ptypes: dict[str, type[BaseDataType]] = {}
     sparql_query: str = '''
         SELECT * WHERE {{
           ?item_id <{wb_url}/prop/{pid}> ?s .
@@ -31,8 +40,7 @@ class BaseDataType(Claim):
         super().__init__(**kwargs)
 
         if isinstance(prop_nr, str):
-            pattern = re.compile(r'^([a-z][a-z\d+.-]*):([^][<>\"\x00-\x20\x7F])+$')
-            matches = pattern.match(str(prop_nr))
+            matches = URI_PATTERN.match(str(prop_nr))
 
             if matches:
                 prop_nr = prop_nr.rsplit('/', 1)[-1]
@@ -40,10 +48,12 @@ class BaseDataType(Claim):
         self.mainsnak.property_number = prop_nr
         # self.subclasses.append(self)
 
-    # Allow registration of subclasses of BaseDataType into BaseDataType.subclasses
+    # Allow registration of subclasses of BaseDataType into BaseDataType.subclasses, BaseDataType.dtypes and BaseDataType.ptypes
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
         cls.subclasses.append(cls)
+        register_subclass(cls.dtypes, cls, 'DTYPE')
+        register_subclass(cls.ptypes, cls, 'PTYPE')
 
     def set_value(self, value: Any | None = None):
         pass
@@ -53,15 +63,13 @@ class BaseDataType(Claim):
 
     def parse_sparql_value(self, value, type='literal', unit='1') -> bool:
         if type == 'uri':
-            pattern = re.compile(r'^<?(.*?)>?$')
-            matches = pattern.match(value)
+            matches = SPARQL_URI_PATTERN.match(value)
             if not matches:
                 return False
 
             self.set_value(value=matches.group(1))
         elif type == 'literal':
-            pattern = re.compile(r'^"?(.*?)"?$')
-            matches = pattern.match(value)
+            matches = SPARQL_LITERAL_PATTERN.match(value)
             if not matches:
                 return False
 
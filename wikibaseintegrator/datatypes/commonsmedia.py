@@ -11,6 +11,7 @@ class CommonsMedia(URL):
     """
     Implements the Wikibase data type for Wikimedia commons media files
     """
+    __slots__ = ()
     DTYPE = 'commonsMedia'
     PTYPE = 'http://wikiba.se/ontology#CommonsMedia'
 
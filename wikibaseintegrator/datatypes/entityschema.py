@@ -8,6 +8,7 @@ class EntitySchema(BaseDataType):
     """
     Implements the Wikibase data type 'entity-schema'
     """
+    __slots__ = ()
     DTYPE = 'entity-schema'
 
     def __init__(self, value: str | int | None = None, **kwargs: Any):
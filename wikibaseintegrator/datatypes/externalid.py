@@ -5,5 +5,6 @@ class ExternalID(String):
     """
     Implements the Wikibase data type 'external-id'
     """
+    __slots__ = ()
     DTYPE = 'external-id'
     PTYPE = 'http://wikiba.se/ontology#ExternalId'
@@ -6,4 +6,5 @@ class EDTF(String):
     Implements the Wikibase data type for Wikibase Extended Date/Time Format extension.
     More info at https://www.mediawiki.org/wiki/Extension:Wikibase_EDTF
     """
+    __slots__ = ()
     DTYPE = 'edtf'
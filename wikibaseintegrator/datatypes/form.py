@@ -12,6 +12,7 @@ class Form(BaseDataType):
     """
     Implements the Wikibase data type 'wikibase-form'
     """
+    __slots__ = ()
     DTYPE = 'wikibase-form'
     PTYPE = 'http://wikiba.se/ontology#WikibaseForm'
     sparql_query = '''
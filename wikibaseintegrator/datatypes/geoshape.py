@@ -12,6 +12,7 @@ class GeoShape(BaseDataType):
     """
     Implements the Wikibase data type 'geo-shape'
     """
+    __slots__ = ()
     DTYPE = 'geo-shape'
     PTYPE = 'http://wikiba.se/ontology#GeoShape'
     sparql_query = '''
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Hashable
 from typing import Any
 
 from wikibaseintegrator.datatypes.basedatatype import BaseDataType
-from wikibaseintegrator.models import Claim
+from wikibaseintegrator.models import Snak
 from wikibaseintegrator.wbi_config import config
 from wikibaseintegrator.wbi_enums import WikibaseSnakType
 
@@ -13,6 +14,7 @@ class GlobeCoordinate(BaseDataType):
     """
     Implements the Wikibase data type for globe coordinates
     """
+    __slots__ = ()
     DTYPE = 'globe-coordinate'
     PTYPE = 'http://wikiba.se/ontology#GlobeCoordinate'
     sparql_query = '''
@@ -64,20 +66,16 @@ class GlobeCoordinate(BaseDataType):
                 'type': 'globecoordinate'
             }
 
-    def __eq__(self, other):
-        if isinstance(other, Claim) and self.mainsnak.datavalue.get('type') == 'globecoordinate' and other.mainsnak.datavalue.get('type') == 'globecoordinate':
-            # Compare rounded copies to ignore precision noise without mutating the claims
-            def rounded(datavalue: dict) -> dict:
-                value = dict(datavalue['value'])
-                value['latitude'] = round(value['latitude'], 6)
-                value['longitude'] = round(value['longitude'], 6)
-                value['precision'] = round(value['precision'], 17)
-                return {**datavalue, 'value': value}
+    def _value_fingerprint(self) -> Hashable:
+        if self.mainsnak.datavalue.get('type') == 'globecoordinate':
+            # Round the coordinates to ignore precision noise without mutating the claim
+            value = dict(self.mainsnak.datavalue['value'])
+            value['latitude'] = round(value['latitude'], 6)
+            value['longitude'] = round(value['longitude'], 6)
+            value['precision'] = round(value['precision'], 17)
+            return Snak.freeze({**self.mainsnak.datavalue, 'value': value})
 
-            return rounded(self.mainsnak.datavalue) == rounded(other.mainsnak.datavalue) and self.mainsnak.property_number == other.mainsnak.property_number \
-                and self.has_equal_qualifiers(other)
-
-        return super().__eq__(other)
+        return super()._value_fingerprint()
 
     def from_sparql_value(self, sparql_value: dict) -> GlobeCoordinate:
         """
@@ -7,11 +7,14 @@ from wikibaseintegrator.datatypes.basedatatype import BaseDataType
 from wikibaseintegrator.wbi_config import config
 from wikibaseintegrator.wbi_enums import WikibaseSnakType
 
+ID_PATTERN = re.compile(r'^(?:[a-zA-Z]+:|.+\/entity\/)?Q?([0-9]+)$')
+
 
 class Item(BaseDataType):
     """
     Implements the Wikibase data type 'wikibase-item' with a value being another item ID
     """
+    __slots__ = ()
     DTYPE = 'wikibase-item'
     PTYPE = 'http://wikiba.se/ontology#WikibaseItem'
     sparql_query = '''
@@ -36,8 +39,7 @@ class Item(BaseDataType):
 
         if value:
             if isinstance(value, str):
-                pattern = re.compile(r'^(?:[a-zA-Z]+:|.+\/entity\/)?Q?([0-9]+)$')
-                matches = pattern.match(value)
+                matches = ID_PATTERN.match(value)
 
                 if not matches:
                     raise ValueError(f"Invalid item ID ({value}), format must be 'Q[0-9]+'")
@@ -7,11 +7,14 @@ from wikibaseintegrator.datatypes.basedatatype import BaseDataType
 from wikibaseintegrator.wbi_config import config
 from wikibaseintegrator.wbi_enums import WikibaseSnakType
 
+ID_PATTERN = re.compile(r'^(?:[a-zA-Z]+:|.+\/entity\/)?L?([0-9]+)$')
+
 
 class Lexeme(BaseDataType):
     """
     Implements the Wikibase data type 'wikibase-lexeme'
     """
+    __slots__ = ()
     DTYPE = 'wikibase-lexeme'
     PTYPE = 'http://wikiba.se/ontology#WikibaseLexeme'
     sparql_query = '''
@@ -36,8 +39,7 @@ class Lexeme(BaseDataType):
 
         if value:
             if isinstance(value, str):
-                pattern = re.compile(r'^(?:[a-zA-Z]+:|.+\/entity\/)?L?([0-9]+)$')
-                matches = pattern.match(value)
+                matches = ID_PATTERN.match(value)
 
                 if not matches:
                     raise ValueError(f"Invalid lexeme ID ({value}), format must be 'L[0-9]+'")
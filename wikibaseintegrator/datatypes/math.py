@@ -10,6 +10,7 @@ class Math(String):
     """
     Implements the Wikibase data type 'math' for mathematical formula in TEX format
     """
+    __slots__ = ()
     DTYPE = 'math'
     PTYPE = 'http://wikiba.se/ontology#Math'
 
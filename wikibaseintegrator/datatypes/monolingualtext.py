@@ -12,6 +12,7 @@ class MonolingualText(BaseDataType):
     """
     Implements the Wikibase data type for Monolingual Text strings
     """
+    __slots__ = ()
     DTYPE = 'monolingualtext'
     PTYPE = 'http://wikiba.se/ontology#Monolingualtext'
 
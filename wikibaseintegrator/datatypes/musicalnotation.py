@@ -5,6 +5,7 @@ class MusicalNotation(String):
     """
     Implements the Wikibase data type 'musical-notation'
     """
+    __slots__ = ()
     DTYPE = 'musical-notation'
     PTYPE = 'http://wikiba.se/ontology#MusicalNotation'
 
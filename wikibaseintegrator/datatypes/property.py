@@ -7,11 +7,14 @@ from wikibaseintegrator.datatypes.basedatatype import BaseDataType
 from wikibaseintegrator.wbi_config import config
 from wikibaseintegrator.wbi_enums import WikibaseSnakType
 
+ID_PATTERN = re.compile(r'^(?:[a-zA-Z]+:|.+\/entity\/)?P?([0-9]+)$')
+
 
 class Property(BaseDataType):
     """
     Implements the Wikibase data type 'property'
     """
+    __slots__ = ()
     DTYPE = 'wikibase-property'
     PTYPE = 'http://wikiba.se/ontology#Property'
     sparql_query = '''
@@ -37,8 +40,7 @@ class Property(BaseDataType):
 
         if value:
             if isinstance(value, str):
-                pattern = re.compile(r'^(?:[a-zA-Z]+:|.+\/entity\/)?P?([0-9]+)$')
-                matches = pattern.match(value)
+                matches = ID_PATTERN.match(value)
 
                 if not matches:
                     raise ValueError(f"Invalid property ID ({value}), format must be 'P[0-9]+'")
@@ -12,6 +12,7 @@ class Quantity(BaseDataType):
     """
     Implements the Wikibase data type for quantities
     """
+    __slots__ = ()
     DTYPE = 'quantity'
     PTYPE = 'http://wikiba.se/ontology#Quantity'
     sparql_query = '''
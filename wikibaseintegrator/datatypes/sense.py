@@ -12,6 +12,7 @@ class Sense(BaseDataType):
     """
     Implements the Wikibase data type 'wikibase-sense'
     """
+    __slots__ = ()
     DTYPE = 'wikibase-sense'
     PTYPE = 'http://wikiba.se/ontology#WikibaseSense'
     sparql_query = '''
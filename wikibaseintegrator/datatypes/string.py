@@ -10,6 +10,7 @@ class String(BaseDataType):
     """
     Implements the Wikibase data type 'string'
     """
+    __slots__ = ()
     DTYPE = 'string'
     PTYPE = 'http://wikiba.se/ontology#String'
 
@@ -12,6 +12,7 @@ class TabularData(BaseDataType):
     """
     Implements the Wikibase data type 'tabular-data'
     """
+    __slots__ = ()
     DTYPE = 'tabular-data'
     PTYPE = 'http://wikiba.se/ontology#TabularData'
 
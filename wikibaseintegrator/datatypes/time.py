@@ -9,12 +9,20 @@ from wikibaseintegrator.datatypes.basedatatype import BaseDataType
 from wikibaseintegrator.wbi_config import config
 from wikibaseintegrator.wbi_enums import WikibaseSnakType, WikibaseTimePrecision
 
+# The formats of the times with a precision of a day, of a month, and of a year or lower
+# Pattern with precision lower than day supported
+# pattern = re.compile(r'^[+-][0-9]{1,16}-(?:1[0-2]|0[1-9])-(?:3[01]|0[1-9]|[12][0-9])T(?:2[0-3]|[01][0-9]):[0-5][0-9]:[0-5][0-9]Z$')
+PATTERN_DAY = re.compile(r'^[+-][0-9]{1,16}-(?:1[0-2]|0[1-9])-(?:3[01]|0[1-9]|[12][0-9])T00:00:00Z$')
+PATTERN_MONTH = re.compile(r'^[+-][0-9]{1,16}-(?:1[0-2]|0[1-9])-(?:3[01]|0[0-9]|[12][0-9])T00:00:00Z$')
+PATTERN_YEAR = re.compile(r'^[+-][0-9]{1,16}-(?:1[0-2]|0[0-9])-(?:3[01]|0[0-9]|[12][0-9])T00:00:00Z$')
+
 
 @total_ordering
 class Time(BaseDataType):
     """
     Implements the Wikibase data type with date and time values
     """
+    __slots__ = ()
     DTYPE = 'time'
     PTYPE = 'http://wikiba.se/ontology#Time'
     sparql_query = '''
@@ -60,19 +68,12 @@ class Time(BaseDataType):
 
             if not (time.startswith("+") or time.startswith("-")):
                 time = "+" + time
-
-            # Pattern with precision lower than day supported
-            # pattern = re.compile(r'^[+-][0-9]{1,16}-(?:1[0-2]|0[1-9])-(?:3[01]|0[1-9]|[12][0-9])T(?:2[0-3]|[01][0-9]):[0-5][0-9]:[0-5][0-9]Z$')
-
-            pattern_day = re.compile(r'^[+-][0-9]{1,16}-(?:1[0-2]|0[1-9])-(?:3[01]|0[1-9]|[12][0-9])T00:00:00Z$')
-            pattern_month = re.compile(r'^[+-][0-9]{1,16}-(?:1[0-2]|0[1-9])-(?:3[01]|0[0-9]|[12][0-9])T00:00:00Z$')
-            pattern_year = re.compile(r'^[+-][0-9]{1,16}-(?:1[0-2]|0[0-9])-(?:3[01]|0[0-9]|[12][0-9])T00:00:00Z$')
             if not precision:
-                if pattern_day.match(time):
+                if PATTERN_DAY.match(time):
                     precision = WikibaseTimePrecision.DAY
-                elif pattern_month.match(time):
+                elif PATTERN_MONTH.match(time):
                     precision = WikibaseTimePrecision.MONTH
-                elif pattern_year.match(time):
+                elif PATTERN_YEAR.match(time):
                     precision = WikibaseTimePrecision.YEAR
                 else:
                     raise ValueError(f"Time value ({time}) must be a string in the following format: '+%Y-%m-%dT00:00:00Z'.")
@@ -84,11 +85,11 @@ class Time(BaseDataType):
                     raise ValueError("Invalid value for time precision, see https://www.mediawiki.org/wiki/Wikibase/DataModel/JSON#time")
 
                 if precision == WikibaseTimePrecision.DAY:
-                    pattern = pattern_day
+                    pattern = PATTERN_DAY
                 elif precision == WikibaseTimePrecision.MONTH:
-                    pattern = pattern_month
+                    pattern = PATTERN_MONTH
                 else:
-                    pattern = pattern_year
+                    pattern = PATTERN_YEAR
                 matches = pattern.match(time)
                 if not matches:
                     raise ValueError(f"Time value ({time}) must be a string in the following format: '+%Y-%m-%dT00:00:00Z'. Check whether the time value format is consistent with the introduced precision.")
@@ -11,6 +11,7 @@ class URL(BaseDataType):
     """
     Implements the Wikibase data type for URL strings
     """
+    __slots__ = ()
     DTYPE = 'url'
     PTYPE = 'http://wikiba.se/ontology#Url'
     sparql_query = '''
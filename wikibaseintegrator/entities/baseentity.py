@@ -2,17 +2,20 @@ from __future__ import annotations
 
 import logging
 from copy import copy
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, TypeVar
 
-from wikibaseintegrator import wbi_fastrun
-from wikibaseintegrator.datatypes import BaseDataType
+from wikibaseintegrator import wbi_fastrun, wbi_rest
 from wikibaseintegrator.models.aliases import Aliases
-from wikibaseintegrator.models.claims import Claim, Claims
+from wikibaseintegrator.models.basemodel import LazyDict
+from wikibaseintegrator.models.claims import Claim, Claims, _claim_from_json
 from wikibaseintegrator.models.descriptions import Descriptions
 from wikibaseintegrator.models.labels import Labels
-from wikibaseintegrator.wbi_enums import ActionIfExists, EntityField
-from wikibaseintegrator.wbi_exceptions import MissingEntityException
-from wikibaseintegrator.wbi_helpers import delete_page, edit_entity, mediawiki_api_call_helper
+from wikibaseintegrator.wbi_config import config
+from wikibaseintegrator.wbi_diff import EntityDiff, diff
+from wikibaseintegrator.wbi_enums import ActionIfExists, ConflictPolicy, EntityField, ReadBackend
+from wikibaseintegrator.wbi_exceptions import EditConflict, MissingEntityException, PartialWriteError
+from wikibaseintegrator.wbi_helpers import (delete_page, edit_entity, generate_claim_id, get_entity_data, mediawiki_api_call_helper, register_subclass, remove_claims, set_claim,
+                                            set_term)
 from wikibaseintegrator.wbi_login import _Login
 
 if TYPE_CHECKING:
@@ -20,10 +23,14 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
+BaseEntityT = TypeVar('BaseEntityT', bound='BaseEntity')
+
 
 class BaseEntity:
     ETYPE = 'base-entity'
     subclasses: list[type[BaseEntity]] = []
+    # The entity types by ETYPE, see register_subclass() for the rules applied to the subclasses
+    etypes: dict[str, type[BaseEntity]] = {}
 
     def __init__(self, api: WikibaseIntegrator | None = None, title: str | None = None, pageid: int | None = None, lastrevid: int | None = None, type: str | None = None,
                  id: str | None = None, claims: Claims | None = None, is_bot: bool | None = None, login: _Login | None = None):
@@ -40,13 +47,17 @@ class BaseEntity:
         self.pageid = pageid
         self.lastrevid = lastrevid
         self.type = str(type or self.ETYPE)
-        self.id = id
+        self.__id: str | None = None
         self.claims = claims or Claims()
+        self.id = id
+        # The JSON of the revision the entity was loaded from lazily, compared with the entity to write only the changes, see _write()
+        self.base_json: dict[str, Any] | None = None
 
-    # Allow registration of subclasses of BaseEntity into BaseEntity.subclasses
+    # Allow registration of subclasses of BaseEntity into BaseEntity.subclasses and BaseEntity.etypes
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
         cls.subclasses.append(cls)
+        register_subclass(cls.etypes, cls, 'ETYPE')
 
     @property
     def api(self) -> WikibaseIntegrator:
@@ -101,6 +112,7 @@ class BaseEntity:
     @id.setter
     def id(self, value: str | None):
         self.__id = value
+        self.claims.entity_id = value
 
     @property
     def claims(self) -> Claims:
@@ -112,8 +124,11 @@ class BaseEntity:
             raise TypeError
 
         if isinstance(value, Claim):
-            value = Claims().add(claims=value)
+            claims = Claims()
+            claims.entity_id = self.id
+            value = claims.add(claims=value)
 
+        value.entity_id = self.id
         self.__claims = value
 
     def add_claims(self, claims: Claim | list[Claim] | Claims, action_if_exists: ActionIfExists = ActionIfExists.APPEND_OR_REPLACE) -> BaseEntity:
@@ -147,11 +162,16 @@ class BaseEntity:
 
         return json_data
 
-    def from_json(self, json_data: dict[str, Any]) -> BaseEntity:
+    def from_json(self, json_data: dict[str, Any], lazy: bool = False, trusted: bool = False) -> BaseEntity:
         """
         Import a dictionary into BaseEntity attributes.
 
         :param json_data: A specific dictionary from MediaWiki API
+        :param lazy: Keep the JSON of the claims of each property, and of the terms of each language, and build the
+            objects on first access only. :func:`get_json` reuses the JSON of everything never accessed as is, so it
+            must not be modified by the caller.
+        :param trusted: The JSON comes from a Wikibase instance: the ID and the claims are set without being validated.
+            Used by :func:`get` and :func:`write`, don't use it for a JSON built by hand.
         :return:
         """
         if 'missing' in json_data:  # TODO: 1.35 compatibility
@@ -161,16 +181,45 @@ class BaseEntity:
             self.title = str(json_data['title'])
         if 'pageid' in json_data:  # TODO: 1.35 compatibility
             self.pageid = int(json_data['pageid'])
-        self.lastrevid = int(json_data['lastrevid'])
+        if 'lastrevid' in json_data:  # Not in the JSON of a new entity
+            self.lastrevid = int(json_data['lastrevid'])
         self.type = str(json_data['type'])
-        self.id = str(json_data['id'])
+        if 'id' in json_data and trusted:
+            self.__id = self.claims.entity_id = str(json_data['id'])
+        elif 'id' in json_data:
+            self.id = str(json_data['id'])
         if 'claims' in json_data:  # 'claims' is named 'statements' in Wikimedia Commons MediaInfo
-            self.claims = Claims().from_json(json_data['claims'])
+            self.claims = Claims().from_json(json_data['claims'], lazy=lazy, trusted=trusted)
+        # Kept without cost when loaded lazily: the JSON of the parts never accessed is shared with the entity
+        self.base_json = json_data if lazy and trusted and 'lastrevid' in json_data else None
 
         return self
 
+    def clone(self: BaseEntityT) -> BaseEntityT:
+        """
+        Return a copy of the entity, like a template copied for each entity of a mass creation.
+
+        The copy is loaded lazily from the JSON of the entity, see :func:`from_json`. The claims of a property, the terms
+        of a language and the sitelinks are only built when they are accessed, and the JSON of the parts never accessed
+        is shared with the entity and its other copies. A copy of a copy reuses this JSON as is, so cloning a clone is
+        cheaper than cloning the original. Modifying a copy doesn't change the entity, and the other way round: the
+        snaks copy the datavalues of the JSON they are built from. The new claims of the entity, whose GUID was
+        generated locally, are new in the copy too.
+
+        :return: A new entity of the same class
+        """
+        clone = self.__class__(api=self.api)
+        clone.from_json(self.get_json(), lazy=True, trusted=True)
+        clone.claims.set_new_ids(self.claims.new_ids())
+        clone.title = self.title
+        clone.pageid = self.pageid
+        clone.lastrevid = self.lastrevid
+        clone.base_json = self.base_json
+        return clone
+
     # noinspection PyMethodMayBeStatic
-    def _get(self, entity_id: str, login: _Login | None = None, allow_anonymous: bool = True, is_bot: bool | None = None, props: str | list | None = None, **kwargs: Any) -> dict:  # pylint: disable=no-self-use
+    def _get(self, entity_id: str, login: _Login | None = None, allow_anonymous: bool = True, is_bot: bool | None = None, props: str | list | None = None,
+             revision: int | None = None, **kwargs: Any) -> dict:  # pylint: disable=no-self-use
         """
         Retrieve an entity in json representation from the Wikibase instance
 
@@ -178,10 +227,24 @@ class BaseEntity:
         :param login: A login instance
         :param allow_anonymous: Force a check if the query can be anonymous or not
         :param is_bot: Add the bot flag to the query
+        :param props: The parts of the entity to retrieve, with the MediaWiki API
+        :param revision: The ID of a revision of the entity to retrieve, always read from Special:EntityData
         :param kwargs: More arguments for Python requests
         :return: python complex dictionary representation of a json
         """
 
+        login = login or self.api.login
+        # The requests with the session cookie of a login are not served by a CDN, a login is only used if required
+        session = login.get_session() if login is not None and not allow_anonymous else None
+
+        if revision is not None or (self.api.read_backend == ReadBackend.ENTITY_DATA and not props):
+            if props:
+                raise ValueError("props can't be used to retrieve a revision")
+            return get_entity_data(entity_id, revision=revision, cache=self.api.read_cache, session=session, **kwargs)
+
+        if self.api.read_backend == ReadBackend.REST and self.ETYPE in wbi_rest.ENTITY_PATHS:
+            return {'entities': {entity_id: wbi_rest.get_entity(entity_id, self.ETYPE, props=props, cache=self.api.read_cache, session=session, **kwargs)}}
+
         params = {
             'action': 'wbgetentities',
             'ids': entity_id,
@@ -196,11 +259,79 @@ class BaseEntity:
             if 'info' not in props:
                 params['props'] += '|info'
 
-        login = login or self.api.login
         is_bot = is_bot if is_bot is not None else self.api.is_bot
 
         return mediawiki_api_call_helper(data=params, login=login, allow_anonymous=allow_anonymous, is_bot=is_bot, **kwargs)
 
+    def write_lightweight(self, **kwargs: Any) -> WriteResult:
+        """
+        Write the entity like :func:`write`, without rebuilding it from the entity returned by the instance. Only the
+        fields changed by the write are updated on the local entity: the ID, the last revision, the GUIDs of the claims
+        added and the claims removed. The other parts are reloaded lazily from the response, so the claims returned by the
+        instance are never parsed.
+
+        :param kwargs: The arguments of :func:`write`
+        :return: The ID, the last revision and the GUIDs of the claims added
+        """
+        json_data = self._write(data=self.get_json(), **kwargs)
+        claims_json = json_data.get('claims') or json_data.get('statements') or {}
+        self.from_json({key: value for key, value in json_data.items() if key not in ('claims', 'statements')}, lazy=True, trusted=True)
+        # The claims were not reloaded, the entity can't be compared with the response
+        self.base_json = None
+
+        added: dict[str, list[str]] = {}
+        new_ids = self.claims.new_ids()
+        for property in list(self.claims.claims):
+            # The claims not built yet are unchanged, unless they are new
+            raw_json = self.claims.claims.get_raw(property) if isinstance(self.claims.claims, LazyDict) and self.claims.claims.is_raw(property) else None
+            if raw_json is not None and not any(claim.get('id') in new_ids for claim in raw_json):
+                continue
+            claims = [claim for claim in self.claims.claims[property] if not claim.removed]
+            if claims:
+                self.claims.claims[property] = claims
+            else:
+                del self.claims.claims[property]
+
+            self._match_claim_ids(property, claims, claims_json.get(property, []))
+            for claim in claims:
+                if claim.new and claim.id is not None:
+                    claim.new = False
+                    added.setdefault(property, []).append(claim.id)
+
+        return WriteResult(id=str(self.id), lastrevid=self.lastrevid, claims=added)
+
+    @staticmethod
+    def _match_claim_ids(property: str, claims: list[Claim], claims_json: list[dict]) -> None:
+        """
+        Give the GUIDs of the claims returned by the instance to the claims written without a GUID, added to a new
+        entity. The claims are matched by fingerprint, equal claims in order. If the instance changed the value of a
+        claim, the only claim left on each side is matched, the other ones keep no GUID.
+
+        :param property: The property of the claims
+        :param claims: The claims written
+        :param claims_json: The JSON of the claims returned by the instance
+        """
+        unknown_claims = [claim for claim in claims if claim.id is None]
+        if not unknown_claims:
+            return
+
+        known_ids = {claim.id for claim in claims}
+        unknown_ids: dict[tuple, list[str]] = {}
+        for claim_json in claims_json:
+            if claim_json['id'] not in known_ids:
+                unknown_ids.setdefault(_claim_from_json(claim_json, trusted=True).fingerprint, []).append(claim_json['id'])
+
+        for claim in unknown_claims:
+            if unknown_ids.get(claim.fingerprint):
+                claim.id = unknown_ids[claim.fingerprint].pop(0)
+
+        unmatched_claims = [claim for claim in unknown_claims if claim.id is None]
+        unmatched_ids = [claim_id for claim_ids in unknown_ids.values() for claim_id in claim_ids]
+        if len(unmatched_claims) == 1 and len(unmatched_ids) == 1:
+            unmatched_claims[0].id = unmatched_ids[0]
+        elif unmatched_claims:
+            log.warning("Can't find the GUIDs of %d claims of %s, their values were changed by the instance", len(unmatched_claims), property)
+
     def clear(self, **kwargs: Any) -> dict[str, Any]:
         """
         Use the `clear` parameter of `wbeditentity` API call to clear the content of the entity.
@@ -212,6 +343,23 @@ class BaseEntity:
         return self._write(data={}, clear=True, **kwargs)
 
     def get_claims(self, property: str, login: _Login | None = None, allow_anonymous: bool = True, is_bot: bool | None = None, **kwargs: Any):
+        """
+        Retrieve the claims of a property from the Wikibase instance, without the rest of the entity, and add them to the entity.
+
+        :param property: The property of the claims
+        :param login: A login instance
+        :param allow_anonymous: Force a check if the query can be anonymous or not
+        :param is_bot: Add the bot flag to the query
+        :param kwargs: More arguments for Python requests
+        :return: The entity
+        """
+        login = login or self.api.login
+
+        if self.api.read_backend == ReadBackend.REST and self.ETYPE in wbi_rest.ENTITY_PATHS:
+            session = login.get_session() if login is not None and not allow_anonymous else None
+            self.claims.from_json(wbi_rest.get_statements(str(self.id), self.ETYPE, property=property, cache=self.api.read_cache, session=session, **kwargs), trusted=True)
+            return self
+
         params = {
             'action': 'wbgetclaims',
             'entity': self.id,
@@ -219,18 +367,29 @@ class BaseEntity:
             'format': 'json'
         }
 
-        login = login or self.api.login
         is_bot = is_bot if is_bot is not None else self.api.is_bot
 
         json_data = mediawiki_api_call_helper(data=params, login=login, allow_anonymous=allow_anonymous, is_bot=is_bot, **kwargs)
-        self.claims.from_json(json_data['claims'])
+        self.claims.from_json(json_data['claims'], trusted=True)
         return self
 
     def _write(self, data: dict | None = None, summary: str | None = None, login: _Login | None = None, allow_anonymous: bool = False, limit_claims: list[str | int] | None = None,
-               clear: bool = False, as_new: bool = False, is_bot: bool | None = None, fields_to_update: list | None | EntityField = None, **kwargs: Any) -> dict[str, Any]:
+               clear: bool = False, as_new: bool = False, is_bot: bool | None = None, fields_to_update: list | None | EntityField = None, update_fastrun: bool = True,
+               statement_level: bool | None = None, conflict_policy: ConflictPolicy | None = None, **kwargs: Any) -> dict[str, Any]:
         """
         Writes the entity JSON to the Wikibase instance and after successful write, returns the "entity" part of the response.
 
+        An entity loaded lazily from the instance keeps the JSON of its revision. If only its claims, labels and
+        descriptions changed since, the changes can be written one by one with wbsetclaim, wbremoveclaims, wbsetlabel
+        and wbsetdescription: only the changed claims and terms are sent and compared by the instance, instead of the
+        whole entity. Unlike a wbeditentity call, such a write is not atomic: if an edit fails after others were saved,
+        :class:`~wikibaseintegrator.wbi_exceptions.PartialWriteError` is raised. See statement_level.
+
+        Unless the conflict policy is OVERWRITE, the default, the revision the entity was read from is sent as base
+        revision, and the instance detects the conflicts with the edits made since. With the REBASE policy, the changes
+        since the revision the entity was loaded from are then applied again on the last revision, if it was loaded
+        lazily. Otherwise the conflict is raised.
+
         :param data: The serialized object that is used as the data source. A newly created entity will be assigned an 'id'.
         :param summary: A summary of the edit
         :param login: A login instance
@@ -240,10 +399,41 @@ class BaseEntity:
         :param as_new: Write the entity as a new one
         :param is_bot: Add the bot flag to the query
         :param field_to_update: A list or a single EntityField to update. If not set, all fields will be updated.
+        :param update_fastrun: Patch the fastrun containers with the entity returned by the instance, so that they stay up to date. Enabled by default.
+        :param statement_level: Write the changes at the statement level: always if True, never if False, and by default if
+            they can be written in at most config['STATEMENT_LEVEL_MAX_EDITS'] edits, 0 by default. Ignored with clear,
+            as_new, limit_claims or fields_to_update.
+        :param conflict_policy: The handling of the edit conflicts, the conflict policy of the WikibaseIntegrator instance by default.
+            See :class:`~wikibaseintegrator.wbi_enums.ConflictPolicy`.
         :param kwargs: More arguments for Python requests
         :return: A dictionary representation of the edited Entity
         """
 
+        conflict_policy = conflict_policy or self.api.conflict_policy
+        if conflict_policy != ConflictPolicy.OVERWRITE and not as_new and self.id and self.lastrevid and not kwargs.get('baserevid'):
+            kwargs['baserevid'] = self.lastrevid
+        # Only the changes since the revision loaded are applied again after a conflict, if they are known
+        rebase_changes = not clear and not limit_claims and fields_to_update is None and self.base_json is not None
+
+        max_edits = config['STATEMENT_LEVEL_MAX_EDITS'] if statement_level is None else 0
+        whole_entity = not clear and not as_new and not limit_claims and fields_to_update is None
+        if (statement_level or max_edits > 0) and whole_entity:
+            changes = self._statement_changes()
+            if changes is not None and (statement_level or _count_edits(changes) <= max_edits):
+                try:
+                    return self._write_statements(changes, summary=summary, login=login, allow_anonymous=allow_anonymous, is_bot=is_bot, update_fastrun=update_fastrun,
+                                                  **kwargs)
+                except EditConflict as error:
+                    if conflict_policy != ConflictPolicy.REBASE:
+                        raise
+                    entity_json = self._rebase(error, rebase_changes, summary=summary, login=login, allow_anonymous=allow_anonymous,
+                                               is_bot=is_bot if is_bot is not None else self.api.is_bot, **kwargs)
+                    if update_fastrun:
+                        wbi_fastrun.update_fastrun_store(entity_json)
+                    return entity_json
+            if statement_level:
+                raise ValueError('Only the claims, labels and descriptions of an entity loaded lazily from the instance can be written at the statement level')
+
         data = data or {}
 
         if fields_to_update is not None:
@@ -303,18 +493,145 @@ class BaseEntity:
             entity_id = None
             # Don't keep an id when creating a new entity: a null id in the data payload is rejected by the API.
             data.pop('id', None)
+            # Nor the GUIDs of the claims, they belong to the original entity
+            for key in ('claims', 'statements'):
+                if key in data:
+                    data[key] = {property: [{name: value for name, value in claim.items() if name != 'id'} for claim in claims if 'remove' not in claim]
+                                 for property, claims in data[key].items()}
         else:
             entity_id = self.id
 
         try:
             json_result: dict = edit_entity(data=data, id=entity_id, type=self.type, summary=summary, clear=clear, is_bot=is_bot, allow_anonymous=allow_anonymous,
                                             login=login, **kwargs)
+        except EditConflict as error:
+            if conflict_policy != ConflictPolicy.REBASE:
+                log.exception('Error while writing to the Wikibase instance')
+                raise
+            json_result = {'entity': self._rebase(error, rebase_changes, summary=summary, login=login, allow_anonymous=allow_anonymous, is_bot=is_bot, clear=clear,
+                                                  **kwargs)}
         except Exception:
             log.exception('Error while writing to the Wikibase instance')
             raise
 
+        if update_fastrun:
+            wbi_fastrun.update_fastrun_store(json_result['entity'])
+
         return json_result['entity']
 
+    def _rebase(self, conflict: EditConflict, rebase_changes: bool, login: _Login | None = None, allow_anonymous: bool = False, is_bot: bool = False,
+                **kwargs: Any) -> dict[str, Any]:
+        """
+        Apply the changes since the revision the entity was loaded from again on the last revision of the entity after an
+        edit conflict, and write them, see :func:`_write`.
+
+        :param conflict: The edit conflict, raised if the changes are not known
+        :param rebase_changes: The changes since the revision the entity was loaded from are known and can be written alone
+        :return: The "entity" part of the response
+        """
+        if not rebase_changes or self.base_json is None:
+            log.error('Edit conflict on %s, the changes since the revision read are not known and are not written again', self.id)
+            raise conflict
+
+        # The base revision of each attempt is the last revision
+        kwargs.pop('baserevid', None)
+        changes = diff(self.__class__(api=self.api).from_json(self.base_json, lazy=True, trusted=True), self).get_json()
+
+        for _ in range(config['EDIT_CONFLICT_RETRIES']):
+            # Only the revision and the claims of the last revision are needed, to skip the claims removed since
+            latest = self._get(entity_id=str(self.id), login=login, allow_anonymous=allow_anonymous, is_bot=is_bot, props='info|claims')['entities'][str(self.id)]
+            log.warning('Edit conflict on %s, writing the changes again on revision %s', self.id, latest['lastrevid'])
+            try:
+                return edit_entity(data=_without_removed_claims(changes, latest), id=self.id, type=self.type, is_bot=is_bot,
+                                   allow_anonymous=allow_anonymous, login=login, baserevid=latest['lastrevid'], **kwargs)['entity']
+            except EditConflict as error:
+                conflict = error
+
+        log.error('Edit conflict on %s, still conflicting after %d attempts', self.id, config['EDIT_CONFLICT_RETRIES'])
+        raise conflict
+
+    def _statement_changes(self) -> EntityDiff | None:
+        """
+        Compare the entity with the revision it was loaded from.
+
+        :return: The changes, or None if they can't be written at the statement level
+        """
+        if not self.id or self.base_json is None:
+            return None
+
+        changes = diff(self.__class__(api=self.api).from_json(self.base_json, lazy=True, trusted=True), self)
+        unsupported = ('aliases', 'sitelinks', 'values', 'forms_added', 'forms_removed', 'forms_changed', 'senses_added', 'senses_removed', 'senses_changed')
+        if set(changes.terms) - {'labels', 'descriptions'} or any(getattr(changes, name) for name in unsupported):
+            return None
+        return changes
+
+    def _write_statements(self, changes: EntityDiff, summary: str | None = None, login: _Login | None = None, allow_anonymous: bool = False, is_bot: bool | None = None,
+                          update_fastrun: bool = True, baserevid: int | None = None, tags: list[str] | None = None, **kwargs: Any) -> dict[str, Any]:
+        """
+        Write the changes of the entity one by one, see :func:`_write`. The new claims get a GUID generated locally. If
+        an edit fails after others were saved, :class:`~wikibaseintegrator.wbi_exceptions.PartialWriteError` is raised
+        from its error.
+
+        :return: The JSON of the entity, with the claims returned by the instance and its last revision
+        """
+        assert self.id is not None and self.base_json is not None
+
+        is_bot = is_bot if is_bot is not None else self.api.is_bot
+        login = login or self.api.login
+        options = {'summary': summary, 'tags': tags, 'is_bot': is_bot, 'login': login, 'allow_anonymous': allow_anonymous, **kwargs}
+        lastrevid = self.lastrevid
+        saved_claims: dict[str, dict] = {}
+        saved_edits = 0
+
+        claims: list[Claim] = []
+        for property_changes in changes.claims_changed.values():
+            for change in property_changes:
+                change.new.id = change.old.id
+                claims.append(change.new)
+        for property_claims in changes.claims_added.values():
+            for claim in property_claims:
+                if not claim.new or not claim.id:
+                    claim.id = generate_claim_id(self.id)
+                claims.append(claim)
+
+        try:
+            for claim in claims:
+                result = set_claim(claim.get_json(), baserevid=baserevid, **options)
+                saved_claims[str(claim.id)] = result['claim']
+                lastrevid = result['pageinfo']['lastrevid']
+                baserevid = lastrevid if baserevid else None
+                saved_edits += 1
+
+            removed_ids = [str(claim.id) for property_claims in changes.claims_removed.values() for claim in property_claims]
+            if removed_ids:
+                lastrevid = remove_claims(removed_ids, baserevid=baserevid, **options)['pageinfo']['lastrevid']
+                baserevid = lastrevid if baserevid else None
+                saved_edits += 1
+
+            for field, terms in changes.terms.items():
+                for language, (_, value) in terms.items():
+                    lastrevid = set_term(self.id, field[:-1], language, value, baserevid=baserevid, **options)['entity']['lastrevid']
+                    baserevid = lastrevid if baserevid else None
+                    saved_edits += 1
+        except Exception as error:
+            log.exception('Error while writing to the Wikibase instance')
+            if saved_edits:
+                raise PartialWriteError(self.id, lastrevid, saved_edits) from error
+            raise
+
+        json_data: dict[str, Any] = self.get_json()
+        for key in ('claims', 'statements', 'labels', 'descriptions'):
+            if key in json_data:
+                json_data[key] = {name: [saved_claims.get(str(value.get('id')), value) for value in values if 'remove' not in value] if isinstance(values, list) else values
+                                  for name, values in json_data[key].items() if isinstance(values, list) or 'remove' not in values}
+        json_data.update({key: self.base_json[key] for key in ('pageid', 'ns', 'title') if key in self.base_json})
+        json_data['lastrevid'] = lastrevid
+
+        if update_fastrun:
+            wbi_fastrun.update_fastrun_store(json_data)
+
+        return json_data
+
     def delete(self, login: _Login | None = None, allow_anonymous: bool = False, is_bot: bool | None = None, **kwargs: Any):
         """
         Delete the current entity. Use the pageid first if available and fallback to the page title.
@@ -342,34 +659,49 @@ class BaseEntity:
 
             return delete_page(title=None, pageid=self.pageid, login=login, allow_anonymous=allow_anonymous, is_bot=is_bot, **kwargs)
 
-    def write_required(self, base_filter: list[BaseDataType | list[BaseDataType]], action_if_exists: ActionIfExists = ActionIfExists.REPLACE_ALL, **kwargs: Any) -> bool:
+    def write_required(self, base_filter: list[wbi_fastrun.BaseFilterElement], action_if_exists: ActionIfExists = ActionIfExists.REPLACE_ALL, use_language_data: bool = True,
+                       **kwargs: Any) -> bool:
+        """
+        Check, through the fastrun container matching the base filter, if the entity differs from the data of the
+        Wikibase instance and a write is required.
+
+        :param base_filter: The filter defining the data corpus. A list made of BaseDataType, tuple of BaseDataType or list of BaseDataType.
+        :param action_if_exists: The action that will be used for the write.
+        :param use_language_data: Also compare the labels, descriptions and aliases of the entity, when it has some and
+            an ID. The terms of an entity without ID are not compared: another entity holding the claims is found.
+        :param kwargs: More arguments for :func:`~wikibaseintegrator.wbi_fastrun.get_fastrun_container`
+        :return: True if a write is required, False otherwise.
+        """
         fastrun_container = wbi_fastrun.get_fastrun_container(base_filter=base_filter, **kwargs)
 
-        # Collect the property numbers targeted by the base_filter. It supports both the simple form (a
-        # BaseDataType) and the property-path form (a list of two BaseDataType), whose anchor is the first property.
-        base_filter_props = set()
-        for prop in base_filter:
-            if isinstance(prop, BaseDataType):
-                base_filter_props.add(prop.mainsnak.property_number)
-            elif isinstance(prop, list) and prop and isinstance(prop[0], BaseDataType):
-                base_filter_props.add(prop[0].mainsnak.property_number)
+        # Only the claims whose property is targeted by the base filter are compared. With a custom base query, the
+        # data corpus is unknown and every claim is compared.
+        base_filter_props = fastrun_container.base_filter_properties
 
         pfilter: set = set()
         for claim in self.claims:
-            if claim.mainsnak.property_number in base_filter_props:
+            if fastrun_container.base_query or claim.mainsnak.property_number in base_filter_props:
                 pfilter.add(claim.mainsnak.property_number)
 
         property_filter: list[str] = list(pfilter)
 
-        # TODO: Add check_language_data
+        # Without ID, the entity is another one holding the claims: different terms must not require writing a duplicate
+        language_data = self._fastrun_language_data() if use_language_data and self.id else {}
 
         # Restrict the check to the entity being edited, when it already has an ID
         entity_filter = [self.id] if self.id else None
 
-        return fastrun_container.write_required(claims=self.claims, entity_filter=entity_filter, property_filter=property_filter, action_if_exists=action_if_exists)
+        return fastrun_container.write_required(claims=self.claims, entity_filter=entity_filter, property_filter=property_filter, action_if_exists=action_if_exists,
+                                                **language_data)
+
+    def _fastrun_language_data(self) -> dict[str, Any]:
+        """
+        The language data compared by :func:`write_required`, as keyword arguments of
+        :func:`~wikibaseintegrator.wbi_fastrun.FastRunContainer.write_required`. None by default.
+        """
+        return {}
 
     def get_entity_url(self, wikibase_url: str | None = None) -> str:
-        from wikibaseintegrator.wbi_config import config
         wikibase_url = wikibase_url or str(config['WIKIBASE_URL'])
         if wikibase_url and self.id:
             return wikibase_url + '/entity/' + self.id
@@ -434,7 +766,14 @@ class TermsEntity(BaseEntity):
             raise TypeError
         self.__aliases = aliases
 
-    def _terms_from_json(self, json_data: dict[str, Any]) -> None:
+    def _fastrun_language_data(self) -> dict[str, Any]:
+        return {
+            'labels': self.labels,
+            'descriptions': self.descriptions,
+            'aliases': self.aliases
+        }
+
+    def _terms_from_json(self, json_data: dict[str, Any], lazy: bool = False) -> None:
         """
         Deserialize the labels/descriptions/aliases blocks.
 
@@ -442,8 +781,48 @@ class TermsEntity(BaseEntity):
         of them (e.g. a MediaInfo entity usually has no aliases).
         """
         if 'labels' in json_data:
-            self.labels = Labels().from_json(json_data['labels'])
+            self.labels = Labels().from_json(json_data['labels'], lazy=lazy)
         if 'descriptions' in json_data:
-            self.descriptions = Descriptions().from_json(json_data['descriptions'])
+            self.descriptions = Descriptions().from_json(json_data['descriptions'], lazy=lazy)
         if 'aliases' in json_data:
-            self.aliases = Aliases().from_json(json_data['aliases'])
+            self.aliases = Aliases().from_json(json_data['aliases'], lazy=lazy)
+
+
+def _without_removed_claims(data: dict[str, Any], latest: dict[str, Any]) -> dict[str, Any]:
+    """Drop the removal of the claims already removed from the last revision of the entity, the instance rejects them."""
+    claims_key = 'statements' if 'statements' in latest else 'claims'
+    latest_ids = {claim['id'] for claims in latest.get(claims_key, {}).values() for claim in claims}
+    data = dict(data)
+    for key in ('claims', 'statements'):
+        if key in data:
+            claims = data.pop(key)
+            claims = [claim for property_claims in claims.values() for claim in property_claims] if isinstance(claims, dict) else claims
+            claims = [claim for claim in claims if 'remove' not in claim or claim.get('id') in latest_ids]
+            if claims:
+                data[claims_key] = claims
+    return data
+
+
+class WriteResult:
+    """
+    The result of :func:`BaseEntity.write_lightweight`.
+
+    :param id: The ID of the entity
+    :param lastrevid: The ID of the revision created by the write
+    :param claims: The GUIDs of the claims added by the write, by property
+    """
+    __slots__ = ('id', 'lastrevid', 'claims')
+
+    def __init__(self, id: str, lastrevid: int | None, claims: dict[str, list[str]] | None = None):
+        self.id = id
+        self.lastrevid = lastrevid
+        self.claims = claims or {}
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {self.id} revision {self.lastrevid}, {sum(len(claims) for claims in self.claims.values())} claims added>'
+
+
+def _count_edits(changes: EntityDiff) -> int:
+    """The number of edits writing the changes at the statement level: one per claim and per term, one for all the claims removed."""
+    return (sum(len(claims) for claims in changes.claims_changed.values()) + sum(len(claims) for claims in changes.claims_added.values()) + bool(changes.claims_removed)
+            + sum(len(terms) for terms in changes.terms.values()))
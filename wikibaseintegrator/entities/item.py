@@ -9,6 +9,8 @@ from wikibaseintegrator.models.descriptions import Descriptions
 from wikibaseintegrator.models.labels import Labels
 from wikibaseintegrator.models.sitelinks import Sitelinks
 
+ID_PATTERN = re.compile(r'^(?:[a-zA-Z]+:)?Q?([0-9]+)$')
+
 
 class ItemEntity(TermsEntity):
     ETYPE = 'item'
@@ -31,8 +33,7 @@ class ItemEntity(TermsEntity):
     @BaseEntity.id.setter  # type: ignore
     def id(self, value: None | str | int):
         if isinstance(value, str):
-            pattern = re.compile(r'^(?:[a-zA-Z]+:)?Q?([0-9]+)$')
-            matches = pattern.match(value)
+            matches = ID_PATTERN.match(value)
 
             if not matches:
                 raise ValueError(f"Invalid item ID ({value}), format must be 'Q[0-9]+'")
@@ -60,11 +61,13 @@ class ItemEntity(TermsEntity):
     def new(self, **kwargs: Any) -> ItemEntity:
         return ItemEntity(api=self.api, **kwargs)
 
-    def get(self, entity_id: str | int | None = None, **kwargs: Any) -> ItemEntity:
+    def get(self, entity_id: str | int | None = None, lazy: bool = False, **kwargs: Any) -> ItemEntity:
         """
         Request the MediaWiki API to get data for the entity specified in argument.
 
         :param entity_id: The entity_id of the Item entity you want. Must start with a 'Q'.
+        :param lazy: Keep the JSON returned by the API and build the claims of each property, the terms of each language
+            and the sitelinks on first access. See :func:`from_json`.
         :param kwargs:
         :return: an ItemEntity instance
         """
@@ -75,8 +78,7 @@ class ItemEntity(TermsEntity):
             raise ValueError("You must provide an entity_id")
 
         if isinstance(entity_id, str):
-            pattern = re.compile(r'^(?:[a-zA-Z]+:)?Q?([0-9]+)$')
-            matches = pattern.match(entity_id)
+            matches = ID_PATTERN.match(entity_id)
 
             if not matches:
                 raise ValueError(f"Invalid item ID ({entity_id}), format must be 'Q[0-9]+'")
@@ -88,7 +90,7 @@ class ItemEntity(TermsEntity):
 
         entity_id = f'Q{entity_id}'
         json_data = super()._get(entity_id=entity_id, **kwargs)
-        return ItemEntity(api=self.api).from_json(json_data=json_data['entities'][entity_id])
+        return ItemEntity(api=self.api).from_json(json_data=json_data['entities'][entity_id], lazy=lazy, trusted=True)
 
     def get_json(self) -> dict[str, str | dict]:
         """
@@ -104,12 +106,12 @@ class ItemEntity(TermsEntity):
             **super().get_json()
         }
 
-    def from_json(self, json_data: dict[str, Any]) -> ItemEntity:
-        super().from_json(json_data=json_data)
-        super()._terms_from_json(json_data=json_data)
+    def from_json(self, json_data: dict[str, Any], lazy: bool = False, trusted: bool = False) -> ItemEntity:
+        super().from_json(json_data=json_data, lazy=lazy, trusted=trusted)
+        super()._terms_from_json(json_data=json_data, lazy=lazy)
 
         if 'sitelinks' in json_data:
-            self.sitelinks = Sitelinks().from_json(json_data['sitelinks'])
+            self.sitelinks = Sitelinks().from_json(json_data['sitelinks'], lazy=lazy)
 
         return self
 
@@ -124,8 +126,9 @@ class ItemEntity(TermsEntity):
         :param allow_anonymous: Force a check if the query can be anonymous or not
         :param clear: Clear the existing entity before updating
         :param is_bot: Add the bot flag to the query
+        :param update_fastrun: Patch the fastrun containers with the entity returned by the instance. Enabled by default.
         :param kwargs: More arguments for Python requests
         :return: an ItemEntity of the response from the instance
         """
         json_data = super()._write(data=self.get_json(), **kwargs)
-        return self.from_json(json_data=json_data)
+        return self.from_json(json_data=json_data, trusted=True)
@@ -9,6 +9,9 @@ from wikibaseintegrator.models.lemmas import Lemmas
 from wikibaseintegrator.models.senses import Senses
 from wikibaseintegrator.wbi_config import config
 
+ID_PATTERN = re.compile(r'^(?:[a-zA-Z]+:)?L?([0-9]+)$')
+LANGUAGE_PATTERN = re.compile(r'^(?:[a-zA-Z]+:|.+/entity/)?Q?([0-9]+)$')
+
 
 class LexemeEntity(BaseEntity):
     ETYPE = 'lexeme'
@@ -26,8 +29,7 @@ class LexemeEntity(BaseEntity):
     @BaseEntity.id.setter  # type: ignore
     def id(self, value: None | str | int):
         if isinstance(value, str):
-            pattern = re.compile(r'^(?:[a-zA-Z]+:)?L?([0-9]+)$')
-            matches = pattern.match(value)
+            matches = ID_PATTERN.match(value)
 
             if not matches:
                 raise ValueError(f"Invalid lexeme ID ({value}), format must be 'L[0-9]+'")
@@ -67,8 +69,7 @@ class LexemeEntity(BaseEntity):
     @language.setter
     def language(self, language: str):
         if isinstance(language, str):
-            pattern = re.compile(r'^(?:[a-zA-Z]+:|.+/entity/)?Q?([0-9]+)$')
-            matches = pattern.match(language)
+            matches = LANGUAGE_PATTERN.match(language)
 
             if not matches:
                 raise ValueError(f"Invalid lexeme language value ({language}), format must be 'Q[0-9]+'")
@@ -106,10 +107,9 @@ class LexemeEntity(BaseEntity):
     def new(self, **kwargs: Any) -> LexemeEntity:
         return LexemeEntity(api=self.api, **kwargs)
 
-    def get(self, entity_id: str | int, **kwargs: Any) -> LexemeEntity:
+    def get(self, entity_id: str | int, lazy: bool = False, **kwargs: Any) -> LexemeEntity:
         if isinstance(entity_id, str):
-            pattern = re.compile(r'^(?:[a-zA-Z]+:)?L?([0-9]+)$')
-            matches = pattern.match(entity_id)
+            matches = ID_PATTERN.match(entity_id)
 
             if not matches:
                 raise ValueError(f"Invalid lexeme ID ({entity_id}), format must be 'L[0-9]+'")
@@ -121,7 +121,7 @@ class LexemeEntity(BaseEntity):
 
         entity_id = f'L{entity_id}'
         json_data = super()._get(entity_id=entity_id, **kwargs)
-        return LexemeEntity(api=self.api).from_json(json_data=json_data['entities'][entity_id])
+        return LexemeEntity(api=self.api).from_json(json_data=json_data['entities'][entity_id], lazy=lazy, trusted=True)
 
     def get_json(self) -> dict[str, str | dict]:
         json_data: dict = {
@@ -137,19 +137,21 @@ class LexemeEntity(BaseEntity):
 
         return json_data
 
-    def from_json(self, json_data: dict[str, Any]) -> LexemeEntity:
-        super().from_json(json_data=json_data)
+    def from_json(self, json_data: dict[str, Any], lazy: bool = False, trusted: bool = False) -> LexemeEntity:
+        super().from_json(json_data=json_data, lazy=lazy, trusted=trusted)
 
         if 'lemmas' in json_data:
-            self.lemmas = Lemmas().from_json(json_data['lemmas'])
+            self.lemmas = Lemmas().from_json(json_data['lemmas'], lazy=lazy)
         if 'lexicalCategory' in json_data:
             self.lexical_category = str(json_data['lexicalCategory'])
-        if 'language' in json_data:
+        if 'language' in json_data and trusted:
+            self.__language = str(json_data['language'])
+        elif 'language' in json_data:
             self.language = str(json_data['language'])
         if 'forms' in json_data:
-            self.forms = Forms().from_json(json_data['forms'])
+            self.forms = Forms().from_json(json_data['forms'], trusted=trusted)
         if 'senses' in json_data:
-            self.senses = Senses().from_json(json_data['senses'])
+            self.senses = Senses().from_json(json_data['senses'], trusted=trusted)
 
         return self
 
@@ -163,8 +165,9 @@ class LexemeEntity(BaseEntity):
         :param allow_anonymous: Force a check if the query can be anonymous or not
         :param clear: Clear the existing entity before updating
         :param is_bot: Add the bot flag to the query
+        :param update_fastrun: Patch the fastrun containers with the entity returned by the instance. Enabled by default.
         :param kwargs: More arguments for Python requests
         :return: an LexemeEntity of the response from the instance
         """
         json_data = super()._write(data=self.get_json(), **kwargs)
-        return self.from_json(json_data=json_data)
+        return self.from_json(json_data=json_data, trusted=True)
@@ -10,6 +10,8 @@ from wikibaseintegrator.models.descriptions import Descriptions
 from wikibaseintegrator.models.labels import Labels
 from wikibaseintegrator.wbi_helpers import mediawiki_api_call_helper
 
+ID_PATTERN = re.compile(r'^M?([0-9]+)$')
+
 
 class MediaInfoEntity(TermsEntity):
     ETYPE = 'mediainfo'
@@ -29,8 +31,7 @@ class MediaInfoEntity(TermsEntity):
     @BaseEntity.id.setter  # type: ignore
     def id(self, value: None | str | int):
         if isinstance(value, str):
-            pattern = re.compile(r'^M?([0-9]+)$')
-            matches = pattern.match(value)
+            matches = ID_PATTERN.match(value)
 
             if not matches:
                 raise ValueError(f"Invalid MediaInfo ID ({value}), format must be 'M[0-9]+'")
@@ -48,10 +49,9 @@ class MediaInfoEntity(TermsEntity):
     def new(self, **kwargs: Any) -> MediaInfoEntity:
         return MediaInfoEntity(api=self.api, **kwargs)
 
-    def get(self, entity_id: str | int, **kwargs: Any) -> MediaInfoEntity:
+    def get(self, entity_id: str | int, lazy: bool = False, **kwargs: Any) -> MediaInfoEntity:
         if isinstance(entity_id, str):
-            pattern = re.compile(r'^M?([0-9]+)$')
-            matches = pattern.match(entity_id)
+            matches = ID_PATTERN.match(entity_id)
 
             if not matches:
                 raise ValueError(f"Invalid MediaInfo ID ({entity_id}), format must be 'M[0-9]+'")
@@ -63,7 +63,7 @@ class MediaInfoEntity(TermsEntity):
 
         entity_id = f'M{entity_id}'
         json_data = super()._get(entity_id=entity_id, **kwargs)
-        return MediaInfoEntity(api=self.api).from_json(json_data=json_data['entities'][entity_id])
+        return MediaInfoEntity(api=self.api).from_json(json_data=json_data['entities'][entity_id], lazy=lazy, trusted=True)
 
     def get_by_title(self, titles: list[str] | str, sites: str = 'commonswiki', **kwargs: Any) -> MediaInfoEntity:
         if isinstance(titles, list):
@@ -83,7 +83,7 @@ class MediaInfoEntity(TermsEntity):
         if len(json_data['entities'].keys()) > 1:
             raise Exception('More than one element for this title')
 
-        return MediaInfoEntity(api=self.api).from_json(json_data=json_data['entities'][list(json_data['entities'].keys())[0]])
+        return MediaInfoEntity(api=self.api).from_json(json_data=json_data['entities'][list(json_data['entities'].keys())[0]], trusted=True)
 
     def get_json(self) -> dict[str, str | dict]:
         json_data = {
@@ -95,21 +95,24 @@ class MediaInfoEntity(TermsEntity):
         if 'claims' in json_data:  # MediaInfo change name of 'claims' to 'statements'
             json_data['statements'] = json_data.pop('claims')
 
+        # The statements are copied, the JSON of the statements loaded lazily must not be modified
         if isinstance(json_data, dict) and 'statements' in json_data and isinstance(json_data['statements'], dict):
-            for prop_nr, statements in json_data['statements'].items():
-                for statement in statements:
-                    if isinstance(statement, dict) and 'mainsnak' in statement:
-                        if isinstance(statement['mainsnak'], dict) and 'datatype' in statement['mainsnak']:
-                            del statement['mainsnak']['datatype']
+            json_data['statements'] = {
+                prop_nr: [
+                    {**statement, 'mainsnak': {key: value for key, value in statement['mainsnak'].items() if key != 'datatype'}}
+                    if isinstance(statement, dict) and isinstance(statement.get('mainsnak'), dict) and 'datatype' in statement['mainsnak'] else statement
+                    for statement in statements
+                ] for prop_nr, statements in json_data['statements'].items()
+            }
 
         return json_data
 
-    def from_json(self, json_data: dict[str, Any]) -> MediaInfoEntity:
-        super().from_json(json_data=json_data)
-        super()._terms_from_json(json_data=json_data)
+    def from_json(self, json_data: dict[str, Any], lazy: bool = False, trusted: bool = False) -> MediaInfoEntity:
+        super().from_json(json_data=json_data, lazy=lazy, trusted=trusted)
+        super()._terms_from_json(json_data=json_data, lazy=lazy)
 
         if 'statements' in json_data:
-            self.claims = Claims().from_json(json_data['statements'])
+            self.claims = Claims().from_json(json_data['statements'], lazy=lazy, trusted=trusted)
 
         return self
 
@@ -123,8 +126,9 @@ class MediaInfoEntity(TermsEntity):
         :param allow_anonymous: Force a check if the query can be anonymous or not
         :param clear: Clear the existing entity before updating
         :param is_bot: Add the bot flag to the query
+        :param update_fastrun: Patch the fastrun containers with the entity returned by the instance. Enabled by default.
         :param kwargs: More arguments for Python requests
         :return: an MediaInfoEntity of the response from the instance
         """
         json_data = super()._write(data=self.get_json(), **kwargs)
-        return self.from_json(json_data=json_data)
+        return self.from_json(json_data=json_data, trusted=True)
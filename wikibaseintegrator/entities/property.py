@@ -9,6 +9,8 @@ from wikibaseintegrator.models.descriptions import Descriptions
 from wikibaseintegrator.models.labels import Labels
 from wikibaseintegrator.wbi_enums import WikibaseDatatype
 
+ID_PATTERN = re.compile(r'^(?:[a-zA-Z]+:)?P?([0-9]+)$')
+
 
 class PropertyEntity(TermsEntity):
     ETYPE = 'property'
@@ -22,8 +24,7 @@ class PropertyEntity(TermsEntity):
     @BaseEntity.id.setter  # type: ignore
     def id(self, value: None | str | int):
         if isinstance(value, str):
-            pattern = re.compile(r'^(?:[a-zA-Z]+:)?P?([0-9]+)$')
-            matches = pattern.match(value)
+            matches = ID_PATTERN.match(value)
 
             if not matches:
                 raise ValueError(f"Invalid property ID ({value}), format must be 'P[0-9]+'")
@@ -52,10 +53,9 @@ class PropertyEntity(TermsEntity):
     def new(self, **kwargs: Any) -> PropertyEntity:
         return PropertyEntity(api=self.api, **kwargs)
 
-    def get(self, entity_id: str | int, **kwargs: Any) -> PropertyEntity:
+    def get(self, entity_id: str | int, lazy: bool = False, **kwargs: Any) -> PropertyEntity:
         if isinstance(entity_id, str):
-            pattern = re.compile(r'^(?:[a-zA-Z]+:)?P?([0-9]+)$')
-            matches = pattern.match(entity_id)
+            matches = ID_PATTERN.match(entity_id)
 
             if not matches:
                 raise ValueError(f"Invalid property ID ({entity_id}), format must be 'P[0-9]+'")
@@ -67,7 +67,7 @@ class PropertyEntity(TermsEntity):
 
         entity_id = f'P{entity_id}'
         json_data = super()._get(entity_id=entity_id, **kwargs)
-        return PropertyEntity(api=self.api).from_json(json_data=json_data['entities'][entity_id])
+        return PropertyEntity(api=self.api).from_json(json_data=json_data['entities'][entity_id], lazy=lazy, trusted=True)
 
     def get_json(self) -> dict[str, str | Any]:
         json = {
@@ -82,9 +82,9 @@ class PropertyEntity(TermsEntity):
 
         return json
 
-    def from_json(self, json_data: dict[str, Any]) -> PropertyEntity:
-        super().from_json(json_data=json_data)
-        super()._terms_from_json(json_data=json_data)
+    def from_json(self, json_data: dict[str, Any], lazy: bool = False, trusted: bool = False) -> PropertyEntity:
+        super().from_json(json_data=json_data, lazy=lazy, trusted=trusted)
+        super()._terms_from_json(json_data=json_data, lazy=lazy)
 
         if 'datatype' in json_data:
             self.datatype = json_data['datatype']
@@ -101,8 +101,9 @@ class PropertyEntity(TermsEntity):
         :param allow_anonymous: Force a check if the query can be anonymous or not
         :param clear: Clear the existing entity before updating
         :param is_bot: Add the bot flag to the query
+        :param update_fastrun: Patch the fastrun containers with the entity returned by the instance. Enabled by default.
         :param kwargs: More arguments for Python requests
         :return: an PropertyEntity of the response from the instance
         """
         json_data = super()._write(data=self.get_json(), **kwargs)
-        return self.from_json(json_data=json_data)
+        return self.from_json(json_data=json_data, trusted=True)
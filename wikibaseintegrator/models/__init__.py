@@ -1,5 +1,5 @@
 from .aliases import Alias, Aliases
-from .basemodel import BaseModel
+from .basemodel import BaseModel, LazyDict
 from .claims import Claim, Claims
 from .descriptions import Descriptions
 from .forms import Form, Forms
@@ -1,24 +1,28 @@
 from __future__ import annotations
 
-from wikibaseintegrator.models.basemodel import BaseModel
+from collections.abc import MutableMapping
+
+from wikibaseintegrator.models.basemodel import BaseModel, LazyDict, json_items
 from wikibaseintegrator.models.language_values import LanguageValue
 from wikibaseintegrator.wbi_config import config
 from wikibaseintegrator.wbi_enums import ActionIfExists
 
 
 class Aliases(BaseModel):
+    __slots__ = ('__aliases',)
+
     def __init__(self, language: str | None = None, value: str | None = None):
-        self.aliases: dict[str, list[Alias]] = {}
+        self.aliases: MutableMapping[str, list[Alias]] = {}
 
         if language is not None:
             self.set(language=language, values=value)
 
     @property
-    def aliases(self) -> dict[str, list[Alias]]:
+    def aliases(self) -> MutableMapping[str, list[Alias]]:
         return self.__aliases
 
     @aliases.setter
-    def aliases(self, value: dict[str, list[Alias]]):
+    def aliases(self, value: MutableMapping[str, list[Alias]]):
         self.__aliases = value
 
     def get(self, language: str | None = None) -> list[Alias] | None:
@@ -71,15 +75,30 @@ class Aliases(BaseModel):
         return self
 
     def get_json(self) -> dict[str, list]:
-        json_data: dict[str, list] = {}
-        for language, aliases in self.aliases.items():
-            if language not in json_data:
-                json_data[language] = []
-            for alias in aliases:
-                json_data[language].append(alias.get_json())
-        return json_data
-
-    def from_json(self, json_data: dict[str, list]) -> Aliases:
+        return {language: aliases for language, aliases, _ in json_items(self.aliases, lambda aliases: [alias.get_json() for alias in aliases])}
+
+    def from_json(self, json_data: dict[str, list], lazy: bool = False) -> Aliases:
+        """
+        Add the aliases of a JSON/dict object.
+
+        :param json_data: A dict of lists of aliases with the language as key, in the Wikibase format.
+        :param lazy: Keep the JSON of each language and build its aliases on first access. :func:`get_json` returns the
+            JSON of the languages never accessed as is.
+        :return: The updated Aliases object.
+        """
+        if lazy:
+            if not isinstance(self.aliases, LazyDict):
+                self.aliases = LazyDict(_aliases_from_json, self.aliases)
+            assert isinstance(self.aliases, LazyDict)
+
+            for language, aliases in json_data.items():
+                if language in self.aliases:
+                    self.set(language, [alias['value'] for alias in aliases])
+                else:
+                    self.aliases.set_raw(language, aliases)
+
+            return self
+
         for language in json_data:
             for alias in json_data[language]:
                 self.set(alias['language'], alias['value'])
@@ -95,4 +114,13 @@ class Aliases(BaseModel):
 
 
 class Alias(LanguageValue):
-    pass
+    __slots__ = ()
+
+
+def _aliases_from_json(language: str, json_data: list[dict[str, str]]) -> list[Alias]:
+    """The factory of the aliases loaded lazily: build the aliases of a language from their JSON."""
+    aliases: list[Alias] = []
+    for alias in (Alias(language, alias_json['value']) for alias_json in json_data):
+        if alias not in aliases:
+            aliases.append(alias)
+    return aliases
@@ -1,8 +1,147 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator, Mapping, MutableMapping
+from typing import Any
+
+# The number of changes made to the models after their fingerprint or their hash was computed, see changed()
+_changes = [0]
+
+
+def changed() -> None:
+    """
+    Record a change made to a snak, a list of snaks, qualifiers or a claim after its fingerprint or its hash was
+    computed. The indexes of the fingerprints and of the hashes kept by the containers (Claims, Qualifiers, References),
+    which may hold the changed object, are rebuilt on their next use.
+    """
+    _changes[0] += 1
+
+
+def changes() -> int:
+    """The number of changes recorded with :func:`changed`, to check if an index of fingerprints or hashes is up to date."""
+    return _changes[0]
+
+
 class BaseModel:
+    """
+    The base class of the models. The models declare their attributes in ``__slots__`` to keep the instances small, a
+    subclass without ``__slots__`` gets a ``__dict__`` as usual.
+    """
+    __slots__ = ()
+
     def __repr__(self):
         """A mixin implementing a simple __repr__."""
         return "<{klass} @{id:x} {attrs}>".format(  # pylint: disable=consider-using-f-string
             klass=self.__class__.__name__,
             id=id(self) & 0xFFFFFF,
-            attrs=" ".join(f"{k}={v!r}" for k, v in self.__dict__.items()),
+            attrs=" ".join(f"{k}={v!r}" for k, v in self._attributes().items()),
         )
+
+    def _attributes(self) -> dict:
+        """Return the attributes of the instance, from the slots of every class and from the ``__dict__``."""
+        attributes = {}
+        for klass in reversed(type(self).__mro__):
+            for slot in klass.__dict__.get('__slots__', ()):
+                # The slots with a leading double underscore are name-mangled, like the other private attributes
+                name = f'_{klass.__name__.lstrip("_")}{slot}' if slot.startswith('__') and not slot.endswith('__') else slot
+                if hasattr(self, name):
+                    attributes[name] = getattr(self, name)
+        attributes.update(getattr(self, '__dict__', {}))
+        return attributes
+
+
+class _Raw:
+    """The JSON of a value of a :class:`LazyDict`, not built yet."""
+    __slots__ = ('json',)
+
+    def __init__(self, json: Any):
+        self.json = json
+
+
+class LazyDict(MutableMapping):
+    """
+    A dict whose values can be stored as JSON and built on first access, with a factory called with the key and the
+    JSON. The order of the keys is kept, whether the values are built or not.
+
+    :param factory: A function building a value from its key and its JSON
+    :param data: The values already built
+    """
+    __slots__ = ('data', 'factory')
+
+    def __init__(self, factory: Callable[[Any, Any], Any], data: Mapping | None = None):
+        self.data: dict = dict(data or {})
+        self.factory = factory
+
+    def set_raw(self, key: Any, json: Any) -> None:
+        """
+        Store the JSON of a value, which will be built on first access.
+
+        :param key: The key
+        :param json: The JSON of the value
+        """
+        self.data[key] = _Raw(json)
+
+    def is_raw(self, key: Any) -> bool:
+        """
+        Check if the value of a key has not been built yet.
+
+        :param key: The key
+        :return: True if the value is still stored as JSON
+        """
+        return isinstance(self.data.get(key), _Raw)
+
+    def get_raw(self, key: Any) -> Any:
+        """
+        Return the JSON of a value not built yet.
+
+        :param key: The key
+        :return: The JSON, as given to :func:`set_raw`
+        """
+        value = self.data[key]
+        if not isinstance(value, _Raw):
+            raise ValueError(f'The value of {key} is already built')
+        return value.json
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self.data[key]
+        if isinstance(value, _Raw):
+            value = self.data[key] = self.factory(key, value.json)
+        return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self.data[key] = value
+
+    def __delitem__(self, key: Any) -> None:
+        del self.data[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.data
+
+    def __iter__(self) -> Iterator:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self):
+        items = ', '.join(f'{key!r}: ' + ('<raw>' if isinstance(value, _Raw) else repr(value)) for key, value in self.data.items())
+        return f'<{type(self).__name__} {{{items}}}>'
+
+
+def json_items(mapping: Mapping, get_json: Callable[[Any], Any]) -> Iterator[tuple[Any, Any, bool]]:
+    """
+    Iterate over the JSON of the values of a mapping, without building the values of a :class:`LazyDict`: their JSON is
+    returned as is.
+
+    :param mapping: A dict or a :class:`LazyDict`
+    :param get_json: A function returning the JSON of a built value
+    :return: An iterator of (key, JSON, True if the JSON is the stored one)
+    """
+    if isinstance(mapping, LazyDict):
+        for key, value in mapping.data.items():
+            if isinstance(value, _Raw):
+                yield key, value.json, True
+            else:
+                yield key, get_json(value), False
+    else:
+        for key, value in mapping.items():
+            yield key, get_json(value), False
@@ -1,29 +1,76 @@
 from __future__ import annotations
 
-import copy
+import sys
 import warnings
 from abc import abstractmethod
-from collections.abc import Callable
+from collections.abc import Callable, Hashable, Iterable, MutableMapping
+from copy import deepcopy
+from functools import partial
 from typing import Any
 
-from wikibaseintegrator.models.basemodel import BaseModel
+from wikibaseintegrator.models.basemodel import BaseModel, LazyDict, changed, changes, json_items
 from wikibaseintegrator.models.qualifiers import Qualifiers
 from wikibaseintegrator.models.references import Reference, References
 from wikibaseintegrator.models.snaks import Snak, Snaks
 from wikibaseintegrator.wbi_enums import ActionIfExists, WikibaseRank, WikibaseSnakType
+from wikibaseintegrator.wbi_helpers import generate_claim_id
+
+# The ranks by value, to parse the trusted JSON without the checks of the enum
+RANKS = {rank.value: rank for rank in WikibaseRank}
 
 
 class Claims(BaseModel):
+    """
+    The claims of an entity, by property.
+
+    The claims of each property are indexed by fingerprint to find the existing claims in constant time when claims are
+    added. The index of a property is updated by :func:`add` and rebuilt after any other change.
+    """
+    __slots__ = ('__claims', '__index', '__new_ids', 'entity_id')
+
     def __init__(self) -> None:
-        self.claims: dict[str, list[Claim]] = {}
+        self.claims: MutableMapping[str, list[Claim]] = {}
+        # The ID of the entity of the claims, set by the entity. The new claims added get a GUID of this entity.
+        self.entity_id: str | None = None
+        # The GUIDs of the new claims whose JSON is not built yet, see set_new_ids()
+        self.__new_ids: set[str] = set()
 
     @property
-    def claims(self) -> dict[str, list[Claim]]:
+    def claims(self) -> MutableMapping[str, list[Claim]]:
+        """
+        A dict of lists of Claim with the property as key. It is a :class:`~wikibaseintegrator.models.basemodel.LazyDict`
+        if the claims have been loaded lazily.
+        """
         return self.__claims
 
     @claims.setter
-    def claims(self, claims: dict[str, list[Claim]]):
+    def claims(self, claims: MutableMapping[str, list[Claim]]):
         self.__claims = claims
+        # The first claim of each fingerprint, by property, and the state each index was built for: see changes()
+        self.__index: dict[str, tuple[tuple[int, int, int], dict[Hashable, Claim]]] = {}
+
+    def __existing(self, property: str) -> dict[Hashable, Claim]:
+        """The first claim of each fingerprint among the claims of a property, rebuilt if the claims changed since the index was built."""
+        claims = self.claims.get(property) or []
+        state = (changes(), id(claims), len(claims))
+        index = self.__index.get(property)
+        if index is None or index[0] != state:
+            existing_claims: dict[Hashable, Claim] = {}
+            for claim in claims:
+                existing_claims.setdefault(claim.fingerprint, claim)
+            index = self.__index[property] = (state, existing_claims)
+        return index[1]
+
+    def __append(self, property: str, claim: Claim) -> None:
+        """Append a claim to the claims of a property, and to their index if it is up to date."""
+        claims = self.claims[property]
+        index = self.__index.get(property)
+        up_to_date = index is not None and index[0] == (changes(), id(claims), len(claims))
+        claims.append(claim)
+        if up_to_date:
+            assert index is not None
+            index[1].setdefault(claim.fingerprint, claim)
+            self.__index[property] = ((changes(), id(claims), len(claims)), index[1])
 
     def get(self, property: str | int) -> list[Claim]:
         if isinstance(property, int):
@@ -35,9 +82,9 @@ class Claims(BaseModel):
         return []
 
     def remove(self, property: str | None = None) -> None:
-        if property in self.claims:
+        if property is not None and property in self.claims:
             for prop in list(self.claims[property]):
-                if prop.id:
+                if prop.id and not prop.new:
                     prop.remove()
                 else:
                     self.claims[property].remove(prop)
@@ -46,6 +93,8 @@ class Claims(BaseModel):
 
     def add(self, claims: Claims | list[Claim] | Claim, action_if_exists: ActionIfExists = ActionIfExists.REPLACE_ALL) -> Claims:
         """
+        If the ID of the entity is known, the new claims added get a GUID generated locally, see :func:`~wikibaseintegrator.wbi_helpers.generate_claim_id`,
+        so that they can be addressed before the entity is written.
 
         :param claims: A Claim, list of Claim or just a Claims object to add to this Claims object.
         :param action_if_exists: Replace or append the statement. You can force an addition if the declaration already exists. Defaults to REPLACE_ALL.
@@ -64,9 +113,13 @@ class Claims(BaseModel):
         elif claims is None or ((not isinstance(claims, list) or not all(isinstance(n, Claim) for n in claims)) and not isinstance(claims, Claims)):
             raise TypeError("claims must be an instance of Claim or Claims or a list of Claim")
 
+        def existing(claim: Claim) -> Claim | None:
+            return self.__existing(claim.mainsnak.property_number).get(claim.fingerprint)
+
         # TODO: Don't replace if claim is the same
         # This code is separated from the rest to avoid looping multiple over `self.claims`.
         if action_if_exists == ActionIfExists.REPLACE_ALL:
+            new_fingerprints = {claim.fingerprint for claim in claims if claim is not None}
             for claim in claims:
                 if claim is not None:
                     assert isinstance(claim, Claim)
@@ -74,7 +127,7 @@ class Claims(BaseModel):
                     property = claim.mainsnak.property_number
                     if property in self.claims:
                         for claim_to_remove in self.claims[property]:
-                            if claim_to_remove not in claims:
+                            if claim_to_remove.fingerprint not in new_fingerprints:
                                 claim_to_remove.remove()
 
         for claim in claims:
@@ -87,60 +140,117 @@ class Claims(BaseModel):
 
                 if action_if_exists == ActionIfExists.KEEP:
                     if len(self.claims[property]) == 0:
-                        self.claims[property].append(claim)
+                        self.__append(property, self._with_id(claim))
                 elif action_if_exists == ActionIfExists.FORCE_APPEND:
-                    self.claims[property].append(claim)
+                    self.__append(property, self._with_id(claim))
                 elif action_if_exists == ActionIfExists.APPEND_OR_REPLACE:
-                    if claim not in self.claims[property]:
-                        self.claims[property].append(claim)
+                    existing_claim = existing(claim)
+                    if existing_claim is None:
+                        self.__append(property, self._with_id(claim))
                     else:
                         # Force update the claim if already present
-                        self.claims[property][self.claims[property].index(claim)].update(claim)
+                        existing_claim.update(claim)
                 elif action_if_exists == ActionIfExists.REPLACE_ALL:
-                    if claim not in self.claims[property]:
-                        self.claims[property].append(claim)
+                    if existing(claim) is None:
+                        self.__append(property, self._with_id(claim))
                 elif action_if_exists == ActionIfExists.MERGE_REFS_OR_APPEND:
                     claim_exists = False
                     for existing_claim in self.claims[property]:
                         # Compare the main snaks (which also handles no-value/some-value snaks that have no
                         # datavalue) and the qualifiers to decide if the statement already exists.
-                        if claim.mainsnak == existing_claim.mainsnak and claim.quals_equal(claim, existing_claim):
+                        if claim.mainsnak.fingerprint == existing_claim.mainsnak.fingerprint and claim.quals_equal(claim, existing_claim):
                             claim_exists = True
 
                             # Check if current reference block is present on references
                             if not Claim.ref_present(newitem=claim, olditem=existing_claim):
                                 for ref_to_add in claim.references:
-                                    if ref_to_add not in existing_claim.references:
-                                        existing_claim.references.add(ref_to_add)
+                                    existing_claim.references.add(ref_to_add)
                             break
 
                     # If the claim value does not exist, append it
                     if not claim_exists:
-                        self.claims[property].append(claim)
+                        self.__append(property, self._with_id(claim))
         return self
 
-    def from_json(self, json_data: dict[str, Any]) -> Claims:
+    def _with_id(self, claim: Claim) -> Claim:
+        """Give a GUID of the entity to a new claim. A claim already given a GUID of another entity is copied, the same claim can be added to several entities."""
+        if self.entity_id is None or not claim.new:
+            return claim
+        if claim.id is not None:
+            if claim.id.split('$', 1)[0] == self.entity_id:
+                return claim
+            claim = deepcopy(claim)
+        claim.id = generate_claim_id(self.entity_id)
+        return claim
+
+    def from_json(self, json_data: dict[str, Any], lazy: bool = False, trusted: bool = False) -> Claims:
+        """
+        Add the claims of a JSON/dict object.
+
+        :param json_data: A dict of lists of claims with the property as key, in the Wikibase format.
+        :param lazy: Keep the JSON of each property and build its claims on first access. :func:`get_json` returns the
+            JSON of the properties never accessed as is.
+        :param trusted: The JSON comes from a Wikibase instance: the claims are built without validating their values.
+            See :func:`Claim.from_json`.
+        :return: The updated Claims object.
+        """
+        if lazy:
+            if not isinstance(self.claims, LazyDict):
+                self.claims = LazyDict(partial(_claims_from_json, trusted=trusted, new_ids=self.__new_ids), self.claims)
+            assert isinstance(self.claims, LazyDict)
+
+            for property, claims in json_data.items():
+                if property in self.claims:
+                    self.claims[property].extend(_claims_from_json(property, claims, trusted=trusted))
+                else:
+                    self.claims.set_raw(property, claims)
+
+            return self
+
         for property in json_data:
+            if trusted:
+                self.claims.setdefault(sys.intern(property), []).extend(_claims_from_json(property, json_data[property], trusted=True))
+                continue
             for claim in json_data[property]:
-                from wikibaseintegrator.datatypes import BaseDataType
-                if 'datatype' in claim['mainsnak']:
-                    data_type = [x for x in BaseDataType.subclasses if x.DTYPE == claim['mainsnak']['datatype']][0]
-                else:
-                    data_type = BaseDataType
-                self.add(claims=data_type().from_json(claim), action_if_exists=ActionIfExists.FORCE_APPEND)
+                self.add(claims=_claim_from_json(claim), action_if_exists=ActionIfExists.FORCE_APPEND)
 
         return self
 
+    def new_ids(self) -> set[str]:
+        """
+        Return the GUIDs of the new claims, see :attr:`Claim.new`, without building the claims loaded lazily.
+
+        :return: The GUIDs generated locally, not on the instance yet
+        """
+        new_ids: set[str] = set()
+        for property in self.claims:
+            if isinstance(self.claims, LazyDict) and self.claims.is_raw(property):
+                new_ids.update(claim_json['id'] for claim_json in self.claims.get_raw(property) if claim_json.get('id') in self.__new_ids)
+            else:
+                new_ids.update(str(claim.id) for claim in self.claims[property] if claim.new and claim.id)
+        return new_ids
+
+    def set_new_ids(self, new_ids: Iterable[str]) -> None:
+        """
+        Mark the claims with these GUIDs as new, see :attr:`Claim.new`. The claims loaded lazily are marked when they are
+        built. The JSON of a claim doesn't tell if the claim is new: :func:`~wikibaseintegrator.entities.baseentity.BaseEntity.clone`
+        copies the claims through their JSON.
+
+        :param new_ids: The GUIDs generated locally, not on the instance yet
+        """
+        new_ids = set(new_ids)
+        for property in self.claims:
+            if not isinstance(self.claims, LazyDict) or not self.claims.is_raw(property):
+                for claim in self.claims[property]:
+                    if claim.id in new_ids:
+                        claim.new = True
+        self.__new_ids.update(new_ids)
+
     def get_json(self) -> dict[str, list]:
         json_data: dict[str, list] = {}
-        for property, claims in self.claims.items():
-            if property not in json_data:
-                json_data[property] = []
-            for claim in claims:
-                if not claim.removed or claim.id:
-                    json_data[property].append(claim.get_json())
-            if len(json_data[property]) == 0:
-                del json_data[property]
+        for property, claims_json, _ in json_items(self.claims, lambda claims: [claim.get_json() for claim in claims if not claim.removed or (claim.id and not claim.new)]):
+            if claims_json:
+                json_data[property] = claims_json
         return json_data
 
     def count(self) -> int:
@@ -150,7 +260,7 @@ class Claims(BaseModel):
         Note: ``len(claims)`` returns the number of distinct properties, while iterating (``for claim in claims``)
         yields the individual claims. Use this method when you need the claim count.
         """
-        return sum(len(claim_list) for claim_list in self.claims.values())
+        return sum(len(claims_json) for _, claims_json, _ in json_items(self.claims, lambda claims: claims))
 
     def __iter__(self):
         iterate = []
@@ -163,7 +273,7 @@ class Claims(BaseModel):
         return len(self.claims)
 
 
-class Claim(BaseModel):
+class Claim(BaseModel):  # pylint: disable=too-many-public-methods
     """
     extend :func:`wikibaseintegrator.models.basemodel.BaseModel`
 
@@ -172,6 +282,7 @@ class Claim(BaseModel):
     :param rank:
     :param references: A References object, a list of Claim object or a list of list of Claim object
     """
+    __slots__ = ('__fingerprint', '__mainsnak', '__type', '__qualifiers', '__qualifiers_order', '__id', '__rank', '__removed', '__references', '__new')
     DTYPE = 'claim'
 
     def __init__(self, qualifiers: Qualifiers | None = None, id: str | None = None, rank: WikibaseRank | None = None, references: References | list[Claim | list[Claim]] | None = None,
@@ -183,11 +294,14 @@ class Claim(BaseModel):
         :param references: A References object, a list of Claim object or a list of list of Claim object
         :param snaktype:
         """
+        # The fingerprint of the claim, with the fingerprints of the main snak and of the qualifiers it was built from
+        self.__fingerprint: tuple | None = None
         self.mainsnak = Snak(datatype=self.DTYPE, snaktype=snaktype)
         self.type = 'statement'
         self.qualifiers = qualifiers or Qualifiers()
         self.qualifiers_order = []
         self.id = id
+        self.new = id is None
         self.rank = rank or WikibaseRank.NORMAL
         self.removed = False
 
@@ -221,6 +335,7 @@ class Claim(BaseModel):
     @mainsnak.setter
     def mainsnak(self, value: Snak):
         self.__mainsnak = value
+        self.__reset()
 
     @property
     def type(self) -> str | dict:
@@ -238,6 +353,7 @@ class Claim(BaseModel):
     def qualifiers(self, value: Qualifiers) -> None:
         assert isinstance(value, (Qualifiers, list))
         self.__qualifiers: Qualifiers = Qualifiers().set(value) if isinstance(value, list) else value
+        self.__reset()
 
     @property
     def qualifiers_order(self) -> list[str]:
@@ -255,6 +371,15 @@ class Claim(BaseModel):
     def id(self, value: str | None):
         self.__id = value
 
+    @property
+    def new(self) -> bool:
+        """The claim is not on the instance yet: its ID, if any, was generated locally and can't be removed from the instance."""
+        return self.__new
+
+    @new.setter
+    def new(self, value: bool):
+        self.__new = value
+
     @property
     def rank(self) -> WikibaseRank:
         return self.__rank
@@ -284,27 +409,47 @@ class Claim(BaseModel):
         self.removed = remove
 
     def update(self, claim: Claim) -> None:
-        self.mainsnak = claim.mainsnak
-        self.qualifiers = claim.qualifiers
+        """
+        Replace the main snak, the qualifiers, the rank and the references of the claim with the ones of another claim.
+        If both claims have the same fingerprint, like a claim added again with APPEND_OR_REPLACE, the indexes holding
+        the claim stay up to date.
+
+        :param claim: The other claim
+        """
+        if self.__fingerprint is not None and claim.fingerprint == self.fingerprint:
+            self.__mainsnak = claim.mainsnak
+            self.__qualifiers = claim.qualifiers
+        else:
+            self.mainsnak = claim.mainsnak
+            self.qualifiers = claim.qualifiers
         self.qualifiers_order = claim.qualifiers_order
         self.rank = claim.rank
         self.references = claim.references
 
-    def from_json(self, json_data: dict[str, Any]) -> Claim:
+    def from_json(self, json_data: dict[str, Any], trusted: bool = False) -> Claim:
         """
 
         :param json_data: a JSON representation of a Claim
+        :param trusted: The JSON comes from a Wikibase instance: the snaks and the rank are set without being validated
+            and the references are not deduplicated. Don't use it for a JSON built by hand.
         """
-        self.mainsnak = Snak().from_json(json_data['mainsnak'])
-        self.type = str(json_data['type'])
+        self.mainsnak = Snak().from_json(json_data['mainsnak'], trusted=trusted)
+        self.type = sys.intern(str(json_data['type']))
         if 'qualifiers' in json_data:
-            self.qualifiers = Qualifiers().from_json(json_data['qualifiers'])
+            self.qualifiers = Qualifiers().from_json(json_data['qualifiers'], trusted=trusted)
         if 'qualifiers-order' in json_data:
-            self.qualifiers_order = list(json_data['qualifiers-order'])
-        self.id = str(json_data['id'])
-        self.rank: WikibaseRank = WikibaseRank(json_data['rank'])
+            self.qualifiers_order = [sys.intern(property) for property in json_data['qualifiers-order']]
+        if 'id' in json_data:  # Not in the JSON of a new claim
+            self.id = str(json_data['id'])
+            self.new = False
+        if trusted:
+            self.__rank = RANKS[json_data['rank']]
+        else:
+            self.rank = WikibaseRank(json_data['rank'])
         if 'references' in json_data:
-            self.references = References().from_json(json_data['references'])
+            self.references = References().from_json(json_data['references'], trusted=trusted)
+        if 'remove' in json_data:
+            self.removed = True
 
         return self
 
@@ -324,40 +469,60 @@ class Claim(BaseModel):
         if len(self.references) > 0:
             json_data['references'] = self.references.get_json()
         if self.removed:
-            if self.id:
+            if self.id and not self.new:
                 json_data['remove'] = ''
         return json_data
 
-    def has_equal_qualifiers(self, other: Claim) -> bool:
-        # check if the qualifiers are equal with the 'other' object
-        self_qualifiers = copy.deepcopy(self.qualifiers)
-        other_qualifiers = copy.deepcopy(other.qualifiers)
+    def __reset(self) -> None:
+        """Reset the cached fingerprint after the main snak or the qualifiers were replaced."""
+        if self.__fingerprint is not None:
+            # The fingerprint was used, maybe by an index of claims
+            changed()
+            self.__fingerprint = None
 
-        if len(self_qualifiers) != len(other_qualifiers):
-            return False
+    @property
+    def fingerprint(self) -> tuple:
+        """
+        A hashable canonical identity of the claim: the property, the value and the qualifiers. Two claims are equal
+        if and only if they have the same fingerprint. See :func:`get_fingerprint`. It is cached, and built again when
+        the fingerprint of the main snak or of the qualifiers changes.
+        """
+        mainsnak, qualifiers = self.mainsnak.fingerprint, self.qualifiers.fingerprint
+        cached = self.__fingerprint
+        if cached is None or cached[0] is not mainsnak or cached[1] is not qualifiers:
+            cached = self.__fingerprint = (mainsnak, qualifiers, self.get_fingerprint())
+        return cached[2]
 
-        for property_number in self_qualifiers.qualifiers:
-            if property_number not in other_qualifiers.qualifiers:
-                return False
+    def get_fingerprint(self, include_references: bool = False, include_rank: bool = False) -> tuple:
+        """
+        Return a hashable canonical identity of the claim, built from the cached fingerprints of the snaks. The order
+        of the qualifiers and of the references is ignored.
 
-            if len(self_qualifiers.qualifiers[property_number]) != len(other_qualifiers.qualifiers[property_number]):
-                return False
+        :param include_references: Add the references to the fingerprint.
+        :param include_rank: Add the rank to the fingerprint.
+        :return: A tuple
+        """
+        fingerprint: tuple = (self.mainsnak.property_number, self._value_fingerprint(), self.qualifiers.fingerprint)
+        if include_references:
+            fingerprint += (self.references.fingerprint,)
+        if include_rank:
+            fingerprint += (self.rank.value,)
+        return fingerprint
 
-            flg = [False for _ in range(len(self_qualifiers.qualifiers[property_number]))]
-            for count, i in enumerate(self_qualifiers.qualifiers[property_number]):
-                for q in other_qualifiers:
-                    if i == q:
-                        flg[count] = True
-            if not all(flg):
-                return False
+    def _value_fingerprint(self) -> Hashable:
+        """The canonical form of the value of the main snak, used by the fingerprint of the claim."""
+        return self.mainsnak.fingerprint[3]
 
-        return True
+    def has_equal_qualifiers(self, other: Claim) -> bool:
+        # check if the qualifiers are equal with the 'other' object
+        return self.qualifiers.fingerprint == other.qualifiers.fingerprint
 
     def reset_id(self):
         """
         Reset the ID of the current claim
         """
         self.id = None
+        self.new = True
 
     # TODO: rewrite this?
     def __contains__(self, item):
@@ -371,7 +536,7 @@ class Claim(BaseModel):
 
     def __eq__(self, other):
         if isinstance(other, Claim):
-            return self.mainsnak.datavalue == other.mainsnak.datavalue and self.mainsnak.property_number == other.mainsnak.property_number and self.has_equal_qualifiers(other)
+            return self.fingerprint == other.fingerprint
 
         if isinstance(other, str):
             return self.mainsnak.property_number == other
@@ -409,7 +574,8 @@ class Claim(BaseModel):
         oldqual = olditem.qualifiers
         newqual = newitem.qualifiers
 
-        return (len(oldqual) == len(newqual)) and all(x in oldqual for x in newqual)
+        fingerprints = {x.fingerprint for x in oldqual}
+        return (len(oldqual) == len(newqual)) and all(x.fingerprint in fingerprints for x in newqual)
 
     @staticmethod
     def refs_equal(olditem: Claim, newitem: Claim) -> bool:
@@ -439,11 +605,29 @@ class Claim(BaseModel):
             warnings.warn("New item has more or less than 1 reference block.")
             return False
 
-        def ref_equal(oldref: References, newref: References) -> bool:
-            return (len(oldref) == len(newref)) and all(x in oldref for x in newref)
-
-        return any(any(ref_equal(oldref, newref) for oldref in oldrefs) for newref in newrefs)
+        return any(newref in oldrefs for newref in newrefs)
 
     @abstractmethod
     def get_sparql_value(self, **kwargs: Any) -> str | None:
         pass
+
+
+def _claim_from_json(claim_json: dict[str, Any], trusted: bool = False) -> Claim:
+    """Build a claim of the data type of its main snak from its JSON."""
+    from wikibaseintegrator.datatypes import BaseDataType
+    if 'datatype' in claim_json['mainsnak']:
+        data_type = BaseDataType.dtypes[claim_json['mainsnak']['datatype']]
+    else:
+        data_type = BaseDataType
+    return data_type().from_json(claim_json, trusted=trusted)
+
+
+def _claims_from_json(_property: str, claims_json: list[dict[str, Any]], trusted: bool = False, new_ids: set[str] | None = None) -> list[Claim]:
+    """The factory of the claims loaded lazily: build the claims of a property from their JSON, the claims whose GUID is in new_ids are new."""
+    claims = [_claim_from_json(claim_json, trusted=trusted) for claim_json in claims_json]
+    if new_ids:
+        for claim in claims:
+            if claim.id in new_ids:
+                claim.new = True
+                new_ids.discard(claim.id)
+    return claims
@@ -8,6 +8,8 @@ from wikibaseintegrator.models.language_values import LanguageValues
 
 
 class Forms(BaseModel):
+    __slots__ = ('__forms',)
+
     def __init__(self) -> None:
         self.forms: list[Form] = []
 
@@ -33,9 +35,9 @@ class Forms(BaseModel):
 
         return self
 
-    def from_json(self, json_data: list[dict]) -> Forms:
+    def from_json(self, json_data: list[dict], trusted: bool = False) -> Forms:
         for form in json_data:
-            self.add(form=Form().from_json(form))
+            self.add(form=Form().from_json(form, trusted=trusted))
 
         return self
 
@@ -51,6 +53,8 @@ class Forms(BaseModel):
 
 
 class Form(BaseModel):
+    __slots__ = ('__id', '__representations', '__grammatical_features', '__claims')
+
     def __init__(self, form_id: str | None = None, representations: Representations | None = None, grammatical_features: str | int | list[str] | None = None, claims: Claims | None = None):
         self.id = form_id
         self.representations: Representations = representations or LanguageValues()
@@ -101,11 +105,11 @@ class Form(BaseModel):
     def claims(self, value):
         self.__claims = value
 
-    def from_json(self, json_data: dict[str, Any]) -> Form:
+    def from_json(self, json_data: dict[str, Any], trusted: bool = False) -> Form:
         self.id = json_data['id']
         self.representations = Representations().from_json(json_data['representations'])
         self.grammatical_features = json_data['grammaticalFeatures']
-        self.claims = Claims().from_json(json_data['claims'])
+        self.claims = Claims().from_json(json_data['claims'], trusted=trusted)
 
         return self
 
@@ -125,4 +129,4 @@ class Form(BaseModel):
 
 
 class Representations(LanguageValues):
-    pass
+    __slots__ = ()
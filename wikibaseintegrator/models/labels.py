@@ -1,17 +1,19 @@
 from __future__ import annotations
 
-from wikibaseintegrator.models.language_values import LanguageValue, LanguageValues
+from wikibaseintegrator.models.language_values import LanguageValues
 
 
 class Labels(LanguageValues):
-    def from_json(self, json_data: dict[str, dict]) -> Labels:
+    __slots__ = ()
+
+    def from_json(self, json_data: dict[str, dict], lazy: bool = False) -> Labels:
         """
         Create a new Labels object from a JSON/dict object.
 
         :param json_data: A dict object who use the same format as Wikibase.
+        :param lazy: Build the LanguageValue of each language on first access.
         :return: The newly created or updated object.
         """
-        for language_value in json_data:
-            self.add(language_value=LanguageValue(language=json_data[language_value]['language']).from_json(json_data=json_data[language_value]))
+        super().from_json(json_data=json_data, lazy=lazy)
 
         return self
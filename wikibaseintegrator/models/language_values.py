@@ -1,23 +1,29 @@
 from __future__ import annotations
 
-from wikibaseintegrator.models.basemodel import BaseModel
+import sys
+from collections.abc import MutableMapping
+
+from wikibaseintegrator.models.basemodel import BaseModel, LazyDict, json_items
 from wikibaseintegrator.wbi_config import config
 from wikibaseintegrator.wbi_enums import ActionIfExists
 
 
 class LanguageValues(BaseModel):
+    __slots__ = ('__values',)
+
     def __init__(self) -> None:
-        self.values: dict[str, LanguageValue] = {}
+        self.values: MutableMapping[str, LanguageValue] = {}
 
     @property
-    def values(self) -> dict[str, LanguageValue]:
+    def values(self) -> MutableMapping[str, LanguageValue]:
         """
-        A dict of LanguageValue with the language as key.
+        A dict of LanguageValue with the language as key. It is a :class:`~wikibaseintegrator.models.basemodel.LazyDict`
+        if the values have been loaded lazily.
         """
         return self.__values
 
     @values.setter
-    def values(self, value: dict[str, LanguageValue]):
+    def values(self, value: MutableMapping[str, LanguageValue]):
         self.__values = value
 
     def add(self, language_value: LanguageValue) -> LanguageValues:
@@ -72,13 +78,25 @@ class LanguageValues(BaseModel):
 
         return self.get(language=language)
 
-    def from_json(self, json_data: dict[str, dict]) -> LanguageValues:
+    def from_json(self, json_data: dict[str, dict], lazy: bool = False) -> LanguageValues:
         """
         Create a new LanguageValues object from a JSON/dict object.
 
         :param json_data: A dict object who use the same format as Wikibase.
+        :param lazy: Keep the JSON of each language and build its LanguageValue on first access. :func:`get_json`
+            returns the JSON of the languages never accessed as is.
         :return: The newly created or updated object.
         """
+        if lazy:
+            if not isinstance(self.values, LazyDict):
+                self.values = LazyDict(_language_value_from_json, self.values)
+            assert isinstance(self.values, LazyDict)
+
+            for language, language_json in json_data.items():
+                self.values.set_raw(language, language_json)
+
+            return self
+
         for language_value in json_data:
             self.add(language_value=LanguageValue(language=json_data[language_value]['language']).from_json(json_data=json_data[language_value]))
 
@@ -90,11 +108,7 @@ class LanguageValues(BaseModel):
 
         :return: A dict using Wikibase format.
         """
-        json_data: dict[str, dict] = {}
-        for language, language_value in self.values.items():
-            json_data[language] = language_value.get_json()
-
-        return json_data
+        return {language: language_value for language, language_value, _ in json_items(self.values, lambda language_value: language_value.get_json())}
 
     def __contains__(self, language: str) -> bool:
         return language in self.values
@@ -107,6 +121,8 @@ class LanguageValues(BaseModel):
 
 
 class LanguageValue(BaseModel):
+    __slots__ = ('__language', '__value', '__removed')
+
     def __init__(self, language: str, value: str | None = None):
         self.language = language
         self.value = value
@@ -127,7 +143,8 @@ class LanguageValue(BaseModel):
         if not isinstance(value, str):
             raise ValueError("language must be a str")
 
-        self.__language = value
+        # The language codes are shared by many values
+        self.__language = sys.intern(value)
 
     @property
     def value(self) -> str | None:
@@ -157,6 +174,8 @@ class LanguageValue(BaseModel):
     def from_json(self, json_data: dict[str, str]) -> LanguageValue:
         self.language = json_data['language']
         self.value = json_data['value']
+        if 'remove' in json_data:
+            self.removed = True
 
         return self
 
@@ -183,3 +202,8 @@ class LanguageValue(BaseModel):
 
     def __str__(self):
         return self.value or ''
+
+
+def _language_value_from_json(_language: str, json_data: dict[str, str]) -> LanguageValue:
+    """The factory of the values loaded lazily: build a LanguageValue from its JSON."""
+    return LanguageValue(language=json_data['language']).from_json(json_data=json_data)
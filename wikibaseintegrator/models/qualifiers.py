@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import sys
+from collections import Counter
 from typing import TYPE_CHECKING
 
-from wikibaseintegrator.models.basemodel import BaseModel
-from wikibaseintegrator.models.snaks import Snak
+from wikibaseintegrator.models.basemodel import BaseModel, changed, changes
+from wikibaseintegrator.models.snaks import Snak, SnakListCache
 from wikibaseintegrator.wbi_enums import ActionIfExists
 
 if TYPE_CHECKING:
@@ -11,7 +13,21 @@ if TYPE_CHECKING:
 
 
 class Qualifiers(BaseModel):
+    """
+    The qualifiers of a claim, by property.
+
+    The fingerprint and the computed hash of the qualifiers are cached, and computed again when a qualifier is added,
+    removed or changed. The fingerprints of the qualifiers are indexed for the membership checks: the index is updated
+    by :func:`add` and :func:`remove`, and rebuilt after any other change.
+    """
+    __slots__ = ('__qualifiers', '__cache', '__index', '__indexed')
+
     def __init__(self) -> None:
+        # Created when the fingerprint or the hash is first used
+        self.__cache: SnakListCache | None = None
+        # The number of qualifiers by fingerprint, and the state it was built for: see changes() and count()
+        self.__index: Counter | None = None
+        self.__indexed: tuple[int, int] | None = None
         self.qualifiers: dict[str, list[Snak | Claim]] = {}
 
     @property
@@ -22,6 +38,7 @@ class Qualifiers(BaseModel):
     def qualifiers(self, value):
         assert isinstance(value, dict)
         self.__qualifiers = value
+        self.__changed()
 
     def set(self, qualifiers: Qualifiers | list[Snak | Claim] | None) -> Qualifiers:
         if isinstance(qualifiers, list) or isinstance(qualifiers, Qualifiers):
@@ -58,6 +75,7 @@ class Qualifiers(BaseModel):
             self.qualifiers[property] = []
 
         self.qualifiers[property].append(qualifier)
+        self.__changed(qualifier, 1)
 
         return self
 
@@ -71,6 +89,7 @@ class Qualifiers(BaseModel):
 
         if qualifier in self.qualifiers[qualifier.property_number]:
             self.qualifiers[qualifier.property_number].remove(qualifier)
+            self.__changed(qualifier, -1)
 
         if len(self.qualifiers[qualifier.property_number]) == 0:
             del self.qualifiers[qualifier.property_number]
@@ -85,12 +104,22 @@ class Qualifiers(BaseModel):
             self.qualifiers = {}
         elif property in self.qualifiers:
             del self.qualifiers[property]
+            self.__changed()
         return self
 
-    def from_json(self, json_data: dict[str, list]) -> Qualifiers:
+    def from_json(self, json_data: dict[str, list], trusted: bool = False) -> Qualifiers:
+        """
+        :param json_data: A dict of lists of snaks with the property as key, in the Wikibase format.
+        :param trusted: The JSON comes from a Wikibase instance and is not validated, see :func:`Snak.from_json`.
+        """
         for property in json_data:
+            if trusted:
+                self.qualifiers.setdefault(sys.intern(property), []).extend(Snak().from_json(snak, trusted=True) for snak in json_data[property])
+                continue
             for snak in json_data[property]:
                 self.add(qualifier=Snak().from_json(snak))
+        if trusted:
+            self.__changed()
         return self
 
     def get_json(self) -> dict[str, list]:
@@ -103,6 +132,51 @@ class Qualifiers(BaseModel):
                 json_data[property].append(qualifier.get_json())
         return json_data
 
+    def __changed(self, qualifier: Snak | None = None, count: int = 0) -> None:
+        """
+        Record a change of the qualifiers: the index is updated with the qualifier added (count 1) or removed (count -1),
+        and dropped after any other change.
+        """
+        up_to_date = qualifier is not None and self.__index is not None and self.__indexed == (changes(), self.count() - count)
+        if self.__cache is not None:
+            self.__cache.invalidate()
+            if self.__cache.key is not None:
+                # The fingerprint was used, maybe by an index of claims
+                changed()
+        if up_to_date:
+            assert qualifier is not None and self.__index is not None
+            self.__index[qualifier.fingerprint] += count
+            if self.__index[qualifier.fingerprint] <= 0:
+                del self.__index[qualifier.fingerprint]
+            self.__indexed = (changes(), self.count())
+        else:
+            self.__index = None
+
+    def __fingerprints(self) -> Counter:
+        """The number of qualifiers by fingerprint, rebuilt if the qualifiers changed since the index was built."""
+        if self.__index is None or self.__indexed != (changes(), self.count()):
+            self.__index = Counter(qualifier.fingerprint for qualifier in self)
+            self.__indexed = (changes(), self.count())
+        return self.__index
+
+    def __snak_list_cache(self) -> SnakListCache:
+        if self.__cache is None:
+            self.__cache = SnakListCache()
+        return self.__cache
+
+    @property
+    def fingerprint(self) -> frozenset:
+        """
+        A hashable canonical identity of the qualifiers, made of the fingerprints of the snaks. The order of the snaks
+        is ignored.
+        """
+        return self.__snak_list_cache().get_fingerprint(self)
+
+    @property
+    def computed_hash(self) -> str:
+        """The hash Wikibase gives to these qualifiers, computed locally. The order of the snaks is ignored."""
+        return self.__snak_list_cache().get_computed_hash(self)
+
     def count(self) -> int:
         """
         Return the total number of individual qualifier snaks, across every property.
@@ -112,6 +186,16 @@ class Qualifiers(BaseModel):
         """
         return sum(len(snak_list) for snak_list in self.qualifiers.values())
 
+    def __contains__(self, item):
+        from wikibaseintegrator.models.claims import Claim
+        if isinstance(item, Claim):
+            item = Snak().from_json(item.get_json()['mainsnak'])
+
+        if not isinstance(item, Snak):
+            return False
+
+        return item.fingerprint in self.__fingerprints()
+
     def __iter__(self):
         iterate = []
         for qualifier in self.qualifiers.values():
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import logging
+import sys
+from collections import Counter
 from typing import TYPE_CHECKING, Any
 
-from wikibaseintegrator.models.basemodel import BaseModel
+from wikibaseintegrator.models.basemodel import BaseModel, changed, changes
 from wikibaseintegrator.models.snaks import Snak, Snaks
 from wikibaseintegrator.wbi_enums import ActionIfExists
 
@@ -14,6 +16,14 @@ log = logging.getLogger(__name__)
 
 
 class References(BaseModel):
+    """
+    The reference blocks of a claim.
+
+    The computed hashes of the references are indexed to find the duplicates in constant time: the index is updated by
+    :func:`add` and :func:`remove`, and rebuilt after any other change.
+    """
+    __slots__ = ('__references', '__index', '__indexed')
+
     def __init__(self) -> None:
         self.references: list[Reference] = []
 
@@ -24,6 +34,9 @@ class References(BaseModel):
     @references.setter
     def references(self, value: list[Reference]):
         self.__references = value
+        # The number of references by computed hash, and the state it was built for: see changes()
+        self.__index: Counter | None = None
+        self.__indexed: tuple[int, int] | None = None
 
     def get(self, hash: str | None = None) -> Reference | None:
         for reference in self.references:
@@ -47,14 +60,26 @@ class References(BaseModel):
         if reference is not None:
             assert isinstance(reference, Reference)
 
-            if reference not in self.references:
+            hashes = self.__hashes()
+            if reference.computed_hash not in hashes:
                 self.references.append(reference)
+                hashes[reference.computed_hash] += 1
+                self.__indexed = (changes(), len(self.references))
 
         return self
 
-    def from_json(self, json_data: list[dict]) -> References:
-        for reference in json_data:
-            self.add(reference=Reference().from_json(reference))
+    def from_json(self, json_data: list[dict], trusted: bool = False) -> References:
+        """
+        :param json_data: A list of reference blocks, in the Wikibase format.
+        :param trusted: The JSON comes from a Wikibase instance and is not validated, see :func:`Snak.from_json`. The
+            reference blocks of a statement are already distinct on the instance, they are not deduplicated.
+        """
+        if trusted:
+            self.references.extend(Reference().from_json(reference_json, trusted=True) for reference_json in json_data)
+            return self
+
+        for reference_json in json_data:
+            self.add(Reference().from_json(reference_json))
 
         return self
 
@@ -73,7 +98,14 @@ class References(BaseModel):
 
         for reference in self.references:
             if reference == reference_to_remove:
+                up_to_date = self.__index is not None and self.__indexed == (changes(), len(self.references))
                 self.references.remove(reference)
+                if up_to_date:
+                    assert self.__index is not None
+                    self.__index[reference.computed_hash] -= 1
+                    if self.__index[reference.computed_hash] <= 0:
+                        del self.__index[reference.computed_hash]
+                    self.__indexed = (changes(), len(self.references))
                 return True
 
         return False
@@ -82,6 +114,33 @@ class References(BaseModel):
         self.references = []
         return self
 
+    @property
+    def fingerprint(self) -> frozenset:
+        """A hashable canonical identity of the references, made of the fingerprints of the references. The order is ignored."""
+        return frozenset(Counter(reference.fingerprint for reference in self.references).items())
+
+    def __hashes(self) -> Counter:
+        """The number of references by computed hash, rebuilt if the references changed since the index was built."""
+        if self.__index is None or self.__indexed != (changes(), len(self.references)):
+            self.__index = Counter(reference.computed_hash for reference in self.references)
+            self.__indexed = (changes(), len(self.references))
+        return self.__index
+
+    def computed_hashes(self) -> set[str]:
+        """
+        Return the hashes Wikibase gives to the reference blocks, computed locally, to check the presence of many
+        references at once.
+
+        :return: A set of hashes
+        """
+        return set(self.__hashes())
+
+    def __contains__(self, item):
+        if not isinstance(item, Reference):
+            return False
+
+        return item.computed_hash in self.__hashes()
+
     def __iter__(self):
         return iter(self.references)
 
@@ -90,6 +149,8 @@ class References(BaseModel):
 
 
 class Reference(BaseModel):
+    __slots__ = ('__hash', '__snaks', '__snaks_order')
+
     def __init__(self, snaks: Snaks | None = None, snaks_order: list | None = None):
         self.hash = None
         self.snaks = snaks or Snaks()
@@ -109,6 +170,10 @@ class Reference(BaseModel):
 
     @snaks.setter
     def snaks(self, value):
+        previous = getattr(self, '_Reference__snaks', None)
+        if previous is not None and previous.hashed:
+            # The hash of the reference was used, maybe by an index of references
+            changed()
         self.__snaks = value
 
     @property
@@ -132,10 +197,14 @@ class Reference(BaseModel):
 
         return self
 
-    def from_json(self, json_data: dict[str, Any]) -> Reference:
-        self.hash = json_data['hash']
-        self.snaks = Snaks().from_json(json_data['snaks'])
-        self.snaks_order = json_data['snaks-order']
+    def from_json(self, json_data: dict[str, Any], trusted: bool = False) -> Reference:
+        """
+        :param json_data: The JSON representation of the reference block.
+        :param trusted: The JSON comes from a Wikibase instance and is not validated, see :func:`Snak.from_json`.
+        """
+        self.hash = json_data.get('hash')  # Not in the JSON of a new reference
+        self.snaks = Snaks().from_json(json_data['snaks'], trusted=trusted)
+        self.snaks_order = [sys.intern(property) for property in json_data['snaks-order']]
 
         return self
 
@@ -146,6 +215,23 @@ class Reference(BaseModel):
         }
         return json_data
 
+    @property
+    def fingerprint(self) -> frozenset:
+        """
+        A hashable canonical identity of the reference, made of the fingerprints of the snaks. The hash is only known
+        server-side, so it is not part of it: two references are equal when they hold the same snaks. The order of the
+        snaks is ignored, like in the fingerprint of the qualifiers. It is cached by the snaks.
+        """
+        return self.snaks.fingerprint
+
+    @property
+    def computed_hash(self) -> str:
+        """
+        The hash Wikibase gives to this reference block, computed locally. Unlike :attr:`hash`, it is known for a new
+        reference and follows the changes of its snaks. It is cached by the snaks.
+        """
+        return self.snaks.computed_hash
+
     def __iter__(self):
         return iter(self.snaks)
 
@@ -156,5 +242,4 @@ class Reference(BaseModel):
         if not isinstance(other, Reference):
             return NotImplemented
 
-        # The hash is only known server-side, so two references are considered equal when they hold the same snaks
-        return self.snaks.get_json() == other.snaks.get_json()
+        return self.fingerprint == other.fingerprint
@@ -9,6 +9,8 @@ from wikibaseintegrator.wbi_enums import ActionIfExists
 
 
 class Senses(BaseModel):
+    __slots__ = ('senses',)
+
     def __init__(self) -> None:
         self.senses: list[Sense] = []
 
@@ -24,9 +26,9 @@ class Senses(BaseModel):
 
         return self
 
-    def from_json(self, json_data: list[dict]) -> Senses:
+    def from_json(self, json_data: list[dict], trusted: bool = False) -> Senses:
         for sense in json_data:
-            self.add(sense=Sense().from_json(sense))
+            self.add(sense=Sense().from_json(sense, trusted=trusted))
 
         return self
 
@@ -42,16 +44,18 @@ class Senses(BaseModel):
 
 
 class Sense(BaseModel):
+    __slots__ = ('id', 'glosses', 'claims', 'removed')
+
     def __init__(self, sense_id: str | None = None, glosses: Glosses | None = None, claims: Claims | None = None):
         self.id = sense_id
         self.glosses: LanguageValues = glosses or Glosses()
         self.claims = claims or Claims()
         self.removed = False
 
-    def from_json(self, json_data: dict[str, Any]) -> Sense:
+    def from_json(self, json_data: dict[str, Any], trusted: bool = False) -> Sense:
         self.id = json_data['id']
         self.glosses = Glosses().from_json(json_data['glosses'])
-        self.claims = Claims().from_json(json_data['claims'])
+        self.claims = Claims().from_json(json_data['claims'], trusted=trusted)
 
         return self
 
@@ -77,4 +81,4 @@ class Sense(BaseModel):
 
 
 class Glosses(LanguageValues):
-    pass
+    __slots__ = ()
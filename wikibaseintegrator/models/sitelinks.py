@@ -1,14 +1,19 @@
 from __future__ import annotations
 
-from wikibaseintegrator.models.basemodel import BaseModel
+import sys
+from collections.abc import MutableMapping
+
+from wikibaseintegrator.models.basemodel import BaseModel, LazyDict, json_items
 
 
 class Sitelinks(BaseModel):
+    __slots__ = ('sitelinks',)
+
     def __init__(self) -> None:
-        self.sitelinks: dict[str, Sitelink] = {}
+        self.sitelinks: MutableMapping[str, Sitelink] = {}
 
     def get(self, site: str | None = None) -> Sitelink | None:
-        if site in self.sitelinks:
+        if site is not None and site in self.sitelinks:
             return self.sitelinks[site]
 
         return None
@@ -20,15 +25,32 @@ class Sitelinks(BaseModel):
 
     def get_json(self) -> dict[str, dict]:
         return {
-            sitelink:
+            site:
                 {
-                    'site': self.sitelinks[sitelink].site,
-                    'title': self.sitelinks[sitelink].title,
-                    'badges': self.sitelinks[sitelink].badges
-                } for sitelink in self.sitelinks
+                    'site': sitelink['site'],
+                    'title': sitelink['title'],
+                    'badges': sitelink['badges']
+                } for site, sitelink, _ in json_items(self.sitelinks, lambda sitelink: {'site': sitelink.site, 'title': sitelink.title, 'badges': sitelink.badges})
         }
 
-    def from_json(self, json_data: dict[str, dict]) -> Sitelinks:
+    def from_json(self, json_data: dict[str, dict], lazy: bool = False) -> Sitelinks:
+        """
+        Add the sitelinks of a JSON/dict object.
+
+        :param json_data: A dict of sitelinks with the site as key, in the Wikibase format.
+        :param lazy: Keep the JSON of each sitelink and build its Sitelink on first access.
+        :return: The updated Sitelinks object.
+        """
+        if lazy:
+            if not isinstance(self.sitelinks, LazyDict):
+                self.sitelinks = LazyDict(_sitelink_from_json, self.sitelinks)
+            assert isinstance(self.sitelinks, LazyDict)
+
+            for site, sitelink_json in json_data.items():
+                self.sitelinks.set_raw(site, sitelink_json)
+
+            return self
+
         for sitelink in json_data:
             self.set(site=json_data[sitelink]['site'], title=json_data[sitelink]['title'], badges=json_data[sitelink]['badges'])
 
@@ -39,10 +61,17 @@ class Sitelinks(BaseModel):
 
 
 class Sitelink(BaseModel):
+    __slots__ = ('site', 'title', 'badges')
+
     def __init__(self, site: str | None = None, title: str | None = None, badges: list[str] | None = None):
-        self.site = site
+        self.site = sys.intern(site) if site else site
         self.title = title
         self.badges: list[str] = badges or []
 
     def __str__(self):
         return self.title
+
+
+def _sitelink_from_json(_site: str, json_data: dict) -> Sitelink:
+    """The factory of the sitelinks loaded lazily: build a Sitelink from its JSON."""
+    return Sitelink(site=json_data['site'], title=json_data['title'], badges=list(json_data['badges']))
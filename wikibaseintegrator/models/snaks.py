@@ -1,15 +1,136 @@
 from __future__ import annotations
 
 import re
+import sys
+from collections import Counter
+from collections.abc import Hashable, Iterable
 from typing import Any
 
-from wikibaseintegrator.models.basemodel import BaseModel
+from wikibaseintegrator.models.basemodel import BaseModel, changed, changes
 from wikibaseintegrator.wbi_enums import WikibaseSnakType
+from wikibaseintegrator.wbi_hashing import snak_hash, snak_list_hash
+
+PROPERTY_NUMBER_PATTERN = re.compile(r'^P?([0-9]+)$')
+
+# The snak types by value, to parse the trusted JSON without the checks of the enum
+SNAK_TYPES = {snaktype.value: snaktype for snaktype in WikibaseSnakType}
+
+# The keys of the datavalues holding a string repeated across many snaks
+INTERNED_VALUE_KEYS = frozenset(('entity-type', 'id', 'unit', 'calendarmodel', 'globe', 'language'))
+
+
+def copy_datavalue(datavalue: dict) -> dict:
+    """
+    Copy a datavalue, as in the JSON of an entity. Its value is a string or a dict of strings and numbers, the copy
+    shares nothing mutable with the datavalue.
+
+    :param datavalue: A datavalue
+    :return: The copy
+    """
+    datavalue = dict(datavalue)
+    if isinstance(datavalue.get('value'), dict):
+        datavalue['value'] = dict(datavalue['value'])
+    return datavalue
+
+
+def intern_datavalue(datavalue: dict) -> dict:
+    """
+    Copy a datavalue and intern its strings repeated across many snaks, like its type, the type and the ID of an entity
+    or the unit of a quantity, so that the loaded entities share them instead of keeping a copy each. The snaks don't
+    share their datavalue with the JSON they are built from, which can be kept by an entity loaded lazily and its
+    clones.
+
+    :param datavalue: A datavalue, as in the JSON of an entity
+    :return: The copy of the datavalue
+    """
+    datavalue = copy_datavalue(datavalue)
+    if isinstance(datavalue.get('type'), str):
+        datavalue['type'] = sys.intern(datavalue['type'])
+    value = datavalue.get('value')
+    if isinstance(value, dict):
+        for key in INTERNED_VALUE_KEYS.intersection(value):
+            if isinstance(value[key], str):
+                value[key] = sys.intern(value[key])
+    return datavalue
+
+
+class SnakListCache:
+    """
+    The cached fingerprint and hash of a list of snaks, the snaks of a reference or the qualifiers of a claim. They are
+    computed again when a snak was added or removed since, see :func:`invalidate`, or when a snak was changed. The order
+    of the snaks is ignored, like in the hash Wikibase gives to a list of snaks.
+    """
+    __slots__ = ('key', 'fingerprint', 'computed_hash', 'dirty', 'checked')
+
+    def __init__(self) -> None:
+        # The fingerprints of the snaks the cached values were computed from
+        self.key: tuple | None = None
+        self.fingerprint: frozenset | None = None
+        self.computed_hash: str | None = None
+        # A snak was added or removed since the key was computed
+        self.dirty = True
+        # The number of changes recorded when the key was last checked, a snak may have changed since: see changes()
+        self.checked = -1
+
+    def invalidate(self) -> None:
+        """Record that a snak was added to the list or removed from it."""
+        self.dirty = True
+
+    def get_fingerprint(self, snaks: Iterable[Snak]) -> frozenset:
+        """
+        Return the fingerprint of the snaks: a hashable canonical identity made of the fingerprints of the snaks.
+
+        :param snaks: The snaks
+        :return: A frozenset
+        """
+        self.__check(snaks)
+        if self.fingerprint is None:
+            self.fingerprint = frozenset(Counter(snak.fingerprint for snak in snaks).items())
+        return self.fingerprint
+
+    def get_computed_hash(self, snaks: Iterable[Snak]) -> str:
+        """
+        Return the hash Wikibase gives to the list of snaks, computed locally.
+
+        :param snaks: The snaks
+        :return: The hash
+        """
+        self.__check(snaks)
+        if self.computed_hash is None:
+            self.computed_hash = snak_list_hash(snak.computed_hash for snak in snaks)
+        return self.computed_hash
+
+    def __check(self, snaks: Iterable[Snak]) -> None:
+        """Reset the cached values if the snaks changed since they were computed. Nothing is computed if no change was recorded since the last check."""
+        if not self.dirty and self.checked == changes():
+            return
+        key = tuple(snak.fingerprint for snak in snaks)
+        if key != self.key:
+            self.key = key
+            self.fingerprint = None
+            self.computed_hash = None
+        self.dirty = False
+        self.checked = changes()
 
 
 class Snaks(BaseModel):
+    """
+    The snaks of a reference, by property.
+
+    The fingerprint and the computed hash of the snaks are cached. They are computed again when a snak is added,
+    removed or changed.
+    """
+    __slots__ = ('snaks', '__cache')
+
     def __init__(self) -> None:
         self.snaks: dict[str, list[Snak]] = {}
+        # Created when the fingerprint or the hash is first used
+        self.__cache: SnakListCache | None = None
+
+    def __snak_list_cache(self) -> SnakListCache:
+        if self.__cache is None:
+            self.__cache = SnakListCache()
+        return self.__cache
 
     def get(self, property: str | int) -> list[Snak]:
         if isinstance(property, int):
@@ -27,13 +148,21 @@ class Snaks(BaseModel):
             self.snaks[property] = []
 
         self.snaks[property].append(snak)
+        if self.__cache is not None:
+            self.__cache.invalidate()
+        if self.hashed:
+            changed()
 
         return self
 
-    def from_json(self, json_data: dict[str, list]) -> Snaks:
+    def from_json(self, json_data: dict[str, list], trusted: bool = False) -> Snaks:
+        """
+        :param json_data: A dict of lists of snaks with the property as key, in the Wikibase format.
+        :param trusted: The JSON comes from a Wikibase instance and is not validated, see :func:`Snak.from_json`.
+        """
         for property in json_data:
             for snak in json_data[property]:
-                self.add(snak=Snak().from_json(snak))
+                self.add(snak=Snak().from_json(snak, trusted=trusted))
 
         return self
 
@@ -55,12 +184,38 @@ class Snaks(BaseModel):
             iterate.extend(snak)
         return iter(iterate)
 
+    @property
+    def hashed(self) -> bool:
+        """The fingerprint or the hash of the snaks was computed: they may be indexed, e.g. by the references of a claim."""
+        return self.__cache is not None and self.__cache.key is not None
+
+    @property
+    def fingerprint(self) -> frozenset:
+        """A hashable canonical identity of this list of snaks, made of the fingerprints of the snaks. The order of the snaks is ignored."""
+        return self.__snak_list_cache().get_fingerprint(self)
+
+    @property
+    def computed_hash(self) -> str:
+        """The hash Wikibase gives to this list of snaks, computed locally. The order of the snaks is ignored."""
+        return self.__snak_list_cache().get_computed_hash(self)
+
     def __len__(self):
         return len(self.snaks)
 
 
 class Snak(BaseModel):
+    """
+    A snak: a property and a value, or the absence of a value.
+
+    The fingerprint and the computed hash of the snak are cached and reset when an attribute is set. The datavalue
+    must be replaced, not modified in place, once they have been used.
+    """
+
+    __slots__ = ('__fingerprint', '__computed_hash', '__snaktype', '__property_number', '__hash', '__datavalue', '__datatype')
+
     def __init__(self, snaktype: WikibaseSnakType = WikibaseSnakType.KNOWN_VALUE, property_number: str | None = None, hash: str | None = None, datavalue: dict | None = None, datatype: str | None = None):
+        self.__fingerprint: tuple | None = None
+        self.__computed_hash: str | None = None
         self.snaktype = snaktype
         self.property_number = property_number
         self.hash = hash
@@ -75,6 +230,7 @@ class Snak(BaseModel):
     def snaktype(self, value: WikibaseSnakType):
         """Parse the snaktype. The enum throws an error if it is not one of the recognized values"""
         self.__snaktype = WikibaseSnakType(value)
+        self.__reset()
 
     @property
     def property_number(self):
@@ -83,17 +239,17 @@ class Snak(BaseModel):
     @property_number.setter
     def property_number(self, value):
         if isinstance(value, int):
-            self.__property_number = 'P' + str(value)
+            self.__property_number = sys.intern('P' + str(value))
         elif value is not None:
-            pattern = re.compile(r'^P?([0-9]+)$')
-            matches = pattern.match(value)
+            matches = PROPERTY_NUMBER_PATTERN.match(value)
 
             if not matches:
                 raise ValueError('Invalid property_number, format must be "P[0-9]+"')
 
-            self.__property_number = 'P' + str(matches.group(1))
+            self.__property_number = sys.intern('P' + str(matches.group(1)))
         else:
             self.__property_number = value
+        self.__reset()
 
     @property
     def hash(self):
@@ -112,6 +268,7 @@ class Snak(BaseModel):
         if value is not None and value != {}:
             self.snaktype = WikibaseSnakType.KNOWN_VALUE
         self.__datavalue = value
+        self.__reset()
 
     @property
     def datatype(self):
@@ -119,15 +276,72 @@ class Snak(BaseModel):
 
     @datatype.setter
     def datatype(self, value):
-        self.__datatype = value
+        self.__datatype = sys.intern(value) if isinstance(value, str) else value
+        self.__reset()
+
+    def __reset(self) -> None:
+        """Reset the cached fingerprint and hash after a change."""
+        if self.__fingerprint is not None or self.__computed_hash is not None:
+            changed()
+            self.__fingerprint = None
+            self.__computed_hash = None
+
+    @property
+    def fingerprint(self) -> tuple:
+        """
+        A hashable canonical identity of the snak: two snaks are equal if and only if they have the same fingerprint.
+        The server-side hash is not part of it.
+        """
+        if self.__fingerprint is None:
+            self.__fingerprint = (self.snaktype.value, self.property_number, self.datatype, self.freeze(self.datavalue))
+        return self.__fingerprint
+
+    @property
+    def computed_hash(self) -> str:
+        """
+        The hash Wikibase gives to this snak, computed locally. Unlike :attr:`hash`, it is known for a new snak and
+        follows the changes of the snak.
+        """
+        if self.__computed_hash is None:
+            self.__computed_hash = snak_hash(self.snaktype, self.property_number, self.datavalue)
+        return self.__computed_hash
+
+    @staticmethod
+    def freeze(value: Any) -> Hashable:
+        """
+        Convert a JSON value (dict, list, scalar) to a hashable canonical form. Two JSON values are equal if and only
+        if their canonical forms are equal.
+
+        :param value: A JSON value
+        """
+        if isinstance(value, dict):
+            return frozenset((key, Snak.freeze(item)) for key, item in value.items())
+        if isinstance(value, list):
+            return tuple(Snak.freeze(item) for item in value)
+        return value
+
+    def from_json(self, json_data: dict[str, Any], trusted: bool = False) -> Snak:
+        """
+        :param json_data: The JSON representation of the snak.
+        :param trusted: The JSON comes from a Wikibase instance: the attributes are set as is, without the validation
+            and the normalization of the setters. Don't use it for a JSON built by hand.
+        """
+        if trusted:
+            self.__snaktype = SNAK_TYPES[json_data['snaktype']]
+            self.__property_number = sys.intern(json_data['property'])
+            self.__hash = json_data.get('hash')
+            self.__datavalue = intern_datavalue(json_data['datavalue']) if 'datavalue' in json_data else {}
+            self.__datatype = sys.intern(json_data['datatype']) if json_data.get('datatype') else json_data.get('datatype')
+            self.__fingerprint = None
+            self.__computed_hash = None
+            return self
 
-    def from_json(self, json_data: dict[str, Any]) -> Snak:
         self.snaktype: WikibaseSnakType = WikibaseSnakType(json_data['snaktype'])
         self.property_number = json_data['property']
         if 'hash' in json_data:
             self.hash = json_data['hash']
         if 'datavalue' in json_data:
-            self.datavalue = json_data['datavalue']
+            self.datavalue = intern_datavalue(json_data['datavalue'])
         if 'datatype' in json_data:  # datatype can be null with MediaInfo
             self.datatype = json_data['datatype']
         return self
@@ -137,7 +351,7 @@ class Snak(BaseModel):
             'snaktype': self.snaktype.value,
             'property': self.property_number,
             'datatype': self.datatype,
-            'datavalue': self.datavalue
+            'datavalue': copy_datavalue(self.datavalue) if isinstance(self.datavalue, dict) else self.datavalue
         }
 
         if self.snaktype in [WikibaseSnakType.NO_VALUE, WikibaseSnakType.UNKNOWN_VALUE]:
@@ -153,4 +367,4 @@ class Snak(BaseModel):
         if not isinstance(other, Snak):
             return NotImplemented
 
-        return self.snaktype == other.snaktype and self.property_number == other.property_number and self.datatype == other.datatype and self.datavalue == other.datavalue
+        return self.fingerprint == other.fingerprint
@@ -0,0 +1,326 @@
+"""
+Export of entities to Apache Arrow record batches and Parquet files.
+
+The entities are converted to five normalised tables, joined on the entity id and the statement id:
+
+* ``entities``: one row per entity, and per form and sense of the lexemes
+* ``terms``: one row per label, description, alias, lemma, representation and gloss
+* ``statements``: one row per statement, with its main snak
+* ``qualifiers``: one row per qualifier snak
+* ``references``: one row per snak of a reference block, with the hash of the block
+
+The snaks have a string column ``value`` (the entity id, the string, the text, the time or the amount) and typed
+columns for the monolingual texts, the times, the quantities and the globe coordinates.
+
+The entities are buffered as rows of tuples and converted to Arrow column by column, so that a stream of any length can
+be written in batches with a bounded memory. This module requires pyarrow, which is installed by the ``arrow`` extra.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from collections.abc import Callable, Iterable, Iterator
+from typing import TYPE_CHECKING, Any
+
+from wikibaseintegrator.entities.baseentity import BaseEntity
+from wikibaseintegrator.wbi_enums import WikibaseSnakType
+from wikibaseintegrator.wbi_hashing import snak_hash, snak_list_hash
+
+if TYPE_CHECKING:
+    import pyarrow
+
+# The columns of the snaks, after the columns identifying their statement
+SNAK_COLUMNS = (
+    ('property', 'string'),
+    ('snaktype', 'string'),
+    ('datatype', 'string'),
+    ('value_type', 'string'),
+    ('value', 'string'),
+    ('value_language', 'string'),
+    ('time', 'timestamp[s]'),
+    ('time_precision', 'int8'),
+    ('time_timezone', 'int16'),
+    ('time_calendarmodel', 'string'),
+    ('quantity_amount', 'double'),
+    ('quantity_lower', 'double'),
+    ('quantity_upper', 'double'),
+    ('quantity_unit', 'string'),
+    ('latitude', 'double'),
+    ('longitude', 'double'),
+    ('altitude', 'double'),
+    ('coordinate_precision', 'double'),
+    ('globe', 'string'),
+    ('value_json', 'string')
+)
+
+# The columns of the tables, by table
+TABLES = {
+    'entities': (('id', 'string'), ('type', 'string'), ('lastrevid', 'int64'), ('datatype', 'string'), ('lexical_category', 'string'), ('language', 'string')),
+    'terms': (('entity_id', 'string'), ('term_type', 'string'), ('language', 'string'), ('value', 'string')),
+    'statements': (('entity_id', 'string'), ('statement_id', 'string'), ('rank', 'string')) + SNAK_COLUMNS,
+    'qualifiers': (('entity_id', 'string'), ('statement_id', 'string'), ('hash', 'string')) + SNAK_COLUMNS,
+    'references': (('entity_id', 'string'), ('statement_id', 'string'), ('reference_hash', 'string'), ('hash', 'string')) + SNAK_COLUMNS
+}
+
+# The fields of terms of the JSON of the entities, with their term type
+TERM_TYPES = {
+    'labels': 'label',
+    'descriptions': 'description',
+    'lemmas': 'lemma',
+    'representations': 'representation',
+    'glosses': 'gloss'
+}
+
+TIME_PATTERN = re.compile(r'^([+-]?)(\d+)-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)Z$')
+
+# The empty typed columns, padding the columns of each value type
+_NO_TIME = (None,) * 4
+_NO_QUANTITY = (None,) * 4
+_NO_COORDINATE = (None,) * 5
+_NO_VALUE = (None,) * 16
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as error:
+        raise ImportError('The export to Arrow and Parquet requires pyarrow, install it with "pip install wikibaseintegrator[arrow]"') from error
+    return pyarrow
+
+
+def schemas() -> dict[str, pyarrow.Schema]:
+    """
+    Return the Arrow schemas of the tables.
+
+    :return: A dict of schemas with the name of the table as key
+    """
+    pa = _import_pyarrow()
+    return {table: pa.schema([(name, pa.type_for_alias(type_name)) for name, type_name in columns]) for table, columns in TABLES.items()}
+
+
+class ArrowExporter:
+    """
+    Convert entities to Arrow record batches. Add the entities with :func:`add`, then get the record batches of the
+    entities added since the last call with :func:`flush`.
+    """
+
+    def __init__(self) -> None:
+        self.pyarrow = _import_pyarrow()
+        self.schemas = schemas()
+        self.rows: dict[str, list[tuple]] = {table: [] for table in TABLES}
+        self.entities = 0
+
+    def add(self, entity: BaseEntity | dict[str, Any]) -> ArrowExporter:
+        """
+        Add an entity to the next record batches.
+
+        :param entity: An entity, or the JSON of an entity as returned by the Wikibase instance or found in a dump
+        :return: The exporter
+        """
+        if isinstance(entity, BaseEntity):
+            json_data: dict[str, Any] = dict(entity.get_json())
+            lastrevid = entity.lastrevid
+        else:
+            json_data = entity
+            lastrevid = entity.get('lastrevid')
+
+        entity_id = json_data.get('id')
+        self.rows['entities'].append((entity_id, json_data.get('type'), lastrevid, json_data.get('datatype'), json_data.get('lexicalCategory'), json_data.get('language')))
+        self._add_parts(entity_id, json_data)
+
+        for sub_entity_type, key in (('form', 'forms'), ('sense', 'senses')):
+            for sub_entity in json_data.get(key, []):
+                if 'remove' in sub_entity:
+                    continue
+                self.rows['entities'].append((sub_entity.get('id'), sub_entity_type, lastrevid, None, None, None))
+                self._add_parts(sub_entity.get('id'), sub_entity)
+
+        self.entities += 1
+        return self
+
+    def flush(self) -> dict[str, pyarrow.RecordBatch]:
+        """
+        Return the record batches of the entities added since the last call, and empty the buffers.
+
+        :return: A dict of record batches with the name of the table as key
+        """
+        batches = {}
+        for table, rows in self.rows.items():
+            schema = self.schemas[table]
+            columns = list(zip(*rows)) if rows else [()] * len(schema)
+            batches[table] = self.pyarrow.RecordBatch.from_arrays([self.pyarrow.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema)
+            rows.clear()
+
+        self.entities = 0
+        return batches
+
+    def __len__(self):
+        return self.entities
+
+    def _add_parts(self, entity_id: str | None, json_data: dict[str, Any]) -> None:
+        """Add the terms and the statements of an entity, a form or a sense."""
+        terms = self.rows['terms']
+        for key, term_type in TERM_TYPES.items():
+            for language, term in json_data.get(key, {}).items():
+                if 'value' in term:
+                    terms.append((entity_id, term_type, language, term['value']))
+        for language, aliases in json_data.get('aliases', {}).items():
+            terms.extend((entity_id, 'alias', language, alias['value']) for alias in aliases if 'value' in alias and 'remove' not in alias)
+
+        statements, qualifiers, references = self.rows['statements'], self.rows['qualifiers'], self.rows['references']
+        claims = json_data.get('claims') or json_data.get('statements') or {}
+        for claim in (claim for property_claims in claims.values() for claim in property_claims):
+            if 'remove' in claim:
+                continue
+            statement_id = claim.get('id')
+            statements.append((entity_id, statement_id, claim.get('rank')) + _snak_values(claim['mainsnak']))
+            for snak in (snak for property_snaks in claim.get('qualifiers', {}).values() for snak in property_snaks):
+                qualifiers.append((entity_id, statement_id, _snak_hash(snak)) + _snak_values(snak))
+            for reference in claim.get('references', []):
+                snaks = [snak for property_snaks in reference['snaks'].values() for snak in property_snaks]
+                hashes = [_snak_hash(snak) for snak in snaks]
+                reference_hash = reference.get('hash') or snak_list_hash(hashes)
+                references.extend((entity_id, statement_id, reference_hash, hash) + _snak_values(snak) for snak, hash in zip(snaks, hashes))
+
+
+def iter_record_batches(entities: Iterable[BaseEntity | dict[str, Any]], batch_size: int = 10000) -> Iterator[dict[str, pyarrow.RecordBatch]]:
+    """
+    Convert a stream of entities to Arrow record batches.
+
+    :param entities: The entities, or the JSON of the entities
+    :param batch_size: The number of entities of each batch
+    :return: An iterator of dicts of record batches with the name of the table as key
+    """
+    exporter = ArrowExporter()
+    for entity in entities:
+        exporter.add(entity)
+        if len(exporter) >= batch_size:
+            yield exporter.flush()
+
+    if len(exporter) > 0:
+        yield exporter.flush()
+
+
+def write_parquet(entities: Iterable[BaseEntity | dict[str, Any]], directory: str, batch_size: int = 10000, **kwargs: Any) -> dict[str, int]:
+    """
+    Write a stream of entities to one Parquet file per table, named after the table, like ``statements.parquet``. The
+    entities are written in batches, so that the memory used does not depend on the number of entities.
+
+    :param entities: The entities, or the JSON of the entities
+    :param directory: The directory of the Parquet files, created if needed
+    :param batch_size: The number of entities of each batch
+    :param kwargs: More arguments for pyarrow.parquet.ParquetWriter, like compression
+    :return: The number of rows written, by table
+    """
+    _import_pyarrow()
+    import pyarrow.parquet
+
+    os.makedirs(directory, exist_ok=True)
+    writers = {table: pyarrow.parquet.ParquetWriter(os.path.join(directory, f'{table}.parquet'), schema, **kwargs) for table, schema in schemas().items()}
+    rows = dict.fromkeys(TABLES, 0)
+    try:
+        for batches in iter_record_batches(entities, batch_size=batch_size):
+            for table, batch in batches.items():
+                writers[table].write_batch(batch)
+                rows[table] += batch.num_rows
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    return rows
+
+
+def _snak_hash(snak: dict[str, Any]) -> str:
+    return snak.get('hash') or snak_hash(WikibaseSnakType(snak['snaktype']), snak['property'], snak.get('datavalue'))
+
+
+def _snak_values(snak: dict[str, Any]) -> tuple:
+    """Return the values of the snak columns."""
+    datavalue = snak.get('datavalue')
+    if datavalue is None:
+        return (snak['property'], snak['snaktype'], snak.get('datatype'), None) + _NO_VALUE
+
+    value_type = datavalue.get('type')
+    converter = DATAVALUE_CONVERTERS.get(value_type)
+    values = converter(datavalue['value']) if converter else _json_values(datavalue.get('value'))
+    return (snak['property'], snak['snaktype'], snak.get('datatype'), value_type) + values
+
+
+def _string_values(value: Any) -> tuple:
+    return (value, None) + _NO_TIME + _NO_QUANTITY + _NO_COORDINATE + (None,)
+
+
+def _entity_id_values(value: dict) -> tuple:
+    return _string_values(value.get('id'))
+
+
+def _monolingual_text_values(value: dict) -> tuple:
+    return (value.get('text'), value.get('language')) + _NO_TIME + _NO_QUANTITY + _NO_COORDINATE + (None,)
+
+
+def _time_values(value: dict) -> tuple:
+    time = value.get('time')
+    return (time, None, time_seconds(time) if time else None, value.get('precision'), value.get('timezone'), value.get('calendarmodel')) + _NO_QUANTITY + _NO_COORDINATE + (None,)
+
+
+def _quantity_values(value: dict) -> tuple:
+    amount = value.get('amount')
+    return ((amount, None) + _NO_TIME + (_float(amount), _float(value.get('lowerBound')), _float(value.get('upperBound')), value.get('unit')) + _NO_COORDINATE
+            + (None,))
+
+
+def _globe_coordinate_values(value: dict) -> tuple:
+    return ((None, None) + _NO_TIME + _NO_QUANTITY + (_float(value.get('latitude')), _float(value.get('longitude')), _float(value.get('altitude')),
+                                                       _float(value.get('precision')), value.get('globe')) + (None,))
+
+
+def _json_values(value: Any) -> tuple:
+    return (None, None) + _NO_TIME + _NO_QUANTITY + _NO_COORDINATE + (json.dumps(value, sort_keys=True),)
+
+
+def _float(value: Any) -> float | None:
+    return None if value is None else float(value)
+
+
+# The converters of the datavalues to the values of the snak columns after 'value_type', by datavalue type
+DATAVALUE_CONVERTERS: dict[str, Callable[[Any], tuple]] = {
+    'string': _string_values,
+    'wikibase-entityid': _entity_id_values,
+    'monolingualtext': _monolingual_text_values,
+    'time': _time_values,
+    'quantity': _quantity_values,
+    'globecoordinate': _globe_coordinate_values
+}
+
+
+def time_seconds(time: str) -> int | None:
+    """
+    Convert a time in the Wikibase format, like '+2001-12-31T00:00:00Z', to a number of seconds since 1970-01-01, in
+    the proleptic Gregorian calendar. The date is taken as written, whatever its calendar model. A month or a day of
+    00, used for the times with a precision of a year or a month, is read as 01. The years before the common era have
+    no year 0, as in Wikibase: -0001 is the year before +0001.
+
+    :param time: A time in the Wikibase format
+    :return: The number of seconds, or None if the time can't be parsed
+    """
+    match = TIME_PATTERN.match(time)
+    if match is None:
+        return None
+
+    sign, year_text, month_text, day_text, hour, minute, second = match.groups()
+    year = int(year_text)
+    if sign == '-':
+        year = 1 - year
+    month = int(month_text) or 1
+    day = int(day_text) or 1
+
+    # Days from civil, with years starting in March so that the leap day is the last day of the year
+    year -= month <= 2
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    days = era * 146097 + day_of_era - 719468
+
+    return days * 86400 + int(hour) * 3600 + int(minute) * 60 + int(second)
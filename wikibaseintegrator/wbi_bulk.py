@@ -0,0 +1,260 @@
+"""
+Bulk creation of items from tabular data.
+
+A :class:`BulkBuilder` maps the columns of a table to the parts of the items: the id, the terms, the claims and their
+qualifiers and references. The table can be a pandas DataFrame, an Arrow table, a dict of columns or an iterable of
+rows like a ``csv.DictReader``.
+
+The table is processed column by column instead of row by row: the distinct values of a column are validated and
+formatted once, by the ``set_value()`` of a single instance of the datatype, and the snaks are built as JSON and shared
+by the rows with the same value. No datatype object is created per row, and the items are loaded from this JSON without
+being validated again.
+"""
+from __future__ import annotations
+
+import inspect
+import math
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any
+
+from wikibaseintegrator.datatypes.basedatatype import BaseDataType
+from wikibaseintegrator.entities.item import ItemEntity
+from wikibaseintegrator.wbi_config import config
+from wikibaseintegrator.wbi_enums import ColumnRole
+from wikibaseintegrator.wikibaseintegrator import WikibaseIntegrator
+
+# The roles of the columns holding a snak
+SNAK_ROLES = (ColumnRole.CLAIM, ColumnRole.QUALIFIER, ColumnRole.REFERENCE)
+
+# The roles of the columns holding a term, with the key of the terms in the JSON of the entity
+TERM_ROLES = {
+    ColumnRole.LABEL: 'labels',
+    ColumnRole.DESCRIPTION: 'descriptions',
+    ColumnRole.ALIAS: 'aliases'
+}
+
+
+class Column:
+    """
+    The role of a column of a table.
+
+    :param name: The name of the column
+    :param role: The role of the column, a claim by default
+    :param prop_nr: The property of the claims, qualifiers or references
+    :param datatype: The datatype of the claims, qualifiers or references, as a class like Time or a DTYPE like 'time'
+    :param of: For a qualifier, the name of the column of its claim. For a reference, the name of the column of its
+        claim, or None to add it to every claim of the row. The reference snaks of a row with the same claim column form
+        one reference block.
+    :param language: The language of the terms. Use wbi_config['DEFAULT_LANGUAGE'] by default.
+    :param argument: The argument of the ``set_value()`` of the datatype receiving the value of a cell, the first one
+        by default, like 'time' for Time or 'amount' for Quantity. A cell with a dict gives all the arguments.
+    :param kwargs: More arguments of the ``set_value()`` of the datatype, the same for every row, like the precision
+        of a Time or the unit of a Quantity
+    """
+    __slots__ = ('name', 'role', 'prop_nr', 'datatype', 'of', 'language', 'argument', 'kwargs')
+
+    def __init__(self, name: str, role: ColumnRole = ColumnRole.CLAIM, prop_nr: str | int | None = None, datatype: type[BaseDataType] | str | None = None, of: str | None = None,
+                 language: str | None = None, argument: str | None = None, **kwargs: Any):
+        self.name = name
+        self.role = role
+        self.of = of
+        self.language = str(language or config['DEFAULT_LANGUAGE'])
+        self.kwargs = kwargs
+        self.prop_nr: str | None = None
+        self.datatype: type[BaseDataType] | None = None
+        self.argument: str | None = argument
+
+        if role in SNAK_ROLES:
+            if prop_nr is None or datatype is None:
+                raise ValueError(f"The column '{name}' needs a property and a datatype")
+            self.prop_nr = 'P' + str(prop_nr) if isinstance(prop_nr, int) else str(prop_nr).upper()
+            if isinstance(datatype, str):
+                if datatype not in BaseDataType.dtypes:
+                    raise ValueError(f"Unknown datatype '{datatype}' for the column '{name}'")
+                datatype = BaseDataType.dtypes[datatype]
+            self.datatype = datatype
+            self.argument = argument or list(inspect.signature(datatype.set_value).parameters)[1]
+
+        if role == ColumnRole.QUALIFIER and of is None:
+            raise ValueError(f"The qualifier column '{name}' needs the name of the column of its claim")
+
+    def __repr__(self):
+        return f'<Column {self.name!r} {self.role.name} {self.prop_nr or ""}>'
+
+
+class BulkBuilder:
+    """
+    Create items from the rows of a table, one item per row.
+
+    :param columns: The columns to use. The other columns of the table are ignored.
+    :param api: The WikibaseIntegrator instance of the items, a new one by default, shared by the items
+    :param chunk_size: The number of rows processed at once when the table is an iterable of rows
+    """
+
+    def __init__(self, columns: list[Column], api: WikibaseIntegrator | None = None, chunk_size: int = 10000):
+        names = {column.name for column in columns}
+        claim_names = {column.name for column in columns if column.role == ColumnRole.CLAIM}
+        for column in columns:
+            if column.of is not None and column.of not in claim_names:
+                raise ValueError(f"The column '{column.name}' refers to '{column.of}', which is not a claim column")
+        if len(names) != len(columns):
+            raise ValueError('The names of the columns must be unique')
+
+        self.columns = columns
+        self.api = api or WikibaseIntegrator()
+        self.chunk_size = chunk_size
+
+    def payloads(self, table: Any) -> Iterator[dict[str, Any]]:
+        """
+        Build the JSON of the items, as sent to ``wbeditentity``.
+
+        :param table: A pandas DataFrame, an Arrow table, a dict of columns or an iterable of rows
+        :return: An iterator of dicts, one per row
+        """
+        claim_columns = [column for column in self.columns if column.role == ColumnRole.CLAIM]
+        qualifier_columns = {column.name: [qualifier for qualifier in self.columns if qualifier.role == ColumnRole.QUALIFIER and qualifier.of == column.name]
+                             for column in claim_columns}
+        reference_columns = {column.name: [reference for reference in self.columns if reference.role == ColumnRole.REFERENCE and reference.of in (column.name, None)]
+                             for column in claim_columns}
+        id_columns = [column for column in self.columns if column.role == ColumnRole.ID]
+        term_columns = [column for column in self.columns if column.role in TERM_ROLES]
+
+        for chunk in self._chunks(table):
+            cells = {column.name: self._format_column(column, chunk[column.name]) for column in self.columns}
+            rows = len(cells[self.columns[0].name]) if self.columns else 0
+
+            for row in range(rows):
+                json_data: dict[str, Any] = {'type': 'item'}
+                for column in id_columns:
+                    if cells[column.name][row] is not None:
+                        json_data['id'] = cells[column.name][row]
+
+                for column in term_columns:
+                    value = cells[column.name][row]
+                    if value is None:
+                        continue
+                    terms = json_data.setdefault(TERM_ROLES[column.role], {})
+                    if column.role == ColumnRole.ALIAS:
+                        aliases = terms.setdefault(column.language, [])
+                        aliases.extend({'language': column.language, 'value': alias} for alias in value)
+                    else:
+                        terms[column.language] = {'language': column.language, 'value': value}
+
+                claims: dict[str, list] = {}
+                for column in claim_columns:
+                    mainsnak = cells[column.name][row]
+                    if mainsnak is None:
+                        continue
+                    claim: dict[str, Any] = {'mainsnak': mainsnak, 'type': 'statement', 'rank': 'normal'}
+                    qualifiers = _group_snaks(cells[qualifier.name][row] for qualifier in qualifier_columns[column.name])
+                    if qualifiers:
+                        claim['qualifiers'] = qualifiers
+                        claim['qualifiers-order'] = list(qualifiers)
+                    reference = _group_snaks(cells[reference.name][row] for reference in reference_columns[column.name])
+                    if reference:
+                        claim['references'] = [{'snaks': reference, 'snaks-order': list(reference)}]
+                    claims.setdefault(str(column.prop_nr), []).append(claim)
+                if claims:
+                    json_data['claims'] = claims
+
+                yield json_data
+
+    def entities(self, table: Any) -> Iterator[ItemEntity]:
+        """
+        Build the items. They are loaded lazily from their JSON, see :func:`payloads`.
+
+        :param table: A pandas DataFrame, an Arrow table, a dict of columns or an iterable of rows
+        :return: An iterator of ItemEntity, one per row
+        """
+        for json_data in self.payloads(table):
+            yield ItemEntity(api=self.api).from_json(json_data, lazy=True, trusted=True)
+
+    def _chunks(self, table: Any) -> Iterator[Mapping[str, list]]:
+        """Split the table into dicts of columns."""
+        names = [column.name for column in self.columns]
+        if hasattr(table, 'to_batches'):  # Arrow table
+            for batch in table.to_batches():
+                yield batch.select(names).to_pydict()
+        elif hasattr(table, 'to_pydict'):  # Arrow record batch
+            yield table.select(names).to_pydict()
+        elif hasattr(table, 'columns') and hasattr(table, 'to_dict'):  # pandas DataFrame
+            yield {name: table[name].tolist() for name in names}
+        elif isinstance(table, Mapping):
+            yield {name: list(table[name]) for name in names}
+        else:
+            yield from self._row_chunks(table, names)
+
+    def _row_chunks(self, rows: Iterable[Mapping[str, Any]], names: list[str]) -> Iterator[Mapping[str, list]]:
+        chunk: dict[str, list] = {name: [] for name in names}
+        size = 0
+        for row in rows:
+            for name in names:
+                chunk[name].append(row.get(name))
+            size += 1
+            if size >= self.chunk_size:
+                yield chunk
+                chunk = {name: [] for name in names}
+                size = 0
+        if size > 0:
+            yield chunk
+
+    @staticmethod
+    def _format_column(column: Column, values: list) -> list:
+        """
+        Validate and format the cells of a column: the JSON of the snaks, the term values or the ids, None for the
+        empty cells. Each distinct value is formatted once.
+        """
+        if column.role == ColumnRole.ALIAS:
+            return [None if _is_missing(value) else [str(alias) for alias in value] if isinstance(value, list) else [str(value)] for value in values]
+        if column.datatype is None:
+            return [None if _is_missing(value) else str(value) for value in values]
+
+        template = column.datatype(prop_nr=column.prop_nr)
+        dtype = column.datatype.DTYPE
+        snaks: dict[Any, dict] = {}
+        cells: list[dict | None] = []
+        for index, value in enumerate(values):
+            if _is_missing(value):
+                cells.append(None)
+                continue
+
+            key = _cell_key(value)
+            snak = snaks.get(key) if key is not None else None
+            if snak is None:
+                try:
+                    if isinstance(value, dict):
+                        template.set_value(**{**column.kwargs, **value})
+                    else:
+                        template.set_value(**{**column.kwargs, str(column.argument): value})
+                except (ValueError, TypeError, AssertionError) as error:
+                    raise ValueError(f"Invalid value {value!r} in the column '{column.name}', row {index}: {error}") from error
+                snak = {'snaktype': 'value', 'property': column.prop_nr, 'datavalue': template.mainsnak.datavalue, 'datatype': dtype}
+                if key is not None:
+                    snaks[key] = snak
+            cells.append(snak)
+
+        return cells
+
+
+def _is_missing(value: Any) -> bool:
+    """An empty cell: None, an empty string or NaN."""
+    return value is None or (isinstance(value, str) and not value) or (isinstance(value, float) and math.isnan(value))
+
+
+def _cell_key(value: Any) -> Any:
+    """The key of the value of a cell among the formatted values, None if it is not hashable."""
+    key = (value.__class__, tuple(sorted(value.items())) if isinstance(value, dict) else value)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _group_snaks(snaks: Iterable[dict | None]) -> dict[str, list]:
+    """Group the snaks by property, in the JSON format of the qualifiers and of the references."""
+    grouped: dict[str, list] = {}
+    for snak in snaks:
+        if snak is not None:
+            grouped.setdefault(snak['property'], []).append(snak)
+    return grouped
@@ -0,0 +1,126 @@
+"""
+Local cache of the HTTP responses of the read endpoints of a Wikibase instance, validated with conditional requests.
+
+A cached response is sent back to the server with its validators (If-None-Match for the ETag, If-Modified-Since for the
+Last-Modified date). If the entity did not change, the server, or the CDN in front of it, answers 304 Not Modified
+without a body and the cached response is used.
+"""
+from __future__ import annotations
+
+import collections
+import threading
+from typing import Any
+
+
+class CachedResponse:
+    """
+    The body of a response and its validators.
+
+    :param content: The raw body of the response
+    :param etag: The value of the ETag header
+    :param last_modified: The value of the Last-Modified header
+    """
+    __slots__ = ('content', 'etag', 'last_modified')
+
+    def __init__(self, content: bytes, etag: str | None = None, last_modified: str | None = None):
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def validators(self) -> dict[str, str]:
+        """The headers of a conditional request revalidating this response."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    A thread-safe cache of responses by URL, evicting the least recently used ones.
+
+    The raw bodies are stored, not the parsed JSON, so an entity loaded from the cache never shares its data with another one.
+
+    :param max_size: The maximum number of responses kept, None for no limit
+    """
+    __slots__ = ('max_size', 'hits', 'misses', '_responses', '_lock')
+
+    def __init__(self, max_size: int | None = 1000):
+        if max_size is not None and max_size < 1:
+            raise ValueError('max_size must be greater than 0')
+        self.max_size = max_size
+        # The number of responses served from the cache, and fetched from the server
+        self.hits = 0
+        self.misses = 0
+        self._responses: collections.OrderedDict[str, CachedResponse] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> CachedResponse | None:
+        """
+        Return the cached response of a URL.
+
+        :param url: The URL of the request, with its parameters
+        :return: The cached response, or None
+        """
+        with self._lock:
+            response = self._responses.get(url)
+            if response is not None:
+                self._responses.move_to_end(url)
+            return response
+
+    def set(self, url: str, response: CachedResponse) -> None:
+        """
+        Store the response of a URL.
+
+        :param url: The URL of the request, with its parameters
+        :param response: The response to store
+        """
+        with self._lock:
+            self._responses[url] = response
+            self._responses.move_to_end(url)
+            if self.max_size is not None:
+                while len(self._responses) > self.max_size:
+                    self._responses.popitem(last=False)
+
+    def record_hit(self) -> None:
+        """Count a response served from the cache."""
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self) -> None:
+        """Count a response fetched from the server."""
+        with self._lock:
+            self.misses += 1
+
+    def remove(self, url: str) -> None:
+        """
+        Remove the response of a URL, if any.
+
+        :param url: The URL of the request, with its parameters
+        """
+        with self._lock:
+            self._responses.pop(url, None)
+
+    def clear(self) -> None:
+        """Remove all the responses."""
+        with self._lock:
+            self._responses.clear()
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def __contains__(self, url: object) -> bool:
+        return url in self._responses
+
+    def __getstate__(self) -> dict[str, Any]:
+        # The lock can't be pickled, e.g. with the WikibaseIntegrator instance of an entity sent to a process pool
+        return {'max_size': self.max_size, 'responses': list(self._responses.items())}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(state['max_size'])  # type: ignore[misc]  # pylint: disable=unnecessary-dunder-call
+        self._responses.update(state['responses'])
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {len(self)} responses, {self.hits} hits, {self.misses} misses>'
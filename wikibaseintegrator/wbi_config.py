@@ -13,6 +13,11 @@ USER_AGENT:        Complementary user agent string used for http requests. Both
 TIMEOUT:           Timeout (in seconds) passed to every HTTP request, either a single value or a (connect, read) tuple.
                    Prevents a silent/unresponsive server from blocking the process indefinitely.
                    Set to None to disable (wait forever). Default: (5, 300)
+EDIT_CONFLICT_RETRIES: maximum number of times the changes of an entity are applied again on its last revision after an
+                   edit conflict, with the REBASE conflict policy. Default: 3
+STATEMENT_LEVEL_MAX_EDITS: maximum number of edits of a write of the changes of an entity at the statement level, chosen
+                   automatically instead of a wbeditentity call sending the whole entity. Such a write is not atomic.
+                   Default: 0 (disabled)
 """
 
 from typing import Any
@@ -29,9 +34,12 @@ config: dict[str, Any] = {
     'MEDIAWIKI_API_URL': 'https://www.wikidata.org/w/api.php',
     'MEDIAWIKI_INDEX_URL': 'https://www.wikidata.org/w/index.php',
     'MEDIAWIKI_REST_URL': 'https://www.wikidata.org/w/rest.php',
+    'ENTITY_DATA_URL': 'https://www.wikidata.org/wiki/Special:EntityData',
     'SPARQL_ENDPOINT_URL': 'https://query.wikidata.org/sparql',
     'WIKIBASE_URL': 'http://www.wikidata.org',
     'DEFAULT_LANGUAGE': 'en',
     'DEFAULT_LEXEME_LANGUAGE': 'Q1860',
-    'SPARQL_QUERY_LIMIT': 10000
+    'SPARQL_QUERY_LIMIT': 10000,
+    'EDIT_CONFLICT_RETRIES': 3,
+    'STATEMENT_LEVEL_MAX_EDITS': 0
 }
@@ -0,0 +1,385 @@
+"""
+Structural comparison of two versions of an entity.
+
+:func:`diff` compares an entity, usually the one fetched from the Wikibase instance, with another version of it, usually
+the one built locally, and returns an :class:`EntityDiff`: the claims added, removed or changed by property, the terms
+changed by language, the sitelinks changed and, for the lexemes, the forms and senses changed. The claims are matched
+with their fingerprints and their ids, and the qualifiers and references with their hashes, without comparing every
+pair of claims.
+
+The result can be logged with ``str()`` and converted with :func:`EntityDiff.get_json` to the minimal data of a
+``wbeditentity`` call applying the changes.
+"""
+from __future__ import annotations
+
+import json
+from collections import Counter
+from collections.abc import Callable, Hashable, Iterable, MutableMapping
+from typing import Any
+
+from wikibaseintegrator.models.basemodel import LazyDict
+from wikibaseintegrator.models.claims import Claim, Claims
+from wikibaseintegrator.models.language_values import LanguageValues
+from wikibaseintegrator.models.sitelinks import Sitelink, Sitelinks
+from wikibaseintegrator.models.snaks import Snak
+from wikibaseintegrator.wbi_enums import WikibaseSnakType
+
+# The fields of terms, by attribute, with their key in the JSON of the entity
+TERM_FIELDS = {
+    'labels': 'labels',
+    'descriptions': 'descriptions',
+    'lemmas': 'lemmas',
+    'representations': 'representations',
+    'glosses': 'glosses'
+}
+
+# The other fields compared as a whole, by attribute, with their key in the JSON of the entity
+VALUE_FIELDS = {
+    'lexical_category': 'lexicalCategory',
+    'language': 'language',
+    'grammatical_features': 'grammaticalFeatures'
+}
+
+
+class ClaimChange:
+    """
+    A claim of the old entity matched with a different claim of the new entity, by id or by value. The qualifiers and
+    the references added or removed are matched with their hashes.
+    """
+    __slots__ = ('old', 'new', 'qualifiers_added', 'qualifiers_removed', 'references_added', 'references_removed')
+
+    def __init__(self, old: Claim, new: Claim):
+        self.old = old
+        self.new = new
+        self.qualifiers_added: list[Snak] = _difference(new.qualifiers, old.qualifiers, lambda snak: snak.computed_hash)
+        self.qualifiers_removed: list[Snak] = _difference(old.qualifiers, new.qualifiers, lambda snak: snak.computed_hash)
+        self.references_added = _difference(new.references, old.references, lambda reference: reference.computed_hash)
+        self.references_removed = _difference(old.references, new.references, lambda reference: reference.computed_hash)
+
+    @property
+    def value_changed(self) -> bool:
+        """True if the main snak changed."""
+        return self.old.get_fingerprint()[:2] != self.new.get_fingerprint()[:2]
+
+    @property
+    def rank_changed(self) -> bool:
+        """True if the rank changed."""
+        return self.old.rank != self.new.rank
+
+    def get_json(self) -> dict[str, Any]:
+        """
+        Return the JSON of the new claim, with the id of the old one so that the instance updates it.
+        """
+        json_data = self.new.get_json()
+        if self.old.id:
+            json_data['id'] = self.old.id
+        return json_data
+
+    def __str__(self):
+        changes = []
+        if self.value_changed:
+            changes.append(f'{_format_snak(self.old.mainsnak)} -> {_format_snak(self.new.mainsnak)}')
+        else:
+            changes.append(_format_snak(self.new.mainsnak))
+        if self.rank_changed:
+            changes.append(f'rank {self.old.rank.value} -> {self.new.rank.value}')
+        changes.extend(f'+qualifier {qualifier.property_number}: {_format_snak(qualifier)}' for qualifier in self.qualifiers_added)
+        changes.extend(f'-qualifier {qualifier.property_number}: {_format_snak(qualifier)}' for qualifier in self.qualifiers_removed)
+        changes.extend(f'+reference {reference.computed_hash}' for reference in self.references_added)
+        changes.extend(f'-reference {reference.computed_hash}' for reference in self.references_removed)
+        return ', '.join(changes)
+
+
+class EntityDiff:
+    """
+    The changes between two versions of an entity, or of a form or a sense of a lexeme. Build it with :func:`diff`.
+
+    The claims are grouped by property. The terms (labels, descriptions, lemmas, representations and glosses) are
+    grouped by field, then by language, with the old and the new value, None if absent. The aliases are grouped by
+    language, with the aliases removed and the aliases added. The sitelinks are grouped by site, with the old and the
+    new sitelink, None if absent. The forms and senses changed are described by an EntityDiff of their own.
+    """
+    __slots__ = ('old', 'new', 'claims_added', 'claims_removed', 'claims_changed', 'terms', 'aliases', 'sitelinks', 'values', 'forms_added', 'forms_removed',
+                 'forms_changed', 'senses_added', 'senses_removed', 'senses_changed')
+
+    def __init__(self, old: Any, new: Any):
+        self.old = old
+        self.new = new
+        self.claims_added: dict[str, list[Claim]] = {}
+        self.claims_removed: dict[str, list[Claim]] = {}
+        self.claims_changed: dict[str, list[ClaimChange]] = {}
+        self.terms: dict[str, dict[str, tuple[str | None, str | None]]] = {}
+        self.aliases: dict[str, tuple[list[str], list[str]]] = {}
+        self.sitelinks: dict[str, tuple[Sitelink | None, Sitelink | None]] = {}
+        self.values: dict[str, tuple[Any, Any]] = {}
+        self.forms_added: list = []
+        self.forms_removed: list = []
+        self.forms_changed: dict[str, EntityDiff] = {}
+        self.senses_added: list = []
+        self.senses_removed: list = []
+        self.senses_changed: dict[str, EntityDiff] = {}
+
+    @property
+    def properties(self) -> list[str]:
+        """The properties with claims added, removed or changed."""
+        return list(dict.fromkeys([*self.claims_added, *self.claims_removed, *self.claims_changed]))
+
+    def get_json(self) -> dict[str, Any]:
+        """
+        Return the minimal data of a ``wbeditentity`` call changing the old entity into the new one: only the changed
+        claims, terms, sitelinks, forms and senses are sent, with the ``remove`` and ``add`` markers of the API.
+
+        :return: A dict, empty if there is no change
+        """
+        json_data: dict[str, Any] = {}
+
+        claims: dict[str, list] = {}
+        for property_number in self.properties:
+            claims_json = [change.get_json() for change in self.claims_changed.get(property_number, [])]
+            claims_json.extend(claim.get_json() for claim in self.claims_added.get(property_number, []))
+            claims_json.extend({'id': claim.id, 'remove': ''} for claim in self.claims_removed.get(property_number, []) if claim.id and not claim.new)
+            if claims_json:
+                claims[property_number] = claims_json
+        if claims:
+            json_data['claims'] = claims
+
+        for field, changes in self.terms.items():
+            json_data[TERM_FIELDS[field]] = {
+                language: {'language': language, 'value': new} if new is not None else {'language': language, 'remove': ''} for language, (_, new) in changes.items()
+            }
+
+        if self.aliases:
+            json_data['aliases'] = {
+                language: [{'language': language, 'value': value, 'remove': ''} for value in removed] + [{'language': language, 'value': value, 'add': ''} for value in added]
+                for language, (removed, added) in self.aliases.items()
+            }
+
+        if self.sitelinks:
+            json_data['sitelinks'] = {
+                site: {'site': site, 'title': new.title, 'badges': new.badges} if new is not None else {'site': site, 'remove': ''} for site, (_, new) in self.sitelinks.items()
+            }
+
+        for field, (_, new) in self.values.items():
+            json_data[VALUE_FIELDS[field]] = new
+
+        for key, added, removed, changed in (('forms', self.forms_added, self.forms_removed, self.forms_changed),
+                                              ('senses', self.senses_added, self.senses_removed, self.senses_changed)):
+            sub_entities_json = [{'id': sub_entity_id, **sub_diff.get_json()} for sub_entity_id, sub_diff in changed.items()]
+            sub_entities_json.extend(sub_entity.get_json() for sub_entity in added)
+            sub_entities_json.extend({'id': sub_entity.id, 'remove': ''} for sub_entity in removed if sub_entity.id)
+            if sub_entities_json:
+                json_data[key] = sub_entities_json
+
+        return json_data
+
+    def __bool__(self):
+        return bool(self.claims_added or self.claims_removed or self.claims_changed or self.terms or self.aliases or self.sitelinks or self.values or self.forms_added
+                    or self.forms_removed or self.forms_changed or self.senses_added or self.senses_removed or self.senses_changed)
+
+    def __str__(self):
+        return '\n'.join(self._lines()) or 'no change'
+
+    def _lines(self) -> list[str]:
+        """Return one line per change, for the logs."""
+        lines: list[str] = []
+        for property_number in self.properties:
+            lines.extend(f'+ {property_number}: {_format_snak(claim.mainsnak)}' for claim in self.claims_added.get(property_number, []))
+            lines.extend(f'- {property_number}: {_format_snak(claim.mainsnak)}' for claim in self.claims_removed.get(property_number, []))
+            lines.extend(f'~ {_join(property_number, change.old.id)}: {change}' for change in self.claims_changed.get(property_number, []))
+        for field, changes in self.terms.items():
+            lines.extend(f'~ {field}[{language}]: {old!r} -> {new!r}' for language, (old, new) in changes.items())
+        for language, (removed_values, added_values) in self.aliases.items():
+            lines.extend(f'- aliases[{language}]: {value!r}' for value in removed_values)
+            lines.extend(f'+ aliases[{language}]: {value!r}' for value in added_values)
+        for site, (old_sitelink, new_sitelink) in self.sitelinks.items():
+            lines.append(f'~ sitelinks[{site}]: {_format_sitelink(old_sitelink)} -> {_format_sitelink(new_sitelink)}')
+        lines.extend(f'~ {field}: {old!r} -> {new!r}' for field, (old, new) in self.values.items())
+        sub_entities: list[tuple[str, list, list, dict[str, EntityDiff]]] = [('form', self.forms_added, self.forms_removed, self.forms_changed),
+                                                                             ('sense', self.senses_added, self.senses_removed, self.senses_changed)]
+        for kind, added, removed, changed in sub_entities:
+            lines.extend(f'+ {_join(kind, sub_entity.id)}' for sub_entity in added)
+            lines.extend(f'- {_join(kind, sub_entity.id)}' for sub_entity in removed)
+            for sub_entity_id, sub_diff in changed.items():
+                lines.extend(f'{sub_entity_id} {line}' for line in sub_diff._lines())  # pylint: disable=protected-access
+        return lines
+
+
+def diff(old: Any, new: Any) -> EntityDiff:
+    """
+    Compare two versions of an entity, or of a form or a sense of a lexeme.
+
+    The claims of each property are matched in three passes, each one with a dict: the claims identical in both
+    versions, then the claims with the same id, then the claims with the same value. The matched claims which differ
+    are changed, the other claims are added or removed. The claims, terms and senses marked as removed in the new
+    version are considered absent. The forms and senses are matched by id.
+
+    :param old: The old version, usually the entity fetched from the Wikibase instance
+    :param new: The new version, usually the entity built locally
+    :return: An EntityDiff
+    """
+    if not isinstance(new, old.__class__) and not isinstance(old, new.__class__):
+        raise TypeError(f"Can't compare a '{type(old)}' with a '{type(new)}'")
+
+    entity_diff = EntityDiff(old, new)
+
+    if isinstance(getattr(old, 'claims', None), Claims):
+        _diff_claims(entity_diff, old.claims, new.claims)
+
+    for field in TERM_FIELDS:
+        if isinstance(getattr(old, field, None), LanguageValues):
+            changes = _diff_terms(getattr(old, field), getattr(new, field))
+            if changes:
+                entity_diff.terms[field] = changes
+
+    if hasattr(old, 'aliases'):
+        old_aliases, new_aliases = _alias_values(old.aliases.aliases), _alias_values(new.aliases.aliases)
+        for language in dict.fromkeys([*old_aliases, *new_aliases]):
+            removed = _difference(old_aliases.get(language, []), new_aliases.get(language, []), str)
+            added = _difference(new_aliases.get(language, []), old_aliases.get(language, []), str)
+            if removed or added:
+                entity_diff.aliases[language] = (removed, added)
+
+    if isinstance(getattr(old, 'sitelinks', None), Sitelinks):
+        old_sitelinks, new_sitelinks = old.sitelinks.sitelinks, new.sitelinks.sitelinks
+        for site in dict.fromkeys([*old_sitelinks, *new_sitelinks]):
+            old_sitelink, new_sitelink = old_sitelinks.get(site), new_sitelinks.get(site)
+            if _sitelink_key(old_sitelink) != _sitelink_key(new_sitelink):
+                entity_diff.sitelinks[site] = (old_sitelink, new_sitelink)
+
+    for field in VALUE_FIELDS:
+        if hasattr(old, field) and getattr(old, field) != getattr(new, field):
+            entity_diff.values[field] = (getattr(old, field), getattr(new, field))
+
+    if hasattr(old, 'forms'):
+        entity_diff.forms_added, entity_diff.forms_removed, entity_diff.forms_changed = _diff_sub_entities(old.forms.forms, new.forms.forms)
+
+    if hasattr(old, 'senses'):
+        entity_diff.senses_added, entity_diff.senses_removed, entity_diff.senses_changed = _diff_sub_entities(old.senses.senses, new.senses.senses)
+
+    return entity_diff
+
+
+def _diff_claims(entity_diff: EntityDiff, old_claims: Claims, new_claims: Claims) -> None:
+    for property_number in dict.fromkeys([*old_claims.claims, *new_claims.claims]):
+        if _same_raw(old_claims.claims, new_claims.claims, property_number):
+            continue
+        old_list = [claim for claim in old_claims.get(property_number) if not claim.removed]
+        new_list = [claim for claim in new_claims.get(property_number) if not claim.removed]
+
+        _, old_list, new_list = _match(old_list, new_list, lambda claim: claim.get_fingerprint(include_references=True, include_rank=True))
+        if not old_list and not new_list:
+            continue
+
+        by_id, old_list, new_list = _match(old_list, new_list, lambda claim: claim.id or None)
+        by_value, old_list, new_list = _match(old_list, new_list, lambda claim: claim.get_fingerprint()[:2])
+
+        if by_id or by_value:
+            entity_diff.claims_changed[property_number] = [ClaimChange(old, new) for old, new in by_id + by_value]
+        if new_list:
+            entity_diff.claims_added[property_number] = new_list
+        if old_list:
+            entity_diff.claims_removed[property_number] = old_list
+
+
+def _same_raw(old_values: MutableMapping, new_values: MutableMapping, key: str) -> bool:
+    """Check if two lazy dicts share the same JSON, not built yet, for a key: the entities were loaded from the same JSON and the values are unchanged."""
+    return (isinstance(old_values, LazyDict) and isinstance(new_values, LazyDict) and old_values.is_raw(key) and new_values.is_raw(key)
+            and old_values.get_raw(key) is new_values.get_raw(key))
+
+
+def _diff_terms(old_terms: LanguageValues, new_terms: LanguageValues) -> dict[str, tuple[str | None, str | None]]:
+    old_values, new_values = _term_values(old_terms), _term_values(new_terms)
+    return {language: (old_values.get(language), new_values.get(language)) for language in dict.fromkeys([*old_values, *new_values])
+            if old_values.get(language) != new_values.get(language)}
+
+
+def _diff_sub_entities(old_list: list, new_list: list) -> tuple[list, list, dict[str, EntityDiff]]:
+    """Match the forms or the senses of two lexemes by id."""
+    old_by_id = {sub_entity.id: sub_entity for sub_entity in old_list if not getattr(sub_entity, 'removed', False)}
+    new_list = [sub_entity for sub_entity in new_list if not getattr(sub_entity, 'removed', False)]
+    new_ids = {sub_entity.id for sub_entity in new_list if sub_entity.id}
+
+    added = []
+    changed: dict[str, EntityDiff] = {}
+    for sub_entity in new_list:
+        if sub_entity.id in old_by_id:
+            sub_diff = diff(old_by_id[sub_entity.id], sub_entity)
+            if sub_diff:
+                changed[sub_entity.id] = sub_diff
+        else:
+            added.append(sub_entity)
+
+    removed = [sub_entity for sub_entity_id, sub_entity in old_by_id.items() if sub_entity_id not in new_ids]
+    return added, removed, changed
+
+
+def _match(old_list: list, new_list: list, key: Callable[[Any], Hashable]) -> tuple[list[tuple[Any, Any]], list, list]:
+    """
+    Pair the items of two lists with the same key, in order. An item with a None key is never paired.
+
+    :return: The pairs, the old items left and the new items left
+    """
+    candidates: dict[Hashable, list] = {}
+    for item in old_list:
+        item_key = key(item)
+        if item_key is not None:
+            candidates.setdefault(item_key, []).append(item)
+
+    pairs = []
+    new_left = []
+    for item in new_list:
+        item_key = key(item)
+        if item_key is not None and candidates.get(item_key):
+            pairs.append((candidates[item_key].pop(0), item))
+        else:
+            new_left.append(item)
+
+    paired = {id(old) for old, _ in pairs}
+    return pairs, [item for item in old_list if id(item) not in paired], new_left
+
+
+def _difference(items: Iterable, other_items: Iterable, key: Callable[[Any], Hashable]) -> list:
+    """Return the items absent from other_items, by key, with their multiplicity."""
+    counts = Counter(key(item) for item in other_items)
+    difference = []
+    for item in items:
+        item_key = key(item)
+        if counts[item_key] > 0:
+            counts[item_key] -= 1
+        else:
+            difference.append(item)
+    return difference
+
+
+def _term_values(terms: LanguageValues) -> dict[str, str]:
+    return {language: term.value for language, term in terms.values.items() if not term.removed and term.value is not None}
+
+
+def _alias_values(aliases: Any) -> dict[str, list[str]]:
+    return {language: [alias.value for alias in language_aliases if not alias.removed] for language, language_aliases in aliases.items()}
+
+
+def _sitelink_key(sitelink: Sitelink | None) -> tuple | None:
+    return None if sitelink is None else (sitelink.title, frozenset(sitelink.badges))
+
+
+def _join(*parts: str | None) -> str:
+    return ' '.join(part for part in parts if part)
+
+
+def _format_snak(snak: Snak) -> str:
+    if snak.snaktype != WikibaseSnakType.KNOWN_VALUE:
+        return snak.snaktype.value
+    value = (snak.datavalue or {}).get('value')
+    if isinstance(value, dict):
+        for key in ('id', 'text', 'time', 'amount'):
+            if key in value:
+                return str(value[key])
+        return json.dumps(value, sort_keys=True)
+    return str(value)
+
+
+def _format_sitelink(sitelink: Sitelink | None) -> str:
+    if sitelink is None:
+        return 'None'
+    return repr(sitelink.title) + (f' {sorted(sitelink.badges)}' if sitelink.badges else '')
@@ -0,0 +1,245 @@
+"""
+Streaming reader of the JSON dumps of a Wikibase instance, like https://dumps.wikimedia.org/wikidatawiki/entities/.
+
+A dump is a JSON array with one entity per line, optionally compressed with gzip or bzip2. The reader streams the lines
+without loading the dump in memory, filters them by entity type, ID or property, and parses the matching ones into
+entity objects, optionally in a process pool.
+
+The filter is applied in two steps. A cheap byte-level prefilter runs on the raw line before it is parsed: it reads the
+type and the ID at the head of the line, and looks for the quoted IDs of the properties. It may keep a line that does not
+match, never the opposite. The exact filter then runs on the parsed JSON.
+"""
+from __future__ import annotations
+
+import bz2
+import collections
+import gzip
+import json
+import os
+import re
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import AbstractContextManager, nullcontext
+from typing import IO, Any
+
+from wikibaseintegrator.entities.baseentity import BaseEntity
+from wikibaseintegrator.wikibaseintegrator import WikibaseIntegrator
+
+# The functions opening a dump in binary mode, by file extension
+DUMP_OPENERS: dict[str, Callable[..., Any]] = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open
+}
+
+# The type and the ID of an entity, at the head of its line in a dump. The head is short: the type and the ID come before
+# the terms and the claims, after the page information for the lexemes and the media files.
+HEAD_PATTERN = re.compile(rb'"type"\s*:\s*"([a-z]+)"\s*,\s*"id"\s*:\s*"([^"]+)"')
+HEAD_SIZE = 512
+
+
+class DumpFilter:
+    """
+    A filter of the entities of a dump. An entity matches if it matches each of the given criteria.
+
+    :param entity_types: The types of the entities to keep, like 'item' or 'lexeme'
+    :param ids: The IDs of the entities to keep
+    :param properties: Keep the entities with at least one statement of one of these properties
+    """
+    __slots__ = ('entity_types', 'ids', 'properties', '_property_tokens')
+
+    def __init__(self, entity_types: Iterable[str] | None = None, ids: Iterable[str] | None = None, properties: Iterable[str] | None = None):
+        self.entity_types = frozenset(entity_types) if entity_types is not None else None
+        self.ids = frozenset(str(entity_id).upper() for entity_id in ids) if ids is not None else None
+        self.properties = frozenset(str(prop_nr).upper() for prop_nr in properties) if properties is not None else None
+        self._property_tokens = tuple(f'"{prop_nr}"'.encode() for prop_nr in self.properties) if self.properties is not None else None
+
+    def __bool__(self) -> bool:
+        return self.entity_types is not None or self.ids is not None or self.properties is not None
+
+    def prefilter(self, line: bytes) -> bool:
+        """
+        Check a raw line of a dump before it is parsed.
+
+        :param line: The JSON of an entity
+        :return: False if the entity does not match, True if it may match
+        """
+        if self.entity_types is not None or self.ids is not None:
+            head = HEAD_PATTERN.search(line, 0, HEAD_SIZE)
+            if head and head.group(1).decode() in BaseEntity.etypes:
+                if self.entity_types is not None and head.group(1).decode() not in self.entity_types:
+                    return False
+                if self.ids is not None and head.group(2).decode() not in self.ids:
+                    return False
+
+        if self._property_tokens is not None:
+            return any(token in line for token in self._property_tokens)
+
+        return True
+
+    def match(self, json_data: dict[str, Any]) -> bool:
+        """
+        Check the JSON of an entity.
+
+        :param json_data: The JSON of an entity
+        :return: True if the entity matches
+        """
+        if self.entity_types is not None and json_data.get('type') not in self.entity_types:
+            return False
+        if self.ids is not None and json_data.get('id') not in self.ids:
+            return False
+        if self.properties is not None:
+            claims = json_data.get('claims') or json_data.get('statements') or {}
+            return not self.properties.isdisjoint(claims)
+        return True
+
+
+class DumpReader:
+    """
+    Read the entities of a JSON dump.
+
+    :param dump: The path of the dump, compressed if its extension is .gz or .bz2, or a file object opened in binary
+        mode, like the output of a faster decompressor (lbzip2, pigz) run in a subprocess
+    :param entity_types: The types of the entities to keep, like 'item' or 'lexeme'
+    :param ids: The IDs of the entities to keep
+    :param properties: Keep the entities with at least one statement of one of these properties
+    :param api: The WikibaseIntegrator instance of the entities, a new one by default, shared by the entities
+    """
+
+    def __init__(self, dump: str | os.PathLike | IO[bytes], entity_types: Iterable[str] | None = None, ids: Iterable[str] | None = None,
+                 properties: Iterable[str] | None = None, api: WikibaseIntegrator | None = None):
+        self.dump = dump
+        self.filter = DumpFilter(entity_types=entity_types, ids=ids, properties=properties)
+        self.api = api or WikibaseIntegrator()
+
+    def lines(self) -> Iterator[bytes]:
+        """
+        Stream the JSON of the entities of the dump that pass the prefilter, without parsing them.
+
+        :return: An iterator of the raw lines, without the separating comma
+        """
+        prefilter = self.filter.prefilter if self.filter else None
+        with _open_dump(self.dump) as file:
+            for line in file:
+                line = line.rstrip()
+                if line.endswith(b','):
+                    line = line[:-1]
+                if not line or line in (b'[', b']'):
+                    continue
+                if prefilter is None or prefilter(line):
+                    yield line
+
+    def json(self) -> Iterator[dict[str, Any]]:
+        """
+        Stream the JSON of the matching entities of the dump, parsed in this process.
+
+        :return: An iterator of dicts
+        """
+        for line in self.lines():
+            json_data = json.loads(line)
+            if self.filter.match(json_data):
+                yield json_data
+
+    def entities(self, processes: int | None = 1, ordered: bool = True, chunk_size: int = 1000, lazy: bool = True,
+                 function: Callable[[BaseEntity], Any] | None = None) -> Iterator[Any]:
+        """
+        Stream the matching entities of the dump, as entity objects.
+
+        The lines are read and prefiltered in this process, and parsed and filtered in chunks by a pool of worker
+        processes. The number of chunks in progress is bounded, so the memory used does not depend on the size of the
+        dump. Sending an entity object, or its parsed JSON, from a worker to this process costs more than parsing its line
+        again, so the workers send back the lines of the matching entities, which are parsed here, or the results of the
+        function.
+
+        :param processes: The number of worker processes, os.cpu_count() if None. With 1, the lines are parsed in this
+            process.
+        :param ordered: Return the entities in the order of the dump. Otherwise, each chunk is returned as soon as it is
+            parsed.
+        :param chunk_size: The number of lines sent at once to a worker
+        :param lazy: Load the entities lazily, see :func:`~wikibaseintegrator.entities.baseentity.BaseEntity.from_json`
+        :param function: A function called on each entity in the worker, its result is returned instead of the entity.
+            It must be picklable, e.g. a function defined at the top level of a module. This is where the pool pays off:
+            the work of the function is spread over the workers, and a small result, like an ID or a tuple of values,
+            is cheap to send back.
+        :return: An iterator of entities, or of the results of the function
+        """
+        processes = processes or os.cpu_count() or 1
+        if processes == 1:
+            for json_data in self.json():
+                entity = _parse(json_data, self.api, lazy)
+                yield function(entity) if function else entity
+            return
+
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(self.filter, function)) as executor:
+            pending: collections.deque[Future] = collections.deque()
+            for chunk in _chunks(self.lines(), chunk_size):
+                pending.append(executor.submit(_parse_chunk, chunk))
+                if len(pending) >= processes * 2:
+                    yield from self._results(pending, ordered, lazy if function is None else None)
+            while pending:
+                yield from self._results(pending, ordered, lazy if function is None else None)
+
+    def __iter__(self) -> Iterator[BaseEntity]:
+        return self.entities()
+
+    def _results(self, pending: collections.deque[Future], ordered: bool, lazy: bool | None) -> Iterator[Any]:
+        """
+        Return the results of the first chunk in progress, or of a completed chunk if the order is not kept. Without a
+        function, the lines sent back by the worker are loaded into entities, lazily or not.
+        """
+        if ordered:
+            future = pending.popleft()
+        else:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            future = done.pop()
+            pending.remove(future)
+
+        results = future.result()
+        if lazy is None:
+            yield from results
+        else:
+            for line in results:
+                yield _parse(json.loads(line), self.api, lazy)
+
+
+def _open_dump(dump: str | os.PathLike | IO[bytes]) -> AbstractContextManager[IO[bytes]]:
+    """Open a dump in binary mode. A file object given by the caller is not closed."""
+    if not isinstance(dump, (str, os.PathLike)):
+        return nullcontext(dump)
+    opener = DUMP_OPENERS.get(os.path.splitext(dump)[1], open)
+    return opener(dump, 'rb')
+
+
+def _chunks(lines: Iterator[bytes], chunk_size: int) -> Iterator[list[bytes]]:
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _parse(json_data: dict[str, Any], api: WikibaseIntegrator, lazy: bool) -> BaseEntity:
+    """Create the entity object of the JSON of an entity of a dump."""
+    entity_class = BaseEntity.etypes.get(json_data.get('type', ''), BaseEntity)
+    return entity_class(api=api).from_json(json_data, lazy=lazy, trusted=True)
+
+
+# The state of a worker process, set by _init_worker()
+_worker: dict[str, Any] = {}
+
+
+def _init_worker(dump_filter: DumpFilter, function: Callable[[BaseEntity], Any] | None) -> None:
+    _worker.update(filter=dump_filter, function=function, api=WikibaseIntegrator())
+
+
+def _parse_chunk(chunk: list[bytes]) -> list[Any]:
+    """Filter a chunk of lines in a worker process, return the matching lines or the results of the function."""
+    dump_filter, function, api = _worker['filter'], _worker['function'], _worker['api']
+    results = []
+    for line in chunk:
+        json_data = json.loads(line)
+        if dump_filter.match(json_data):
+            results.append(function(_parse(json_data, api, lazy=True)) if function else line)
+    return results
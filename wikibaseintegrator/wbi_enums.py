@@ -96,3 +96,53 @@ class EntityField(Enum):
     LANGUAGE = auto()
     FORMS = auto()
     SENSES = auto()
+
+
+class ColumnRole(Enum):
+    """
+    The role of a column of a table in the creation of entities with :class:`~wikibaseintegrator.wbi_bulk.BulkBuilder`.
+
+    ID: The id of an existing entity to update.
+    LABEL, DESCRIPTION, ALIAS: A term of the entity, in the language of the column.
+    CLAIM: The value of a claim of the entity.
+    QUALIFIER: The value of a qualifier of the claim of another column.
+    REFERENCE: The value of a snak of the reference block of the claim of another column, or of every claim of the row.
+    """
+    ID = auto()
+    LABEL = auto()
+    DESCRIPTION = auto()
+    ALIAS = auto()
+    CLAIM = auto()
+    QUALIFIER = auto()
+    REFERENCE = auto()
+
+
+class ReadBackend(Enum):
+    """
+    The endpoint used to read the entities, selected per :class:`~wikibaseintegrator.wikibaseintegrator.WikibaseIntegrator` instance.
+
+    ACTION_API: The wbgetentities module of the MediaWiki API, with POST requests.
+    ENTITY_DATA: Special:EntityData, with GET requests which can be served by a CDN and revalidated against a local cache.
+    REST: The Wikibase REST API, with GET requests revalidated against a local cache, for the items and the properties. The
+        other entity types are read with the MediaWiki API.
+    """
+    ACTION_API = 'wbgetentities'
+    ENTITY_DATA = 'Special:EntityData'
+    REST = 'rest'
+
+
+class ConflictPolicy(Enum):
+    """
+    The handling of the edits of an entity made by others since it was read, selected per :class:`~wikibaseintegrator.wikibaseintegrator.WikibaseIntegrator` instance.
+
+    OVERWRITE: Write without the revision the entity was read from. The instance applies the write on its last revision. The default.
+    FAIL: Write with the revision the entity was read from as base revision. The instance merges the changes made since if
+        they don't conflict with the write, otherwise :class:`~wikibaseintegrator.wbi_exceptions.EditConflict` is raised.
+    REBASE: Like FAIL, but on an edit conflict, the changes since the revision the entity was read from are applied again on
+        the last revision and written, up to config['EDIT_CONFLICT_RETRIES'] times. Only the changes of an entity read with
+        lazy=True are known, and only if it is written without clear, limit_claims or fields_to_update: otherwise the
+        conflict is raised, like with FAIL.
+    """
+    OVERWRITE = 'overwrite'
+    FAIL = 'fail'
+    REBASE = 'rebase'
@@ -89,6 +89,25 @@ class NonExistentEntityError(MWApiError):
     pass
 
 
+class EditConflict(MWApiError):
+    """
+    When the API return an 'editconflict' error: the entity was edited since its base revision, and the edits conflict
+    """
+
+
+class PartialWriteError(Exception):
+    """
+    Raised when a write made of several edits, at the statement level, fails after some of the edits were saved: the
+    entity is only partly written. The error of the failed edit is the cause of this one.
+    """
+
+    def __init__(self, entity_id: str, lastrevid: int | None, edits: int):
+        super().__init__(f'The write of {entity_id} failed after {edits} edits saved, up to revision {lastrevid}')
+        self.entity_id = entity_id
+        self.lastrevid = lastrevid
+        self.edits = edits
+
+
 class MaxRetriesReachedException(Exception):
     pass
 
@@ -5,16 +5,27 @@ is actually required, so that a synchronisation bot can skip the entities that a
 from __future__ import annotations
 
 import collections
+import json
 import logging
+import os
+import pickle
 import re
-from collections import defaultdict
+import sys
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import ExitStack
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Any, TypeVar
 
 from wikibaseintegrator.datatypes import BaseDataType
-from wikibaseintegrator.models import Claim, Claims, Qualifiers, Reference, References
+from wikibaseintegrator.models import Aliases, Claim, Claims, LanguageValues, Qualifiers, Reference, References
 from wikibaseintegrator.wbi_config import config
 from wikibaseintegrator.wbi_enums import ActionIfExists, WikibaseRank
 from wikibaseintegrator.wbi_helpers import execute_sparql_query
 
+if TYPE_CHECKING:
+    from wikibaseintegrator.wbi_mirror import EntityMirror, MirrorSource
+
 log = logging.getLogger(__name__)
 
 fastrun_store: list[FastRunContainer] = []
@@ -23,13 +34,41 @@ fastrun_store: list[FastRunContainer] = []
 # with the Wikidata entity Q199 (the number one), whatever the instance.
 UNITLESS_UNIT_URIS = ('1', 'http://www.wikidata.org/entity/Q199', 'https://www.wikidata.org/entity/Q199')
 
+# The RDF predicates holding the language data, by language data type
+LANG_DATA_TYPES = {
+    'label': 'rdfs:label',
+    'description': 'schema:description',
+    'aliases': 'skos:altLabel'
+}
+
+
+# The subclass closures of the property path base filters, computed once and shared by every container:
+# closure key (endpoint, path property and root classes) -> the SPARQL values of the classes
+class_closures: dict[str, tuple[str, ...]] = {}
+
+# The number of classes bound by one VALUES block when a precomputed closure is used, a larger closure is split into
+# several queries
+CLASS_CLOSURE_CHUNK_SIZE = 1000
+
+# A base filter element: a datatype instance, a tuple of alternative values of the same property or a property path
+BaseFilterElement = BaseDataType | tuple[BaseDataType, ...] | list[BaseDataType | tuple[BaseDataType, ...]]
+
+# The qualifiers, the references or the rank of a statement, see FastRunContainer._load_statement_data()
+StatementDataT = TypeVar('StatementDataT')
+
+
+def _sparql_string(value: str) -> str:
+    """Format a Python string as a SPARQL string literal."""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r') + '"'
+
 
 class FastRunContainer:
     """
     A FastRunContainer loads the statements of the entities matching the base filter from the SPARQL endpoint and
     caches them, so that a bot can check whether a write is required without loading every entity through the API.
 
-    :param base_filter: The default filter to initialize the dataset. A list made of BaseDataType or list of BaseDataType.
+    :param base_filter: The default filter to initialize the dataset. A list made of BaseDataType, tuple of BaseDataType
+        (alternative values of the same property) or list of BaseDataType (property path).
     :param base_data_type: The default data type to create objects.
     :param use_qualifiers: Use qualifiers during fastrun. Enabled by default.
     :param use_references: Use references during fastrun. Disabled by default.
@@ -39,17 +78,33 @@ class FastRunContainer:
         qualifiers, references and ranks stays case sensitive. Disabled by default.
     :param sparql_endpoint_url: SPARQL endpoint URL.
     :param wikibase_url: Wikibase URL used for the concept URI.
+    :param base_query: A custom SPARQL graph pattern binding ?entity, added to the base filter. It allows to define a
+        data corpus that can't be expressed with the base filter (UNION, FILTER, MINUS...).
+    :param precompute_closure: Replace the property paths of the base filter by the list of classes they can reach,
+        computed once with one query. The queries bind the classes with VALUES blocks instead of evaluating the path
+        each time, which is much cheaper for deep class hierarchies. Disabled by default.
+    :param closure_file: A JSON file where the precomputed closures are persisted and read back from, so that they are
+        only computed once across runs. Delete the file to compute them again.
+    :param mirror: A local mirror of the entities used as the data source instead of the SPARQL endpoint, see
+        :class:`~wikibaseintegrator.wbi_mirror.EntityMirror`. The base filter is evaluated on the mirror, a custom base
+        query is not supported.
     """
 
     data: dict[str, dict[str, list[dict[str, str]]]]
 
-    def __init__(self, base_filter: list[BaseDataType | list[BaseDataType]], base_data_type: type[BaseDataType] | None = None, use_qualifiers: bool = True,
+    def __init__(self, base_filter: list[BaseFilterElement], base_data_type: type[BaseDataType] | None = None, use_qualifiers: bool = True,
                  use_references: bool = False, use_rank: bool = False, cache: bool = True, case_insensitive: bool = False, sparql_endpoint_url: str | None = None,
-                 wikibase_url: str | None = None):
+                 wikibase_url: str | None = None, base_query: str | None = None, precompute_closure: bool = False, closure_file: str | None = None,
+                 mirror: EntityMirror | None = None):
 
         for k in base_filter:
-            if not isinstance(k, BaseDataType) and not (isinstance(k, list) and len(k) == 2 and isinstance(k[0], BaseDataType) and isinstance(k[1], BaseDataType)):
-                raise ValueError("base_filter must be an instance of BaseDataType or a list of instances of BaseDataType")
+            # The anchor of a property path is checked like a simple element
+            anchor = k[0] if isinstance(k, list) and len(k) == 2 and isinstance(k[1], BaseDataType) else k
+            if not isinstance(anchor, BaseDataType) and not self._is_alternatives(anchor):
+                raise ValueError("base_filter must be an instance of BaseDataType, a tuple of instances of BaseDataType or a list of instances of BaseDataType")
+
+        if mirror is not None and base_query:
+            raise ValueError("A custom base query can't be evaluated on a mirror")
 
         # Statements loaded from the SPARQL endpoint: property number -> value key -> list of {'entity': uri, 'sid': uri}
         self.data: dict[str, dict[str, list[dict[str, str]]]] = {}
@@ -58,9 +113,13 @@ class FastRunContainer:
         self.loaded_complete: set[str] = set()
 
         self.base_filter = base_filter
+        self.base_query = base_query
+        self.precompute_closure = precompute_closure
+        self.closure_file = closure_file
         self.base_data_type = base_data_type or BaseDataType
         self.sparql_endpoint_url = str(sparql_endpoint_url or config['SPARQL_ENDPOINT_URL'])
-        self.wikibase_url = str(wikibase_url or config['WIKIBASE_URL'])
+        self.wikibase_url = str(wikibase_url or (mirror.wikibase_url if mirror is not None else config['WIKIBASE_URL']))
+        self.mirror = mirror
         self.use_qualifiers = use_qualifiers
         self.use_references = use_references
         self.use_rank = use_rank
@@ -74,10 +133,68 @@ class FastRunContainer:
         self._references_cache: dict[str, References] = {}
         self._rank_cache: dict[str, WikibaseRank | None] = {}
 
+        # The value keys of the statements of each entity in self.data: entity ID -> property number -> value keys.
+        # Only built when an entity is updated after a write, see update_entity().
+        self._entity_index: dict[str, dict[str, set[str]]] | None = None
+
+        # The statements and the terms of the entities of the mirror matching the base filter
+        self._mirror_source: MirrorSource | None = None
+        if mirror is not None:
+            from wikibaseintegrator.wbi_mirror import MirrorSource
+            self._mirror_source = MirrorSource(mirror, base_filter, self.wikibase_url, case_insensitive)
+
+        self._init_locks()
+
+    def _init_locks(self) -> None:
+        """
+        Create the locks making the container safe to share between threads: the container lock protects the
+        replacement of the data, the property locks, the language lock and the statement locks serialize the loads so
+        that a property, a language or the data of a statement is only queried once.
+        """
+        self._lock = threading.RLock()
+        self._property_locks: dict[str, threading.Lock] = {}
+        self._language_lock = threading.Lock()
+        # Only while the qualifiers, the references or the rank of the statement are loaded
+        self._statement_locks: dict[str, threading.Lock] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        """The locks can't be pickled, they are created again by __setstate__."""
+        state = self.__dict__.copy()
+        for attribute in ('_lock', '_property_locks', '_language_lock', '_statement_locks'):
+            del state[attribute]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._init_locks()
+
+    @staticmethod
+    def _is_alternatives(k: object) -> bool:
+        """
+        Check if a base filter element is a tuple of alternative values: datatype instances of the same property, all
+        with a value.
+        """
+        return (isinstance(k, tuple) and len(k) > 0 and all(isinstance(x, BaseDataType) and x.mainsnak.datavalue for x in k)
+                and len({x.mainsnak.property_number for x in k}) == 1)
+
+    @property
+    def base_filter_properties(self) -> set[str]:
+        """
+        The property numbers targeted by the base filter. For a property path, the first property is the anchor.
+        """
+        properties = set()
+        for k in self.base_filter:
+            if isinstance(k, list):
+                k = k[0]
+            if isinstance(k, tuple):
+                k = k[0]
+            properties.add(k.mainsnak.property_number)
+        return properties
+
     @staticmethod
     def _entity_id(entity: str) -> str:
-        """Reduce an entity URI to its bare entity ID. A bare entity ID is returned unchanged."""
-        return entity.rsplit('/', 1)[-1]
+        """Reduce an entity URI to its bare entity ID. A bare entity ID is returned unchanged. The ID is interned."""
+        return sys.intern(entity.rsplit('/', 1)[-1])
 
     def _datatype_class(self, property_type: str) -> type[BaseDataType]:
         """
@@ -86,9 +203,8 @@ class FastRunContainer:
         :param property_type: A property type URI from the wikibase ontology
         :exception ValueError: if no class implements the given property type
         """
-        for subclass in self.base_data_type.subclasses:
-            if subclass.PTYPE == property_type:
-                return subclass
+        if property_type in self.base_data_type.ptypes:
+            return self.base_data_type.ptypes[property_type]
         raise ValueError(f"No data type class found for the property type '{property_type}'")
 
     @classmethod
@@ -119,20 +235,41 @@ class FastRunContainer:
             value += '@' + self._normalize_unit(datavalue['value'].get('unit', '1'))
         return value
 
-    def _base_filter_string(self, wb_url: str | None = None) -> str:
-        """Generate the SPARQL triples restricting ?entity to the entities matching the base filter."""
+    def _base_filter_string(self, wb_url: str | None = None, closure_chunks: dict[int, tuple[str, ...]] | None = None) -> str:
+        """
+        Generate the SPARQL triples restricting ?entity to the entities matching the base filter.
+
+        :param wb_url: The first part of the concept URI of entities.
+        :param closure_chunks: The classes replacing the property path of the base filter elements, by element index.
+        """
         wb_url = wb_url or self.wikibase_url
 
         base_filter_string = ''
-        for k in self.base_filter:
-            if isinstance(k, BaseDataType):
-                # TODO: Add multiple values for a property (OR-operation) (with the VALUES tag?)
+        for index, k in enumerate(self.base_filter):
+            if closure_chunks and index in closure_chunks:
+                # A precomputed property path: the entity is an instance of one of the classes of the closure
+                assert isinstance(k, list)
+                anchor = k[0][0] if isinstance(k[0], tuple) else k[0]
+                classes = ' '.join(closure_chunks[index])
+                base_filter_string += f'VALUES ?zzclasses{index} {{ {classes} }}\n'
+                base_filter_string += f'?entity <{wb_url}/prop/direct/{anchor.mainsnak.property_number}> ?zzclasses{index} .\n'
+            elif isinstance(k, BaseDataType):
                 if k.mainsnak.datavalue:
                     base_filter_string += '?entity <{wb_url}/prop/direct/{prop_nr}> {entity} .\n'.format(
                         wb_url=wb_url, prop_nr=k.mainsnak.property_number, entity=k.get_sparql_value(wikibase_url=wb_url))
                 elif sum(1 for x in self.base_filter if isinstance(x, BaseDataType) and x.mainsnak.property_number == k.mainsnak.property_number) == 1:
                     base_filter_string += '?entity <{wb_url}/prop/direct/{prop_nr}> ?zz{prop_nr} .\n'.format(
                         wb_url=wb_url, prop_nr=k.mainsnak.property_number)
+            elif self._is_alternatives(k):
+                assert isinstance(k, tuple)
+                # The alternative values of the property (OR-operation), with a VALUES block
+                base_filter_string += self._values_string(k, index, wb_url=wb_url)
+                base_filter_string += f'?entity <{wb_url}/prop/direct/{k[0].mainsnak.property_number}> ?zzvalues{index} .\n'
+            elif isinstance(k, list) and len(k) == 2 and self._is_alternatives(k[0]) and isinstance(k[1], BaseDataType):
+                assert isinstance(k[0], tuple)
+                base_filter_string += self._values_string(k[0], index, wb_url=wb_url)
+                prop_nr, prop_nr2 = k[0][0].mainsnak.property_number, k[1].mainsnak.property_number
+                base_filter_string += f'?entity <{wb_url}/prop/direct/{prop_nr}>/<{wb_url}/prop/direct/{prop_nr2}>* ?zzvalues{index} .\n'
             elif isinstance(k, list) and len(k) == 2 and isinstance(k[0], BaseDataType) and isinstance(k[1], BaseDataType):
                 if k[0].mainsnak.datavalue:
                     base_filter_string += '?entity <{wb_url}/prop/direct/{prop_nr}>/<{wb_url}/prop/direct/{prop_nr2}>* {entity} .\n'.format(
@@ -143,10 +280,127 @@ class FastRunContainer:
                     base_filter_string += '?entity <{wb_url}/prop/direct/{prop_nr1}>/<{wb_url}/prop/direct/{prop_nr2}>* ?zz{prop_nr1}{prop_nr2} .\n'.format(
                         wb_url=wb_url, prop_nr1=k[0].mainsnak.property_number, prop_nr2=k[1].mainsnak.property_number)
             else:
-                raise ValueError("base_filter must be an instance of BaseDataType or a list of instances of BaseDataType")
+                raise ValueError("base_filter must be an instance of BaseDataType, a tuple of instances of BaseDataType or a list of instances of BaseDataType")
+
+        if self.base_query:
+            base_filter_string += self.base_query.strip() + '\n'
 
         return base_filter_string
 
+    def _base_filter_strings(self, wb_url: str | None = None) -> list[str]:
+        """
+        Generate the base filters of the queries loading the data corpus. Without precomputed closures, there is only
+        one. Otherwise, the closures are split into chunks of CLASS_CLOSURE_CHUNK_SIZE classes, one base filter per
+        chunk. Only one closure is split, the one with the fewest chunks, so that the number of queries does not grow
+        with the product of the chunks: the other closures larger than a chunk keep their property path.
+        """
+        wb_url = wb_url or self.wikibase_url
+
+        closures = self._class_closures(wb_url=wb_url)
+        if not closures:
+            return [self._base_filter_string(wb_url=wb_url)]
+
+        small_closures = {index: closure for index, closure in closures.items() if len(closure) <= CLASS_CLOSURE_CHUNK_SIZE}
+        large_closures = {index: closure for index, closure in closures.items() if len(closure) > CLASS_CLOSURE_CHUNK_SIZE}
+        if not large_closures:
+            return [self._base_filter_string(wb_url=wb_url, closure_chunks=small_closures)]
+
+        index, closure = min(large_closures.items(), key=lambda item: len(item[1]))
+        return [self._base_filter_string(wb_url=wb_url, closure_chunks={**small_closures, index: closure[i:i + CLASS_CLOSURE_CHUNK_SIZE]})
+                for i in range(0, len(closure), CLASS_CLOSURE_CHUNK_SIZE)]
+
+    def _class_closures(self, wb_url: str) -> dict[int, tuple[str, ...]]:
+        """
+        The subclass closures of the property paths of the base filter with a value, by element index. Empty if
+        precompute_closure is disabled.
+        """
+        closures: dict[int, tuple[str, ...]] = {}
+        if not self.precompute_closure:
+            return closures
+
+        for index, k in enumerate(self.base_filter):
+            if not isinstance(k, list) or len(k) != 2 or not isinstance(k[1], BaseDataType):
+                continue
+            if self._is_alternatives(k[0]):
+                assert isinstance(k[0], tuple)
+                roots = tuple(str(x.get_sparql_value(wikibase_url=wb_url)) for x in k[0])
+            elif isinstance(k[0], BaseDataType) and k[0].mainsnak.datavalue:
+                roots = (str(k[0].get_sparql_value(wikibase_url=wb_url)),)
+            else:
+                # Without a value, the path does not restrict the corpus more than its first property
+                continue
+            closures[index] = self._class_closure(roots=roots, prop_nr=k[1].mainsnak.property_number, wb_url=wb_url)
+
+        return closures
+
+    def _class_closure(self, roots: tuple[str, ...], prop_nr: str, wb_url: str, limit: int | None = None) -> tuple[str, ...]:
+        """
+        Compute the classes reaching one of the roots through any number of hops of the given property (the roots
+        included). The result is kept in class_closures and in the closure file, if any.
+
+        :param roots: The SPARQL values of the root classes.
+        :param prop_nr: The property of the path, e.g. P279 (subclass of).
+        :param wb_url: The first part of the concept URI of entities.
+        :param limit: The limit to request at one time.
+        :return: The SPARQL values of the classes.
+        """
+        key = ' '.join([self.sparql_endpoint_url, f'{wb_url}/prop/direct/{prop_nr}', *sorted(set(roots))])
+        if key in class_closures:
+            return class_closures[key]
+
+        if self.closure_file and os.path.isfile(self.closure_file):
+            with open(self.closure_file, encoding='utf-8') as file:
+                class_closures.update({closure_key: tuple(closure) for closure_key, closure in json.load(file).items()})
+            if key in class_closures:
+                log.debug("Closure of %s read from '%s'", key, self.closure_file)
+                return class_closures[key]
+
+        limit = limit or int(config['SPARQL_QUERY_LIMIT'])  # type: ignore
+
+        offset = 0
+        classes = dict.fromkeys(roots)
+        while True:
+            query = f'''
+            #Tool: WikibaseIntegrator wbi_fastrun._class_closure
+            SELECT DISTINCT ?class WHERE {{
+              VALUES ?root {{ {' '.join(dict.fromkeys(roots))} }}
+              ?class <{wb_url}/prop/direct/{prop_nr}>* ?root .
+            }}
+            ORDER BY ?class
+            OFFSET {offset}
+            LIMIT {limit}
+            '''
+
+            offset += limit  # We increase the offset for the next iteration
+            results = execute_sparql_query(query=query, endpoint=self.sparql_endpoint_url)['results']['bindings']
+
+            for result in results:
+                if result['class']['type'] == 'uri':
+                    classes[f"<{result['class']['value']}>"] = None
+
+            if len(results) == 0 or len(results) < limit:
+                break
+
+        class_closures[key] = tuple(classes)
+        log.debug("Closure of %s: %s classes", key, len(class_closures[key]))
+
+        if self.closure_file:
+            persisted = {}
+            if os.path.isfile(self.closure_file):
+                with open(self.closure_file, encoding='utf-8') as file:
+                    persisted = json.load(file)
+            persisted[key] = list(class_closures[key])
+            with open(self.closure_file, 'w', encoding='utf-8') as file:
+                json.dump(persisted, file)
+
+        return class_closures[key]
+
+    @staticmethod
+    def _values_string(alternatives: tuple[BaseDataType, ...], index: int, wb_url: str) -> str:
+        """Generate the VALUES block binding the alternative values of a base filter element."""
+        values = ' '.join(dict.fromkeys(str(x.get_sparql_value(wikibase_url=wb_url)) for x in alternatives))
+        return f'VALUES ?zzvalues{index} {{ {values} }}\n'
+
     def load_statements(self, claims: list[Claim] | Claims | Claim, cache: bool | None = None, wb_url: str | None = None, limit: int | None = None) -> None:
         """
         Load the statements related to the given claims into the internal cache of the current object.
@@ -176,40 +430,101 @@ class FastRunContainer:
         for claim in claims:
             prop_nr = claim.mainsnak.property_number
 
-            # Load each property from the Wikibase instance or the cache
-            if cache and prop_nr in self.data and prop_nr in self.loaded_complete:
+            # The cached properties are read without waiting for a reload in progress
+            if cache and prop_nr in self.loaded_complete:
                 log.debug("Property '%s' found in cache, %s elements", prop_nr, len(self.data[prop_nr]))
                 continue
 
-            offset = 0
+            # Single-flight: the threads needing the same property wait for the first load and reuse it
+            with self._property_lock(prop_nr):
+                self._load_property(claim=claim, cache=cache, wb_url=wb_url, limit=limit)
 
-            base_filter_string = self._base_filter_string(wb_url=wb_url)
+    def _property_lock(self, prop_nr: str) -> threading.Lock:
+        """Return the lock serializing the loads of the given property."""
+        with self._lock:
+            return self._property_locks.setdefault(prop_nr, threading.Lock())
 
-            # A partial load restricted to the claim value: only when the cache is disabled, because the result
-            # can't be reused for other values. The case insensitive mode always needs the complete data, the
-            # SPARQL comparison is case sensitive.
-            partial_load = bool(claim.mainsnak.datavalue) and not cache and not self.case_insensitive
+    def _load_statement_data(self, store: dict[str, StatementDataT], sid: str, cache: bool, load: Callable[[], StatementDataT]) -> StatementDataT:
+        """
+        Return the qualifiers, the references or the rank of a statement from their cache, or load them.
 
-            # Restrict the statements to the ones holding the same qualifiers as the claim. Only applied to a
-            # partial load: a complete load must contain every statement, whatever its qualifiers.
-            qualifiers_filter_string = ''
-            if partial_load and self.use_qualifiers:
-                for qualifier in claim.qualifiers:
-                    if not qualifier.datatype:
-                        continue
-                    fake_json = {
-                        'mainsnak': qualifier.get_json(),
-                        'type': qualifier.datatype,
-                        'id': 'Q0',
-                        'rank': 'normal'
-                    }
-                    f = [x for x in self.base_data_type.subclasses if x.DTYPE == qualifier.datatype][0]().from_json(json_data=fake_json)
-                    qualifiers_filter_string += f'?sid pq:{qualifier.property_number} {f.get_sparql_value()}.\n'
-
-            # We force a refresh of the data, remove the previous results
-            self.data[prop_nr] = {}
-            self.loaded_complete.discard(prop_nr)
+        Single-flight, like the properties: the threads needing the same statement wait for the first load and reuse it.
+        The loaded value doesn't replace a value stored meanwhile by :func:`update_entity`, which is more recent.
+
+        :param store: The cache of the data
+        :param sid: The statement URI
+        :param cache: Reuse the value already loaded for this statement
+        :param load: The function loading the value
+        """
+        if cache and sid in store:
+            return store[sid]
+
+        with self._lock:
+            lock = self._statement_locks.setdefault(sid, threading.Lock())
+        try:
+            with lock:
+                if cache and sid in store:
+                    return store[sid]
+                value = load()
+                with self._lock:
+                    if cache and sid in store:
+                        return store[sid]
+                    store[sid] = value
+                    return value
+        finally:
+            with self._lock:
+                if self._statement_locks.get(sid) is lock:
+                    del self._statement_locks[sid]
+
+    def _load_property(self, claim: Claim, cache: bool, wb_url: str, limit: int) -> None:
+        """
+        Load the statements of the property of the given claim, see :func:`load_statements`.
+
+        :param claim: The claim whose property is loaded.
+        :param cache: Reuse the statements already loaded.
+        :param wb_url: The first part of the concept URI of entities.
+        :param limit: The limit to request at one time.
+        """
+        prop_nr = claim.mainsnak.property_number
+
+        # Loaded by another thread in the meantime
+        if cache and prop_nr in self.loaded_complete:
+            return
+
+        if self._mirror_source is not None:
+            self._store_data(prop_nr, self._mirror_source.statements(prop_nr), partial_load=False)
+            return
+
+        base_filter_strings = self._base_filter_strings(wb_url=wb_url)
+
+        # A partial load restricted to the claim value: only when the cache is disabled, because the result
+        # can't be reused for other values. The case insensitive mode always needs the complete data, the
+        # SPARQL comparison is case sensitive.
+        partial_load = bool(claim.mainsnak.datavalue) and not cache and not self.case_insensitive
 
+        # Restrict the statements to the ones holding the same qualifiers as the claim. Only applied to a
+        # partial load: a complete load must contain every statement, whatever its qualifiers.
+        qualifiers_filter_string = ''
+        if partial_load and self.use_qualifiers:
+            for qualifier in claim.qualifiers:
+                if not qualifier.datatype:
+                    continue
+                fake_json = {
+                    'mainsnak': qualifier.get_json(),
+                    'type': qualifier.datatype,
+                    'id': 'Q0',
+                    'rank': 'normal'
+                }
+                f = self.base_data_type.dtypes[qualifier.datatype]().from_json(json_data=fake_json)
+                qualifiers_filter_string += f'?sid pq:{qualifier.property_number} {f.get_sparql_value()}.\n'
+
+        # The statements are loaded apart and replace the previous ones once complete, the readers never see a
+        # partially loaded property
+        data: dict[str, list[dict[str, str]]] = {}
+
+        # One query, paginated, by base filter. A statement can match several of them and is only stored once.
+        for base_filter_string in base_filter_strings:
+            offset = 0
             while True:
                 if partial_load:
                     query = '''
@@ -251,49 +566,86 @@ class FastRunContainer:
                     '''
 
                     # Format the query
-                    # TODO: Add custom query support
                     query = query.format(base_filter_string=base_filter_string, wb_url=wb_url, prop_nr=prop_nr, offset=str(offset), limit=str(limit))
 
                 offset += limit  # We increase the offset for the next iteration
                 results = execute_sparql_query(query=query, endpoint=self.sparql_endpoint_url)['results']['bindings']
 
-                for result in results:
-                    entity = result['entity']['value']
-                    sid = result['sid']['value']
-                    property_type = result['property_type']['value']
-
-                    try:
-                        f = self._datatype_class(property_type)().from_sparql_value(sparql_value=result['value'])
-                    except ValueError as exception:
-                        # A value the data type can't represent (e.g. a timestamp whose precision can't be inferred).
-                        # The value stays out of the dataset, a write will be reported as required for it.
-                        log.warning("Skipping a value of property '%s': %s", prop_nr, exception)
-                        continue
+                self._store_statements(prop_nr=prop_nr, results=results, data=data)
 
-                    if f is None:
-                        # The data type does not implement from_sparql_value() yet
-                        log.warning("The data type of property '%s' does not support from_sparql_value(), skipping the value", prop_nr)
-                        continue
+                if len(results) == 0 or len(results) < limit:
+                    break
 
-                    # The simple value of a quantity does not carry the unit, set it from the value node
-                    if 'unit' in result and isinstance(f.mainsnak.datavalue, dict) and f.mainsnak.datavalue.get('type') == 'quantity':
-                        f.mainsnak.datavalue['value']['unit'] = result['unit']['value']
+        self._store_data(prop_nr, data, partial_load=partial_load)
 
-                    sparql_value = self._value_key(f)
-                    if sparql_value is not None:
-                        if sparql_value not in self.data[prop_nr]:
-                            self.data[prop_nr][sparql_value] = []
+    def _store_data(self, prop_nr: str, data: dict[str, list[dict[str, str]]], partial_load: bool) -> None:
+        """
+        Replace the statements of a property by the ones just loaded. The updates of the entities holding the property
+        wait for the load to be stored, see :func:`update_entity`.
 
-                        if prop_nr not in self.properties_type:
-                            self.properties_type[prop_nr] = property_type
+        :param prop_nr: The property number of the statements.
+        :param data: The statements of the property: value key -> list of {'entity': uri, 'sid': uri}
+        :param partial_load: The statements are restricted to a value, the property is not completely loaded.
+        """
+        with self._lock:
+            self.data[prop_nr] = data
+            if partial_load:
+                self.loaded_complete.discard(prop_nr)
+            else:
+                self.loaded_complete.add(prop_nr)
 
-                        self.data[prop_nr][sparql_value].append({'entity': entity, 'sid': sid})
+            if self._entity_index is not None:
+                for value_key, statements in data.items():
+                    for statement in statements:
+                        self._entity_index.setdefault(self._entity_id(statement['entity']), {}).setdefault(prop_nr, set()).add(value_key)
 
-                if len(results) == 0 or len(results) < limit:
-                    break
+    def _statement_uri(self, statement_id: str) -> str:
+        """The statement URI of the RDF export: the $ separator of the statement ID is replaced by a dash."""
+        return f'{self.wikibase_url}/entity/statement/{statement_id.replace("$", "-", 1)}'
 
-            if not partial_load:
-                self.loaded_complete.add(prop_nr)
+    def _store_statements(self, prop_nr: str, results: list[dict[str, dict]], data: dict[str, list[dict[str, str]]]) -> None:
+        """
+        Store the statements returned by the SPARQL endpoint. A statement matching several base filters is only
+        stored once.
+
+        :param prop_nr: The property number of the statements.
+        :param results: The bindings returned by the SPARQL endpoint
+        :param data: The statements of the property being loaded: value key -> list of {'entity': uri, 'sid': uri}
+        """
+        for result in results:
+            # An entity has many statements, its URI is interned to be shared by them
+            entity = sys.intern(result['entity']['value'])
+            sid = result['sid']['value']
+            property_type = result['property_type']['value']
+
+            try:
+                f = self._datatype_class(property_type)().from_sparql_value(sparql_value=result['value'])
+            except ValueError as exception:
+                # A value the data type can't represent (e.g. a timestamp whose precision can't be inferred).
+                # The value stays out of the dataset, a write will be reported as required for it.
+                log.warning("Skipping a value of property '%s': %s", prop_nr, exception)
+                continue
+
+            if f is None:
+                # The data type does not implement from_sparql_value() yet
+                log.warning("The data type of property '%s' does not support from_sparql_value(), skipping the value", prop_nr)
+                continue
+
+            # The simple value of a quantity does not carry the unit, set it from the value node
+            if 'unit' in result and isinstance(f.mainsnak.datavalue, dict) and f.mainsnak.datavalue.get('type') == 'quantity':
+                f.mainsnak.datavalue['value']['unit'] = result['unit']['value']
+
+            sparql_value = self._value_key(f)
+            if sparql_value is not None:
+                if sparql_value not in data:
+                    data[sparql_value] = []
+
+                if prop_nr not in self.properties_type:
+                    self.properties_type[prop_nr] = property_type
+
+                statement = {'entity': entity, 'sid': sid}
+                if statement not in data[sparql_value]:
+                    data[sparql_value].append(statement)
 
     def _load_qualifiers(self, sid: str, limit: int | None = None, cache: bool | None = None) -> Qualifiers:
         """
@@ -310,8 +662,13 @@ class FastRunContainer:
         if cache is None:
             cache = self.cache
 
-        if cache and sid in self._qualifiers_cache:
-            return self._qualifiers_cache[sid]
+        return self._load_statement_data(self._qualifiers_cache, sid, cache, lambda: self._query_qualifiers(sid, limit=limit))
+
+    def _query_qualifiers(self, sid: str, limit: int | None = None) -> Qualifiers:
+        """Query the qualifiers of a statement from the mirror or from the SPARQL endpoint."""
+        if self._mirror_source is not None:
+            claim = self._mirror_source.claim(sid)
+            return claim.qualifiers if claim else Qualifiers()
 
         offset = 0
 
@@ -358,8 +715,6 @@ class FastRunContainer:
             if len(results) == 0 or len(results) < limit:
                 break
 
-        self._qualifiers_cache[sid] = qualifiers
-
         return qualifiers
 
     def _load_references(self, sid: str, limit: int | None = None, cache: bool | None = None) -> References:
@@ -377,8 +732,13 @@ class FastRunContainer:
         if cache is None:
             cache = self.cache
 
-        if cache and sid in self._references_cache:
-            return self._references_cache[sid]
+        return self._load_statement_data(self._references_cache, sid, cache, lambda: self._query_references(sid, limit=limit))
+
+    def _query_references(self, sid: str, limit: int | None = None) -> References:
+        """Query the references of a statement from the mirror or from the SPARQL endpoint."""
+        if self._mirror_source is not None:
+            claim = self._mirror_source.claim(sid)
+            return claim.references if claim else References()
 
         offset = 0
 
@@ -436,8 +796,6 @@ class FastRunContainer:
         for _, ref in reference.items():
             references.add(ref)
 
-        self._references_cache[sid] = references
-
         return references
 
     def _load_rank(self, sid: str, cache: bool | None = None) -> WikibaseRank | None:
@@ -454,8 +812,13 @@ class FastRunContainer:
         if cache is None:
             cache = self.cache
 
-        if cache and sid in self._rank_cache:
-            return self._rank_cache[sid]
+        return self._load_statement_data(self._rank_cache, sid, cache, lambda: self._query_rank(sid))
+
+    def _query_rank(self, sid: str) -> WikibaseRank | None:
+        """Query the rank of a statement from the mirror or from the SPARQL endpoint."""
+        if self._mirror_source is not None:
+            claim = self._mirror_source.claim(sid)
+            return claim.rank if claim else None
 
         query = f'''
         #Tool: WikibaseIntegrator wbi_fastrun._load_rank
@@ -478,8 +841,6 @@ class FastRunContainer:
             elif rank_raw == 'DeprecatedRank':
                 rank = WikibaseRank.DEPRECATED
 
-        self._rank_cache[sid] = rank
-
         return rank
 
     def _get_property_type(self, prop_nr: str | int) -> str:
@@ -580,11 +941,12 @@ class FastRunContainer:
 
     def write_required(self, claims: list[Claim] | Claims | Claim, entity_filter: list[str] | str | None = None, property_filter: list[str] | str | None = None,
                        action_if_exists: ActionIfExists = ActionIfExists.REPLACE_ALL, use_qualifiers: bool | None = None, use_references: bool | None = None,
-                       use_rank: bool | None = None, cache: bool | None = None, query_limit: int | None = None) -> bool:
+                       use_rank: bool | None = None, cache: bool | None = None, query_limit: int | None = None, labels: LanguageValues | None = None,
+                       descriptions: LanguageValues | None = None, aliases: Aliases | None = None) -> bool:
         """
         Check if a write to the Wikibase instance is required: a write is not required only when at least one entity
         already holds, for every claim, a statement with the same value (and the same qualifiers, references and rank,
-        depending on the flags).
+        depending on the flags), and the same labels, descriptions and aliases when they are given.
 
         :param claims: The claims proposed to be written.
         :param entity_filter: Allows you to filter the entities checked. This can be a single entity or a list of entities.
@@ -598,6 +960,9 @@ class FastRunContainer:
         :param use_rank: Use rank during fastrun. Disabled by default.
         :param cache: Put data returned by the SPARQL endpoint in cache. Enabled by default.
         :param query_limit: Limit the amount of results from the SPARQL server
+        :param labels: The labels proposed to be written, compared with the labels loaded from the SPARQL endpoint.
+        :param descriptions: The descriptions proposed to be written.
+        :param aliases: The aliases proposed to be written.
         :return: a boolean True if a write is required. False otherwise.
         """
 
@@ -606,10 +971,12 @@ class FastRunContainer:
         elif (not isinstance(claims, list) or not all(isinstance(n, Claim) for n in claims)) and not isinstance(claims, Claims):
             raise ValueError("claims must be an instance of Claim or Claims or a list of Claim")
 
-        if len(claims) == 0:
+        has_language_data = bool(labels) or bool(descriptions) or bool(aliases)
+
+        if len(claims) == 0 and not has_language_data:
             raise ValueError("claims must have at least one claim")
 
-        if action_if_exists == ActionIfExists.FORCE_APPEND:
+        if action_if_exists == ActionIfExists.FORCE_APPEND and len(claims) > 0:
             # The new statements are always appended, a write is always required
             log.debug("Force append: write required")
             return True
@@ -635,7 +1002,7 @@ class FastRunContainer:
             use_rank = self.use_rank
 
         claims_to_check = [claim for claim in claims if claim.mainsnak.property_number in property_filter]
-        if not claims_to_check:
+        if not claims_to_check and not (has_language_data and entities_allowed):
             # Nothing can be verified through the fastrun data
             log.debug("No claim matches the property filter: write required")
             return True
@@ -656,14 +1023,18 @@ class FastRunContainer:
 
             candidates.append((claim, statements))
 
-        # The entities holding every claim value
-        common_entities = set.intersection(*({self._entity_id(statement['entity']) for statement in statements} for _, statements in candidates))
+        # The entities holding every claim value. Without claims to check, only the language data of the entities
+        # allowed by the entity filter is compared.
+        if candidates:
+            common_entities = set.intersection(*({self._entity_id(statement['entity']) for statement in statements} for _, statements in candidates))
+        else:
+            common_entities = set(entities_allowed or ())
         if not common_entities:
             log.debug("No entity holds all the claim values: write required")
             return True
 
         # Deep comparison: no write is needed if at least one entity holds, for every claim, a statement also
-        # matching the qualifiers, references and rank, depending on the flags
+        # matching the qualifiers, references and rank, depending on the flags, and the same language data
         for entity in sorted(common_entities):
             for claim, statements in candidates:
                 entity_statements = [statement for statement in statements if self._entity_id(statement['entity']) == entity]
@@ -671,27 +1042,40 @@ class FastRunContainer:
                            for statement in entity_statements):
                     break
             else:
+                if has_language_data and not self._language_data_matches(entity, labels=labels, descriptions=descriptions, aliases=aliases,
+                                                                         action_if_exists=action_if_exists):
+                    continue
                 log.debug("Entity '%s' already holds all the claims: no write required", entity)
                 return False
 
         return True
 
-    def init_language_data(self, lang: str, lang_data_type: str) -> None:
+    def init_language_data(self, lang: str | list[str], lang_data_type: str, limit: int | None = None) -> None:
         """
-        Initialize language data store
+        Initialize language data store. Several languages can be given, they are loaded together with one paginated
+        query, the languages already loaded are skipped.
 
-        :param lang: language code
+        :param lang: language code or list of language codes
         :param lang_data_type: 'label', 'description' or 'aliases'
+        :param limit: The limit to request at one time.
         :return: None
         """
-        if lang not in self.loaded_langs:
-            self.loaded_langs[lang] = {}
+        if lang_data_type not in LANG_DATA_TYPES:
+            raise ValueError(f"lang_data_type must be one of {', '.join(LANG_DATA_TYPES)}, got '{lang_data_type}'")
+
+        langs = [lang] if isinstance(lang, str) else list(dict.fromkeys(lang))
 
-        if lang_data_type not in self.loaded_langs[lang]:
-            result = self._query_lang(lang=lang, lang_data_type=lang_data_type)
-            if result is not None:
-                data = self._process_lang(result=result)
-                self.loaded_langs[lang].update({lang_data_type: data})
+        # Single-flight, like the properties: the languages are only loaded once
+        with self._language_lock:
+            langs_to_load = [x for x in langs if lang_data_type not in self.loaded_langs.get(x, {})]
+            if not langs_to_load:
+                return
+
+            data = self._process_lang(results=self._query_lang(langs=langs_to_load, lang_data_type=lang_data_type, limit=limit), langs=langs_to_load,
+                                      lang_data_type=lang_data_type)
+            with self._lock:
+                for x in langs_to_load:
+                    self.loaded_langs.setdefault(x, {})[lang_data_type] = data[x]
 
     def get_language_data(self, qid: str, lang: str, lang_data_type: str) -> list[str]:
         """
@@ -708,8 +1092,13 @@ class FastRunContainer:
         """
         self.init_language_data(lang, lang_data_type)
 
-        current_lang_data = self.loaded_langs[lang][lang_data_type]
-        all_lang_strings = list(current_lang_data.get(self._entity_id(qid), []))
+        value = self.loaded_langs[lang][lang_data_type].get(self._entity_id(qid))
+        if value is None:
+            all_lang_strings = []
+        elif isinstance(value, str):
+            all_lang_strings = [value]
+        else:
+            all_lang_strings = list(value)
         if not all_lang_strings and lang_data_type in {'label', 'description'}:
             all_lang_strings = ['']
         return all_lang_strings
@@ -737,55 +1126,338 @@ class FastRunContainer:
 
         return False
 
-    def _query_lang(self, lang: str, lang_data_type: str) -> list[dict[str, dict]] | None:
+    def _language_data_matches(self, entity: str, labels: LanguageValues | None = None, descriptions: LanguageValues | None = None, aliases: Aliases | None = None,
+                               action_if_exists: ActionIfExists = ActionIfExists.REPLACE_ALL) -> bool:
+        """
+        Compare the labels, descriptions and aliases of a local entity with the language data of the given entity.
+
+        The labels and descriptions must be identical, a removed one must not exist. The aliases of the local entity
+        must all exist (with REPLACE_ALL, the aliases of the language must be exactly the same) and the removed ones
+        must not exist. The comparison is case sensitive, unless case_insensitive is enabled.
+
+        :param entity: The entity ID or URI to compare with.
+        :param labels: The local labels.
+        :param descriptions: The local descriptions.
+        :param aliases: The local aliases.
+        :param action_if_exists: The action that will be used for the write.
+        :return: True if the language data of the entity matches the local one.
+        """
+        entity_id = self._entity_id(entity)
+
+        def normalize(value: str) -> str:
+            return value.casefold() if self.case_insensitive else value
+
+        for lang_data_type, language_values in (('label', labels), ('description', descriptions)):
+            if not language_values:
+                continue
+
+            self.init_language_data([language_value.language for language_value in language_values], lang_data_type)
+            for language_value in language_values:
+                current = self.loaded_langs[language_value.language][lang_data_type].get(entity_id)
+                if language_value.removed:
+                    if current is not None:
+                        log.debug("The %s in '%s' must be removed", lang_data_type, language_value.language)
+                        return False
+                elif current is None or normalize(current) != normalize(str(language_value.value)):
+                    log.debug("Difference with the %s in '%s'", lang_data_type, language_value.language)
+                    return False
+
+        if aliases:
+            self.init_language_data(list(aliases.aliases.keys()), 'aliases')
+            for language, language_aliases in aliases.aliases.items():
+                current_aliases = {normalize(alias) for alias in self.loaded_langs[language]['aliases'].get(entity_id, ())}
+                kept_aliases = {normalize(str(alias.value)) for alias in language_aliases if not alias.removed}
+                removed_aliases = {normalize(str(alias.value)) for alias in language_aliases if alias.removed}
+
+                if not kept_aliases <= current_aliases or removed_aliases & current_aliases:
+                    log.debug("Difference with the aliases in '%s'", language)
+                    return False
+
+                if action_if_exists == ActionIfExists.REPLACE_ALL and kept_aliases != current_aliases:
+                    log.debug("Difference with the aliases in '%s'", language)
+                    return False
+
+        return True
+
+    def _query_lang(self, langs: list[str], lang_data_type: str, limit: int | None = None) -> Iterator[dict[str, dict]]:
         """
         Query the SPARQL endpoint for the language data of the entities matching the base filter.
 
-        :param lang: language code
+        The results are paginated with a keyset (the entity, language and value of the last row of the previous page)
+        instead of an offset, so that each page costs the same whatever its position. With precomputed closures, the
+        pagination is repeated for each chunk of classes.
+
+        :param langs: list of language codes
         :param lang_data_type: 'label', 'description' or 'aliases'
+        :param limit: The limit to request at one time.
+        :return: An iterator over the bindings returned by the SPARQL endpoint
         """
+        if self._mirror_source is not None:
+            yield from self._mirror_source.terms(langs, lang_data_type)
+            return
 
-        lang_data_type_dict = {
-            'label': 'rdfs:label',
-            'description': 'schema:description',
-            'aliases': 'skos:altLabel'
-        }
+        limit = limit or int(config['SPARQL_QUERY_LIMIT'])  # type: ignore
 
-        query = f'''
-        #Tool: WikibaseIntegrator wbi_fastrun._query_lang
-        SELECT ?entity ?label WHERE {{
-            {self._base_filter_string()}
+        langs_string = ', '.join(_sparql_string(lang) for lang in langs)
 
-            OPTIONAL {{
-                ?entity {lang_data_type_dict[lang_data_type]} ?label FILTER (lang(?label) = "{lang}") .
-            }}
-        }}
-        '''
+        for base_filter_string in self._base_filter_strings():
+            keyset_filter_string = ''
+            while True:
+                query = f'''
+                #Tool: WikibaseIntegrator wbi_fastrun._query_lang
+                SELECT ?entity ?label WHERE {{
+                  {base_filter_string}
+                  ?entity {LANG_DATA_TYPES[lang_data_type]} ?label .
+                  FILTER (LANG(?label) IN ({langs_string}))
+                  {keyset_filter_string}
+                }}
+                ORDER BY STR(?entity) LANG(?label) STR(?label)
+                LIMIT {limit}
+                '''
 
-        log.debug(query)
+                results = execute_sparql_query(query=query, endpoint=self.sparql_endpoint_url)['results']['bindings']
+                yield from results
 
-        return execute_sparql_query(query=query, endpoint=self.sparql_endpoint_url)['results']['bindings']
+                if len(results) == 0 or len(results) < limit:
+                    break
+
+                last_entity = _sparql_string(results[-1]['entity']['value'])
+                last_lang = _sparql_string(results[-1]['label'].get('xml:lang', ''))
+                last_value = _sparql_string(results[-1]['label']['value'])
+                keyset_filter_string = (f'FILTER (STR(?entity) > {last_entity} || (STR(?entity) = {last_entity} && (LANG(?label) > {last_lang} || '
+                                        f'(LANG(?label) = {last_lang} && STR(?label) > {last_value}))))')
 
     @staticmethod
-    def _process_lang(result: list) -> defaultdict[str, set]:
-        data = defaultdict(set)
-        for r in result:
-            qid = r['entity']['value'].split("/")[-1]
-            if 'label' in r:
-                data[qid].add(r['label']['value'])
+    def _process_lang(results: Iterable[dict[str, dict]], langs: list[str], lang_data_type: str) -> dict[str, dict[str, str | tuple[str, ...]]]:
+        """
+        Store the language data in a compact form: language -> entity ID -> the value for a label or a description and
+        the tuple of values for the aliases. The entity IDs are interned, they are shared between the languages.
+
+        :param results: The bindings returned by the SPARQL endpoint
+        :param langs: The languages requested, a binding without a language is assigned to the first one
+        :param lang_data_type: 'label', 'description' or 'aliases'
+        """
+        data: dict[str, dict[str, str | tuple[str, ...]]] = {lang: {} for lang in langs}
+        # The aliases of each entity, deduplicated in their order of arrival, converted to tuples once all collected
+        aliases: dict[str, dict[str, dict[str, None]]] = {lang: {} for lang in langs}
+        for r in results:
+            if 'label' not in r:
+                continue
+            lang = r['label'].get('xml:lang', langs[0])
+            if lang not in data:
+                continue
+            qid = sys.intern(r['entity']['value'].rsplit('/', 1)[-1])
+            value = r['label']['value']
+            if lang_data_type == 'aliases':
+                aliases[lang].setdefault(qid, {})[value] = None
+            elif qid not in data[lang]:
+                data[lang][qid] = value
+
+        for lang, entities in aliases.items():
+            data[lang].update((qid, tuple(values)) for qid, values in entities.items())
         return data
 
     def clear(self) -> None:
         """
         Convenience function to empty the caches of this fastrun container.
         """
-        self.data = {}
-        self.loaded_complete = set()
-        self.properties_type = {}
-        self.loaded_langs = {}
-        self._qualifiers_cache = {}
-        self._references_cache = {}
-        self._rank_cache = {}
+        with self._lock:
+            self.data = {}
+            self.loaded_complete = set()
+            self.properties_type = {}
+            self.loaded_langs = {}
+            self._qualifiers_cache = {}
+            self._references_cache = {}
+            self._rank_cache = {}
+            self._entity_index = None
+            if self._mirror_source is not None:
+                self._mirror_source.clear()
+
+    def export_snapshot(self, name: str | None = None) -> shared_memory.SharedMemory:
+        """
+        Export a snapshot of this container to a new shared memory block, so that the workers of a process pool can
+        create their own container from it with :func:`from_snapshot`, without querying the SPARQL endpoint again.
+
+        The snapshot is the pickled container, the shared memory block only carries it to the workers: each worker
+        unpickles its own copy of the data, nothing is shared afterwards. The later loads and updates of this container
+        are not exported. The caller owns the block and must close() and unlink() it once the workers are done.
+
+        A container using a mirror in memory can't be exported, the workers can't open it: use a mirror in a database
+        file, which each worker opens again.
+
+        :param name: The name of the shared memory block. A unique name is generated if not set.
+        :return: The shared memory block, its name is given to the workers.
+        """
+        if self.mirror is not None and str(self.mirror.path) == ':memory:':
+            raise ValueError("A fastrun container using a mirror in memory can't be exported to other processes, use a mirror in a database file")
+
+        with self._lock:
+            payload = pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+
+        # The size of the payload comes first, the block can be larger than requested
+        block = shared_memory.SharedMemory(name=name, create=True, size=len(payload) + 8)
+        buffer = block.buf
+        assert buffer is not None
+        buffer[:8] = len(payload).to_bytes(8, 'little')
+        buffer[8:len(payload) + 8] = payload
+        return block
+
+    @classmethod
+    def from_snapshot(cls, name: str) -> FastRunContainer:
+        """
+        Create a container from the snapshot exported by :func:`export_snapshot` in another process and add it to the
+        fastrun store, so that :func:`~wikibaseintegrator.entities.baseentity.BaseEntity.write_required` uses it when
+        called with the same base filter and options. The block is left untouched, the data is copied.
+
+        Only use a block exported by a trusted process: the data is unpickled.
+
+        :param name: The name of the shared memory block.
+        :return: The FastRunContainer
+        """
+        # The workers must not unlink the block when they exit, it belongs to the exporting process
+        if sys.version_info >= (3, 13):
+            block = shared_memory.SharedMemory(name=name, track=False)  # pylint: disable=unexpected-keyword-arg
+        else:
+            block = shared_memory.SharedMemory(name=name)
+        try:
+            buffer = block.buf
+            assert buffer is not None
+            size = int.from_bytes(bytes(buffer[:8]), 'little')
+            fastrun_container = pickle.loads(bytes(buffer[8:size + 8]))
+        finally:
+            block.close()
+
+        if not isinstance(fastrun_container, cls):
+            raise ValueError(f"The shared memory block '{name}' does not contain a {cls.__name__}")
+
+        fastrun_store.append(fastrun_container)
+        return fastrun_container
+
+    def update_entity(self, entity_json: dict[str, Any]) -> None:
+        """
+        Patch the data of this container with the JSON representation of an entity returned by the Wikibase instance
+        after a write, so that the next checks take the write into account without reloading the data.
+
+        The statements of the entity are replaced in the statements data and in the qualifiers, references and ranks
+        caches, and its labels, descriptions and aliases in the language data. Only the properties and the languages
+        already loaded are patched. The loads in progress of the properties of the entity and of the language data are
+        waited for, so that the data they store doesn't drop the patch. If the entity no longer matches the base filter,
+        its data is removed. When the base filter can't be checked locally (property path without precomputed closure,
+        custom base query), only an entity already in the data is patched.
+
+        :param entity_json: The JSON representation of the entity, as returned by the Wikibase instance.
+        """
+        entity_id = entity_json.get('id')
+        if not entity_id:
+            return
+
+        if self.mirror is not None:
+            self.mirror.add(entity_json)
+
+        claims = Claims().from_json(entity_json.get('claims', entity_json.get('statements', {})), trusted=True)
+        in_corpus = self._in_corpus(claims)
+
+        with self._lock:
+            prop_nrs = sorted(set(claims.claims) | set(self._get_entity_index().get(entity_id, {})))
+
+        with ExitStack() as stack:
+            # In the order of the properties, two updates don't wait for each other
+            for prop_nr in prop_nrs:
+                stack.enter_context(self._property_lock(prop_nr))
+            # The language data loaded meanwhile would be older than the entity
+            stack.enter_context(self._language_lock)
+            stack.enter_context(self._lock)
+
+            entity_index = self._get_entity_index()
+            if in_corpus is None:
+                in_corpus = entity_id in entity_index
+
+            if self._mirror_source is not None:
+                self._mirror_source.update(entity_id, in_corpus)
+
+            # Remove the previous statements of the entity
+            for prop_nr, value_keys in entity_index.pop(entity_id, {}).items():
+                for value_key in value_keys:
+                    statements = self.data.get(prop_nr, {}).get(value_key)
+                    if statements is None:
+                        continue
+                    for statement in statements:
+                        if self._entity_id(statement['entity']) == entity_id:
+                            self._qualifiers_cache.pop(statement['sid'], None)
+                            self._references_cache.pop(statement['sid'], None)
+                            self._rank_cache.pop(statement['sid'], None)
+                    statements[:] = [statement for statement in statements if self._entity_id(statement['entity']) != entity_id]
+                    if not statements:
+                        del self.data[prop_nr][value_key]
+
+            if in_corpus:
+                entity = f'{self.wikibase_url}/entity/{entity_id}'
+                for claim in claims:
+                    prop_nr = claim.mainsnak.property_number
+                    claim_value_key = self._value_key(claim)
+                    if prop_nr not in self.loaded_complete or claim_value_key is None or not claim.id:
+                        continue
+
+                    sid = self._statement_uri(claim.id)
+                    self.data[prop_nr].setdefault(claim_value_key, []).append({'entity': entity, 'sid': sid})
+                    entity_index.setdefault(entity_id, {}).setdefault(prop_nr, set()).add(claim_value_key)
+
+                    self._qualifiers_cache[sid] = claim.qualifiers
+                    self._references_cache[sid] = claim.references
+                    self._rank_cache[sid] = claim.rank
+
+            for lang_data_type, json_key in (('label', 'labels'), ('description', 'descriptions'), ('aliases', 'aliases')):
+                for lang, loaded in self.loaded_langs.items():
+                    if lang_data_type not in loaded:
+                        continue
+                    value = entity_json.get(json_key, {}).get(lang) if in_corpus else None
+                    if not value:
+                        loaded[lang_data_type].pop(entity_id, None)
+                    elif lang_data_type == 'aliases':
+                        loaded[lang_data_type][sys.intern(entity_id)] = tuple(dict.fromkeys(alias['value'] for alias in value))
+                    else:
+                        loaded[lang_data_type][sys.intern(entity_id)] = value['value']
+
+    def _get_entity_index(self) -> dict[str, dict[str, set[str]]]:
+        """Return the index of the statements data by entity, built on the first call."""
+        if self._entity_index is None:
+            self._entity_index = {}
+            for prop_nr, values in self.data.items():
+                for value_key, statements in values.items():
+                    for statement in statements:
+                        self._entity_index.setdefault(self._entity_id(statement['entity']), {}).setdefault(prop_nr, set()).add(value_key)
+        return self._entity_index
+
+    def _in_corpus(self, claims: Claims) -> bool | None:
+        """
+        Check if an entity holding the given claims matches the base filter.
+
+        :param claims: The claims of the entity.
+        :return: True or False, or None if the base filter can't be checked locally.
+        """
+        if self.base_query:
+            return None
+
+        closures = self._class_closures(wb_url=self.wikibase_url)
+        for index, k in enumerate(self.base_filter):
+            if isinstance(k, BaseDataType):
+                values = {self._value_key(claim) for claim in claims.get(k.mainsnak.property_number)}
+                matches = self._value_key(k) in values if k.mainsnak.datavalue else bool(values)
+            elif isinstance(k, tuple):
+                values = {self._value_key(claim) for claim in claims.get(k[0].mainsnak.property_number)}
+                matches = any(self._value_key(x) in values for x in k)
+            elif index in closures:
+                assert isinstance(k, list)
+                anchor = k[0][0] if isinstance(k[0], tuple) else k[0]
+                classes = set(closures[index])
+                matches = any(claim.get_sparql_value(wikibase_url=self.wikibase_url) in classes for claim in claims.get(anchor.mainsnak.property_number))
+            else:
+                return None
+
+            if not matches:
+                return False
+
+        return True
 
     def __repr__(self) -> str:
         """A mixin implementing a simple __repr__."""
@@ -796,17 +1468,33 @@ class FastRunContainer:
         )
 
 
-def get_fastrun_container(base_filter: list[BaseDataType | list[BaseDataType]], use_qualifiers: bool = True, use_references: bool = False, use_rank: bool = False,
-                          cache: bool = True, case_insensitive: bool = False) -> FastRunContainer:
+def update_fastrun_store(entity_json: dict[str, Any]) -> None:
+    """
+    Patch every fastrun container with the JSON representation of an entity returned by the Wikibase instance after a
+    write. See :func:`FastRunContainer.update_entity`.
+
+    :param entity_json: The JSON representation of the entity, as returned by the Wikibase instance.
+    """
+    for fastrun_container in fastrun_store:
+        fastrun_container.update_entity(entity_json)
+
+
+def get_fastrun_container(base_filter: list[BaseFilterElement], use_qualifiers: bool = True, use_references: bool = False, use_rank: bool = False,
+                          cache: bool = True, case_insensitive: bool = False, base_query: str | None = None, precompute_closure: bool = False,
+                          closure_file: str | None = None, mirror: EntityMirror | None = None) -> FastRunContainer:
     """
     Return a FastRunContainer object, create a new one if it doesn't already exist.
 
-    :param base_filter: The default filter to initialize the dataset. A list made of BaseDataType or list of BaseDataType.
+    :param base_filter: The default filter to initialize the dataset. A list made of BaseDataType, tuple of BaseDataType or list of BaseDataType.
     :param use_qualifiers: Use qualifiers during fastrun. Enabled by default.
     :param use_references: Use references during fastrun. Disabled by default.
     :param use_rank: Use rank during fastrun. Disabled by default.
     :param cache: Put data returned by the SPARQL endpoint in cache. Enabled by default.
     :param case_insensitive: Compare the string values without taking the case into account. Disabled by default.
+    :param base_query: A custom SPARQL graph pattern binding ?entity, added to the base filter.
+    :param precompute_closure: Replace the property paths of the base filter by their precomputed class closures. Disabled by default.
+    :param closure_file: A JSON file where the precomputed closures are persisted.
+    :param mirror: A local mirror of the entities used as the data source instead of the SPARQL endpoint.
     :return: a FastRunContainer object
     """
     if base_filter is None:
@@ -814,27 +1502,34 @@ def get_fastrun_container(base_filter: list[BaseDataType | list[BaseDataType]],
 
     # We search if we already have a FastRunContainer with the same parameters to reuse it
     fastrun_container = _search_fastrun_store(base_filter=base_filter, use_qualifiers=use_qualifiers, use_references=use_references, use_rank=use_rank,
-                                              case_insensitive=case_insensitive, cache=cache)
+                                              case_insensitive=case_insensitive, cache=cache, base_query=base_query, precompute_closure=precompute_closure,
+                                              closure_file=closure_file, mirror=mirror)
 
     return fastrun_container
 
 
-def _search_fastrun_store(base_filter: list[BaseDataType | list[BaseDataType]], use_qualifiers: bool = True, use_references: bool = False, use_rank: bool = False,
-                          cache: bool = True, case_insensitive: bool = False) -> FastRunContainer:
+def _search_fastrun_store(base_filter: list[BaseFilterElement], use_qualifiers: bool = True, use_references: bool = False, use_rank: bool = False,
+                          cache: bool = True, case_insensitive: bool = False, base_query: str | None = None, precompute_closure: bool = False,
+                          closure_file: str | None = None, mirror: EntityMirror | None = None) -> FastRunContainer:
     """
     Search for an existing FastRunContainer with the same parameters or create a new one if it doesn't exist.
 
-    :param base_filter: The default filter to initialize the dataset. A list made of BaseDataType or list of BaseDataType.
+    :param base_filter: The default filter to initialize the dataset. A list made of BaseDataType, tuple of BaseDataType or list of BaseDataType.
     :param use_qualifiers: Use qualifiers during fastrun. Enabled by default.
     :param use_references: Use references during fastrun. Disabled by default.
     :param use_rank: Use rank during fastrun. Disabled by default.
     :param cache: Put data returned by the SPARQL endpoint in cache. Enabled by default.
     :param case_insensitive: Compare the string values without taking the case into account. Disabled by default.
+    :param base_query: A custom SPARQL graph pattern binding ?entity, added to the base filter.
+    :param precompute_closure: Replace the property paths of the base filter by their precomputed class closures. Disabled by default.
+    :param closure_file: A JSON file where the precomputed closures are persisted.
+    :param mirror: A local mirror of the entities used as the data source instead of the SPARQL endpoint.
     :return: a FastRunContainer object
     """
     for fastrun in fastrun_store:
-        if (fastrun.base_filter == base_filter) and (fastrun.use_qualifiers == use_qualifiers) and (fastrun.use_references == use_references) and (
-                fastrun.use_rank == use_rank) and (fastrun.case_insensitive == case_insensitive) and (fastrun.sparql_endpoint_url == config['SPARQL_ENDPOINT_URL']):
+        if (fastrun.base_filter == base_filter) and (fastrun.base_query == base_query) and (fastrun.precompute_closure == precompute_closure) and (
+                fastrun.use_qualifiers == use_qualifiers) and (fastrun.use_references == use_references) and (fastrun.use_rank == use_rank) and (
+                fastrun.case_insensitive == case_insensitive) and (fastrun.sparql_endpoint_url == config['SPARQL_ENDPOINT_URL']) and (fastrun.mirror is mirror):
             fastrun.cache = cache
             return fastrun
 
@@ -842,6 +1537,7 @@ def _search_fastrun_store(base_filter: list[BaseDataType | list[BaseDataType]],
     log.info("Create a new FastRunContainer")
 
     fastrun_container = FastRunContainer(base_data_type=BaseDataType, base_filter=base_filter, use_qualifiers=use_qualifiers, use_references=use_references, use_rank=use_rank,
-                                         cache=cache, case_insensitive=case_insensitive)
+                                         cache=cache, case_insensitive=case_insensitive, base_query=base_query, precompute_closure=precompute_closure,
+                                         closure_file=closure_file, mirror=mirror)
     fastrun_store.append(fastrun_container)
     return fastrun_container
@@ -0,0 +1,119 @@
+"""
+Client-side computation of the hashes Wikibase gives to snaks, qualifiers and references.
+
+Wikibase hashes a snak with the SHA-1 of its PHP serialization, and a list of snaks (the qualifiers of a statement or
+a reference block) with the SHA-1 of the sorted hashes of its snaks. The functions of this module reproduce these
+serializations for the snaks without value and for the string and entity id values, checked against the hashes of the
+server, so that a locally built snak gets the hash the server would give it.
+
+The other value types (time, quantity, globe coordinate, monolingual text...) get a hash computed from their JSON: it is
+stable, so two equal snaks get the same hash, but it does not match the hash of the server.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from wikibaseintegrator.wbi_enums import WikibaseSnakType
+
+# The PHP classes of the snaks, as they appear in the serialization
+SNAK_CLASSES = {
+    WikibaseSnakType.KNOWN_VALUE: 'Wikibase\\DataModel\\Snak\\PropertyValueSnak',
+    WikibaseSnakType.NO_VALUE: 'Wikibase\\DataModel\\Snak\\PropertyNoValueSnak',
+    WikibaseSnakType.UNKNOWN_VALUE: 'Wikibase\\DataModel\\Snak\\PropertySomeValueSnak'
+}
+
+# The PHP classes of the entity ids, by entity type
+ENTITY_ID_CLASSES = {
+    'item': 'Wikibase\\DataModel\\Entity\\ItemId',
+    'property': 'Wikibase\\DataModel\\Entity\\PropertyId',
+    'lexeme': 'Wikibase\\Lexeme\\Domain\\Model\\LexemeId',
+    'form': 'Wikibase\\Lexeme\\Domain\\Model\\FormId',
+    'sense': 'Wikibase\\Lexeme\\Domain\\Model\\SenseId',
+    'mediainfo': 'Wikibase\\MediaInfo\\DataModel\\MediaInfoId'
+}
+
+ENTITY_ID_PREFIXES = {
+    'item': 'Q',
+    'property': 'P',
+    'lexeme': 'L',
+    'mediainfo': 'M'
+}
+
+
+def snak_hash(snaktype: WikibaseSnakType, property_number: str, datavalue: dict | None = None) -> str:
+    """
+    Compute the hash Wikibase gives to a snak.
+
+    A datavalue of a type other than string and entity id gets a hash computed from its JSON, which is stable but does
+    not match the hash of the server.
+
+    :param snaktype: The type of the snak
+    :param property_number: The property of the snak, like 'P31'
+    :param datavalue: The datavalue of the snak, as in the JSON of the entity
+    :return: The hash, as an hexadecimal string
+    """
+    if snaktype == WikibaseSnakType.KNOWN_VALUE:
+        serialized_value = _serialize_datavalue(datavalue or {})
+        if serialized_value is None:
+            return _sha1(json.dumps([property_number, datavalue], sort_keys=True))
+        data = f'a:2:{{i:0;{_php_string(property_number)}i:1;{serialized_value}}}'
+    else:
+        data = _php_string(property_number)
+
+    return _sha1(_php_object(SNAK_CLASSES[snaktype], data))
+
+
+def snak_list_hash(hashes: Iterable[str]) -> str:
+    """
+    Compute the hash Wikibase gives to a list of snaks, like the qualifiers of a statement or a reference block. The
+    order of the snaks is ignored.
+
+    :param hashes: The hashes of the snaks
+    :return: The hash, as an hexadecimal string
+    """
+    return _sha1('|'.join(sorted(hashes)))
+
+
+def _sha1(data: str) -> str:
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def _php_string(value: str) -> str:
+    return f's:{len(value.encode("utf-8"))}:"{value}";'
+
+
+def _php_object(klass: str, data: str) -> str:
+    """Serialize an object implementing the PHP Serializable interface."""
+    return f'C:{len(klass)}:"{klass}":{len(data.encode("utf-8"))}:{{{data}}}'
+
+
+def _serialize_datavalue(datavalue: dict) -> str | None:
+    serializer = DATAVALUE_SERIALIZERS.get(datavalue.get('type', ''))
+    value = datavalue.get('value')
+    if serializer is None or (datavalue.get('type') != 'string' and not isinstance(value, dict)):
+        return None
+    return serializer(value)
+
+
+def _serialize_string(value: Any) -> str | None:
+    return _php_object('DataValues\\StringValue', str(value))
+
+
+def _serialize_entity_id(value: dict) -> str | None:
+    entity_type = value.get('entity-type')
+    entity_id = value.get('id')
+    if entity_id is None and entity_type in ENTITY_ID_PREFIXES and 'numeric-id' in value:
+        entity_id = ENTITY_ID_PREFIXES[entity_type] + str(value['numeric-id'])
+    if entity_type not in ENTITY_ID_CLASSES or entity_id is None:
+        return None
+    return _php_object('Wikibase\\DataModel\\Entity\\EntityIdValue', _php_object(ENTITY_ID_CLASSES[entity_type], entity_id))
+
+
+# The serializers of the datavalues, by datavalue type
+DATAVALUE_SERIALIZERS: dict[str, Callable[[Any], str | None]] = {
+    'string': _serialize_string,
+    'wikibase-entityid': _serialize_entity_id
+}
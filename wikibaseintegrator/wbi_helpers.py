@@ -7,19 +7,21 @@ import datetime
 import json
 import logging
 import re
+import uuid
 import warnings
 from time import sleep
 from typing import TYPE_CHECKING, Any
-from urllib.parse import urlparse
+from urllib.parse import urlencode, urlparse
 
 import requests
 import ujson
 from requests import Session
 
 from wikibaseintegrator.wbi_backoff import wbi_backoff
+from wikibaseintegrator.wbi_cache import CachedResponse, ResponseCache
 from wikibaseintegrator.wbi_config import config
-from wikibaseintegrator.wbi_exceptions import (AnonymousEditNotAllowedError, MaxRetriesReachedException, ModificationFailed, MWApiError, NonExistentEntityError, SaveFailed,
-                                               SearchError)
+from wikibaseintegrator.wbi_exceptions import (AnonymousEditNotAllowedError, EditConflict, MaxRetriesReachedException, ModificationFailed, MWApiError, NonExistentEntityError,
+                                               SaveFailed, SearchError)
 
 if TYPE_CHECKING:
     from wikibaseintegrator.datatypes import BaseDataType
@@ -148,6 +150,10 @@ def mediawiki_api_call(method: str, mediawiki_api_url: str | None = None, sessio
             if 'code' in json_data['error'] and json_data['error']['code'] in ['no-such-entity', 'missingtitle']:
                 raise NonExistentEntityError(json_data['error'])
 
+            # edit conflict with the base revision
+            if 'code' in json_data['error'] and json_data['error']['code'] == 'editconflict':
+                raise EditConflict(json_data['error'])
+
             # duplicate error
             if 'code' in json_data['error'] and json_data['error']['code'] == 'modification-failed':  # pragma: no cover
                 raise ModificationFailed(json_data['error'])
@@ -314,6 +320,110 @@ def execute_sparql_query(query: str, prefix: str | None = None, endpoint: str |
     raise MaxRetriesReachedException(f"No result after {max_retries} retries.")
 
 
+def conditional_get(url: str, params: dict[str, Any] | None = None, cache: ResponseCache | None = None, immutable: bool = False, user_agent: str | None = None,
+                    session: Session | None = None, max_retries: int = 100, retry_after: int = 60, **kwargs: Any) -> CachedResponse | None:
+    """
+    Send a GET request to a read endpoint of the instance. With a cache, a response already cached is revalidated with a
+    conditional request: the server answers 304 Not Modified, without a body, if the resource did not change.
+
+    :param url: The URL of the resource
+    :param params: The parameters of the query string
+    :param cache: The cache of the responses
+    :param immutable: The resource never changes, like the content of a revision: a cached response is used without any request
+    :param user_agent: The user agent (Recommended for Wikimedia Foundation instances)
+    :param session: The session used for the request, the anonymous session by default. The requests with a session cookie
+        are not served by the cache of a CDN.
+    :param max_retries: The maximum number of retries
+    :param retry_after: The timeout between each retry
+    :param kwargs: Any additional keyword arguments to pass to requests.request
+    :return: The response, from the cache or not, or None if the resource does not exist (404 Not Found)
+    """
+    user_agent = user_agent or (str(config['USER_AGENT']) if config['USER_AGENT'] is not None else None)
+
+    hostname = urlparse(url).hostname
+    if hostname is not None and hostname.endswith(('wikidata.org', 'wikipedia.org', 'wikimedia.org')) and user_agent is None:
+        log.warning('WARNING: Please set an user agent if you interact with a Wikibase instance from the Wikimedia Foundation.')
+        log.warning('More information in the README.md and https://foundation.wikimedia.org/wiki/Policy:User-Agent_policy')
+
+    if params:
+        url += '?' + urlencode(params)
+
+    headers = {
+        'User-Agent': get_user_agent(user_agent)
+    }
+
+    cached = cache.get(url) if cache is not None else None
+    if cache is not None and cached is not None:
+        if immutable:
+            cache.record_hit()
+            return cached
+        headers.update(cached.validators())
+
+    if 'timeout' not in kwargs:
+        kwargs['timeout'] = config['TIMEOUT']
+
+    session = session if session else default_session
+    for _ in range(max_retries):
+        try:
+            response = session.get(url, headers=headers, **kwargs)
+        except requests.exceptions.ConnectionError as e:
+            log.exception("Connection error: %s. Sleeping for %d seconds.", e, retry_after)
+            sleep(retry_after)
+            continue
+        if response.status_code in (500, 502, 503, 504):
+            log.error("Service unavailable (HTTP Code %d). Sleeping for %d seconds.", response.status_code, retry_after)
+            sleep(retry_after)
+            continue
+        if response.status_code == 429:
+            sleep_sec = int(response.headers.get('retry-after', retry_after))
+            log.error("Too Many Requests (429). Sleeping for %d seconds", sleep_sec)
+            sleep(sleep_sec)
+            continue
+        if response.status_code == 404:
+            return None
+
+        if response.status_code == 304 and cache is not None and cached is not None:
+            cache.record_hit()
+            return cached
+
+        response.raise_for_status()
+        result = CachedResponse(response.content, etag=response.headers.get('ETag'), last_modified=response.headers.get('Last-Modified'))
+        if cache is not None:
+            cache.record_miss()
+            if result.etag or result.last_modified or immutable:
+                cache.set(url, result)
+        return result
+
+    raise MaxRetriesReachedException(f'The number of retries ({max_retries}) have been reached.')
+
+
+def get_entity_data(entity_id: str, revision: int | None = None, cache: ResponseCache | None = None, entity_data_url: str | None = None, **kwargs: Any) -> dict:
+    """
+    Read an entity from Special:EntityData. Unlike the POST requests to the MediaWiki API, these GET requests can be served
+    by the cache of a CDN, like the one in front of the Wikimedia Foundation instances. See :func:`conditional_get` for
+    the use of the cache. The content of a revision never changes, its cached response is used without any request.
+
+    :param entity_id: The ID of the entity
+    :param revision: The ID of a revision of the entity, the latest revision by default
+    :param cache: The cache of the responses
+    :param entity_data_url: The URL of Special:EntityData (default Wikidata)
+    :param kwargs: Any additional keyword arguments to pass to :func:`conditional_get`
+    :return: The data returned, in the format of wbgetentities: the entity in 'entities', by its ID
+    """
+    entity_data_url = str(entity_data_url or config['ENTITY_DATA_URL'])
+
+    response = conditional_get(f'{entity_data_url}/{entity_id}.json', params={'revision': revision} if revision else None, cache=cache, immutable=bool(revision), **kwargs)
+    if response is None:
+        raise NonExistentEntityError({'code': 'no-such-entity', 'info': f'Could not find an entity with the ID "{entity_id}".', 'id': entity_id})
+
+    json_data = ujson.loads(response.content)
+    # A redirect is followed, its target is returned by the requested ID, like wbgetentities
+    entities = json_data.get('entities', {})
+    if entity_id not in entities and len(entities) == 1:
+        json_data['entities'] = {entity_id: next(iter(entities.values()))}
+    return json_data
+
+
 def edit_entity(data: dict, id: str | None = None, type: str | None = None, baserevid: int | None = None, summary: str | None = None, clear: bool = False, is_bot: bool = False,
                 tags: list[str] | None = None, site: str | None = None, title: str | None = None, **kwargs: Any) -> dict:
     """
@@ -423,19 +533,57 @@ def merge_lexemes(source: str, target: str, login: _Login | None = None, summary
     return mediawiki_api_call_helper(data=params, login=login, is_bot=is_bot, **kwargs)
 
 
-def remove_claims(claim_id: str, summary: str | None = None, baserevid: int | None = None, is_bot: bool = False, **kwargs: Any) -> dict:
+def remove_claims(claim_id: str | list[str], summary: str | None = None, baserevid: int | None = None, tags: list[str] | None = None, is_bot: bool = False,
+                  **kwargs: Any) -> dict:
     """
     Delete a claim from an entity
 
-    :param claim_id: One GUID or several (pipe-separated) GUIDs identifying the claims to be removed. All claims must belong to the same entity.
+    :param claim_id: One GUID or several (a list or pipe-separated) GUIDs identifying the claims to be removed. All claims must belong to the same entity.
     :param summary: Summary for the edit. Will be prepended by an automatically generated comment.
     :param baserevid: The numeric identifier for the revision to base the modification on. This is used for detecting conflicts during save.
+    :param tags: Change tags to apply to the revision.
     :param is_bot: Mark this edit as bot.
     """
 
     params: dict[str, str | int] = {
         'action': 'wbremoveclaims',
-        'claim': claim_id,
+        'claim': '|'.join(claim_id) if isinstance(claim_id, list) else claim_id,
+        'format': 'json'
+    }
+
+    if summary:
+        params.update({'summary': summary})
+
+    if baserevid:
+        params.update({'baserevid': baserevid})
+
+    if tags:
+        params.update({'tags': '|'.join(tags)})
+
+    if is_bot:
+        params.update({'bot': ''})
+
+    return mediawiki_api_call_helper(data=params, is_bot=is_bot, **kwargs)
+
+
+def set_claim(claim: dict[str, Any], summary: str | None = None, baserevid: int | None = None, tags: list[str] | None = None, is_bot: bool = False, **kwargs: Any) -> dict:
+    """
+    Create or replace a single claim of an entity, with the wbsetclaim module of the MediaWiki API. Unlike :func:`edit_entity`,
+    only the claim is sent and compared by the instance.
+
+    :param claim: The JSON of the claim. Its GUID is mandatory, even for a new claim, and identifies the entity, see :func:`generate_claim_id`.
+    :param summary: Summary for the edit. Will be prepended by an automatically generated comment.
+    :param baserevid: The numeric identifier for the revision to base the modification on. This is used for detecting conflicts during save.
+    :param tags: Change tags to apply to the revision.
+    :param is_bot: Mark this edit as bot.
+    :return: The data returned by the API, with the claim saved in 'claim' and the new revision in 'pageinfo'
+    """
+    if not claim.get('id'):
+        raise ValueError("The GUID of the claim is mandatory, see generate_claim_id()")
+
+    params: dict[str, Any] = {
+        'action': 'wbsetclaim',
+        'claim': ujson.dumps(claim),
         'format': 'json'
     }
 
@@ -445,12 +593,67 @@ def remove_claims(claim_id: str, summary: str | None = None, baserevid: int | No
     if baserevid:
         params.update({'baserevid': baserevid})
 
+    if tags:
+        params.update({'tags': '|'.join(tags)})
+
     if is_bot:
         params.update({'bot': ''})
 
     return mediawiki_api_call_helper(data=params, is_bot=is_bot, **kwargs)
 
 
+def set_term(entity_id: str, term_type: str, language: str, value: str | None, summary: str | None = None, baserevid: int | None = None, tags: list[str] | None = None,
+             is_bot: bool = False, **kwargs: Any) -> dict:
+    """
+    Set or remove a label or a description of an entity, with the wbsetlabel or wbsetdescription module of the MediaWiki API.
+
+    :param entity_id: The ID of the entity
+    :param term_type: 'label' or 'description'
+    :param language: The language of the term
+    :param value: The new value, None or an empty string to remove the term
+    :param summary: Summary for the edit. Will be prepended by an automatically generated comment.
+    :param baserevid: The numeric identifier for the revision to base the modification on. This is used for detecting conflicts during save.
+    :param tags: Change tags to apply to the revision.
+    :param is_bot: Mark this edit as bot.
+    :return: The data returned by the API, with the new revision in 'entity'
+    """
+    if term_type not in ('label', 'description'):
+        raise ValueError(f"Invalid term type ({term_type}), must be 'label' or 'description'")
+
+    params: dict[str, Any] = {
+        'action': f'wbset{term_type}',
+        'id': entity_id,
+        'language': language,
+        'value': value or '',
+        'format': 'json'
+    }
+
+    if summary:
+        params.update({'summary': summary})
+
+    if baserevid:
+        params.update({'baserevid': baserevid})
+
+    if tags:
+        params.update({'tags': '|'.join(tags)})
+
+    if is_bot:
+        params.update({'bot': ''})
+
+    return mediawiki_api_call_helper(data=params, is_bot=is_bot, **kwargs)
+
+
+def generate_claim_id(entity_id: str) -> str:
+    """
+    Generate the GUID of a new claim of an entity, like the instance does: the ID of the entity and a random UUID,
+    separated by a dollar sign.
+
+    :param entity_id: The ID of the entity
+    :return: A GUID, like 'Q42$F078E5B3-F9A8-480E-B7AC-D97778CBBEF9'
+    """
+    return f'{entity_id}${str(uuid.uuid4()).upper()}'
+
+
 def check_constraints(entity_id: str | list[str] | None = None, claim_id: str | list[str] | None = None, status: list[str] | None = None, allow_anonymous: bool = True,
                       **kwargs: Any) -> dict:
     """
@@ -810,10 +1013,10 @@ def generate_entity_instances(entities: str | list[str], allow_anonymous: bool =
     from wikibaseintegrator import WikibaseIntegrator
     for qid, v in reply['entities'].items():
         wbi = WikibaseIntegrator(is_bot=kwargs.get('is_bot', False), login=kwargs.get('login', None))
-        # Use the recursive subclass registry (not __subclasses__(), which only returns direct subclasses) so that
+        # Use the registry of the entity types (not __subclasses__(), which only returns direct subclasses) so that
         # entities inheriting through an intermediate base (Item/Property/MediaInfo via TermsEntity) are found.
-        f = [x for x in BaseEntity.subclasses if x.ETYPE == v['type']][0]
-        ii = f(api=wbi).from_json(v)
+        f = BaseEntity.etypes[v['type']]
+        ii = f(api=wbi).from_json(v, trusted=True)
         entity_instances.append((qid, ii))
 
     return entity_instances
@@ -897,16 +1100,19 @@ def format_amount(amount: int | str | float) -> str:
     :param amount: A int, float or str you want to pass to Quantity value.
     :return: A correctly formatted string amount by Wikibase standard.
     """
+    # Parse the amount only once
+    number = float(amount)
+
     # Remove .0 by casting to int
-    if float(amount) % 1 == 0:
-        amount = int(float(amount))
+    if number % 1 == 0:
+        amount = int(number)
 
     # Adding prefix + for positive number and 0
-    if not str(amount).startswith('+') and float(amount) >= 0:
-        amount = str(f'+{amount}')
+    amount = str(amount)
+    if not amount.startswith('+') and number >= 0:
+        amount = '+' + amount
 
-    # return as string
-    return str(amount)
+    return amount
 
 
 def get_user_agent(user_agent: str | None = None) -> str:
@@ -927,6 +1133,29 @@ def get_user_agent(user_agent: str | None = None) -> str:
     return return_user_agent
 
 
+def register_subclass(registry: dict[str, type], subclass: type, attribute: str) -> None:
+    """
+    Register a class in a registry keyed by one of its class attributes, like the DTYPE of a data type.
+
+    Only a class declaring the attribute itself is registered, a class inheriting the value of its parent does not
+    replace it. When two classes declare the same value, the first one registered is kept, unless the new one is a
+    subclass of it: a subclass redeclaring the DTYPE of a built-in data type replaces it.
+
+    :param registry: The registry, a dictionary of classes by value of the attribute
+    :param subclass: The class to register
+    :param attribute: The name of the class attribute used as key, like 'DTYPE'
+    """
+    if attribute not in vars(subclass):
+        return
+
+    key = getattr(subclass, attribute)
+    registered = registry.get(key)
+    if registered is None or issubclass(subclass, registered):
+        registry[key] = subclass
+    else:
+        log.debug("%s %s is already registered for %s, %s is ignored", attribute, key, registered.__qualname__, subclass.__qualname__)
+
+
 properties_dt: dict = {}
 
 
@@ -947,11 +1176,10 @@ def format2wbi(entitytype: str, json_raw: str, allow_anonymous: bool = True, wik
 
     from wikibaseintegrator.entities.baseentity import BaseEntity
 
-    entity_list = [x for x in BaseEntity.subclasses if x.ETYPE == entitytype]
-    if not entity_list:
+    if entitytype not in BaseEntity.etypes:
         raise ValueError(f'Unknown entity type: {entitytype}')
 
-    entity = entity_list[0]()
+    entity = BaseEntity.etypes[entitytype]()
 
     # Add aliases (for Item and MediaInfo)
     # Add lemmas (for Lexeme)
@@ -1046,7 +1274,7 @@ def _json2datatype(prop_nr: str, statement: dict, wikibase_url: str | None = Non
 
     datatype = properties_dt[prop_nr]
 
-    f = [x for x in BaseDataType.subclasses if x.DTYPE == datatype][0]
+    f = BaseDataType.dtypes[datatype]
     if f.__name__ in ['CommonsMedia', 'ExternalID', 'Form', 'GeoShape', 'Item', 'Lexeme', 'Math', 'MusicalNotation', 'Property', 'Sense', 'String', 'TabularData', 'URL']:
         if isinstance(statement, dict):
             value = statement['value']
@@ -0,0 +1,529 @@
+"""
+Local mirror of entities in a SQLite database, for the read-only lookups of a synchronisation bot.
+
+The mirror holds the JSON of the entities, and indexes their statements (entity, property, value, rank) and their terms
+(labels, descriptions and aliases). It is populated from the MediaWiki API, from a JSON dump or from the recent changes
+of the Wikibase instance, and answers queries like "the entities with P214 = 113230702" or "the entities with P31 = Q5
+and P27 = Q142" without any request to the instance.
+
+A fastrun container can use a mirror as its data source instead of the SPARQL endpoint, see the ``mirror`` parameter of
+:class:`~wikibaseintegrator.wbi_fastrun.FastRunContainer`. A :class:`MirrorSource` gives the container the statements and
+the terms of the mirror in the format of the data loaded from the SPARQL endpoint.
+
+The values are indexed with the keys of the fastrun containers: the SPARQL value of the datatype, computed with the
+Wikibase URL of the mirror, and the normalized unit of the quantities.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING, Any
+
+from wikibaseintegrator.datatypes import BaseDataType
+from wikibaseintegrator.entities.baseentity import BaseEntity
+from wikibaseintegrator.models.claims import Claim, Claims, _claim_from_json
+from wikibaseintegrator.wbi_config import config
+from wikibaseintegrator.wbi_enums import WikibaseRank, WikibaseSnakType
+from wikibaseintegrator.wbi_helpers import mediawiki_api_call_helper
+
+if TYPE_CHECKING:
+    from wikibaseintegrator import WikibaseIntegrator
+    from wikibaseintegrator.wbi_dumps import DumpReader
+    from wikibaseintegrator.wbi_fastrun import BaseFilterElement
+
+log = logging.getLogger(__name__)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS entities (id TEXT PRIMARY KEY, type TEXT NOT NULL, lastrevid INTEGER, json TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS statements (entity_id TEXT NOT NULL, statement_id TEXT, property TEXT NOT NULL, value TEXT, unit TEXT, rank TEXT NOT NULL,
+                                       best INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS statements_value ON statements (property, value);
+CREATE INDEX IF NOT EXISTS statements_entity ON statements (entity_id);
+CREATE INDEX IF NOT EXISTS statements_id ON statements (statement_id);
+CREATE TABLE IF NOT EXISTS terms (entity_id TEXT NOT NULL, term_type TEXT NOT NULL, language TEXT NOT NULL, value TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS terms_entity ON terms (entity_id);
+CREATE INDEX IF NOT EXISTS terms_language ON terms (term_type, language);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+'''
+
+# The term types of the terms table, by field of the JSON of the entities
+TERM_TYPES = {
+    'labels': 'label',
+    'descriptions': 'description',
+    'aliases': 'alias'
+}
+
+# The maximum number of entities requested at once with wbgetentities
+GET_ENTITIES_LIMIT = 50
+
+# The MediaWiki namespace of the media files, whose MediaInfo entity ID is made of the page ID
+FILE_NAMESPACE = 6
+
+
+class EntityMirror:
+    """
+    A local mirror of entities in a SQLite database. It can be shared between threads.
+
+    :param path: The path of the database file, created if it doesn't exist, or ':memory:' for a mirror in memory
+    :param wikibase_url: The Wikibase URL of the SPARQL values of the entities, as in the fastrun containers. Use
+        wbi_config['WIKIBASE_URL'] by default.
+    """
+
+    def __init__(self, path: str | os.PathLike = ':memory:', wikibase_url: str | None = None):
+        self.path = path
+        self.wikibase_url = str(wikibase_url or config['WIKIBASE_URL'])
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+
+    def __getstate__(self) -> dict[str, Any]:
+        """The connection can't be pickled, the database file is opened again by __setstate__."""
+        if str(self.path) == ':memory:':
+            raise TypeError("A mirror in memory can't be pickled, use a database file")
+        return {'path': self.path, 'wikibase_url': self.wikibase_url}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(**state)  # type: ignore[misc]  # pylint: disable=unnecessary-dunder-call
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self) -> int:
+        return self._query('SELECT COUNT(*) FROM entities')[0][0]
+
+    def __contains__(self, entity_id: str) -> bool:
+        return bool(self._query('SELECT 1 FROM entities WHERE id = ?', (entity_id,)))
+
+    def add(self, entities: BaseEntity | dict[str, Any] | Iterable[BaseEntity | dict[str, Any]]) -> int:
+        """
+        Add entities to the mirror, or replace them. The entities are written in one transaction.
+
+        :param entities: An entity, the JSON of an entity, or an iterable of them
+        :return: The number of entities added
+        """
+        if isinstance(entities, (BaseEntity, dict)):
+            entities = [entities]
+
+        count = 0
+        with self._lock, self._connection:
+            for entity in entities:
+                json_data = entity.get_json() if isinstance(entity, BaseEntity) else entity
+                if not json_data.get('id'):
+                    raise ValueError('The entities of a mirror must have an ID')
+                self._delete(str(json_data['id']))
+                self._insert(json_data)
+                count += 1
+        return count
+
+    def remove(self, entity_ids: str | Iterable[str]) -> None:
+        """
+        Remove entities from the mirror.
+
+        :param entity_ids: An entity ID or an iterable of entity IDs
+        """
+        if isinstance(entity_ids, str):
+            entity_ids = [entity_ids]
+        with self._lock, self._connection:
+            for entity_id in entity_ids:
+                self._delete(entity_id)
+
+    def load(self, entity_ids: str | Iterable[str], allow_anonymous: bool = True, **kwargs: Any) -> int:
+        """
+        Load entities from the MediaWiki API into the mirror, GET_ENTITIES_LIMIT entities per request. The entities
+        missing from the Wikibase instance, deleted for instance, are removed from the mirror.
+
+        :param entity_ids: An entity ID or an iterable of entity IDs
+        :param allow_anonymous: Allow an anonymous request to the MediaWiki API. Enabled by default.
+        :param kwargs: More arguments for :func:`~wikibaseintegrator.wbi_helpers.mediawiki_api_call_helper`
+        :return: The number of entities added
+        """
+        if isinstance(entity_ids, str):
+            entity_ids = [entity_ids]
+        entity_ids = list(dict.fromkeys(entity_ids))
+
+        count = 0
+        for index in range(0, len(entity_ids), GET_ENTITIES_LIMIT):
+            params = {
+                'action': 'wbgetentities',
+                'ids': '|'.join(entity_ids[index:index + GET_ENTITIES_LIMIT]),
+                'format': 'json'
+            }
+            reply = mediawiki_api_call_helper(data=params, allow_anonymous=allow_anonymous, **kwargs)
+            entities = reply['entities'].values()
+            self.remove([entity['id'] for entity in entities if 'missing' in entity])
+            count += self.add([entity for entity in entities if 'missing' not in entity])
+        return count
+
+    def load_dump(self, dump: str | os.PathLike | DumpReader, batch_size: int = 1000, **kwargs: Any) -> int:
+        """
+        Load the entities of a JSON dump into the mirror, see :class:`~wikibaseintegrator.wbi_dumps.DumpReader`.
+
+        :param dump: The path of the dump or a DumpReader
+        :param batch_size: The number of entities written in one transaction
+        :param kwargs: The filters of the DumpReader (entity_types, ids, properties) when a path is given
+        :return: The number of entities added
+        """
+        from wikibaseintegrator.wbi_dumps import DumpReader
+
+        reader = dump if isinstance(dump, DumpReader) else DumpReader(dump, **kwargs)
+        count = 0
+        batch: list[dict[str, Any]] = []
+        for json_data in reader.json():
+            batch.append(json_data)
+            if len(batch) >= batch_size:
+                count += self.add(batch)
+                batch = []
+        return count + self.add(batch)
+
+    def update_recent_changes(self, start: str | None = None, namespaces: list[int] | None = None, allow_anonymous: bool = True, **kwargs: Any) -> int:
+        """
+        Load again the entities changed since a given time, from the recent changes of the Wikibase instance. The time
+        of the last change is stored in the mirror, the next call starts from it by default.
+
+        Only the entities already in the mirror are loaded again, or removed if they were deleted. Use :func:`load` to
+        add new entities.
+
+        :param start: The time of the first change, in ISO 8601 format. The time of the last change seen by the
+            previous call by default.
+        :param namespaces: The namespaces of the changes, like [0, 120] for the items and the properties. All the
+            namespaces by default.
+        :param allow_anonymous: Allow an anonymous request to the MediaWiki API. Enabled by default.
+        :param kwargs: More arguments for :func:`~wikibaseintegrator.wbi_helpers.mediawiki_api_call_helper`
+        :return: The number of entities loaded again
+        """
+        start = start or self._get_meta('recentchanges')
+        if start is None:
+            raise ValueError('The start of the recent changes must be given the first time')
+
+        params: dict[str, Any] = {
+            'action': 'query',
+            'list': 'recentchanges',
+            'rcprop': 'title|ids|timestamp',
+            'rctype': 'edit|new|log',
+            'rcdir': 'newer',
+            'rcstart': start,
+            'rclimit': 'max',
+            'format': 'json'
+        }
+        if namespaces is not None:
+            params['rcnamespace'] = '|'.join(str(namespace) for namespace in namespaces)
+
+        entity_ids: dict[str, None] = {}
+        last = start
+        while True:
+            reply = mediawiki_api_call_helper(data=params, allow_anonymous=allow_anonymous, **kwargs)
+            for change in reply['query']['recentchanges']:
+                if change['ns'] == FILE_NAMESPACE:
+                    entity_ids['M' + str(change['pageid'])] = None
+                else:
+                    entity_ids[change['title'].rsplit(':', 1)[-1]] = None
+                last = max(last, change['timestamp'])
+            if 'continue' not in reply:
+                break
+            params.update(reply['continue'])
+
+        known = [entity_id for entity_id in entity_ids if entity_id in self]
+        log.debug('%d entities changed since %s, %d of them in the mirror', len(entity_ids), start, len(known))
+        count = self.load(known, allow_anonymous=allow_anonymous, **kwargs) if known else 0
+        self._set_meta('recentchanges', last)
+        return count
+
+    def get(self, entity_id: str) -> dict[str, Any] | None:
+        """
+        Return the JSON of an entity.
+
+        :param entity_id: The ID of the entity
+        :return: The JSON of the entity, None if it's not in the mirror
+        """
+        rows = self._query('SELECT json FROM entities WHERE id = ?', (entity_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def get_entity(self, entity_id: str, api: WikibaseIntegrator | None = None) -> BaseEntity | None:
+        """
+        Return an entity, loaded lazily from its JSON.
+
+        :param entity_id: The ID of the entity
+        :param api: The WikibaseIntegrator instance of the entity
+        :return: The entity, None if it's not in the mirror
+        """
+        json_data = self.get(entity_id)
+        if json_data is None:
+            return None
+        return BaseEntity.etypes[json_data['type']](api=api).from_json(json_data, lazy=True, trusted=True)
+
+    def get_statement(self, statement_id: str) -> dict[str, Any] | None:
+        """
+        Return the JSON of a statement.
+
+        :param statement_id: The ID of the statement, like 'Q42$F078E5B3-F9A8-480E-B7AC-D97778CBBEF9'
+        :return: The JSON of the statement, None if it's not in the mirror
+        """
+        rows = self._query('SELECT entity_id, property FROM statements WHERE statement_id = ?', (statement_id,))
+        if not rows:
+            return None
+        entity_id, prop_nr = rows[0]
+        json_data = self.get(entity_id) or {}
+        for claim in (json_data.get('claims') or json_data.get('statements') or {}).get(prop_nr, []):
+            if claim.get('id') == statement_id:
+                return claim
+        return None
+
+    def find(self, *filters: BaseFilterElement) -> set[str]:
+        """
+        Return the IDs of the entities matching every filter. The filters are the elements of the base filter of a
+        fastrun container, compared with the best statements of the entities, like the truthy statements of the
+        SPARQL endpoint:
+
+        * a datatype instance with a value: the entities with this value, like ``Item(prop_nr='P31', value='Q5')``
+        * a datatype instance without a value: the entities with a statement of the property
+        * a tuple of datatype instances of the same property: the entities with one of the values
+        * a list of two datatype instances, a property path: the entities whose value of the first property is the
+          value of the first instance, or reaches it through the property of the second instance, like
+          ``[Item(prop_nr='P31', value='Q5'), Item(prop_nr='P279')]`` for the instances of Q5 and of its subclasses
+
+        :param filters: The filters. Without filter, all the entities of the mirror are returned.
+        :return: A set of entity IDs
+        """
+        if not filters:
+            return {row[0] for row in self._query('SELECT id FROM entities')}
+
+        entity_ids: set[str] | None = None
+        for element in filters:
+            matches = self._find(element)
+            entity_ids = matches if entity_ids is None else entity_ids & matches
+            if not entity_ids:
+                break
+        return entity_ids or set()
+
+    def statements(self, prop_nr: str) -> list[tuple[str, str | None, str, str | None]]:
+        """
+        Return the statements of a property holding a value.
+
+        :param prop_nr: The property number
+        :return: A list of tuples (entity ID, statement ID, value, unit). The unit is None for the values that are not
+            quantities.
+        """
+        return self._query('SELECT entity_id, statement_id, value, unit FROM statements WHERE property = ? AND value IS NOT NULL', (prop_nr,))
+
+    def terms(self, term_type: str, languages: Iterable[str]) -> list[tuple[str, str, str]]:
+        """
+        Return the terms of a type in the given languages.
+
+        :param term_type: 'label', 'description' or 'alias'
+        :param languages: The language codes
+        :return: A list of tuples (entity ID, language, value)
+        """
+        languages = list(languages)
+        placeholders = ', '.join('?' * len(languages))
+        return self._query(f'SELECT entity_id, language, value FROM terms WHERE term_type = ? AND language IN ({placeholders})', (term_type, *languages))
+
+    def _find(self, element: BaseFilterElement) -> set[str]:
+        """Return the IDs of the entities matching a filter, see :func:`find`."""
+        params: list[Any]
+        if isinstance(element, BaseDataType):
+            if not element.mainsnak.datavalue:
+                query, params = 'SELECT entity_id FROM statements WHERE property = ? AND best = 1', [element.mainsnak.property_number]
+            else:
+                value, unit = self._value(element)
+                query, params = 'SELECT entity_id FROM statements WHERE property = ? AND value = ? AND unit IS ? AND best = 1', [element.mainsnak.property_number, value, unit]
+        elif isinstance(element, tuple) and element:
+            values = [self._value(x) for x in element]
+            placeholders = ' OR '.join('(value = ? AND unit IS ?)' for _ in values)
+            query = f'SELECT entity_id FROM statements WHERE property = ? AND best = 1 AND ({placeholders})'
+            params = [element[0].mainsnak.property_number, *(x for value in values for x in value)]
+        elif isinstance(element, list) and len(element) == 2 and isinstance(element[1], BaseDataType):
+            roots = element[0] if isinstance(element[0], tuple) else (element[0],)
+            prop_nr = roots[0].mainsnak.property_number
+            if not roots[0].mainsnak.datavalue:
+                return self._find(roots[0])
+            root_values = [self._value(x)[0] for x in roots]
+            placeholders = ', '.join('(?)' for _ in root_values)
+            # The classes reaching the roots through the path property, by their SPARQL value
+            query = f'''
+            WITH RECURSIVE classes(value) AS (
+              VALUES {placeholders}
+              UNION
+              SELECT '<' || ? || '/entity/' || statements.entity_id || '>' FROM statements JOIN classes ON statements.value = classes.value
+              WHERE statements.property = ? AND statements.best = 1
+            )
+            SELECT entity_id FROM statements WHERE property = ? AND best = 1 AND value IN (SELECT value FROM classes)
+            '''
+            params = [*root_values, self.wikibase_url, element[1].mainsnak.property_number, prop_nr]
+        else:
+            raise ValueError("A filter must be an instance of BaseDataType, a tuple of instances of BaseDataType or a list of instances of BaseDataType")
+
+        return {row[0] for row in self._query(query, params)}
+
+    def _query(self, query: str, params: Iterable[Any] = ()) -> list[Any]:
+        """Run a query and return its rows. The connection is shared between threads, the rows are fetched at once."""
+        with self._lock:
+            return self._connection.execute(query, tuple(params)).fetchall()
+
+    def _value(self, claim: Any) -> tuple[str | None, str | None]:
+        """The indexed value of a claim: its SPARQL value and, for a quantity, its normalized unit."""
+        from wikibaseintegrator.wbi_fastrun import FastRunContainer
+
+        try:
+            value = claim.get_sparql_value(wikibase_url=self.wikibase_url)
+        except (KeyError, TypeError, ValueError):
+            # A datatype without a SPARQL representation
+            return None, None
+        datavalue = claim.mainsnak.datavalue
+        unit = None
+        if isinstance(datavalue, dict) and datavalue.get('type') == 'quantity':
+            unit = FastRunContainer._normalize_unit(datavalue['value'].get('unit', '1'))  # pylint: disable=protected-access
+        return value, unit
+
+    def _insert(self, json_data: dict[str, Any]) -> None:
+        entity_id = json_data['id']
+        self._connection.execute('INSERT INTO entities (id, type, lastrevid, json) VALUES (?, ?, ?, ?)',
+                                 (entity_id, json_data.get('type', ''), json_data.get('lastrevid'), json.dumps(json_data, separators=(',', ':'))))
+
+        rows = []
+        for prop_nr, claims in Claims().from_json(json_data.get('claims') or json_data.get('statements') or {}, trusted=True).claims.items():
+            # The best statements: the preferred ones if any, the normal ones otherwise
+            best_rank = WikibaseRank.PREFERRED if any(claim.rank == WikibaseRank.PREFERRED for claim in claims) else WikibaseRank.NORMAL
+            for claim in claims:
+                if claim.mainsnak.snaktype == WikibaseSnakType.NO_VALUE:
+                    continue
+                value, unit = self._value(claim) if claim.mainsnak.snaktype == WikibaseSnakType.KNOWN_VALUE else (None, None)
+                rows.append((entity_id, claim.id, prop_nr, value, unit, claim.rank.value, int(claim.rank == best_rank)))
+        self._connection.executemany('INSERT INTO statements (entity_id, statement_id, property, value, unit, rank, best) VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+
+        terms = []
+        for field, term_type in TERM_TYPES.items():
+            for language, values in (json_data.get(field) or {}).items():
+                for value in values if isinstance(values, list) else [values]:
+                    terms.append((entity_id, term_type, language, value['value']))
+        self._connection.executemany('INSERT INTO terms (entity_id, term_type, language, value) VALUES (?, ?, ?, ?)', terms)
+
+    def _delete(self, entity_id: str) -> None:
+        for table, column in (('entities', 'id'), ('statements', 'entity_id'), ('terms', 'entity_id')):
+            self._connection.execute(f'DELETE FROM {table} WHERE {column} = ?', (entity_id,))
+
+    def _get_meta(self, key: str) -> str | None:
+        rows = self._query('SELECT value FROM meta WHERE key = ?', (key,))
+        return rows[0][0] if rows else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def __repr__(self) -> str:
+        return f'<EntityMirror {str(self.path)!r} {len(self)} entities>'
+
+
+class MirrorSource:
+    """
+    The data source of a fastrun container using a mirror: the statements and the terms of the entities of the mirror
+    matching the base filter of the container, in the format of the data loaded from the SPARQL endpoint. See the
+    ``mirror`` parameter of :class:`~wikibaseintegrator.wbi_fastrun.FastRunContainer`.
+
+    :param mirror: The mirror
+    :param base_filter: The base filter of the container
+    :param wikibase_url: The Wikibase URL of the entity and statement URIs
+    :param case_insensitive: Casefold the values, like the keys of a case insensitive container
+    """
+
+    def __init__(self, mirror: EntityMirror, base_filter: list[BaseFilterElement], wikibase_url: str, case_insensitive: bool = False):
+        self.mirror = mirror
+        self.base_filter = base_filter
+        self.wikibase_url = wikibase_url
+        self.case_insensitive = case_insensitive
+        # The IDs of the entities of the mirror matching the base filter, computed on the first load
+        self._corpus: set[str] | None = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict[str, Any]:
+        """The lock can't be pickled, it is created again by __setstate__."""
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def corpus(self) -> set[str]:
+        """Return the IDs of the entities of the mirror matching the base filter, computed on the first call."""
+        with self._lock:
+            if self._corpus is None:
+                self._corpus = self.mirror.find(*self.base_filter)
+            return self._corpus
+
+    def update(self, entity_id: str, in_corpus: bool) -> None:
+        """
+        Add an entity to the corpus or remove it, after it was updated in the mirror. The corpus is not computed if it
+        was not yet.
+
+        :param entity_id: The ID of the entity
+        :param in_corpus: True if the entity matches the base filter
+        """
+        with self._lock:
+            if self._corpus is not None:
+                if in_corpus:
+                    self._corpus.add(entity_id)
+                else:
+                    self._corpus.discard(entity_id)
+
+    def clear(self) -> None:
+        """Forget the corpus, it is computed again on the next load."""
+        with self._lock:
+            self._corpus = None
+
+    def statements(self, prop_nr: str) -> dict[str, list[dict[str, str]]]:
+        """
+        Load the statements of a property of the entities of the corpus.
+
+        :param prop_nr: The property number of the statements.
+        :return: The statements of the property: value key -> list of {'entity': uri, 'sid': uri}
+        """
+        corpus = self.corpus()
+        data: dict[str, list[dict[str, str]]] = {}
+        for entity_id, statement_id, value, unit in self.mirror.statements(prop_nr):
+            if entity_id not in corpus or not statement_id:
+                continue
+            if self.case_insensitive:
+                value = value.casefold()
+            if unit is not None:
+                value += '@' + unit
+            # The statement URI of the RDF export: the $ separator of the statement ID is replaced by a dash
+            data.setdefault(value, []).append({'entity': sys.intern(f'{self.wikibase_url}/entity/{entity_id}'),
+                                               'sid': f'{self.wikibase_url}/entity/statement/{statement_id.replace("$", "-", 1)}'})
+        return data
+
+    def claim(self, sid: str) -> Claim | None:
+        """
+        Load a statement, by its statement URI.
+
+        :param sid: The statement URI
+        :return: The claim, or None if the statement is not in the mirror
+        """
+        json_data = self.mirror.get_statement(sid.rsplit('/', 1)[-1].replace('-', '$', 1))
+        if json_data is None:
+            return None
+        return _claim_from_json(json_data, trusted=True)
+
+    def terms(self, langs: list[str], lang_data_type: str) -> Iterator[dict[str, dict]]:
+        """
+        Load the language data of the entities of the corpus, in the format of the bindings returned by the SPARQL
+        endpoint.
+
+        :param langs: list of language codes
+        :param lang_data_type: 'label', 'description' or 'aliases'
+        """
+        corpus = self.corpus()
+        term_type = 'alias' if lang_data_type == 'aliases' else lang_data_type
+        for entity_id, lang, value in self.mirror.terms(term_type, langs):
+            if entity_id in corpus:
+                yield {'entity': {'value': f'{self.wikibase_url}/entity/{entity_id}'}, 'label': {'value': value, 'xml:lang': lang}}
+
+    def __repr__(self) -> str:
+        return f'<MirrorSource {self.mirror!r}>'
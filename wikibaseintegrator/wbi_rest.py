@@ -0,0 +1,214 @@
+"""
+Read path through the Wikibase REST API (https://doc.wikimedia.org/Wikibase/master/js/rest-api/), under
+wbi_config['MEDIAWIKI_REST_URL'].
+
+The REST API serves the items and the properties with GET requests, revalidated with their ETag against the cache of the
+WikibaseIntegrator instance: an entity is only transferred again when it changed. The fields of an entity can be
+selected, and the statements of a single property read on their own.
+
+The REST API has its own JSON format, converted here to the format of the MediaWiki API used by the rest of the library.
+"""
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from typing import Any
+
+import ujson
+
+from wikibaseintegrator.wbi_cache import CachedResponse, ResponseCache
+from wikibaseintegrator.wbi_config import config
+from wikibaseintegrator.wbi_exceptions import NonExistentEntityError
+from wikibaseintegrator.wbi_helpers import conditional_get
+
+# The path of the entities in the REST API, by entity type. The other entity types are not served by the REST API.
+ENTITY_PATHS = {
+    'item': 'items',
+    'property': 'properties'
+}
+
+# The fields of the REST API, by part of an entity in the MediaWiki API (the 'props' of wbgetentities)
+FIELDS = {
+    'labels': 'labels',
+    'descriptions': 'descriptions',
+    'aliases': 'aliases',
+    'claims': 'statements',
+    'sitelinks': 'sitelinks',
+    'datatype': 'data_type'
+}
+
+# The fields of each entity type
+ENTITY_FIELDS = {
+    'item': ('type', 'labels', 'descriptions', 'aliases', 'statements', 'sitelinks'),
+    'property': ('type', 'data_type', 'labels', 'descriptions', 'aliases', 'statements')
+}
+
+# The type of the entity referenced by a value, by data type
+ENTITY_VALUE_TYPES = {
+    'wikibase-item': 'item',
+    'wikibase-property': 'property',
+    'wikibase-lexeme': 'lexeme',
+    'wikibase-form': 'form',
+    'wikibase-sense': 'sense',
+    'entity-schema': 'entity-schema'
+}
+
+# The type of the data value of a value which is not a string, by data type
+VALUE_TYPES = {
+    'monolingualtext': 'monolingualtext',
+    'quantity': 'quantity',
+    'time': 'time',
+    'globe-coordinate': 'globecoordinate'
+}
+
+REVISION_PATTERN = re.compile(r'(\d+)')
+
+
+def get_entity(entity_id: str, entity_type: str, props: str | Iterable[str] | None = None, cache: ResponseCache | None = None, mediawiki_rest_url: str | None = None,
+               **kwargs: Any) -> dict[str, Any]:
+    """
+    Read an item or a property from the REST API.
+
+    :param entity_id: The ID of the entity
+    :param entity_type: The type of the entity, 'item' or 'property'
+    :param props: The parts of the entity to read, like the 'props' of wbgetentities: 'labels', 'descriptions', 'aliases',
+        'claims', 'sitelinks' or 'datatype'. All of them by default.
+    :param cache: The cache of the responses
+    :param mediawiki_rest_url: The URL to the MediaWiki REST API (default Wikidata)
+    :param kwargs: Any additional keyword arguments to pass to :func:`~wikibaseintegrator.wbi_helpers.conditional_get`
+    :return: The JSON of the entity, in the format of the MediaWiki API
+    """
+    params = None
+    if props:
+        if isinstance(props, str):
+            props = props.split('|')
+        fields = [FIELDS[prop] for prop in props if prop in FIELDS and FIELDS[prop] in ENTITY_FIELDS[entity_type]]
+        params = {'_fields': ','.join(['type', *fields])}
+
+    response = _get(f'/entities/{_entity_path(entity_type)}/{entity_id}', entity_id, params=params, cache=cache, mediawiki_rest_url=mediawiki_rest_url, **kwargs)
+    return entity_from_rest(ujson.loads(response.content), entity_id=entity_id, etag=response.etag)
+
+
+def get_statements(entity_id: str, entity_type: str, property: str | None = None, cache: ResponseCache | None = None, mediawiki_rest_url: str | None = None,
+                   **kwargs: Any) -> dict[str, list[dict[str, Any]]]:
+    """
+    Read the statements of an item or a property from the REST API, without the rest of the entity.
+
+    :param entity_id: The ID of the entity
+    :param entity_type: The type of the entity, 'item' or 'property'
+    :param property: Only read the statements of this property
+    :param cache: The cache of the responses
+    :param mediawiki_rest_url: The URL to the MediaWiki REST API (default Wikidata)
+    :param kwargs: Any additional keyword arguments to pass to :func:`~wikibaseintegrator.wbi_helpers.conditional_get`
+    :return: The JSON of the claims by property, in the format of the MediaWiki API
+    """
+    params = {'property': property} if property else None
+    response = _get(f'/entities/{_entity_path(entity_type)}/{entity_id}/statements', entity_id, params=params, cache=cache, mediawiki_rest_url=mediawiki_rest_url, **kwargs)
+    return {prop_nr: [statement_from_rest(statement) for statement in statements] for prop_nr, statements in ujson.loads(response.content).items()}
+
+
+def entity_from_rest(json_data: dict[str, Any], entity_id: str | None = None, etag: str | None = None) -> dict[str, Any]:
+    """
+    Convert the JSON of an entity of the REST API to the format of the MediaWiki API.
+
+    :param json_data: The JSON of the entity, with all its fields or some of them
+    :param entity_id: The ID of the entity, if the ID is not among the fields
+    :param etag: The ETag of the response, the ID of the revision of the entity
+    :return: The JSON of the entity
+    """
+    entity: dict[str, Any] = {'id': json_data.get('id', entity_id)}
+    if 'type' in json_data:
+        entity['type'] = json_data['type']
+    if etag and (revision := REVISION_PATTERN.search(etag)):
+        entity['lastrevid'] = int(revision.group(1))
+    if 'data_type' in json_data:
+        entity['datatype'] = json_data['data_type']
+    for term_type in ('labels', 'descriptions'):
+        if term_type in json_data:
+            entity[term_type] = {language: {'language': language, 'value': value} for language, value in json_data[term_type].items()}
+    if 'aliases' in json_data:
+        entity['aliases'] = {language: [{'language': language, 'value': value} for value in values] for language, values in json_data['aliases'].items()}
+    if 'statements' in json_data:
+        entity['claims'] = {prop_nr: [statement_from_rest(statement) for statement in statements] for prop_nr, statements in json_data['statements'].items()}
+    if 'sitelinks' in json_data:
+        entity['sitelinks'] = {site: {'site': site, 'title': sitelink['title'], 'badges': sitelink.get('badges', [])} for site, sitelink in json_data['sitelinks'].items()}
+    return entity
+
+
+def statement_from_rest(json_data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Convert the JSON of a statement of the REST API to the format of the MediaWiki API.
+
+    :param json_data: The JSON of the statement
+    :return: The JSON of the claim
+    """
+    claim: dict[str, Any] = {
+        'mainsnak': _snak_from_rest(json_data),
+        'type': 'statement',
+        'rank': json_data.get('rank', 'normal')
+    }
+    if 'id' in json_data:
+        claim['id'] = json_data['id']
+    if json_data.get('qualifiers'):
+        claim['qualifiers'], claim['qualifiers-order'] = _snaks_from_rest(json_data['qualifiers'])
+    if json_data.get('references'):
+        claim['references'] = []
+        for reference in json_data['references']:
+            snaks, snaks_order = _snaks_from_rest(reference['parts'])
+            json_reference: dict[str, Any] = {'snaks': snaks, 'snaks-order': snaks_order}
+            if 'hash' in reference:
+                json_reference['hash'] = reference['hash']
+            claim['references'].append(json_reference)
+    return claim
+
+
+def _snaks_from_rest(parts: list[dict[str, Any]]) -> tuple[dict[str, list[dict[str, Any]]], list[str]]:
+    """Convert a list of property-value pairs of the REST API to snaks by property, and the order of the properties."""
+    snaks: dict[str, list[dict[str, Any]]] = {}
+    for part in parts:
+        snaks.setdefault(part['property']['id'], []).append(_snak_from_rest(part))
+    return snaks, list(snaks)
+
+
+def _snak_from_rest(json_data: dict[str, Any]) -> dict[str, Any]:
+    """Convert a property-value pair of the REST API, a statement or a qualifier, to a snak."""
+    datatype = json_data['property'].get('data_type')
+    value = json_data['value']
+    snak: dict[str, Any] = {'snaktype': value['type'], 'property': json_data['property']['id']}
+    if datatype:
+        snak['datatype'] = datatype
+    if value['type'] == 'value':
+        snak['datavalue'] = _datavalue_from_rest(value['content'], datatype)
+    return snak
+
+
+def _datavalue_from_rest(content: Any, datatype: str | None) -> dict[str, Any]:
+    """Convert the content of a value of the REST API to a data value. The REST API omits the default fields of the times and the coordinates."""
+    if datatype in ENTITY_VALUE_TYPES:
+        entity_value: dict[str, Any] = {'entity-type': ENTITY_VALUE_TYPES[datatype], 'id': content}
+        if ENTITY_VALUE_TYPES[datatype] in ('item', 'property', 'lexeme'):
+            entity_value['numeric-id'] = int(content[1:])
+        return {'value': entity_value, 'type': 'wikibase-entityid'}
+    if datatype == 'time':
+        content = {'timezone': 0, 'before': 0, 'after': 0, **content}
+    elif datatype == 'globe-coordinate':
+        content = {'altitude': None, **content}
+    if isinstance(content, str):
+        return {'value': content, 'type': 'string'}
+    return {'value': content, 'type': VALUE_TYPES.get(str(datatype), str(datatype))}
+
+
+def _entity_path(entity_type: str) -> str:
+    if entity_type not in ENTITY_PATHS:
+        raise ValueError(f"The REST API does not serve the entities of type '{entity_type}'")
+    return ENTITY_PATHS[entity_type]
+
+
+def _get(path: str, entity_id: str, params: dict[str, Any] | None = None, cache: ResponseCache | None = None, mediawiki_rest_url: str | None = None,
+         **kwargs: Any) -> CachedResponse:
+    """Send a GET request to the REST API, revalidated against the cache. Raise NonExistentEntityError if the entity does not exist."""
+    mediawiki_rest_url = str(mediawiki_rest_url or config['MEDIAWIKI_REST_URL'])
+    response = conditional_get(f'{mediawiki_rest_url}/wikibase/v1{path}', params=params, cache=cache, **kwargs)
+    if response is None:
+        raise NonExistentEntityError({'code': 'no-such-entity', 'info': f'Could not find an entity with the ID "{entity_id}".', 'id': entity_id})
+    return response
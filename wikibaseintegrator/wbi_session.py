@@ -0,0 +1,223 @@
+"""
+Unit of work over the entities of a Wikibase instance.
+
+An :class:`EditSession` records the entities modified during a batch, by ID, and writes each of them once, in a single
+``wbeditentity`` call, when the session is committed. The entities read with :func:`EditSession.get` are shared: each
+update made by a different step of the batch is applied to the same object, in order, with the usual semantics of
+:class:`~wikibaseintegrator.wbi_enums.ActionIfExists`. Another object of an entity already pending, read lazily from
+the instance, can also be added: its changes since the revision it was read from are applied to the pending entity at
+commit time, after the changes already made to it.
+"""
+from __future__ import annotations
+
+import logging
+from types import TracebackType
+from typing import Any
+
+from wikibaseintegrator.entities.baseentity import BaseEntity
+from wikibaseintegrator.wbi_diff import TERM_FIELDS, ClaimChange, EntityDiff, diff
+from wikibaseintegrator.wbi_enums import ActionIfExists
+from wikibaseintegrator.wikibaseintegrator import WikibaseIntegrator
+
+log = logging.getLogger(__name__)
+
+# The attribute of the WikibaseIntegrator instance reading the entities, by prefix of the ID
+ENTITY_TYPES = {
+    'Q': 'item',
+    'P': 'property',
+    'L': 'lexeme',
+    'M': 'mediainfo'
+}
+
+
+class EditSession:
+    """
+    Record the modifications of entities and write each entity in a single edit when the session is committed.
+
+    The session is a context manager: it is committed at the end of the ``with`` block, or rolled back if an exception
+    is raised.
+
+    :param api: The WikibaseIntegrator instance reading the entities, a new one by default
+    :param max_entities: Commit the session before a new entity is added if this number of entities is pending, None for
+        no limit
+    :param write_kwargs: The arguments of each write, like summary, login or is_bot, see
+        :func:`~wikibaseintegrator.entities.baseentity.BaseEntity._write`. The entities are written in a single
+        ``wbeditentity`` call unless statement_level is given.
+    """
+    __slots__ = ('api', 'max_entities', 'write_kwargs', '_entities', '_merges', '_new')
+
+    def __init__(self, api: WikibaseIntegrator | None = None, max_entities: int | None = 100, **write_kwargs: Any):
+        if max_entities is not None and max_entities < 1:
+            raise ValueError('max_entities must be greater than 0')
+        self.api = api or WikibaseIntegrator()
+        self.max_entities = max_entities
+        self.write_kwargs = write_kwargs
+        # The pending entities by ID, the other objects of these entities to merge into them, and the new entities
+        self._entities: dict[str, Any] = {}
+        self._merges: dict[str, list[BaseEntity]] = {}
+        self._new: list[Any] = []
+
+    def get(self, entity_id: str, **kwargs: Any) -> BaseEntity:
+        """
+        Return the pending entity of an ID, or read it lazily from the instance and add it to the session.
+
+        :param entity_id: The ID of the entity, like 'Q582'
+        :param kwargs: More arguments for the get() method of the entity
+        :return: The entity, to modify in place
+        """
+        entity_id = str(entity_id)
+        if entity_id in self._entities:
+            return self._entities[entity_id]
+
+        entity_type = ENTITY_TYPES.get(entity_id[:1].upper())
+        if entity_type is None:
+            raise ValueError(f"Can't find the type of the entity '{entity_id}'")
+        return self.add(getattr(self.api, entity_type).get(entity_id, lazy=True, **kwargs))
+
+    def add(self, entity: BaseEntity) -> BaseEntity:
+        """
+        Add an entity to the session. If another object of the same entity is already pending, the changes of this one
+        since the revision it was read from are applied to the pending one at commit time: it must have been read
+        lazily from the instance.
+
+        :param entity: The entity, new or read from the instance
+        :return: The entity
+        """
+        if entity.id is not None and entity.id in self._entities:
+            pending = self._entities[entity.id]
+            if entity is not pending and all(entity is not other for other in self._merges.get(entity.id, [])):
+                if entity.base_json is None:
+                    raise ValueError(f"Entity '{entity.id}' is already pending: only an entity read lazily from the instance can be merged into it")
+                self._merges.setdefault(entity.id, []).append(entity)
+            return entity
+
+        if entity.id is None and any(entity is new for new in self._new):
+            return entity
+
+        if self.max_entities is not None and len(self) >= self.max_entities:
+            self.commit()
+
+        if entity.id is None:
+            self._new.append(entity)
+        else:
+            self._entities[entity.id] = entity
+        return entity
+
+    def commit(self) -> list[BaseEntity]:
+        """
+        Write each pending entity in a single edit. The entities unchanged since the revision they were read from are
+        not written. If a write fails, the entities not written yet stay pending.
+
+        :return: The entities returned by the instance
+        """
+        write_kwargs = {'statement_level': False, **self.write_kwargs}
+        written = []
+
+        for entity_id in list(self._entities):
+            entity = self._entities[entity_id]
+            for other in self._merges.pop(entity_id, []):
+                _apply(entity, diff(_base(other), other))
+            if entity.base_json is None or diff(_base(entity), entity):
+                written.append(entity.write(**write_kwargs))
+            else:
+                log.debug('Entity %s unchanged, not written', entity_id)
+            del self._entities[entity_id]
+
+        while self._new:
+            written.append(self._new[0].write(**write_kwargs))
+            del self._new[0]
+
+        return written
+
+    def rollback(self) -> None:
+        """Forget the pending entities without writing them. The entity objects keep their local changes."""
+        self._entities.clear()
+        self._merges.clear()
+        self._new.clear()
+
+    def __enter__(self) -> EditSession:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc_value: BaseException | None, traceback: TracebackType | None) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def __len__(self) -> int:
+        return len(self._entities) + len(self._new)
+
+    def __contains__(self, entity_id: object) -> bool:
+        return entity_id in self._entities
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {len(self)} pending entities>'
+
+
+def _base(entity: BaseEntity) -> BaseEntity:
+    """The entity as read from the instance."""
+    assert entity.base_json is not None
+    return entity.__class__(api=entity.api).from_json(entity.base_json, lazy=True, trusted=True)
+
+
+def _apply_claim(claim: Any, change: ClaimChange) -> None:
+    """
+    Apply the changes of a claim of another object of an entity to the claim of the entity with the same id: the
+    qualifiers and references added or removed, and the main snak and the rank if they changed. The other changes made
+    to the claim of the entity are kept.
+    """
+    if change.value_changed:
+        claim.mainsnak = change.new.mainsnak
+    if change.rank_changed:
+        claim.rank = change.new.rank
+
+    for qualifier in change.qualifiers_removed:
+        if qualifier in claim.qualifiers:
+            claim.qualifiers.remove(qualifier)
+    for qualifier in change.qualifiers_added:
+        if qualifier not in claim.qualifiers:
+            claim.qualifiers.add(qualifier)
+    if claim.qualifiers_order and (change.qualifiers_added or change.qualifiers_removed):
+        order = [property for property in claim.qualifiers_order if claim.qualifiers.get(property)]
+        claim.qualifiers_order = order + [property for property in claim.qualifiers.qualifiers if property not in order]
+
+    for reference in change.references_removed:
+        claim.references.remove(reference)
+    for reference in change.references_added:
+        claim.references.add(reference)
+
+
+def _apply(entity: Any, changes: EntityDiff) -> None:
+    """Apply the changes of another object of an entity to the entity. The claims are matched by id."""
+    if any(getattr(changes, field) for field in ('values', 'forms_added', 'forms_removed', 'forms_changed', 'senses_added', 'senses_removed', 'senses_changed')):
+        raise ValueError(f"The changes of the forms, senses and values of '{entity.id}' can't be merged, make them on the entity returned by EditSession.get()")
+
+    claims = {claim.id: claim for property in changes.properties for claim in entity.claims.get(property) if claim.id}
+    for removed_claims in changes.claims_removed.values():
+        for claim in removed_claims:
+            if claim.id in claims:
+                claims[claim.id].remove()
+    for claim_changes in changes.claims_changed.values():
+        for change in claim_changes:
+            if change.old.id in claims:
+                _apply_claim(claims[change.old.id], change)
+            else:
+                entity.claims.add(change.new, action_if_exists=ActionIfExists.FORCE_APPEND)
+    for added_claims in changes.claims_added.values():
+        entity.claims.add(added_claims, action_if_exists=ActionIfExists.FORCE_APPEND)
+
+    for field, terms in changes.terms.items():
+        assert field in TERM_FIELDS
+        for language, (_, value) in terms.items():
+            getattr(entity, field).set(language, value)
+
+    for language, (removed, added) in changes.aliases.items():
+        for alias in entity.aliases.get(language) or []:
+            if alias.value in removed:
+                alias.remove()
+        if added:
+            entity.aliases.set(language, added, action_if_exists=ActionIfExists.APPEND_OR_REPLACE)
+
+    for site, (_, sitelink) in changes.sitelinks.items():
+        # A sitelink with an empty title is removed by wbeditentity
+        entity.sitelinks.set(site, sitelink.title if sitelink else '', list(sitelink.badges) if sitelink else None)
@@ -9,6 +9,8 @@ from wikibaseintegrator.entities.item import ItemEntity
 from wikibaseintegrator.entities.lexeme import LexemeEntity
 from wikibaseintegrator.entities.mediainfo import MediaInfoEntity
 from wikibaseintegrator.entities.property import PropertyEntity
+from wikibaseintegrator.wbi_cache import ResponseCache
+from wikibaseintegrator.wbi_enums import ConflictPolicy, ReadBackend
 
 if TYPE_CHECKING:
     from wikibaseintegrator.wbi_login import _Login
@@ -16,16 +18,23 @@ if TYPE_CHECKING:
 
 class WikibaseIntegrator:
 
-    def __init__(self, is_bot: bool = False, login: _Login | None = None):
+    def __init__(self, is_bot: bool = False, login: _Login | None = None, read_backend: ReadBackend = ReadBackend.ACTION_API, read_cache: ResponseCache | None = None,
+                 conflict_policy: ConflictPolicy = ConflictPolicy.OVERWRITE):
         """
         This function initializes a WikibaseIntegrator instance to quickly access different entity type instances.
 
         :param is_bot: declare if the bot flag must be set when you interact with the MediaWiki API.
         :param login: a wbi_login instance needed when you try to access a restricted MediaWiki instance.
+        :param read_backend: the endpoint used to read the entities, see :class:`~wikibaseintegrator.wbi_enums.ReadBackend`.
+        :param read_cache: the cache of the responses of Special:EntityData, a new one by default, shared by the entities of this instance.
+        :param conflict_policy: the handling of the edits made by others since an entity was read, see :class:`~wikibaseintegrator.wbi_enums.ConflictPolicy`.
         """
         # Runtime variables
         self.is_bot = is_bot or False
         self.login = login
+        self.read_backend = read_backend
+        self.read_cache = read_cache if read_cache is not None else ResponseCache()
+        self.conflict_policy = conflict_policy
 
         # Quick access to entities
         self.item = ItemEntity(api=self)